@@ -0,0 +1,352 @@
+"""
+count_values_in_csv のベンチマーク
+
+generate_csv_corpus で作成した再現可能な合成CSVコーパス（横長・縦長・クォート多用・
+値の中の改行・疎・全角文字）に対して、カウント方式とワーカー数の組み合わせ毎に
+処理速度（行/秒、MB/秒）とピークメモリ使用量（RSS）を計測し、結果をJSONファイルに書き込みます。
+JSONファイルを残しておくことで、実行毎の結果を比較できます。
+
+カウント方式:
+- 2-pass: 1パス化する前の count_values_in_csv（比較用、ワーカー数 1 のみ）
+- python: csv.reader（--engine python）
+- bytes: バイト列走査（--engine bytes）
+- arrow: Apache Arrow の列指向リーダー（--engine arrow、pyarrow がある場合のみ）
+
+使い方:
+    python benchmark_count_CSV_FieldValue.py
+    python benchmark_count_CSV_FieldValue.py --profile wide --profile tall --scale 0.1 --workers 1 --workers 4
+    python benchmark_count_CSV_FieldValue.py --corpus corpus --output before.json
+
+Note:
+    - 計測は1回毎に別のPythonプロセスで実行する（ピークRSSが前の計測の影響を受けないようにする）
+    - ピークRSSはワーカープロセスを含めた中で最大のプロセスの値（resource モジュールが無い Windows では null）
+    - ワーカー数が2以上の場合は、--chunk-size を超えるファイルをレコード境界で分割して並列にカウントする
+"""
+
+import argparse
+import csv
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Dict, Tuple
+
+from count_CSV_FieldValue import CountOptions, count_values_in_csv, csv_arrow_engine, log_message
+from generate_csv_corpus import DEFAULT_SEED, PROFILES, generate_corpus
+
+try:
+    import resource
+except ImportError:
+    resource = None  # Windows ではピークRSSを計測しない
+
+FIELD_SIZE_LIMIT: int = 1024 * 1024 * 1024  # 1 GB
+DEFAULT_CHUNK_SIZE_MB: int = 16  # ワーカー数が2以上の場合に1つのCSVファイルを分割する目安（MB）
+RESULT_VERSION: int = 1  # 結果のJSONファイルの形式のバージョン
+
+
+def count_values_in_csv_two_pass(
+    file_path: str, log_file: str, field_size_limit: int
+) -> Tuple[Dict[str, int], list[str], bool, int]:
+    """比較用: 1パス化する前の count_values_in_csv（2回読み込み + DictReader）
+
+    Args:
+        file_path (str): 処理対象のCSVファイルのパス
+        log_file (str): ログファイルのパス
+        field_size_limit (int): CSVフィールドサイズの制限値（バイト）
+
+    Returns:
+        Tuple[Dict[str, int], list[str], bool, int]: count_values_in_csv と同じ
+    """
+    field_count: Dict[str, int] = {}
+    fieldnames: list[str] = []
+    has_data: bool = False
+    data_row_count: int = 0
+
+    csv.field_size_limit(field_size_limit)
+    with open(file=file_path, mode="r", encoding="cp932") as csvfile:
+        raw_reader = csv.reader(csvfile)
+        header_row: list[str] | None = next(raw_reader, None)
+        expected_field_count: int = len(header_row) if header_row else 0
+        for row_index, raw_row in enumerate(raw_reader, start=2):
+            if len(raw_row) != expected_field_count:
+                log_message(
+                    log_file=log_file,
+                    message=f"{file_path}: 行 {row_index} のフィールド数エラー - 期待値: {expected_field_count}, 実際: {len(raw_row)}",
+                )
+
+        csvfile.seek(0)
+        reader: csv.DictReader[str] = csv.DictReader(f=csvfile)
+        fieldnames = list(reader.fieldnames) if reader.fieldnames else []
+        for row in reader:
+            data_row_count += 1
+            if any(row.values()):
+                has_data = True
+                for field, value in row.items():
+                    if value:
+                        if field in field_count:
+                            field_count[field] += 1
+                        else:
+                            field_count[field] = 1
+
+    return field_count, fieldnames, has_data, data_row_count
+
+
+def peak_rss_bytes() -> int | None:
+    """このプロセスと終了済みの子プロセスのうち、最大のピークRSS（バイト）を返す
+
+    Returns:
+        int | None: ピークRSS（resource モジュールが無い環境では None）
+    """
+    if resource is None:
+        return None
+    max_rss: int = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    )
+    return max_rss if sys.platform == "darwin" else max_rss * 1024  # macOS はバイト、その他は KB 単位
+
+
+def run_measurement(file_path: str, log_file: str, engine: str, workers: int, chunk_size: int) -> Dict[str, Any]:
+    """1回の計測を実行する（--measure で起動された子プロセス用）
+
+    Args:
+        file_path (str): 処理対象のCSVファイルのパス
+        log_file (str): ログファイルのパス
+        engine (str): カウント方式（"2-pass" または count_CSV_FieldValue の ENGINES のいずれか）
+        workers (int): ワーカープロセス数
+        chunk_size (int): ファイルを分割する場合の1範囲あたりの目安のバイト数
+
+    Returns:
+        Dict[str, Any]: 経過秒数（seconds）、データ行数（data_row_count）、ピークRSS（peak_rss_bytes）
+    """
+    start: float = time.perf_counter()
+    if engine == "2-pass":
+        data_row_count: int = count_values_in_csv_two_pass(file_path, log_file, FIELD_SIZE_LIMIT)[3]
+    else:
+        data_row_count = count_values_in_csv(
+            file_path=file_path,
+            log_file=log_file,
+            field_size_limit=FIELD_SIZE_LIMIT,
+            workers=workers,
+            chunk_size=chunk_size,
+            options=CountOptions(engine=engine),
+        ).data_row_count
+    seconds: float = time.perf_counter() - start
+    return {"seconds": seconds, "data_row_count": data_row_count, "peak_rss_bytes": peak_rss_bytes()}
+
+
+def measure(file_path: str, log_file: str, engine: str, workers: int, chunk_size: int) -> Dict[str, Any]:
+    """別のPythonプロセスで1回の計測を実行する
+
+    Args:
+        file_path (str): 処理対象のCSVファイルのパス
+        log_file (str): ログファイルのパス
+        engine (str): カウント方式
+        workers (int): ワーカープロセス数
+        chunk_size (int): ファイルを分割する場合の1範囲あたりの目安のバイト数
+
+    Returns:
+        Dict[str, Any]: run_measurement の戻り値
+
+    Raises:
+        subprocess.CalledProcessError: 子プロセスが異常終了した場合
+    """
+    request: str = json.dumps(
+        {"file_path": file_path, "log_file": log_file, "engine": engine, "workers": workers, "chunk_size": chunk_size}
+    )
+    completed = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--measure", request],
+        check=True,
+        capture_output=True,
+        text=True,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    return json.loads(completed.stdout.splitlines()[-1])
+
+
+def benchmark_file(
+    profile: str, file_path: str, log_file: str, engine: str, workers: int, chunk_size: int, repeat: int
+) -> Dict[str, Any]:
+    """1つのCSVファイルを1つのカウント方式・ワーカー数で repeat 回計測し、最速の結果を返す
+
+    Args:
+        profile (str): プロファイル名
+        file_path (str): 処理対象のCSVファイルのパス
+        log_file (str): ログファイルのパス
+        engine (str): カウント方式
+        workers (int): ワーカープロセス数
+        chunk_size (int): ファイルを分割する場合の1範囲あたりの目安のバイト数
+        repeat (int): 計測回数
+
+    Returns:
+        Dict[str, Any]: 計測結果（JSONファイルの results の1要素）
+
+    Note:
+        - 経過秒数は最小値、ピークRSSは最大値を採用する
+    """
+    measurements: list[Dict[str, Any]] = [
+        measure(file_path=file_path, log_file=log_file, engine=engine, workers=workers, chunk_size=chunk_size)
+        for _ in range(repeat)
+    ]
+    seconds: float = min(measurement["seconds"] for measurement in measurements)
+    rows: int = measurements[0]["data_row_count"]
+    size: int = os.path.getsize(file_path)
+    peak_rss_values: list[int] = [
+        measurement["peak_rss_bytes"] for measurement in measurements if measurement["peak_rss_bytes"] is not None
+    ]
+    return {
+        "profile": profile,
+        "engine": engine,
+        "workers": workers,
+        "rows": rows,
+        "bytes": size,
+        "seconds": round(seconds, 6),
+        "rows_per_sec": round(rows / seconds, 1) if seconds else None,
+        "mb_per_sec": round(size / (1024 * 1024) / seconds, 3) if seconds else None,
+        "peak_rss_mb": round(max(peak_rss_values) / (1024 * 1024), 1) if peak_rss_values else None,
+    }
+
+
+def main() -> None:
+    """ベンチマークを実行して結果を標準出力とJSONファイルに書き込む
+
+    Returns:
+        None
+    """
+    parser = argparse.ArgumentParser(description="count_values_in_csv のベンチマーク")
+    parser.add_argument(
+        "--profile",
+        action="append",
+        choices=list(PROFILES),
+        help="計測する合成CSVファイルのプロファイル（複数指定可、既定値: 全て）",
+    )
+    parser.add_argument("--scale", type=float, default=1.0, help="各プロファイルの既定の行数に掛ける倍率")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="乱数シード（既定値: %(default)s）")
+    parser.add_argument(
+        "--corpus",
+        default=None,
+        metavar="DIR",
+        help="合成CSVファイルの作成先（既に作成済みのファイルは再利用する、省略時は一時ディレクトリ）",
+    )
+    parser.add_argument(
+        "--engine",
+        action="append",
+        choices=("2-pass", "python", "bytes", "arrow"),
+        help="計測するカウント方式（複数指定可、既定値: 全て）",
+    )
+    parser.add_argument(
+        "--workers",
+        action="append",
+        type=int,
+        metavar="N",
+        help="計測するワーカー数（複数指定可、既定値: 1 と CPUコア数）",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE_MB,
+        metavar="MB",
+        help="ワーカー数が2以上の場合に1つのCSVファイルを分割する目安のサイズ（MB、既定値: %(default)s）",
+    )
+    parser.add_argument("--repeat", type=int, default=1, help="計測回数（最速の結果を採用、既定値: %(default)s）")
+    parser.add_argument(
+        "--output",
+        default=None,
+        metavar="FILE",
+        help="結果を書き込むJSONファイル（既定値: benchmark_YYYYMMDD_HHMMSS.json）",
+    )
+    parser.add_argument("--measure", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure is not None:
+        # 子プロセスとして1回の計測を実行し、結果を標準出力の最終行に書き込む
+        print(json.dumps(run_measurement(**json.loads(args.measure))))
+        return
+
+    if args.scale <= 0:
+        parser.error("--scale には0より大きい値を指定してください。")
+    if args.chunk_size <= 0:
+        parser.error("--chunk-size には1以上の値を指定してください。")
+    if args.repeat <= 0:
+        parser.error("--repeat には1以上の値を指定してください。")
+    profiles: list[str] = args.profile or list(PROFILES)
+    engines: list[str] = args.engine or ["2-pass", "python", "bytes", "arrow"]
+    if csv_arrow_engine is None and "arrow" in engines:
+        print("pyarrow がインストールされていないため arrow は計測しません。")
+        engines.remove("arrow")
+    worker_counts: list[int] = sorted(set(args.workers or [1, os.cpu_count() or 1]))
+    if any(workers <= 0 for workers in worker_counts):
+        parser.error("--workers には1以上の値を指定してください。")
+    output_file: str = args.output or f"benchmark_{datetime.now():%Y%m%d_%H%M%S}.json"
+
+    results: list[Dict[str, Any]] = []
+    with tempfile.TemporaryDirectory() as workdir:
+        corpus_directory: str = os.path.abspath(args.corpus) if args.corpus else workdir
+        log_file: str = os.path.join(workdir, "benchmark.log")
+        missing: list[str] = [
+            profile for profile in profiles if not os.path.exists(os.path.join(corpus_directory, f"{profile}.csv"))
+        ]
+        if missing:
+            print(f"合成CSVファイルを作成しています: {', '.join(missing)}")
+            generate_corpus(directory=corpus_directory, profiles=missing, scale=args.scale, seed=args.seed)
+
+        print(
+            f"{'profile':<10} {'engine':<7} {'workers':>7} {'rows':>12} {'MB':>9} "
+            f"{'seconds':>9} {'rows/s':>13} {'MB/s':>9} {'peak RSS MB':>12}"
+        )
+        profile: str
+        for profile in profiles:
+            file_path: str = os.path.join(corpus_directory, f"{profile}.csv")
+            baseline_rows: int | None = None
+            engine: str
+            for engine in engines:
+                workers: int
+                for workers in worker_counts if engine != "2-pass" else [1]:
+                    result: Dict[str, Any] = benchmark_file(
+                        profile=profile,
+                        file_path=file_path,
+                        log_file=log_file,
+                        engine=engine,
+                        workers=workers,
+                        chunk_size=args.chunk_size * 1024 * 1024,
+                        repeat=args.repeat,
+                    )
+                    results.append(result)
+                    if baseline_rows is None:
+                        baseline_rows = result["rows"]
+                    elif result["rows"] != baseline_rows:
+                        print(f"{profile}: データ行数が一致しません ({baseline_rows} != {engine}={result['rows']})")
+                    print(
+                        f"{profile:<10} {engine:<7} {workers:>7} {result['rows']:>12,} "
+                        f"{result['bytes'] / (1024 * 1024):>9.1f} {result['seconds']:>9.3f} "
+                        f"{result['rows_per_sec'] or 0:>13,.0f} {result['mb_per_sec'] or 0:>9.1f} "
+                        f"{result['peak_rss_mb'] if result['peak_rss_mb'] is not None else '-':>12}"
+                    )
+
+    report: Dict[str, Any] = {
+        "version": RESULT_VERSION,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "arrow_available": csv_arrow_engine is not None,
+        "settings": {
+            "profiles": profiles,
+            "scale": args.scale,
+            "seed": args.seed,
+            "corpus": args.corpus,
+            "chunk_size_mb": args.chunk_size,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    with open(file=output_file, mode="w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"結果を {output_file} に書き込みました。")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,31 +11,244 @@ CSVファイルのフィールド値カウントツール
 4. フィールド数の整合性チェック（ヘッダ行と各データ行の比較）
 5. 個別結果ファイルの出力（.txt形式）
 6. 統合結果ファイルの出力（CSV形式）
-7. エラーログの記録
+7. エラーログの記録（フィールド数エラーはファイル毎に集計）
+8. 複数プロセスによるCSVファイルの並列処理（--workers N）
+9. 巨大なCSVファイルのレコード境界での分割と並列カウント（--chunk-size MB）
+10. デコードを行わないバイト列走査によるカウント（--engine bytes）
+    Apache Arrow の列指向CSVリーダーによるカウント（--engine arrow、pyarrow が必要）
+11. 前回から変更されていないCSVファイルのカウント結果の再利用（--force で無効化）
+12. 項目毎の値の種類数（推定）・文字数・空白のみの値の割合の集計（--stats）
+13. 項目毎の頻出値（上位 K 件、出現回数は推定）の個別結果ファイルへの出力（--top-k K）
+14. CSVファイルの検索対象・除外パターンと深さの指定（--include, --exclude, --max-depth）
+15. 処理速度の計測と進捗・残り時間の目安の表示（--no-progress で非表示）
+16. 圧縮されたCSVファイル（.csv.gz, .csv.bz2, .csv.xz）と zip アーカイブ内のCSVファイルの展開しながらの読み込み
+17. 無作為な位置から抽出したレコードによる充填率と信頼区間の推定（--sample N、巨大なファイルを数秒で確認する）
+18. 閾値を超える巨大なフィールドの値を読み込まない、メモリ使用量を抑えたカウント（--max-field-size MB）
+    （閾値を超えたフィールドの行番号・列位置・バイト数を個別結果ファイルに出力する）
+19. 追記されるCSVファイルの、前回カウントした位置より後ろだけのカウント（--append）
+    （先頭から前回の位置までのハッシュが一致しない場合はファイル全体をカウントし直す）
+20. CSVファイルの作成・変更・削除を監視し、変更されたファイルだけをカウントして統合結果ファイルを書き直す（--watch）
+    （inotify を使えない環境では一定間隔のポーリングで変更を確認する）
+21. データ行毎の空値パターン（値が空のフィールドの組み合わせ）の行数の多い順の出力（--null-patterns N）
+22. 項目毎の値の型（整数・小数・日付・日時・真偽値・文字列）と型に合わない値の個数の推定（--infer-types）
+23. 行全体またはキー項目の値が重複するデータ行の行数と行番号の例の出力（--duplicates [KEYS]）
+    （メモリ使用量が --duplicate-memory MB を超える分はハッシュで振り分けた一時ファイルに書き出して数える）
+24. グループ項目（読み込み日・連携元システムなど）の値毎のデータ行数と各フィールドの値の個数の集計（--group-by FIELDS）
+    （異なるグループの数が --group-capacity N を超えた後のグループは「その他」にまとめる）
+25. 他のプログラムから呼び出せる、ファイルを書き込まずに結果を返すライブラリ関数
+    （profile_csv_files: ディレクトリ・ファイルのCSVファイル、profile_csv_stream: メモリ上・受信中のデータ）
+    検索の起点（PATH ...）・文字エンコーディング（--encoding）・結果の出力先（--output-dir）の指定
+26. 統合結果の SQLite データベース・Parquet ファイルへの保存（--store sqlite / parquet）
+    （ファイル・項目・実行毎の表に保存し、SQLite は前回から変更されたファイルだけを書き直す）
 
 処理の流れ:
-1. カレントディレクトリ以下のCSVファイルを再帰的に検索
-2. 各CSVファイルに対して以下の処理を実行:
+1. 検索の起点（既定値: カレントディレクトリ）以下のCSVファイルを再帰的に検索（バックグラウンドで検索しながら以下を並行して実行）
+2. 見つかった各CSVファイルに対して以下の処理を実行:
    - フィールド数の整合性チェック
    - 各フィールドの値存在行数のカウント
    - データ行数の集計
    - 個別結果ファイルの生成
 3. 全CSVファイルの結果を統合したファイルの生成
+4. --watch の場合は変更されたCSVファイルだけを 2. と同様に処理し、統合結果ファイルを書き直す（Ctrl+C まで繰り返す）
 
 出力ファイル:
 - 個別結果: [CSVファイル名].txt (各CSVファイルの解析結果)
+  （圧縮されたCSVファイルは [ファイル名].csv.gz.txt など、zip アーカイブ内のファイルは
+  [アーカイブ名].zip_[アーカイブ内のパス].txt）
 - 統合結果: count_CSV_FieldValue.txt (全CSVファイルの統合結果)
+  （--store sqlite の場合は count_CSV_FieldValue.db、--store parquet の場合は
+  count_CSV_FieldValue.files.parquet と count_CSV_FieldValue.fields.parquet）
 - ログファイル: count_CSV_FieldValue.log (エラーログ)
+- マニフェスト: count_CSV_FieldValue.manifest.json (前回のカウント結果、次回の実行で再利用)
+- 計測結果: count_CSV_FieldValue.metrics.json (全体の処理速度と処理時間の長いファイル)
+- 抽出による推定結果: [CSVファイル名].sample.txt, count_CSV_FieldValue.sample.txt (--sample N の場合のみ、
+  全件カウントの結果ファイルは上書きしない)
 
 Author: akira
 Date: 2025年6月27日
 """
 
+import argparse
+import atexit
+import codecs
 import csv
+import hashlib
+import io
+import mmap
 import os
+import sqlite3
 import sys
+import time
+from collections import Counter, deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
 from datetime import datetime
-from typing import Dict, Tuple
+from functools import partial
+from itertools import compress, count
+from typing import Any, BinaryIO, Callable, Deque, Dict, Iterable, Iterator, NamedTuple, TextIO, Tuple
+
+from csv_bounded_reader import BoundedCsvReader, LargeRecord, OversizedField
+from csv_byte_range import (
+    find_last_record_end,
+    find_record_end,
+    iter_record_blocks,
+    open_byte_range,
+    split_csv_byte_ranges,
+)
+from csv_byte_scan import scan_field_flags
+from csv_compressed import display_name, is_compressed_path, open_csv_text, output_base_name
+from csv_duplicates import DEFAULT_DUPLICATE_MEMORY, DuplicateFinder, DuplicateGroup, DuplicateSummary
+from csv_discovery import (
+    DEFAULT_INCLUDE_PATTERNS,
+    DiscoveredFile,
+    DiscoveryError,
+    discovery_sort_key,
+    iter_csv_roots,
+    iter_in_background,
+)
+from csv_field_stats import STATS_BATCH_ROWS, FieldStats, FieldStatsCollector, TopValue
+from csv_group_counts import DEFAULT_GROUP_CAPACITY, GroupCount, GroupCounter, GroupSummary, format_group_label
+from csv_null_patterns import (
+    DEFAULT_NULL_PATTERN_CAPACITY,
+    NullPattern,
+    NullPatternCounter,
+    NullPatternSummary,
+    empty_field_names,
+)
+from csv_run_metrics import FileMetrics, RunMetrics
+from csv_summary_store import PARQUET_AVAILABLE, StoreUpdate, write_parquet_summary, write_sqlite_summary
+from csv_sampling import (
+    CONFIDENCE_LEVEL,
+    DEFAULT_SAMPLE_SEED,
+    SAMPLE_METHODS,
+    SAMPLE_WINDOW_SIZE,
+    FieldEstimate,
+    SampleResult,
+    exact_sample_result,
+    sample_csv_file,
+    sample_csv_head,
+)
+from csv_type_inference import TYPE_BATCH_VALUES, TYPE_LABELS, FieldType, TypeCounter
+from csv_count_manifest import (
+    AppendState,
+    FileSignature,
+    ManifestEntry,
+    hash_file,
+    is_racy,
+    is_unchanged,
+    load_manifest,
+    new_digest,
+    save_manifest,
+    update_digest,
+)
+from csv_watch import (
+    DEFAULT_POLL_INTERVAL,
+    DEFAULT_QUIET_SECONDS,
+    ChangeWatcher,
+    create_watcher,
+    is_under,
+    iter_changed_files,
+)
+
+try:
+    import csv_arrow_engine
+except ImportError:
+    csv_arrow_engine = None  # pyarrow がインストールされていない場合、--engine arrow は python で処理する
+
+DEFAULT_CHUNK_SIZE: int = 128 * 1024 * 1024  # 大きなファイルを分割する際の1範囲あたりの目安（128 MB）
+DEFAULT_ERROR_SAMPLE_LIMIT: int = 10  # フィールド数エラーの行番号をログに記録する件数
+BYTE_SCAN_BLOCK_SIZE: int = 4 * 1024 * 1024  # バイト列走査（--engine bytes）の1ブロックあたりの目安（4 MB）
+DEFAULT_ENCODING: str = "cp932"  # CSVファイルの既定の文字エンコーディング
+# 区切り文字・引用符・改行をバイト列のまま検出できる文字エンコーディング（codecs.lookup の正規化名）
+#   マルチバイト文字のどのバイトも " , CR LF と一致せず、シフト状態を持たないもの。これ以外（iso-2022-jp など）は
+#   --engine python で先頭から読み込み、バイト範囲の分割・--append・無作為抽出・--max-field-size は使わない
+BYTE_SAFE_ENCODINGS: Tuple[str, ...] = ("ascii", "utf-8", "cp932", "shift_jis", "euc_jp", "iso8859-1")
+DEFAULT_FIELD_SIZE_LIMIT: int = 1024 * 1024 * 1024  # CSVフィールドサイズの制限値（1 GB）
+ENGINES: Tuple[str, ...] = ("python", "bytes", "arrow")  # カウント方式（python: csv.reader, bytes: バイト列走査, arrow: pyarrow）
+STORE_FORMATS: Tuple[str, ...] = ("text", "sqlite", "parquet")  # 統合結果の保存形式（--store）
+TOP_VALUE_DISPLAY_LENGTH: int = 80  # 頻出値を個別ファイルに出力する際の最大文字数（超える部分は省略）
+
+
+LOG_BUFFER_SIZE: int = 1024 * 1024  # ログ書き込みバッファのサイズ（1 MB）
+
+# ログファイルのパスをキーとした書き込み中のログ（実行中は開いたままにしてバッファリングする）
+_log_writers: Dict[str, TextIO] = {}
+
+
+def open_log(log_file: str, create_new: bool = False) -> TextIO:
+    """ログファイルを開き、実行中に使い回す書き込み用ストリームを返す
+
+    Args:
+        log_file (str): ログファイルのパス
+        create_new (bool): 新規作成フラグ（True: 新規作成, False: 追記）
+
+    Returns:
+        TextIO: バッファリングされたログの書き込み用ストリーム
+
+    Raises:
+        OSError: ログファイルを開けなかった場合
+
+    Note:
+        - 同じパスに対しては close_log() するまで同じストリームを返す
+        - create_new=True の場合は開いているストリームを閉じてから新規作成する
+    """
+    writer: TextIO | None = _log_writers.get(log_file)
+    if writer is not None and not create_new:
+        return writer
+    if writer is not None:
+        close_log(log_file=log_file)
+    writer = open(file=log_file, mode="w" if create_new else "a", encoding="cp932", buffering=LOG_BUFFER_SIZE)
+    _log_writers[log_file] = writer
+    return writer
+
+
+def open_memory_log(log_file: str) -> io.StringIO:
+    """ログをファイルではなくメモリに蓄積する
+
+    ワーカープロセスで記録したログを親プロセスへ返すために使用します。
+    log_file はファイルとしては作成されず、ログの識別名としてのみ使われます。
+
+    Args:
+        log_file (str): ログの識別名（log_message() に渡す log_file）
+
+    Returns:
+        io.StringIO: ログが蓄積されるストリーム（close_log() の前に getvalue() で取り出す）
+    """
+    close_log(log_file=log_file)
+    writer: io.StringIO = io.StringIO()
+    _log_writers[log_file] = writer
+    return writer
+
+
+def close_log(log_file: str) -> None:
+    """ログのバッファを書き出して閉じる
+
+    Args:
+        log_file (str): ログファイルのパス
+
+    Returns:
+        None
+    """
+    writer: TextIO | None = _log_writers.pop(log_file, None)
+    if writer is None:
+        return
+    try:
+        writer.close()
+    except (OSError, IOError) as e:
+        print(f"ログファイルへの書き込みエラー: {e}", file=sys.stderr)
+
+
+def close_all_logs() -> None:
+    """開いている全てのログのバッファを書き出して閉じる（プログラム終了時に呼ばれる）
+
+    Returns:
+        None
+    """
+    log_file: str
+    for log_file in list(_log_writers):
+        close_log(log_file=log_file)
+
+
+atexit.register(close_all_logs)
 
 
 def log_message(log_file: str, message: str, create_new: bool = False) -> None:
@@ -58,13 +271,12 @@ def log_message(log_file: str, message: str, create_new: bool = False) -> None:
         - メッセージは "YYYY-MM-DD HH:MM:SS - メッセージ" の形式で記録される
         - ファイルエンコーディングはcp932を使用
         - create_new=Trueの場合は新規作成、Falseの場合は追記
+        - ログファイルは呼び出しごとに開閉せず、close_log() までバッファリングして書き込む
         - エラー発生時は標準エラー出力にエラーメッセージを出力
     """
     try:
         timestamp: str = datetime.now().strftime(format="%Y-%m-%d %H:%M:%S")
-        mode: str = "w" if create_new else "a"
-        with open(file=log_file, mode=mode, encoding="cp932") as log:
-            log.write(f"{timestamp} - {message}\n")
+        open_log(log_file=log_file, create_new=create_new).write(f"{timestamp} - {message}\n")
     except (OSError, IOError) as e:
         # ログファイルへの書き込みに失敗した場合、標準エラー出力に出力
         print(f"ログファイルへの書き込みエラー: {e}", file=sys.stderr)
@@ -72,112 +284,2048 @@ def log_message(log_file: str, message: str, create_new: bool = False) -> None:
         print(f"予期しないエラーが発生しました: {e}", file=sys.stderr)
 
 
-def count_values_in_csv(
-    file_path: str, log_file: str, field_size_limit: int
-) -> Tuple[Dict[str, int], list[str], bool, int]:
-    """CSVファイル内の各フィールドの値を持つフィールドの個数をカウントする
+def append_log_lines(log_file: str, lines: list[str]) -> None:
+    """タイムスタンプ付きのログ行をそのままログファイルへ追記する
 
-    CSVファイルを読み込み、各フィールドに値が存在する行の数をカウントします。
-    ヘッダ行を除いたデータ行数も同時に取得します。
-    また、各データ行のフィールド数がヘッダ行と異なる場合はエラーログを出力します。
+    ワーカープロセスで記録されたログ行を、親プロセスのログファイルへ
+    ファイル単位でまとめて転記するために使用します。
+
+    Args:
+        log_file (str): ログファイルのパス
+        lines (list[str]): 追記するログ行（改行付き）
+
+    Returns:
+        None
+
+    Note:
+        - ファイルエンコーディングはcp932を使用
+        - エラー発生時は標準エラー出力にエラーメッセージを出力
+    """
+    if not lines:
+        return
+    try:
+        open_log(log_file=log_file).writelines(lines)
+    except (OSError, IOError) as e:
+        print(f"ログファイルへの書き込みエラー: {e}", file=sys.stderr)
+    except Exception as e:
+        print(f"予期しないエラーが発生しました: {e}", file=sys.stderr)
+
+
+class FieldCountErrors:
+    """1つのCSVファイル（またはその一部の範囲）のフィールド数エラーの集計
+
+    行ごとのエラーをログに1行ずつ書く代わりに、実際のフィールド数ごとの行数、
+    先頭の行番号のサンプル、合計行数に集約します。ワーカープロセスで集計した
+    範囲ごとの結果は merge() でファイル全体の集計にまとめます。
+    """
+
+    def __init__(self, expected_field_count: int, sample_limit: int, keep_all: bool = False) -> None:
+        """
+        Args:
+            expected_field_count (int): ヘッダ行のフィールド数
+            sample_limit (int): 記録する行番号のサンプル数
+            keep_all (bool): 全てのエラー行を記録するか（詳細ログ出力用）
+        """
+        self.expected_field_count: int = expected_field_count
+        self.sample_limit: int = sample_limit
+        self.total: int = 0  # エラー行の合計
+        self.histogram: Counter[int] = Counter()  # 実際のフィールド数ごとのエラー行数
+        self.samples: list[Tuple[int, int]] = []  # 先頭のエラー行（行番号, 実際のフィールド数）
+        self.details: list[Tuple[int, int]] | None = [] if keep_all else None  # 全てのエラー行
+
+    def add(self, row_index: int, actual_field_count: int) -> None:
+        """フィールド数エラーの行を1行追加する
+
+        Args:
+            row_index (int): 行番号
+            actual_field_count (int): 実際のフィールド数
+
+        Returns:
+            None
+        """
+        self.total += 1
+        self.histogram[actual_field_count] += 1
+        if len(self.samples) < self.sample_limit:
+            self.samples.append((row_index, actual_field_count))
+        if self.details is not None:
+            self.details.append((row_index, actual_field_count))
+
+    def merge(self, other: "FieldCountErrors", row_index_offset: int) -> None:
+        """ファイルの後ろに続く範囲の集計を取り込む
+
+        Args:
+            other (FieldCountErrors): 取り込む範囲の集計（行番号は範囲内の番号）
+            row_index_offset (int): other の行番号に加えるオフセット
+
+        Returns:
+            None
+        """
+        self.total += other.total
+        self.histogram.update(other.histogram)
+        room: int = self.sample_limit - len(self.samples)
+        if room > 0:
+            self.samples.extend((row_index + row_index_offset, count) for row_index, count in other.samples[:room])
+        if self.details is not None and other.details is not None:
+            self.details.extend((row_index + row_index_offset, count) for row_index, count in other.details)
+
+
+def log_field_count_error(
+    log_file: str, file_path: str, expected_field_count: int, row_index: int, actual_field_count: int
+) -> None:
+    """フィールド数エラーの行を1行ログに記録する（詳細ログ出力用）
+
+    Args:
+        log_file (str): ログファイルのパス
+        file_path (str): 処理対象のCSVファイルのパス
+        expected_field_count (int): ヘッダ行のフィールド数
+        row_index (int): 行番号
+        actual_field_count (int): 実際のフィールド数
+
+    Returns:
+        None
+    """
+    log_message(
+        log_file=log_file,
+        message=f"{file_path}: 行 {row_index} のフィールド数エラー - 期待値: {expected_field_count}, 実際: {actual_field_count}",
+    )
+
+
+def log_field_count_errors(log_file: str, file_path: str, errors: FieldCountErrors) -> None:
+    """フィールド数エラーの集計をログに記録する
 
     Args:
+        log_file (str): ログファイルのパス
         file_path (str): 処理対象のCSVファイルのパス
+        errors (FieldCountErrors): フィールド数エラーの集計
+
+    Returns:
+        None
+
+    Note:
+        - エラーが無い場合は何も記録しない
+        - 出力例: "a.csv: フィールド数エラー 3 行 - 期待値: 4, 実際のフィールド数別の行数: 3: 2 行, 5: 1 行, 行番号 (先頭 3 件): 5, 6, 9"
+    """
+    if errors.total == 0:
+        return
+    histogram: str = ", ".join(f"{count}: {rows} 行" for count, rows in sorted(errors.histogram.items()))
+    samples: str = ", ".join(str(row_index) for row_index, _ in errors.samples)
+    log_message(
+        log_file=log_file,
+        message=f"{file_path}: フィールド数エラー {errors.total} 行 - 期待値: {errors.expected_field_count}, "
+        f"実際のフィールド数別の行数: {histogram}, 行番号 (先頭 {len(errors.samples)} 件): {samples}",
+    )
+
+
+class CountOptions(NamedTuple):
+    """カウント処理の設定（ワーカープロセスへそのまま渡す）"""
+
+    error_sample_limit: int = DEFAULT_ERROR_SAMPLE_LIMIT  # フィールド数エラーの行番号をログに記録する件数
+    verbose: bool = False  # フィールド数エラーを1行ずつログに記録するか
+    engine: str = "python"  # カウント方式（ENGINES のいずれか）
+    collect_stats: bool = False  # 項目毎の統計情報（値の種類数・文字数・空白のみの値の割合）を集計するか
+    top_k: int = 0  # 項目毎に求める頻出値の件数（0 の場合は求めない）
+    max_field_size: int = 0  # 値を読み込まずに長さだけを計測するフィールドの閾値（バイト、0 の場合は通常どおり読み込む）
+    append: bool = False  # 追記されるCSVファイルを前回カウントした位置から続けてカウントするか（--append）
+    null_patterns: int = 0  # 行毎の空値パターンを出力する件数（0 の場合は集計しない）
+    null_pattern_capacity: int = DEFAULT_NULL_PATTERN_CAPACITY  # 集計する異なる空値パターンの数の上限
+    infer_types: bool = False  # 項目毎の値の型を推定するか
+    duplicate_keys: Tuple[str, ...] | None = None  # 重複を確認するキー項目（空の場合は行全体、None の場合は確認しない）
+    duplicate_memory: int = DEFAULT_DUPLICATE_MEMORY  # 重複の確認に使うメモリ使用量の上限（バイト、プロセス毎）
+    group_fields: Tuple[str, ...] | None = None  # グループ毎に集計するグループ項目（None の場合は集計しない）
+    group_capacity: int = DEFAULT_GROUP_CAPACITY  # 集計する異なるグループの数の上限
+    encoding: str = DEFAULT_ENCODING  # CSVファイルの文字エンコーディング（ASCII と互換のもの）
+
+    @property
+    def byte_safe(self) -> bool:
+        """区切り文字・引用符・改行をバイト列のまま検出できる文字エンコーディングか（BYTE_SAFE_ENCODINGS を参照）"""
+        return is_byte_safe_encoding(encoding=self.encoding)
+
+    @property
+    def counting_engine(self) -> str:
+        """実際に使うカウント方式（統計情報・頻出値の集計・型の推定・重複の確認とグループ毎の集計には値の内容が、
+        巨大なフィールドを読み込まない処理と空値パターンの集計にはレコード単位の読み込みが必要なため python を使う。
+        バイト列のまま区切り文字を検出できない文字エンコーディングも python を使う）"""
+        if (
+            not self.byte_safe
+            or self.collect_stats
+            or self.top_k > 0
+            or self.infer_types
+            or self.duplicate_keys is not None
+            or self.group_fields is not None
+            or self.max_field_size > 0
+            or self.null_patterns > 0
+        ):
+            return "python"
+        return self.engine
+
+    def create_field_stats(self, field_count: int) -> FieldStatsCollector | None:
+        """統計情報・頻出値・型の集計先を作成する（いずれも集計しない場合は None）"""
+        if not self.collect_stats and self.top_k <= 0 and not self.infer_types:
+            return None
+        return FieldStatsCollector(
+            field_count=field_count, collect_stats=self.collect_stats, top_k=self.top_k, infer_types=self.infer_types
+        )
+
+    def create_null_patterns(self, field_count: int) -> NullPatternCounter | None:
+        """空値パターンの集計先を作成する（集計しない場合は None）"""
+        if self.null_patterns <= 0:
+            return None
+        return NullPatternCounter(field_count=field_count, limit=self.null_patterns, capacity=self.null_pattern_capacity)
+
+    def create_duplicates(self, header: list[str]) -> DuplicateFinder | None:
+        """重複の集計先を作成する（確認しない場合は None）"""
+        if self.duplicate_keys is None:
+            return None
+        return DuplicateFinder(header=header, key_fields=list(self.duplicate_keys), memory_limit=self.duplicate_memory)
+
+    def create_group_counts(self, header: list[str]) -> GroupCounter | None:
+        """グループ毎の値の個数の集計先を作成する（集計しない場合は None）"""
+        if self.group_fields is None:
+            return None
+        return GroupCounter(header=header, group_fields=list(self.group_fields), capacity=self.group_capacity)
+
+
+class CountResult(NamedTuple):
+    """count_values_in_csv の戻り値（先頭の4要素は各フィールドの値の個数の集計結果）"""
+
+    counts: Dict[str, int]  # 各フィールド名と値が存在する行数
+    fieldnames: list[str]  # フィールド名リスト（ヘッダ順）
+    has_data: bool  # データが存在するか（True: データあり, False: ヘッダのみ）
+    data_row_count: int  # データ行数（ヘッダを除く）
+    field_stats: Dict[str, FieldStats] | None = None  # 項目毎の統計情報（options.collect_stats の場合のみ）
+    top_values: Dict[str, list[TopValue]] | None = None  # 項目毎の頻出値（options.top_k > 0 の場合のみ）
+    elapsed_seconds: float = 0.0  # カウントにかかった時間（秒、分割して並列にカウントした場合は各範囲の合計）
+    oversized_fields: list[OversizedField] | None = None  # 閾値を超えたフィールド（options.max_field_size > 0 の場合のみ）
+    append_state: AppendState | None = None  # 次回に続きからカウントするための記録（options.append の場合のみ）
+    null_patterns: NullPatternSummary | None = None  # 行毎の空値パターン（options.null_patterns > 0 の場合のみ）
+    field_types: Dict[str, FieldType] | None = None  # 項目毎の型の推定結果（options.infer_types の場合のみ）
+    duplicates: DuplicateSummary | None = None  # 重複の集計結果（options.duplicate_keys を指定した場合のみ）
+    group_counts: GroupSummary | None = None  # グループ毎の値の個数（options.group_fields を指定した場合のみ）
+
+
+class RangeCountResult(NamedTuple):
+    """CSVファイルの一部のバイト範囲をカウントした結果（ワーカープロセスの戻り値）"""
+
+    positional_count: Counter[int]  # 列位置ごとの値が存在する行数（group_counts で数えた行を除く）
+    record_count: int  # 範囲内のレコード数（空行を含む）
+    data_row_count: int  # 範囲内のデータ行数（空行を除く）
+    has_extra_field: bool  # 余剰フィールドを持つ行があるか
+    field_count_errors: FieldCountErrors  # フィールド数エラーの集計（行番号は範囲内のレコード番号(0始まり)）
+    error: Tuple[str, str] | None  # 読み込みエラー（エラー種別("csv" / "other"), メッセージ）
+    field_stats: FieldStatsCollector | None = None  # 範囲内の統計情報・頻出値・型（集計する場合のみ）
+    elapsed_seconds: float = 0.0  # 範囲のカウントにかかった時間（秒）
+    oversized_fields: list[OversizedField] | None = None  # 閾値を超えたフィールド（行番号は範囲内のレコード番号(0始まり)）
+    null_patterns: NullPatternCounter | None = None  # 範囲内の空値パターン（集計する場合のみ）
+    duplicates: DuplicateFinder | None = None  # 範囲内の重複（確認する場合のみ、行番号は範囲内のレコード番号(0始まり)）
+    group_counts: GroupCounter | None = None  # 範囲内のグループ毎の値の個数（集計する場合のみ）
+
+
+def count_csv_rows(
+    rows: Iterable[list[str]],
+    expected_field_count: int,
+    on_field_count_error: Callable[[int, int], None],
+    field_stats: FieldStatsCollector | None = None,
+    null_patterns: NullPatternCounter | None = None,
+    duplicates: DuplicateFinder | None = None,
+    record_offset: int = 0,
+    group_counts: GroupCounter | None = None,
+) -> Tuple[Counter[int], int, int, bool]:
+    """CSVのデータ行を読み込み、列位置ごとに値が存在する行数をカウントする
+
+    Args:
+        rows (Iterable[list[str]]): csv.reader が返すデータ行（ヘッダ行を除く）
+        expected_field_count (int): ヘッダ行のフィールド数
+        on_field_count_error (Callable[[int, int], None]): フィールド数が異なる行で呼び出す関数
+            引数: (rows 内のレコード番号(0始まり), 実際のフィールド数)
+        field_stats (FieldStatsCollector | None): 統計情報を集計する場合、データ行を追加する集計先
+        null_patterns (NullPatternCounter | None): 空値パターンを集計する場合、データ行を追加する集計先
+        duplicates (DuplicateFinder | None): 重複を確認する場合、データ行を追加する集計先
+        record_offset (int): duplicates に渡すレコード番号に加える値（rows より前のレコード数）
+        group_counts (GroupCounter | None): グループ毎に集計する場合、データ行を追加する集計先
+            （集計する行の列位置ごとの行数は group_counts だけに数え、戻り値の Counter には含めない）
+
+    Returns:
+        Tuple[Counter[int], int, int, bool]: 以下の要素を含むタプル
+            - Counter[int]: 列位置をキーとした値が存在する行数
+            - int: レコード数（空行を含む）
+            - int: データ行数（空行を除く）
+            - bool: 余剰フィールドを持つ行があるか
+
+    Note:
+        - 空行はデータ行として扱わない（csv.DictReader と同じ）
+        - 値が空でない列位置だけを C 実装の Counter.update で加算する
+        - 値の型の推定だけを行う場合は、行を field_stats にためずに値を行順のまま1つのリストに追加し、
+          STATS_BATCH_ROWS 行（横長のファイルは TYPE_BATCH_VALUES 個の値の分の行）毎に型別に数える
+          （フィールド数が異なる行は列数にそろえてから追加する）
+    """
+    column_indexes: range = range(expected_field_count)
+    positional_count: Counter[int] = Counter()
+    record_count: int = 0
+    data_row_count: int = 0
+    has_extra_field: bool = False
+    grouped: GroupCounter | None = group_counts if group_counts is not None and group_counts.active else None
+    type_counter: TypeCounter | None = None
+    type_values: list[str] = []
+    # 横長のファイルは一度に数える行数を減らす（TYPE_BATCH_VALUES を参照）
+    type_batch_size: int = (
+        max(1, min(STATS_BATCH_ROWS, TYPE_BATCH_VALUES // max(expected_field_count, 1))) * expected_field_count
+    )
+    if field_stats is not None and field_stats.types_only:
+        # 値の型の推定だけを行う場合は、行を field_stats にためて列毎に並べ替えずに集計する
+        type_counter, field_stats = field_stats.type_counter, None
+
+    row: list[str]
+    for record_count, row in enumerate(rows, start=1):
+        actual_field_count: int = len(row)
+        # ヘッダ行とデータ行のフィールド数が異なる場合はエラーとして通知
+        if actual_field_count != expected_field_count:
+            on_field_count_error(record_count - 1, actual_field_count)
+            if actual_field_count > expected_field_count:
+                has_extra_field = True  # 余剰フィールドを持つ行はデータありとして扱う
+        if not row:
+            continue
+
+        data_row_count += 1  # 行数をカウント
+        if grouped is not None:
+            grouped.add_row(row)  # 列位置ごとの行数はグループ毎にだけ数える（ファイル全体は build_field_counts で合算）
+        else:
+            positional_count.update(compress(column_indexes, row))
+        if type_counter is not None:
+            type_values.extend(
+                row
+                if actual_field_count == expected_field_count
+                else (row + [""] * expected_field_count)[:expected_field_count]  # 足りない列は空の値にする
+            )
+            if len(type_values) >= type_batch_size:
+                type_counter.update_rows(values=type_values)
+                type_values = []
+        elif field_stats is not None:
+            field_stats.add_row(row)
+        if null_patterns is not None:
+            null_patterns.add_row(row)
+        if duplicates is not None:
+            duplicates.add_row(record_index=record_offset + record_count - 1, row=row)
+
+    if type_counter is not None and type_values:
+        type_counter.update_rows(values=type_values)
+    if field_stats is not None:
+        field_stats.flush()
+    return positional_count, record_count, data_row_count, has_extra_field
+
+
+def count_csv_bounded(
+    reader: BoundedCsvReader,
+    expected_field_count: int,
+    on_field_count_error: Callable[[int, int], None],
+    on_oversized_field: Callable[[int, int, int], None],
+    field_stats: FieldStatsCollector | None = None,
+    null_patterns: NullPatternCounter | None = None,
+    duplicates: DuplicateFinder | None = None,
+    group_counts: GroupCounter | None = None,
+) -> Tuple[Counter[int], int, int, bool]:
+    """巨大なフィールドを文字列にせずにCSVのデータ行をカウントする（--max-field-size）
+
+    Args:
+        reader (BoundedCsvReader): ヘッダ行より後ろ（または範囲の先頭）から読み込むリーダー
+        expected_field_count (int): ヘッダ行のフィールド数
+        on_field_count_error (Callable[[int, int], None]): フィールド数が異なる行で呼び出す関数
+            引数: (レコード番号(0始まり), 実際のフィールド数)
+        on_oversized_field (Callable[[int, int, int], None]): 閾値を超えるフィールドで呼び出す関数
+            引数: (レコード番号(0始まり), 列位置(0始まり), 値のバイト数)
+        field_stats (FieldStatsCollector | None): 統計情報を集計する場合、データ行を追加する集計先
+        null_patterns (NullPatternCounter | None): 空値パターンを集計する場合、データ行を追加する集計先
+        duplicates (DuplicateFinder | None): 重複を確認する場合、データ行を追加する集計先
+        group_counts (GroupCounter | None): グループ毎に集計する場合、データ行を追加する集計先
+
+    Returns:
+        Tuple[Counter[int], int, int, bool]: count_csv_rows と同じ
+
+    Note:
+        - 閾値以下のレコードは count_csv_rows でカウントする（結果は csv.reader で読み込んだ場合と同じ）
+        - 閾値を超えるレコードは値を読み込まずに空かどうかだけを判定する
+          （統計情報・頻出値・型の推定・重複の確認とグループ毎の集計には含めないが、空値パターンには含める）
+    """
+    positional_count: Counter[int] = Counter()
+    record_count: int = 0
+    data_row_count: int = 0
+    has_extra_field: bool = False
+
+    def on_block_field_count_error(record_index: int, actual_field_count: int) -> None:
+        on_field_count_error(record_count + record_index, actual_field_count)
+
+    item: Iterator[list[str]] | LargeRecord
+    for item in reader:
+        if isinstance(item, LargeRecord):
+            if item.field_count != expected_field_count:
+                on_field_count_error(record_count, item.field_count)
+                if item.field_count > expected_field_count:
+                    has_extra_field = True
+            if item.field_count > 0:
+                data_row_count += 1
+                positional_count.update(item.filled_columns)
+                if null_patterns is not None:
+                    null_patterns.add_filled_columns(field_count=item.field_count, filled_columns=item.filled_columns)
+            column: int
+            size: int
+            for column, size in item.oversized_fields:
+                on_oversized_field(record_count, column, size)
+            record_count += 1
+            continue
+
+        block_count, block_record_count, block_data_row_count, block_has_extra_field = count_csv_rows(
+            rows=item,
+            expected_field_count=expected_field_count,
+            on_field_count_error=on_block_field_count_error,
+            field_stats=field_stats,
+            null_patterns=null_patterns,
+            duplicates=duplicates,
+            record_offset=record_count,
+            group_counts=group_counts,
+        )
+        positional_count.update(block_count)
+        record_count += block_record_count
+        data_row_count += block_data_row_count
+        has_extra_field = has_extra_field or block_has_extra_field
+
+    return positional_count, record_count, data_row_count, has_extra_field
+
+
+def log_oversized_fields(log_file: str, file_path: str, oversized_fields: list[OversizedField]) -> None:
+    """閾値を超えたフィールドの件数と先頭の位置をログに記録する
+
+    Args:
         log_file (str): ログファイルのパス
+        file_path (str): 処理対象のCSVファイルのパス
+        oversized_fields (list[OversizedField]): 閾値を超えたフィールド（ファイル全体の行番号）
+
+    Returns:
+        None
+    """
+    if not oversized_fields:
+        return
+    first: OversizedField = oversized_fields[0]
+    log_message(
+        log_file=log_file,
+        message=(
+            f"{file_path}: 巨大なフィールド {len(oversized_fields)} 個の値を読み込まずに長さだけを計測しました。"
+            f"（最初: 行 {first.row_index}, 列 {first.column + 1}, {first.size:,} バイト）"
+        ),
+    )
+
+
+def count_csv_bytes(
+    data: bytes,
+    start: int,
+    end: int,
+    expected_field_count: int,
+    on_field_count_error: Callable[[int, int], None],
+    field_size_limit: int,
+    encoding: str = DEFAULT_ENCODING,
+) -> Tuple[Counter[int], int, int, bool]:
+    """CSVの [start, end) のデータ行をデコードせずにバイト列のまま走査してカウントする
+
+    Args:
+        data (bytes): CSVファイルの内容（mmap）
+        start (int): 開始位置（レコードの先頭）
+        end (int): 終了位置（レコードの区切りの直後、またはデータの末尾）
+        expected_field_count (int): ヘッダ行のフィールド数
+        on_field_count_error (Callable[[int, int], None]): フィールド数が異なる行で呼び出す関数
+            引数: ([start, end) 内のレコード番号(0始まり), 実際のフィールド数)
         field_size_limit (int): CSVフィールドサイズの制限値（バイト）
+        encoding (str): テキストとして読み込むブロックの文字エンコーディング
 
     Returns:
-        Tuple[Dict[str, int], list[str], bool, int]: 以下の要素を含むタプル
-            - Dict[str, int]: 各フィールド名と値が存在する行数の辞書
-            - list[str]: CSVファイルのフィールド名リスト（ヘッダ順）
-            - bool: データが存在するかのフラグ（True: データあり, False: ヘッダのみ）
-            - int: データ行数（ヘッダを除く総行数）
+        Tuple[Counter[int], int, int, bool]: count_csv_rows と同じ
 
-    Raises:
-        FileNotFoundError: 指定されたCSVファイルが存在しない場合
-        OSError: ファイルの読み込みやサイズ取得に失敗した場合
-        csv.Error: CSV形式エラーが発生した場合
-        Exception: その他の予期しないエラーが発生した場合
+    Note:
+        - レコード境界で区切ったブロック毎に csv_byte_scan.scan_field_flags で判定する
+        - ダブルクォートを含むブロックなど、バイト列のままでは判定できないブロックは
+          テキストにデコードして csv.reader で読み込む（結果は同じ）
+    """
+    positional_count: Counter[int] = Counter()
+    record_count: int = 0
+    data_row_count: int = 0
+    has_extra_field: bool = False
+
+    def on_block_field_count_error(record_index: int, actual_field_count: int) -> None:
+        on_field_count_error(record_count + record_index, actual_field_count)
+
+    block: bytes
+    for block in iter_record_blocks(data=data, start=start, end=end, block_size=BYTE_SCAN_BLOCK_SIZE):
+        scanned: Tuple[int, int, bool] | None = None
+        if len(block) <= field_size_limit:
+            scanned = scan_field_flags(
+                block=block,
+                expected_field_count=expected_field_count,
+                positional_count=positional_count,
+                on_field_count_error=on_block_field_count_error,
+            )
+        if scanned is None:
+            with io.TextIOWrapper(io.BytesIO(block), encoding=encoding) as text:
+                block_count, block_record_count, block_data_row_count, block_has_extra_field = count_csv_rows(
+                    rows=csv.reader(text),
+                    expected_field_count=expected_field_count,
+                    on_field_count_error=on_block_field_count_error,
+                )
+            positional_count.update(block_count)
+            scanned = (block_record_count, block_data_row_count, block_has_extra_field)
+        record_count += scanned[0]
+        data_row_count += scanned[1]
+        has_extra_field = has_extra_field or scanned[2]
+
+    return positional_count, record_count, data_row_count, has_extra_field
+
+
+def count_csv_columnar(
+    data: bytes,
+    file_path: str,
+    start: int,
+    end: int,
+    expected_field_count: int,
+    on_field_count_error: Callable[[int, int], None],
+    field_size_limit: int,
+    encoding: str = DEFAULT_ENCODING,
+) -> Tuple[Counter[int], int, int, bool]:
+    """CSVの [start, end) のデータ行を Apache Arrow の列指向CSVリーダーでカウントする
+
+    Args:
+        data (bytes): CSVファイルの内容（mmap）
+        file_path (str): 処理対象のCSVファイルのパス
+        start (int): 開始位置（レコードの先頭）
+        end (int): 終了位置（レコードの区切りの直後、またはファイルの末尾）
+        expected_field_count (int): ヘッダ行のフィールド数
+        on_field_count_error (Callable[[int, int], None]): フィールド数が異なる行で呼び出す関数
+            引数: ([start, end) 内のレコード番号(0始まり), 実際のフィールド数)
+        field_size_limit (int): CSVフィールドサイズの制限値（バイト）
+        encoding (str): 文字エンコーディング
+
+    Returns:
+        Tuple[Counter[int], int, int, bool]: count_csv_rows と同じ
+
+    Note:
+        - フィールド数が異なる行を含むなど、列指向リーダーで読み込めない範囲や
+          pyarrow がインストールされていない場合は csv.reader でカウントし直す（結果は同じ）
+    """
+    if csv_arrow_engine is not None:
+        counted: Tuple[Counter[int], int, int, bool] | None = csv_arrow_engine.count_csv_arrow(
+            file_path=file_path,
+            data=data,
+            start=start,
+            end=end,
+            expected_field_count=expected_field_count,
+            field_size_limit=field_size_limit,
+            encoding=encoding,
+        )
+        if counted is not None:
+            return counted
+
+    with open_byte_range(file_path=file_path, start=start, end=end, encoding=encoding) as csvfile:
+        return count_csv_rows(
+            rows=csv.reader(csvfile),
+            expected_field_count=expected_field_count,
+            on_field_count_error=on_field_count_error,
+        )
+
+
+def read_csv_header(data: bytes, encoding: str = DEFAULT_ENCODING) -> list[str]:
+    """ヘッダ行のバイト列をデコードしてフィールド名リストを返す
+
+    Args:
+        data (bytes): ヘッダ行（1レコード）のバイト列
+        encoding (str): 文字エンコーディング
+
+    Returns:
+        list[str]: フィールド名リスト（空行の場合は空リスト）
+    """
+    with io.TextIOWrapper(io.BytesIO(data), encoding=encoding) as text:
+        header_row: list[str] | None = next(csv.reader(text), None)
+    return list(header_row) if header_row else []
+
+
+def build_field_counts(
+    header: list[str],
+    positional_count: Counter[int],
+    has_extra_field: bool,
+    data_row_count: int,
+    field_stats: FieldStatsCollector | None = None,
+    null_patterns: NullPatternCounter | None = None,
+    duplicates: DuplicateFinder | None = None,
+    group_counts: GroupCounter | None = None,
+) -> CountResult:
+    """列位置のカウントを項目名のカウントに変換して count_values_in_csv の戻り値を組み立てる
+
+    Args:
+        header (list[str]): ヘッダ行のフィールド名リスト
+        positional_count (Counter[int]): 列位置をキーとした値が存在する行数（group_counts で数えた行を除く）
+        has_extra_field (bool): 余剰フィールドを持つ行があるか
+        data_row_count (int): データ行数（ヘッダを除く）
+        field_stats (FieldStatsCollector | None): 列位置毎の統計情報・頻出値・型（集計しない場合は None）
+        null_patterns (NullPatternCounter | None): 空値パターン（集計しない場合は None）
+        duplicates (DuplicateFinder | None): ファイル全体の重複（行番号はヘッダ行の次を 0 としたレコード番号、
+            確認しない場合は None。一時ファイルの削除は呼び出し側で行う）
+        group_counts (GroupCounter | None): グループ毎の値の個数（集計しない場合は None）
+
+    Returns:
+        CountResult: count_values_in_csv の戻り値
+
+    Note:
+        - 項目名が重複する場合は csv.DictReader と同様に最後の列の値を採用する
+    """
+    if group_counts is not None:
+        positional_count = positional_count + group_counts.total_positional_count()
+    name_to_index: Dict[str, int] = {name: index for index, name in enumerate(header)}
+    field_count: Dict[str, int] = {name: positional_count[index] for name, index in name_to_index.items()}
+    has_data: bool = has_extra_field or any(field_count.values())
+    return CountResult(
+        counts=field_count,
+        fieldnames=header,
+        has_data=has_data,
+        data_row_count=data_row_count,
+        field_stats=(
+            field_stats.summarize(header=header) if field_stats is not None and field_stats.collect_stats else None
+        ),
+        top_values=(
+            field_stats.summarize_top_values(header=header)
+            if field_stats is not None and field_stats.top_k > 0
+            else None
+        ),
+        null_patterns=null_patterns.summarize() if null_patterns is not None else None,
+        field_types=(
+            field_stats.summarize_types(header=header) if field_stats is not None and field_stats.infer_types else None
+        ),
+        duplicates=duplicates.summarize(row_index_offset=2) if duplicates is not None else None,
+        group_counts=group_counts.summarize(header=header) if group_counts is not None else None,
+    )
+
+
+def count_csv_range(
+    file_path: str,
+    start: int,
+    end: int,
+    expected_field_count: int,
+    field_size_limit: int,
+    options: CountOptions,
+    header: list[str] | None = None,
+) -> RangeCountResult:
+    """CSVファイルの [start, end) のバイト範囲のデータ行をカウントする（ワーカープロセス用）
+
+    Args:
+        file_path (str): 処理対象のCSVファイルのパス
+        start (int): 範囲の開始位置（レコードの先頭）
+        end (int): 範囲の終了位置（レコードの区切りの直後）
+        expected_field_count (int): ヘッダ行のフィールド数
+        field_size_limit (int): CSVフィールドサイズの制限値（バイト）
+        options (CountOptions): カウント処理の設定
+        header (list[str] | None): ヘッダ行のフィールド名リスト（重複の確認・グループ毎の集計で項目の列位置を求める）
+
+    Returns:
+        RangeCountResult: 範囲内のカウント結果
+
+    Note:
+        - フィールド数エラーと閾値を超えたフィールドはログに書かず、範囲内のレコード番号で集計して返す
+          （ファイル全体での行番号は親プロセスが前の範囲のレコード数から求める）
+        - 読み込みエラーは例外にせず error に格納して返す（重複の一時ファイルは削除する）
+        - 重複の一時ファイルは削除せずに返す（マージした親プロセスで削除する）
+    """
+    start_time: float = time.perf_counter()
+    csv.field_size_limit(new_limit=field_size_limit)
+    field_count_errors: FieldCountErrors = FieldCountErrors(
+        expected_field_count=expected_field_count, sample_limit=options.error_sample_limit, keep_all=options.verbose
+    )
+
+    field_stats: FieldStatsCollector | None = None
+    null_patterns: NullPatternCounter | None = None
+    duplicates: DuplicateFinder | None = None
+    group_counts: GroupCounter | None = None
+    oversized_fields: list[OversizedField] = []
+    try:
+        if options.counting_engine in ("bytes", "arrow"):
+            with open(file=file_path, mode="rb") as binary_file, mmap.mmap(
+                binary_file.fileno(), 0, access=mmap.ACCESS_READ
+            ) as data:
+                count_range: Callable[..., Tuple[Counter[int], int, int, bool]] = (
+                    count_csv_bytes
+                    if options.counting_engine == "bytes"
+                    else partial(count_csv_columnar, file_path=file_path)
+                )
+                positional_count, record_count, data_row_count, has_extra_field = count_range(
+                    data=data,
+                    start=start,
+                    end=end,
+                    expected_field_count=expected_field_count,
+                    on_field_count_error=field_count_errors.add,
+                    field_size_limit=field_size_limit,
+                    encoding=options.encoding,
+                )
+        elif options.max_field_size > 0:
+            field_stats = options.create_field_stats(field_count=expected_field_count)
+            null_patterns = options.create_null_patterns(field_count=expected_field_count)
+            duplicates = options.create_duplicates(header=header or [])
+            group_counts = options.create_group_counts(header=header or [])
+            with open_byte_range(file_path=file_path, start=start, end=end, encoding=options.encoding) as csvfile:
+                positional_count, record_count, data_row_count, has_extra_field = count_csv_bounded(
+                    reader=BoundedCsvReader(
+                        stream=csvfile.buffer,
+                        max_field_size=options.max_field_size,
+                        column_limit=expected_field_count,
+                        encoding=options.encoding,
+                    ),
+                    expected_field_count=expected_field_count,
+                    on_field_count_error=field_count_errors.add,
+                    on_oversized_field=lambda record_index, column, size: oversized_fields.append(
+                        OversizedField(row_index=record_index, column=column, size=size)
+                    ),
+                    field_stats=field_stats,
+                    null_patterns=null_patterns,
+                    duplicates=duplicates,
+                    group_counts=group_counts,
+                )
+        else:
+            field_stats = options.create_field_stats(field_count=expected_field_count)
+            null_patterns = options.create_null_patterns(field_count=expected_field_count)
+            duplicates = options.create_duplicates(header=header or [])
+            group_counts = options.create_group_counts(header=header or [])
+            with open_byte_range(file_path=file_path, start=start, end=end, encoding=options.encoding) as csvfile:
+                positional_count, record_count, data_row_count, has_extra_field = count_csv_rows(
+                    rows=csv.reader(csvfile),
+                    expected_field_count=expected_field_count,
+                    on_field_count_error=field_count_errors.add,
+                    field_stats=field_stats,
+                    null_patterns=null_patterns,
+                    duplicates=duplicates,
+                    group_counts=group_counts,
+                )
+    except csv.Error as e:
+        if duplicates is not None:
+            duplicates.cleanup()
+        return RangeCountResult(Counter(), 0, 0, False, field_count_errors, ("csv", str(e)))
+    except Exception as e:
+        if duplicates is not None:
+            duplicates.cleanup()
+        return RangeCountResult(Counter(), 0, 0, False, field_count_errors, ("other", str(e)))
+
+    return RangeCountResult(
+        positional_count,
+        record_count,
+        data_row_count,
+        has_extra_field,
+        field_count_errors,
+        None,
+        field_stats,
+        time.perf_counter() - start_time,
+        oversized_fields if options.max_field_size > 0 else None,
+        null_patterns,
+        duplicates,
+        group_counts,
+    )
+
+
+def submit_csv_ranges(
+    executor: Executor, file_path: str, field_size_limit: int, chunk_size: int, options: CountOptions
+) -> Tuple[list[str], list[Future[RangeCountResult]]] | None:
+    """CSVファイルをレコード境界で分割し、各範囲のカウントをワーカーへ投入する
+
+    Args:
+        executor (Executor): カウントを実行するプロセスプール
+        file_path (str): 処理対象のCSVファイルのパス
+        field_size_limit (int): CSVフィールドサイズの制限値（バイト）
+        chunk_size (int): 1範囲あたりの目安のバイト数
+        options (CountOptions): カウント処理の設定
+
+    Returns:
+        Tuple[list[str], list[Future[RangeCountResult]]] | None: 以下の要素を含むタプル
+            - list[str]: ヘッダ行のフィールド名リスト
+            - list[Future[RangeCountResult]]: ファイル先頭から順に並んだ各範囲の Future
+            分割できない場合（範囲が1つ以下、ヘッダ行の読み込みに失敗など）は None
+    """
+    try:
+        header_end, ranges = split_csv_byte_ranges(file_path=file_path, chunk_size=chunk_size)
+        if len(ranges) < 2 or 0 < options.max_field_size < header_end:
+            # 閾値を超えるヘッダ行は、通常の読み込みでエラーとしてログに記録する
+            return None
+        with open(file=file_path, mode="rb") as binary_file:
+            header_bytes: bytes = binary_file.read(header_end)
+        if find_record_end(data=header_bytes) != header_end:
+            # ヘッダ行が CR だけで終わる場合など、LF の位置がヘッダ行の終わりと一致しない
+            return None
+        csv.field_size_limit(new_limit=field_size_limit)
+        header: list[str] = read_csv_header(data=header_bytes, encoding=options.encoding)
+    except Exception:
+        # 分割できない場合は通常の読み込みで処理し、エラーはそちらでログに記録する
+        return None
+
+    futures: list[Future[RangeCountResult]] = [
+        executor.submit(count_csv_range, file_path, start, end, len(header), field_size_limit, options, header)
+        for start, end in ranges
+    ]
+    return header, futures
+
+
+def merge_range_results(
+    file_path: str, log_file: str, header: list[str], futures: list[Future[RangeCountResult]], options: CountOptions
+) -> CountResult:
+    """各範囲のカウント結果をファイル先頭から順にマージする
+
+    Args:
+        file_path (str): 処理対象のCSVファイルのパス
+        log_file (str): ログファイルのパス
+        header (list[str]): ヘッダ行のフィールド名リスト
+        futures (list[Future[RangeCountResult]]): ファイル先頭から順に並んだ各範囲の Future
+        options (CountOptions): カウント処理の設定
+
+    Returns:
+        CountResult: count_values_in_csv の戻り値
+
+    Note:
+        - フィールド数エラーと閾値を超えたフィールドの行番号は、前の範囲までのレコード数を加えて
+          ファイル全体の行番号に直す
+        - フィールド数エラーはファイル全体で集計してからログに記録する
+        - いずれかの範囲で読み込みエラーが発生した場合は、通常の読み込みと同様に空の結果を返す
+        - 重複の一時ファイルは、結果を求めた後（エラーの場合はまだマージしていない範囲の分も）削除する
+        - 先頭以外の範囲で異なるグループの数が上限に達した場合は、グループ毎の値の個数だけを
+          ファイル全体を読み込み直して数える（recount_group_counts を参照）
+    """
+    expected_field_count: int = len(header)
+    positional_count: Counter[int] = Counter()
+    data_row_count: int = 0
+    has_extra_field: bool = False
+    row_index_offset: int = 2  # 最初のデータ行はファイルの2行目（1行目はヘッダ）
+    field_count_errors: FieldCountErrors = FieldCountErrors(
+        expected_field_count=expected_field_count, sample_limit=options.error_sample_limit
+    )
+    field_stats: FieldStatsCollector | None = options.create_field_stats(field_count=expected_field_count)
+    null_patterns: NullPatternCounter | None = options.create_null_patterns(field_count=expected_field_count)
+    duplicates: DuplicateFinder | None = options.create_duplicates(header=header)
+    group_counts: GroupCounter | None = options.create_group_counts(header=header)
+    regroup: bool = False  # 先頭以外の範囲で異なるグループの数が上限に達したか
+    elapsed_seconds: float = 0.0
+    oversized_fields: list[OversizedField] = []
+
+    future: Future[RangeCountResult]
+    for future in futures:
+        try:
+            result: RangeCountResult = future.result()
+        except Exception as e:
+            result = RangeCountResult(
+                Counter(), 0, 0, False, FieldCountErrors(expected_field_count, 0), ("other", str(e))
+            )
+
+        if result.field_count_errors.details:
+            record_index: int
+            actual_field_count: int
+            for record_index, actual_field_count in result.field_count_errors.details:
+                log_field_count_error(
+                    log_file=log_file,
+                    file_path=file_path,
+                    expected_field_count=expected_field_count,
+                    row_index=row_index_offset + record_index,
+                    actual_field_count=actual_field_count,
+                )
+        field_count_errors.merge(other=result.field_count_errors, row_index_offset=row_index_offset)
+
+        if result.error is not None:
+            log_field_count_errors(log_file=log_file, file_path=file_path, errors=field_count_errors)
+            error_type, error_message = result.error
+            if error_type == "csv":
+                log_message(
+                    log_file=log_file,
+                    message=f"{file_path}: CSVファイルの読み込み中にエラーが発生しました: {error_message}",
+                )
+            else:
+                log_message(log_file=log_file, message=f"{file_path}: エラーが発生しました: {error_message}")
+            for pending in futures:
+                pending.cancel()
+            discard_range_duplicates(futures=futures, duplicates=duplicates)
+            return CountResult(counts={}, fieldnames=[], has_data=False, data_row_count=0)
+
+        positional_count.update(result.positional_count)
+        if field_stats is not None and result.field_stats is not None:
+            field_stats.merge(other=result.field_stats)
+        if null_patterns is not None and result.null_patterns is not None:
+            null_patterns.merge(other=result.null_patterns)
+        if duplicates is not None and result.duplicates is not None:
+            duplicates.merge(other=result.duplicates, record_offset=row_index_offset - 2)
+        if group_counts is not None and result.group_counts is not None:
+            regroup = regroup or (future is not futures[0] and result.group_counts.overflowed)
+            group_counts.merge(other=result.group_counts)
+        data_row_count += result.data_row_count
+        has_extra_field = has_extra_field or result.has_extra_field
+        if result.oversized_fields:
+            oversized_fields.extend(
+                field._replace(row_index=row_index_offset + field.row_index) for field in result.oversized_fields
+            )
+        row_index_offset += result.record_count
+        elapsed_seconds += result.elapsed_seconds
+
+    log_field_count_errors(log_file=log_file, file_path=file_path, errors=field_count_errors)
+    log_oversized_fields(log_file=log_file, file_path=file_path, oversized_fields=oversized_fields)
+    try:
+        if regroup:
+            group_counts = recount_group_counts(file_path=file_path, header=header, options=options)
+            log_message(
+                log_file=log_file,
+                message=(
+                    f"{file_path}: 分割した範囲で異なるグループの数が上限 ({options.group_capacity}) に達したため、"
+                    "グループ毎の値の個数はファイル全体を読み込み直して数えました。"
+                ),
+            )
+        return build_field_counts(
+            header=header,
+            positional_count=positional_count,
+            has_extra_field=has_extra_field,
+            data_row_count=data_row_count,
+            field_stats=field_stats,
+            null_patterns=null_patterns,
+            duplicates=duplicates,
+            group_counts=group_counts,
+        )._replace(
+            elapsed_seconds=elapsed_seconds, oversized_fields=oversized_fields if options.max_field_size > 0 else None
+        )
+    finally:
+        if duplicates is not None:
+            duplicates.cleanup()
+
+
+def recount_group_counts(file_path: str, header: list[str], options: CountOptions) -> GroupCounter | None:
+    """グループ毎の値の個数だけを、ファイル全体を先頭から読み込み直して数える
+
+    Args:
+        file_path (str): 処理対象のCSVファイルのパス
+        header (list[str]): ヘッダ行のフィールド名リスト
+        options (CountOptions): カウント処理の設定
+
+    Returns:
+        GroupCounter | None: ファイル全体のグループ毎の値の個数（集計しない場合は None）
+
+    Note:
+        - 分割した範囲毎の結果をマージすると、範囲内で「その他」にまとめた行を振り分け直せない場合に使う
+          （異なるグループの数が上限に達するファイルだけなので、読み込み直す分の時間は通常はかからない）
+        - フィールド数エラーと閾値を超えたフィールドは範囲毎の結果で記録済みのため、ここでは記録しない
+    """
+    group_counts: GroupCounter | None = options.create_group_counts(header=header)
+    if group_counts is None:
+        return None
+    with open_csv_text(path=file_path, encoding=options.encoding) as csvfile:
+        if options.max_field_size > 0:
+            bounded_reader: BoundedCsvReader = BoundedCsvReader(
+                stream=csvfile.buffer, max_field_size=options.max_field_size, encoding=options.encoding
+            )
+            bounded_reader.read_header()
+            count_csv_bounded(
+                reader=bounded_reader,
+                expected_field_count=len(header),
+                on_field_count_error=lambda record_index, actual_field_count: None,
+                on_oversized_field=lambda record_index, column, size: None,
+                group_counts=group_counts,
+            )
+        else:
+            reader = csv.reader(csvfile)
+            next(reader, None)
+            count_csv_rows(
+                rows=reader,
+                expected_field_count=len(header),
+                on_field_count_error=lambda record_index, actual_field_count: None,
+                group_counts=group_counts,
+            )
+    return group_counts
+
+
+def discard_range_duplicates(futures: list[Future[RangeCountResult]], duplicates: DuplicateFinder | None) -> None:
+    """読み込みエラーでマージを中止した場合に、重複の一時ファイルを削除する
+
+    Args:
+        futures (list[Future[RangeCountResult]]): 各範囲の Future（取り消せなかった範囲は終わるまで待つ）
+        duplicates (DuplicateFinder | None): マージ済みの範囲の重複（確認しない場合は None）
+
+    Returns:
+        None
+    """
+    if duplicates is None:
+        return
+    duplicates.cleanup()
+    future: Future[RangeCountResult]
+    for future in futures:
+        if future.cancelled():
+            continue
+        try:
+            range_duplicates: DuplicateFinder | None = future.result().duplicates
+        except Exception:
+            continue
+        if range_duplicates is not None:
+            range_duplicates.cleanup()
+
+
+def append_range_result(first: RangeCountResult, second: RangeCountResult) -> RangeCountResult:
+    """ファイル上で連続する2つの範囲のカウント結果を、1つの範囲の結果にまとめる
+
+    Args:
+        first (RangeCountResult): 前の範囲のカウント結果
+        second (RangeCountResult): first の直後から続く範囲のカウント結果
+
+    Returns:
+        RangeCountResult: first の先頭から second の末尾までのカウント結果
+            （second の行番号は first のレコード数を加えて first の範囲内のレコード番号に直す）
+
+    Note:
+        - 読み込みエラーと統計情報・頻出値はまとめない（呼び出し側で扱う）
+    """
+    field_count_errors: FieldCountErrors = FieldCountErrors(
+        expected_field_count=first.field_count_errors.expected_field_count,
+        sample_limit=first.field_count_errors.sample_limit,
+        keep_all=first.field_count_errors.details is not None,
+    )
+    field_count_errors.merge(other=first.field_count_errors, row_index_offset=0)
+    field_count_errors.merge(other=second.field_count_errors, row_index_offset=first.record_count)
+    oversized_fields: list[OversizedField] | None = None
+    if first.oversized_fields is not None or second.oversized_fields is not None:
+        oversized_fields = list(first.oversized_fields or []) + [
+            field._replace(row_index=first.record_count + field.row_index) for field in second.oversized_fields or []
+        ]
+    return RangeCountResult(
+        first.positional_count + second.positional_count,
+        first.record_count + second.record_count,
+        first.data_row_count + second.data_row_count,
+        first.has_extra_field or second.has_extra_field,
+        field_count_errors,
+        None,
+        None,
+        first.elapsed_seconds + second.elapsed_seconds,
+        oversized_fields,
+    )
+
+
+def count_appended_csv(
+    file_path: str,
+    log_file: str,
+    field_size_limit: int,
+    options: CountOptions,
+    append_state: AppendState | None = None,
+) -> CountResult:
+    """追記されるCSVファイルを、前回カウントした位置から続けてカウントする（--append）
+
+    前回の記録（append_state）の位置までのファイルの内容がハッシュと一致する場合は、
+    その位置より後ろに追記された部分だけをカウントして前回のカウント結果に加えます。
+    一致しない場合（ヘッダ行や途中の内容が変更された場合）はファイル全体をカウントし直します。
+
+    Args:
+        file_path (str): 処理対象のCSVファイルのパス（圧縮されていないファイル）
+        log_file (str): ログファイルのパス
+        field_size_limit (int): CSVフィールドサイズの制限値（バイト）
+        options (CountOptions): カウント処理の設定（統計情報・頻出値は集計しない）
+        append_state (AppendState | None): 前回の記録（None の場合はファイル全体をカウントする）
+
+    Returns:
+        CountResult: ファイル全体のカウント結果（append_state に次回のための記録を設定する）
+
+    Raises:
+        OSError: ファイルの読み込みに失敗した場合
+        csv.Error: ヘッダ行の読み込みでCSV形式エラーが発生した場合、ヘッダ行が options.max_field_size を超える場合
+
+    Note:
+        - 書き込み途中で完結していない最後のレコードは、今回の結果には含めるが記録には含めず、
+          次回はそのレコードの先頭からカウントする
+        - フィールド数エラーと閾値を超えたフィールドは、今回カウントした部分のものだけをログに記録する
+        - ヘッダ行が LF で終わっていない場合は記録しない（次回もファイル全体をカウントする）
+        - レコード境界はクォートの個数の偶奇で判定する（csv_byte_range と同じ制約がある）
+        - 前回の位置までのハッシュの確認のため、毎回ファイル全体を読み込む（解析はしない）
+    """
+    with open(file=file_path, mode="rb") as binary_file, mmap.mmap(
+        binary_file.fileno(), 0, access=mmap.ACCESS_READ
+    ) as data:
+        header_end: int = find_record_end(data=data)
+        if 0 < options.max_field_size < header_end:
+            raise csv.Error(f"ヘッダ行が {options.max_field_size} バイトを超えています")
+        header: list[str] = read_csv_header(data=data[:header_end], encoding=options.encoding)
+        expected_field_count: int = len(header)
+        # ヘッダ行が CR だけで終わる場合などは、続きに LF が書き込まれると行の区切りが変わるため記録しない
+        header_ends_with_lf: bool = data[header_end - 1 : header_end] == b"\n"
+
+        # 前回の位置までの内容が変わっていないかをハッシュで確認する
+        digest: hashlib.blake2b = new_digest()
+        if append_state is not None:
+            if (
+                header_end <= append_state.record_end <= len(data)
+                and len(append_state.positional_counts) == expected_field_count
+            ):
+                update_digest(digest=digest, data=data, start=0, end=append_state.record_end)
+                if digest.hexdigest() != append_state.prefix_hash:
+                    append_state = None
+            else:
+                append_state = None
+            if append_state is None:
+                log_message(
+                    log_file=log_file,
+                    message=f"{file_path}: 前回カウントした位置までの内容が変更されたため、ファイル全体をカウントし直します。",
+                )
+                digest = new_digest()
+        if append_state is None:
+            update_digest(digest=digest, data=data, start=0, end=header_end)
+            append_state = AppendState(
+                record_end=header_end,
+                prefix_hash="",
+                record_count=0,
+                data_row_count=0,
+                positional_counts=[0] * expected_field_count,
+                has_extra_field=False,
+                oversized_fields=[] if options.max_field_size > 0 else None,
+            )
+        elif append_state.record_end < len(data):
+            log_message(
+                log_file=log_file,
+                message=(
+                    f"{file_path}: 前回カウントした位置（{append_state.record_end:,} バイト）より後ろの "
+                    f"{len(data) - append_state.record_end:,} バイトだけをカウントします。"
+                ),
+            )
+
+        # 追記された部分のうち完結しているレコードまでを記録し、最後の書き込み途中のレコードは今回だけ数える
+        record_end: int = find_last_record_end(data=data, start=append_state.record_end, end=len(data))
+        update_digest(digest=digest, data=data, start=append_state.record_end, end=record_end)
+        file_size: int = len(data)
+
+    empty_result: RangeCountResult = RangeCountResult(
+        Counter(),
+        0,
+        0,
+        False,
+        FieldCountErrors(
+            expected_field_count=expected_field_count, sample_limit=options.error_sample_limit, keep_all=options.verbose
+        ),
+        None,
+        None,
+        0.0,
+        [] if options.max_field_size > 0 else None,
+    )
+    appended: RangeCountResult = empty_result
+    if append_state.record_end < record_end:
+        appended = count_csv_range(
+            file_path, append_state.record_end, record_end, expected_field_count, field_size_limit, options
+        )
+    incomplete: RangeCountResult = empty_result
+    if record_end < file_size:
+        incomplete = count_csv_range(file_path, record_end, file_size, expected_field_count, field_size_limit, options)
+
+    tail: RangeCountResult = append_range_result(first=appended, second=incomplete)
+    row_index_offset: int = 2 + append_state.record_count  # 今回カウントした最初のレコードの行番号
+    if tail.field_count_errors.details:
+        record_index: int
+        actual_field_count: int
+        for record_index, actual_field_count in tail.field_count_errors.details:
+            log_field_count_error(
+                log_file=log_file,
+                file_path=file_path,
+                expected_field_count=expected_field_count,
+                row_index=row_index_offset + record_index,
+                actual_field_count=actual_field_count,
+            )
+    field_count_errors: FieldCountErrors = FieldCountErrors(
+        expected_field_count=expected_field_count, sample_limit=options.error_sample_limit
+    )
+    field_count_errors.merge(other=tail.field_count_errors, row_index_offset=row_index_offset)
+    log_field_count_errors(log_file=log_file, file_path=file_path, errors=field_count_errors)
+
+    error: Tuple[str, str] | None = appended.error or incomplete.error
+    if error is not None:
+        error_type, error_message = error
+        if error_type == "csv":
+            log_message(
+                log_file=log_file, message=f"{file_path}: CSVファイルの読み込み中にエラーが発生しました: {error_message}"
+            )
+        else:
+            log_message(log_file=log_file, message=f"{file_path}: エラーが発生しました: {error_message}")
+        return CountResult(counts={}, fieldnames=[], has_data=False, data_row_count=0)
+    if tail.oversized_fields:
+        log_oversized_fields(
+            log_file=log_file,
+            file_path=file_path,
+            oversized_fields=[
+                field._replace(row_index=row_index_offset + field.row_index) for field in tail.oversized_fields
+            ],
+        )
+
+    previous: RangeCountResult = RangeCountResult(
+        Counter(dict(enumerate(append_state.positional_counts))),
+        append_state.record_count,
+        append_state.data_row_count,
+        append_state.has_extra_field,
+        empty_result.field_count_errors,
+        None,
+        None,
+        0.0,
+        append_state.oversized_fields,
+    )
+    counted: RangeCountResult = append_range_result(first=previous, second=appended)
+    whole: RangeCountResult = append_range_result(first=counted, second=incomplete)
+    return build_field_counts(
+        header=header,
+        positional_count=whole.positional_count,
+        has_extra_field=whole.has_extra_field,
+        data_row_count=whole.data_row_count,
+    )._replace(
+        oversized_fields=(
+            [field._replace(row_index=2 + field.row_index) for field in whole.oversized_fields]
+            if whole.oversized_fields is not None
+            else None
+        ),
+        append_state=(
+            AppendState(
+                record_end=record_end,
+                prefix_hash=digest.hexdigest(),
+                record_count=counted.record_count,
+                data_row_count=counted.data_row_count,
+                positional_counts=[counted.positional_count[index] for index in range(expected_field_count)],
+                has_extra_field=counted.has_extra_field,
+                oversized_fields=counted.oversized_fields,
+            )
+            if header_ends_with_lf
+            else None
+        ),
+    )
+
+
+def count_values_in_csv(
+    file_path: str,
+    log_file: str,
+    field_size_limit: int,
+    workers: int = 1,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    options: CountOptions = CountOptions(),
+    append_state: AppendState | None = None,
+) -> CountResult:
+    """CSVファイル内の各フィールドの値を持つフィールドの個数をカウントする
+
+    CSVファイルを読み込み、各フィールドに値が存在する行の数をカウントします。
+    ヘッダ行を除いたデータ行数も同時に取得します。
+    また、各データ行のフィールド数がヘッダ行と異なる場合はエラーログを出力します。
+
+    Args:
+        file_path (str): 処理対象のCSVファイルのパス（zip アーカイブ内のファイルは "アーカイブのパス::アーカイブ内のパス"）
+        log_file (str): ログファイルのパス
+        field_size_limit (int): CSVフィールドサイズの制限値（バイト）
+        workers (int): ファイルを分割して並列にカウントするプロセス数（1以下の場合は分割しない）
+        chunk_size (int): 分割する場合の1範囲あたりの目安のバイト数
+        options (CountOptions): カウント処理の設定
+        append_state (AppendState | None): 前回の続きからカウントするための記録（options.append の場合のみ）
+
+    Returns:
+        CountResult: 以下の要素を含むタプル
+            - Dict[str, int]: 各フィールド名と値が存在する行数の辞書
+            - list[str]: CSVファイルのフィールド名リスト（ヘッダ順）
+            - bool: データが存在するかのフラグ（True: データあり, False: ヘッダのみ）
+            - int: データ行数（ヘッダを除く総行数）
+            - Dict[str, FieldStats] | None: 項目毎の統計情報（options.collect_stats の場合のみ）
+            - Dict[str, list[TopValue]] | None: 項目毎の頻出値（options.top_k > 0 の場合のみ）
+            - list[OversizedField] | None: 閾値を超えたフィールド（options.max_field_size > 0 の場合のみ）
+            - AppendState | None: 次回に続きからカウントするための記録（options.append の場合のみ）
+            - NullPatternSummary | None: 行毎の空値パターン（options.null_patterns > 0 の場合のみ）
+            - Dict[str, FieldType] | None: 項目毎の型の推定結果（options.infer_types の場合のみ）
+            - DuplicateSummary | None: 重複の集計結果（options.duplicate_keys を指定した場合のみ）
+            - GroupSummary | None: グループ毎の値の個数（options.group_fields を指定した場合のみ）
+
+    Raises:
+        FileNotFoundError: 指定されたCSVファイルが存在しない場合
+        OSError: ファイルの読み込みやサイズ取得に失敗した場合
+        csv.Error: CSV形式エラーが発生した場合
+        Exception: その他の予期しないエラーが発生した場合
+
+    Note:
+        - ファイルエンコーディングは options.encoding（既定値: cp932）を使用
+        - ファイルは1回だけ読み込み、フィールド数チェックとカウントを同時に行う
+        - 圧縮されたCSVファイル（.gz, .bz2, .xz、zip アーカイブ内のファイルの論理パス）は一時ファイルを作らずに
+          展開しながら読み込む（展開はバックグラウンドのスレッドで解析と並行して行う。
+          engine は python を使い、分割して並列にカウントしない。count_values_in_stream を参照）
+        - options.collect_stats の場合は同じ読み込みで項目毎の統計情報も集計する（engine は python を使う）
+        - options.top_k > 0 の場合は同じ読み込みで項目毎の頻出値も求める（engine は python を使う）
+        - options.infer_types の場合は同じ読み込みで項目毎の値の型も推定する（engine は python を使う）
+        - options.max_field_size > 0 の場合は、閾値を超えるフィールドを含むレコードの値を読み込まずに
+          空かどうかと長さだけを求め、閾値を超えたフィールドの位置を返す（engine は python を使う。
+          それらのレコードは統計情報・頻出値・型の推定に含めない）
+        - options.null_patterns > 0 の場合は同じ読み込みで行毎の空値パターン（値が空のフィールドの組み合わせ）の
+          行数も数える（engine は python を使う）
+        - options.duplicate_keys を指定した場合は同じ読み込みで行全体（またはキー項目の値）が重複する行も数える
+          （engine は python を使う。メモリ使用量が options.duplicate_memory を超える分は一時ファイルに書き出し、
+          結果を求めた後に削除する）
+        - options.group_fields を指定した場合は同じ読み込みでグループ項目の値毎のデータ行数と値の個数も数える
+          （engine は python を使う。異なるグループの数が options.group_capacity を超えた後のグループは
+          「その他」にまとめる）
+        - options.append の場合は、圧縮されていないCSVファイルを前回カウントした位置から続けてカウントする
+          （count_appended_csv を参照。分割して並列にカウントしない）
+        - options.byte_safe でない文字エンコーディング（iso-2022-jp など）は、engine・append・workers に関わらず
+          テキストとして先頭から読み込む（2バイト文字のバイトが " や , と一致し、レコード境界を誤るため）
+        - options.engine == "bytes" の場合はファイルをメモリマップし、デコードせずにバイト列のまま
+          フィールドの空/非空を判定する（ダブルクォートを含む部分はテキストとして読み込む）
+        - options.engine == "arrow" の場合は Apache Arrow の列指向CSVリーダーでカウントする
+          （読み込めないファイルはテキストとして読み込む）
+        - workers > 1 かつファイルサイズが chunk_size を超える場合は、レコード境界で
+          分割したバイト範囲を別プロセスでカウントしてマージする（結果とログは分割しない場合と同じ）
+        - 空のセルは値なしとして扱われる
+        - データ行のフィールド数がヘッダ行と異なる場合、ファイル毎に集計してエラーログを出力
+          （フィールド数別の行数、先頭の行番号、合計。options.verbose の場合は1行ずつ出力）
+        - エラー発生時はログファイルに記録される
+    """
+    result: CountResult = CountResult(counts={}, fieldnames=[], has_data=False, data_row_count=0)
+    compressed: bool = is_compressed_path(path=file_path)
+    counting_engine: str = "python" if compressed else options.counting_engine
+
+    # CSVファイルのサイズ制限を設定
+    csv.field_size_limit(new_limit=field_size_limit)
+
+    try:
+        with open_csv_text(path=file_path, encoding=options.encoding) as csvfile:
+            file_size: int = 0
+            if not compressed:
+                try:
+                    # ファイルサイズが0バイトかチェック（空ファイルの判定）
+                    file_size = os.stat(path=file_path).st_size
+                    if file_size == 0:
+                        log_message(log_file=log_file, message=f"{file_path}: 空ファイルです。")
+                        return result
+                except OSError as e:
+                    log_message(log_file=log_file, message=f"{file_path}: ファイル情報の取得に失敗しました: {e}")
+                    return result
+
+            if options.append and not compressed and options.byte_safe:
+                # 追記されるCSVファイルは前回カウントした位置から続けてカウントする
+                try:
+                    return count_appended_csv(
+                        file_path=file_path,
+                        log_file=log_file,
+                        field_size_limit=field_size_limit,
+                        options=options,
+                        append_state=append_state,
+                    )
+                except csv.Error as e:
+                    log_message(
+                        log_file=log_file, message=f"{file_path}: CSVファイルの読み込み中にエラーが発生しました: {e}"
+                    )
+                    return result
+
+            # 大きなファイルはレコード境界で分割して並列にカウントする
+            if workers > 1 and file_size > chunk_size and options.byte_safe:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    submitted = submit_csv_ranges(
+                        executor=executor,
+                        file_path=file_path,
+                        field_size_limit=field_size_limit,
+                        chunk_size=chunk_size,
+                        options=options,
+                    )
+                    if submitted is not None:
+                        header, futures = submitted
+                        return merge_range_results(
+                            file_path=file_path, log_file=log_file, header=header, futures=futures, options=options
+                        )
+
+            if counting_engine not in ("bytes", "arrow"):
+                # テキストとして先頭から読み込む（圧縮されたCSVファイルも同じ）
+                return count_values_in_stream(csvfile=csvfile, file_path=file_path, log_file=log_file, options=options)
+
+            try:
+                # ファイルをメモリマップし、ヘッダ行の終わり以降をバイト列または列指向で読み込む
+                with open(file=file_path, mode="rb") as binary_file, mmap.mmap(
+                    binary_file.fileno(), 0, access=mmap.ACCESS_READ
+                ) as data:
+                    header_end: int = find_record_end(data=data)
+                    header: list[str] = read_csv_header(data=data[:header_end], encoding=options.encoding)
+                    count_range: Callable[..., Tuple[Counter[int], int, int, bool]] = (
+                        count_csv_bytes
+                        if counting_engine == "bytes"
+                        else partial(count_csv_columnar, file_path=file_path)
+                    )
+                    positional_count, row_count, has_extra_field = count_rows_with_error_log(
+                        count_rows=partial(
+                            count_range,
+                            data=data,
+                            start=header_end,
+                            end=len(data),
+                            field_size_limit=field_size_limit,
+                            encoding=options.encoding,
+                        ),
+                        expected_field_count=len(header),
+                        file_path=file_path,
+                        log_file=log_file,
+                        options=options,
+                    )
+            except csv.Error as e:
+                log_message(
+                    log_file=log_file, message=f"{file_path}: CSVファイルの読み込み中にエラーが発生しました: {e}"
+                )
+                return result
+
+            result = build_field_counts(
+                header=header,
+                positional_count=positional_count,
+                has_extra_field=has_extra_field,
+                data_row_count=row_count,
+            )
+
+    except FileNotFoundError:
+        log_message(log_file=log_file, message=f"{file_path}: ファイルが見つかりません。")
+    except Exception as e:
+        log_message(log_file=log_file, message=f"{file_path}: エラーが発生しました: {e}")
+
+    return result
+
+
+def count_rows_with_error_log(
+    count_rows: Callable[..., Tuple[Counter[int], int, int, bool]],
+    expected_field_count: int,
+    file_path: str,
+    log_file: str,
+    options: CountOptions,
+    oversized_fields: list[OversizedField] | None = None,
+) -> Tuple[Counter[int], int, bool]:
+    """データ行をカウントし、フィールド数エラーと閾値を超えたフィールドをファイル毎に集計してログに記録する
+
+    Args:
+        count_rows (Callable[..., Tuple[Counter[int], int, int, bool]]): count_csv_rows などのカウント関数
+            （expected_field_count と on_field_count_error 以外の引数は指定済みのもの）
+        expected_field_count (int): ヘッダ行のフィールド数
+        file_path (str): 処理対象のCSVファイルのパス
+        log_file (str): ログファイルのパス
+        options (CountOptions): カウント処理の設定
+        oversized_fields (list[OversizedField] | None): count_rows が閾値を超えたフィールドを追加するリスト
+
+    Returns:
+        Tuple[Counter[int], int, bool]: 列位置をキーとした値が存在する行数、データ行数、余剰フィールドを持つ行があるか
+
+    Note:
+        - カウント中に例外が発生した場合も、それまでのフィールド数エラーをログに記録する
+    """
+    field_count_errors: FieldCountErrors = FieldCountErrors(
+        expected_field_count=expected_field_count, sample_limit=options.error_sample_limit
+    )
+
+    def on_field_count_error(record_index: int, actual_field_count: int) -> None:
+        # ヘッダ行とデータ行のフィールド数が異なる場合はファイル毎に集計する
+        row_index: int = record_index + 2  # 2行目から開始（1行目はヘッダ）
+        field_count_errors.add(row_index=row_index, actual_field_count=actual_field_count)
+        if options.verbose:
+            log_field_count_error(
+                log_file=log_file,
+                file_path=file_path,
+                expected_field_count=expected_field_count,
+                row_index=row_index,
+                actual_field_count=actual_field_count,
+            )
+
+    try:
+        positional_count, _, row_count, has_extra_field = count_rows(
+            expected_field_count=expected_field_count, on_field_count_error=on_field_count_error
+        )
+    finally:
+        log_field_count_errors(log_file=log_file, file_path=file_path, errors=field_count_errors)
+        if oversized_fields:
+            log_oversized_fields(log_file=log_file, file_path=file_path, oversized_fields=oversized_fields)
+    return positional_count, row_count, has_extra_field
+
+
+def count_values_in_stream(
+    csvfile: TextIO, file_path: str, log_file: str, options: CountOptions = CountOptions()
+) -> CountResult:
+    """テキストとして開いたCSVを先頭から読み込み、各フィールドの値を持つ行数をカウントする（engine は python）
+
+    圧縮されたCSVファイルや、メモリ上のデータ・ネットワークから受信中のデータなど
+    メモリマップできないCSVも、ファイルと同じ方法でカウントします。
+
+    Args:
+        csvfile (TextIO): 先頭から読み込むテキストストリーム（open() のテキストモードと同じ改行の扱いのもの。
+            options.max_field_size > 0 の場合は、同じ位置から読み込むバイナリストリームを buffer 属性に持つこと）
+        file_path (str): ログに記録するCSVファイルのパス（名前）
+        log_file (str): ログファイルのパス
+        options (CountOptions): カウント処理の設定（engine と append は使わない）
+
+    Returns:
+        CountResult: count_values_in_csv と同じ（空のストリーム・CSV形式エラーの場合はフィールド名リストが空の結果）
+
+    Raises:
+        OSError: ストリームの読み込みに失敗した場合
+        UnicodeDecodeError: options.encoding でデコードできない場合
+
+    Note:
+        - CSVフィールドサイズの制限値は呼び出し側で設定する（csv.field_size_limit）
+        - 空のストリームは空ファイルとしてログに記録する
+        - 重複の一時ファイルは結果を求めた後（エラーの場合を含む）に削除する
+    """
+    result: CountResult = CountResult(counts={}, fieldnames=[], has_data=False, data_row_count=0)
+    oversized_fields: list[OversizedField] = []
+    duplicates: DuplicateFinder | None = None
+    try:
+        count_rows: Callable[..., Tuple[Counter[int], int, int, bool]]
+        bounded_reader: BoundedCsvReader | None = None
+        if options.max_field_size > 0:
+            # 閾値を超えるフィールドは文字列にせずに長さだけを計測する
+            bounded_reader = BoundedCsvReader(
+                stream=csvfile.buffer, max_field_size=options.max_field_size, encoding=options.encoding
+            )
+            header_row: list[str] | None = bounded_reader.read_header()
+        else:
+            reader = csv.reader(csvfile)
+            header_row = next(reader, None)
+        if header_row is None:
+            # 圧縮されたCSVファイルやストリームは、展開後の内容が空かで空ファイルを判定する
+            log_message(log_file=log_file, message=f"{file_path}: 空ファイルです。")
+            return result
+        header: list[str] = list(header_row)
+        field_stats: FieldStatsCollector | None = options.create_field_stats(field_count=len(header))
+        null_patterns: NullPatternCounter | None = options.create_null_patterns(field_count=len(header))
+        duplicates = options.create_duplicates(header=header)
+        group_counts: GroupCounter | None = options.create_group_counts(header=header)
+        if bounded_reader is not None:
+            count_rows = partial(
+                count_csv_bounded,
+                reader=bounded_reader,
+                on_oversized_field=lambda record_index, column, size: oversized_fields.append(
+                    OversizedField(row_index=record_index + 2, column=column, size=size)
+                ),
+                field_stats=field_stats,
+                null_patterns=null_patterns,
+                duplicates=duplicates,
+                group_counts=group_counts,
+            )
+        else:
+            count_rows = partial(
+                count_csv_rows,
+                rows=reader,
+                field_stats=field_stats,
+                null_patterns=null_patterns,
+                duplicates=duplicates,
+                group_counts=group_counts,
+            )
+        positional_count, row_count, has_extra_field = count_rows_with_error_log(
+            count_rows=count_rows,
+            expected_field_count=len(header),
+            file_path=file_path,
+            log_file=log_file,
+            options=options,
+            oversized_fields=oversized_fields,
+        )
+        result = build_field_counts(
+            header=header,
+            positional_count=positional_count,
+            has_extra_field=has_extra_field,
+            data_row_count=row_count,
+            field_stats=field_stats,
+            null_patterns=null_patterns,
+            duplicates=duplicates,
+            group_counts=group_counts,
+        )
+        if options.max_field_size > 0:
+            result = result._replace(oversized_fields=oversized_fields)
+    except csv.Error as e:
+        log_message(log_file=log_file, message=f"{file_path}: CSVファイルの読み込み中にエラーが発生しました: {e}")
+    finally:
+        if duplicates is not None:
+            duplicates.cleanup()
+    return result
+
+
+def count_values_in_csv_worker(
+    file_path: str, field_size_limit: int, options: CountOptions, append_state: AppendState | None = None
+) -> Tuple[CountResult, list[str]]:
+    """プロセスプール上で count_values_in_csv を実行する
+
+    ワーカープロセスはログをメモリに蓄積し、その内容をカウント結果と一緒に
+    親プロセスへ返します。親プロセスは結果を受け取った順ではなくファイルの検索順に
+    ログと出力ファイルを書き込むため、並列実行でも出力順は変わりません。
+
+    Args:
+        file_path (str): 処理対象のCSVファイルのパス
+        field_size_limit (int): CSVフィールドサイズの制限値（バイト）
+        options (CountOptions): カウント処理の設定
+        append_state (AppendState | None): 前回の続きからカウントするための記録（options.append の場合のみ）
+
+    Returns:
+        Tuple[CountResult, list[str]]: 以下の要素を含むタプル
+            - count_values_in_csv の戻り値
+            - ワーカーで記録されたログ行のリスト
+    """
+    worker_log_file: str = f"<worker {os.getpid()}>"
+    worker_log: io.StringIO = open_memory_log(log_file=worker_log_file)
+    start_time: float = time.perf_counter()
+    try:
+        result = count_values_in_csv(
+            file_path=file_path,
+            log_file=worker_log_file,
+            field_size_limit=field_size_limit,
+            options=options,
+            append_state=append_state,
+        )._replace(elapsed_seconds=time.perf_counter() - start_time)
+        lines: list[str] = worker_log.getvalue().splitlines(keepends=True)
+    finally:
+        close_log(log_file=worker_log_file)
+    return result, lines
+
+
+def sample_values_in_csv(
+    file_path: str,
+    log_file: str,
+    field_size_limit: int,
+    sample_size: int,
+    seed: int = DEFAULT_SAMPLE_SEED,
+    options: CountOptions = CountOptions(),
+) -> SampleResult:
+    """CSVファイルからレコードを抽出し、各フィールドの値の充填率を推定する（--sample N）
+
+    Args:
+        file_path (str): 処理対象のCSVファイルのパス（zip アーカイブ内のファイルは "アーカイブのパス::アーカイブ内のパス"）
+        log_file (str): ログファイルのパス
+        field_size_limit (int): CSVフィールドサイズの制限値（バイト）
+        sample_size (int): 抽出するレコード数
+        seed (int): 乱数シード
+        options (CountOptions): 全件をカウントする場合のカウント処理の設定
+
+    Returns:
+        SampleResult: 推定結果（エラーの場合はフィールド名リストが空の結果）
+
+    Note:
+        - 抽出で読み込む量（sample_size × SAMPLE_WINDOW_SIZE）以下の小さなファイルは、
+          count_values_in_csv で全件をカウントする（推定結果の抽出方法は "full"、信頼区間の幅は 0）
+        - 圧縮されたCSVファイルはシークできないため、先頭から sample_size 件のデータ行で推定する
+          （推定データ行数は不明。options.byte_safe でない文字エンコーディングも、シークした位置から
+          レコード境界を判定できないため同じ）
+        - エラー発生時はログファイルに記録される
+    """
+    result: SampleResult = SampleResult(
+        fieldnames=[], method="random", sample_rows=0, estimated_row_count=None, estimates={}
+    )
+    csv.field_size_limit(new_limit=field_size_limit)
+    try:
+        compressed: bool = is_compressed_path(path=file_path)
+        if not compressed and os.stat(path=file_path).st_size <= sample_size * SAMPLE_WINDOW_SIZE:
+            counted: CountResult = count_values_in_csv(
+                file_path=file_path, log_file=log_file, field_size_limit=field_size_limit, options=options
+            )
+            return exact_sample_result(
+                fieldnames=counted.fieldnames, counts=counted.counts, data_row_count=counted.data_row_count
+            )
+        if compressed or not options.byte_safe:
+            with open_csv_text(path=file_path, encoding=options.encoding) as csvfile:
+                return sample_csv_head(text=csvfile, sample_size=sample_size)
+        return sample_csv_file(file_path=file_path, sample_size=sample_size, seed=seed, encoding=options.encoding)
+    except FileNotFoundError:
+        log_message(log_file=log_file, message=f"{file_path}: ファイルが見つかりません。")
+    except csv.Error as e:
+        log_message(log_file=log_file, message=f"{file_path}: CSVファイルの読み込み中にエラーが発生しました: {e}")
+    except Exception as e:
+        log_message(log_file=log_file, message=f"{file_path}: エラーが発生しました: {e}")
+    return result
+
+
+def iter_count_results(
+    csv_files: Iterable[str],
+    log_file: str,
+    field_size_limit: int,
+    workers: int,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    options: CountOptions = CountOptions(),
+    append_states: Dict[str, AppendState] | None = None,
+) -> Iterator[CountResult]:
+    """CSVファイルのカウント結果を csv_files の順に1件ずつ返す
+
+    Args:
+        csv_files (Iterable[str]): 処理対象のCSVファイルのパス（必要になった分だけ読み込む）
+        log_file (str): ログファイルのパス
+        field_size_limit (int): CSVフィールドサイズの制限値（バイト）
+        workers (int): ワーカープロセス数（1以下の場合は親プロセスで順次処理）
+        chunk_size (int): 大きなファイルを分割する場合の1範囲あたりの目安のバイト数
+        options (CountOptions): カウント処理の設定
+        append_states (Dict[str, AppendState] | None): 前回の続きからカウントするCSVファイルの記録
+            （キー: CSVファイルのパス。csv_files から読み込んだ時点で登録されているものを使う）
+
+    Returns:
+        Iterator[CountResult]: count_values_in_csv の戻り値
+
+    Note:
+        - 並列実行時も結果は csv_files の順に返される（終了順には依存しない）
+        - chunk_size を超えるファイルはレコード境界で分割し、同じプロセスプールで並列にカウントする
+          （圧縮されたCSVファイルと、options.append の場合は分割しない）
+        - ワーカーのログは結果を返す直前に親プロセスのログファイルへ転記される
+        - 各結果の elapsed_seconds にカウントにかかった時間を設定する
+          （ワーカーで計測した時間。分割したファイルは各範囲の合計）
+        - 投入済みで未回収のファイル数を制限し、結果を受け取り次第順に返す
+    """
+    if append_states is None:
+        append_states = {}
+    if workers <= 1:
+        csv_file: str
+        for csv_file in csv_files:
+            start_time: float = time.perf_counter()
+            result: CountResult = count_values_in_csv(
+                file_path=csv_file,
+                log_file=log_file,
+                field_size_limit=field_size_limit,
+                options=options,
+                append_state=append_states.pop(csv_file, None),
+            )
+            yield result._replace(elapsed_seconds=time.perf_counter() - start_time)
+        return
+
+    max_pending_files: int = workers * 4
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # (CSVファイルのパス, 分割した場合のヘッダ行, Future のリスト) をファイルの検索順に保持する
+        pending: Deque[Tuple[str, list[str] | None, list[Future[Any]]]] = deque()
+
+        def collect() -> CountResult:
+            file_path, header, futures = pending.popleft()
+            if header is not None:
+                return merge_range_results(
+                    file_path=file_path, log_file=log_file, header=header, futures=futures, options=options
+                )
+            try:
+                result, lines = futures[0].result()
+            except Exception as e:
+                log_message(log_file=log_file, message=f"{file_path}: エラーが発生しました: {e}")
+                return CountResult(counts={}, fieldnames=[], has_data=False, data_row_count=0)
+            append_log_lines(log_file=log_file, lines=lines)
+            return result
+
+        for csv_file in csv_files:
+            submitted = None
+            try:
+                if (
+                    not options.append
+                    and not is_compressed_path(path=csv_file)
+                    and os.path.getsize(csv_file) > chunk_size
+                ):
+                    submitted = submit_csv_ranges(
+                        executor=executor,
+                        file_path=csv_file,
+                        field_size_limit=field_size_limit,
+                        chunk_size=chunk_size,
+                        options=options,
+                    )
+            except OSError:
+                pass  # ファイル情報の取得エラーは count_values_in_csv でログに記録する
+            if submitted is not None:
+                header, range_futures = submitted
+                pending.append((csv_file, header, list(range_futures)))
+            else:
+                future: Future[Any] = executor.submit(
+                    count_values_in_csv_worker, csv_file, field_size_limit, options, append_states.pop(csv_file, None)
+                )
+                pending.append((csv_file, None, [future]))
+            while len(pending) > max_pending_files:
+                yield collect()
+
+        while pending:
+            yield collect()
+
+
+class FileJob(NamedTuple):
+    """検索で見つかったCSVファイルの処理内容（profile_csv_files の plan_file が検索順に1件ずつ作成する）"""
+
+    path: str  # CSVファイルのパス
+    size: int  # ファイルサイズ（バイト、検索時に取得したもの）
+    signature: FileSignature | None  # 現在のファイルの情報（取得できなかった場合は None）
+    entry: ManifestEntry | None  # 前回から変更されていない場合のマニフェストの記録（カウントする場合は None）
+    append_state: AppendState | None = None  # 前回の続きからカウントする場合の記録（--append の場合のみ）
+
+
+class FileProfile(NamedTuple):
+    """profile_csv_files / profile_csv_stream の戻り値（1ファイル分のカウント結果）"""
+
+    path: str  # CSVファイルのパス（zip アーカイブ内のファイルは論理パス、ストリームの場合は指定された名前）
+    result: CountResult | None  # カウント結果（検索中のエラーと前回の結果を再利用するファイルの場合は None）
+    messages: list[str]  # カウント中に記録されたログ（タイムスタンプ付き、エラーが無い場合は空）
+    job: FileJob | None = None  # plan_file が返した処理内容（plan_file を指定しない場合と検索中のエラーは None）
+
+
+_profile_ids: Iterator[int] = count()  # profile_csv_files / profile_csv_stream のログの識別番号
+
+
+def is_byte_safe_encoding(encoding: str) -> bool:
+    """区切り文字・引用符・改行をバイト列のまま検出できる文字エンコーディングかを判定する
+
+    Args:
+        encoding (str): 文字エンコーディング名（別名も可）
+
+    Returns:
+        bool: BYTE_SAFE_ENCODINGS に含まれる場合は True（不明な文字エンコーディングは False）
+    """
+    try:
+        return codecs.lookup(encoding).name in BYTE_SAFE_ENCODINGS
+    except LookupError:
+        return False
+
+
+def validate_encoding(encoding: str, max_field_size: int = 0) -> None:
+    """CSVファイルの文字エンコーディングとして使えるかを確認する
+
+    Args:
+        encoding (str): 文字エンコーディング名
+        max_field_size (int): 値を読み込まずに長さだけを計測するフィールドの閾値（バイト、0 の場合は確認しない）
+
+    Returns:
+        None
+
+    Raises:
+        ValueError: 不明な文字エンコーディングの場合、または ASCII と互換でない場合
+            （レコード境界の検出とバイト列走査は区切り文字・引用符・改行を ASCII のバイトとして扱うため）、
+            max_field_size > 0 で is_byte_safe_encoding でない場合（巨大なフィールドはバイト列のまま走査するため）
+
+    Note:
+        - ASCII と互換でも is_byte_safe_encoding でない文字エンコーディング（iso-2022-jp など）は
+          エラーにはせず、テキストとして先頭から読み込む（CountOptions.byte_safe を参照）
+    """
+    try:
+        compatible: bool = b'",\r\n'.decode(encoding=encoding) == '",\r\n'
+    except LookupError as e:
+        raise ValueError(f"不明な文字エンコーディングです: {encoding}") from e
+    except UnicodeDecodeError:
+        compatible = False
+    if not compatible:
+        raise ValueError(f"ASCII と互換でない文字エンコーディングは指定できません: {encoding}")
+    if max_field_size > 0 and not is_byte_safe_encoding(encoding=encoding):
+        raise ValueError(
+            f"{encoding} は区切り文字をバイト列のまま検出できないため、--max-field-size と同時には指定できません"
+        )
+
+
+def drain_memory_log(log: io.StringIO) -> list[str]:
+    """メモリに蓄積したログを取り出して空にする
+
+    Args:
+        log (io.StringIO): open_memory_log の戻り値
+
+    Returns:
+        list[str]: 蓄積されていたログ行（改行を除く）
+    """
+    lines: list[str] = log.getvalue().splitlines()
+    log.seek(0)
+    log.truncate()
+    return lines
+
+
+def iter_file_profiles(
+    discovered: Iterable[DiscoveredFile | DiscoveryError],
+    log_file: str,
+    field_size_limit: int,
+    workers: int,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    options: CountOptions = CountOptions(),
+    plan_file: Callable[[DiscoveredFile], FileJob] | None = None,
+    memory_log: io.StringIO | None = None,
+) -> Iterator[FileProfile]:
+    """検索で見つかったCSVファイルを順にカウントし、結果を検索順に1件ずつ返す（profile_csv_files と --watch の共通処理）
+
+    Args:
+        discovered (Iterable[DiscoveredFile | DiscoveryError]): 検索結果（必要になった分だけ読み込む）
+        log_file (str): ログファイルのパス（ログの識別名）
+        field_size_limit (int): CSVフィールドサイズの制限値（バイト）
+        workers (int): ワーカープロセス数（1以下の場合は呼び出し元のプロセスで順次処理）
+        chunk_size (int): 大きなファイルを分割する場合の1範囲あたりの目安のバイト数
+        options (CountOptions): カウント処理の設定
+        plan_file (Callable[[DiscoveredFile], FileJob] | None): 見つかったファイル毎に処理内容を返す関数
+            （FileJob.entry が None でないファイルはカウントせず、前回の結果を再利用するものとして返す）
+        memory_log (io.StringIO | None): log_file のログをメモリに蓄積している場合のストリーム
+            （ファイル毎に取り出して FileProfile.messages に入れる）
+
+    Returns:
+        Iterator[FileProfile]: 検索順のカウント結果（検索中に読み込めなかったディレクトリ・ファイルも含む）
+
+    Note:
+        - 検索中のエラーは見つけた時点でログに記録する
+        - workers > 1 の場合もファイルの検索順に結果を返す（iter_count_results を参照）
+        - 呼び出し側が途中で読み込みをやめた場合は、投入済みのカウントの終了を待ってプロセスプールを終了する
+    """
+    # 読み込み済みで未返却の結果と、検索中のエラー以外か（検索順。カウントするファイルの result は返す時に設定する）
+    planned: Deque[Tuple[FileProfile, bool]] = deque()
+    counted: Deque[CountResult] = deque()  # 受け取り済みで未返却のカウント結果（検索順）
+    append_states: Dict[str, AppendState] = {}  # 前回の続きからカウントするCSVファイルの記録
+
+    def iter_files_to_count() -> Iterator[str]:
+        item: DiscoveredFile | DiscoveryError
+        for item in discovered:
+            if isinstance(item, DiscoveryError):
+                log_message(log_file=log_file, message=f"{item.path}: 検索中にエラーが発生しました: {item.message}")
+                messages: list[str] = drain_memory_log(log=memory_log) if memory_log is not None else []
+                planned.append((FileProfile(path=item.path, result=None, messages=messages), False))
+                continue
+            job: FileJob | None = plan_file(item) if plan_file is not None else None
+            planned.append((FileProfile(path=item.path, result=None, messages=[], job=job), True))
+            if job is None or job.entry is None:
+                if job is not None and job.append_state is not None:
+                    append_states[item.path] = job.append_state
+                yield item.path
+
+    count_results: Iterator[CountResult] = iter_count_results(
+        csv_files=iter_files_to_count(),
+        log_file=log_file,
+        field_size_limit=field_size_limit,
+        workers=workers,
+        chunk_size=chunk_size,
+        options=options,
+        append_states=append_states,
+    )
+    try:
+        while True:
+            if not planned:
+                # 次のCSVファイルを読み込む（カウントするファイルの場合は結果を受け取るまで待つ）
+                result: CountResult | None = next(count_results, None)
+                if result is not None:
+                    counted.append(result)
+                elif not planned:
+                    return
+                continue
+            profile: FileProfile
+            is_file: bool
+            profile, is_file = planned.popleft()
+            if is_file:
+                if profile.job is None or profile.job.entry is None:
+                    profile = profile._replace(result=counted.popleft() if counted else next(count_results))
+                if memory_log is not None:
+                    profile = profile._replace(messages=drain_memory_log(log=memory_log))
+            yield profile
+    finally:
+        count_results.close()
+
+
+def profile_csv_files(
+    roots: Iterable[str],
+    include: Iterable[str] = DEFAULT_INCLUDE_PATTERNS,
+    exclude: Iterable[str] = (),
+    max_depth: int | None = None,
+    encoding: str = DEFAULT_ENCODING,
+    workers: int = 1,
+    engine: str = "python",
+    options: CountOptions | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    field_size_limit: int = DEFAULT_FIELD_SIZE_LIMIT,
+    plan_file: Callable[[DiscoveredFile], FileJob] | None = None,
+    log_file: str | None = None,
+    on_discovered: Callable[[Iterable[DiscoveredFile | DiscoveryError]], Iterable[DiscoveredFile | DiscoveryError]]
+    | None = None,
+) -> Iterator[FileProfile]:
+    """検索の起点以下のCSVファイルをカウントし、ファイルを書き込まずに結果を検索順に1件ずつ返す
+
+    他のプログラムから多数のCSVファイルを1つのプロセスでカウントするためのライブラリ関数です。
+    コマンドラインの実行（main()）もこの関数でカウントし、戻り値から個別結果ファイル・統合結果ファイル・
+    マニフェストを書き込みます（この関数自体はログファイル以外のファイルを作成しない）。
+
+    Args:
+        roots (Iterable[str]): 検索の起点となるディレクトリまたはファイル（iter_csv_roots を参照）
+        include (Iterable[str]): 検索対象とするファイルのパターン
+        exclude (Iterable[str]): 除外するファイル・ディレクトリのパターン
+        max_depth (int | None): 検索するサブディレクトリの深さ（None: 制限なし）
+        encoding (str): CSVファイルの文字エンコーディング（ASCII と互換のもの）
+        workers (int): ワーカープロセス数（1以下の場合は呼び出し元のプロセスで順次処理）
+        engine (str): カウント方式（ENGINES のいずれか）
+        options (CountOptions | None): その他のカウント処理の設定（encoding と engine は引数の値を使う。
+            append は plan_file を指定した場合だけ使う）
+        chunk_size (int): 並列処理時に大きなファイルを分割する1範囲あたりの目安のバイト数
+        field_size_limit (int): CSVフィールドサイズの制限値（バイト）
+        plan_file (Callable[[DiscoveredFile], FileJob] | None): 見つかったファイル毎に処理内容を返す関数
+            （マニフェストの記録を再利用する場合に指定する。plan_file_job を参照）
+        log_file (str | None): ログの書き込み先のログファイル（None の場合はファイル毎に FileProfile.messages に入れて返す）
+        on_discovered (Callable[..., Iterable[DiscoveredFile | DiscoveryError]] | None): 検索結果を受け取り、
+            同じ要素を返す関数（検索用のスレッドで呼び出す。RunMetrics.iter_discovered など）
+
+    Returns:
+        Iterator[FileProfile]: 検索順のカウント結果（検索中に読み込めなかったディレクトリ・ファイルも含む）
+
+    Raises:
+        ValueError: encoding または engine が不正な場合（options.max_field_size と同時に使えない encoding を含む）
+
+    Note:
+        - ファイルの検索はバックグラウンドで行い、検索の完了を待たずに見つかった順にカウントする
+        - カウントと結果の順序は iter_file_profiles を参照
+        - pyarrow がインストールされていない場合、engine="arrow" は python で処理する
+    """
+    validate_encoding(encoding=encoding, max_field_size=options.max_field_size if options is not None else 0)
+    if engine not in ENGINES:
+        raise ValueError(f"不明なカウント方式です: {engine}（{', '.join(ENGINES)} のいずれか）")
+    if engine == "arrow" and csv_arrow_engine is None:
+        engine = "python"
+    options = (options or CountOptions())._replace(
+        encoding=encoding, engine=engine, append=options is not None and options.append and plan_file is not None
+    )
+    memory_log: io.StringIO | None = None
+    if log_file is None:
+        log_file = f"<profile {next(_profile_ids)}>"
+        memory_log = open_memory_log(log_file=log_file)
+    discovered: Iterable[DiscoveredFile | DiscoveryError] = iter_csv_roots(
+        roots=roots, include=include, exclude=exclude, max_depth=max_depth
+    )
+    if on_discovered is not None:
+        discovered = on_discovered(discovered)
+    try:
+        yield from iter_file_profiles(
+            discovered=iter_in_background(items=discovered),
+            log_file=log_file,
+            field_size_limit=field_size_limit,
+            workers=workers,
+            chunk_size=chunk_size,
+            options=options,
+            plan_file=plan_file,
+            memory_log=memory_log,
+        )
+    finally:
+        if memory_log is not None:
+            close_log(log_file=log_file)
+
+
+def profile_csv_stream(
+    stream: BinaryIO,
+    name: str,
+    encoding: str = DEFAULT_ENCODING,
+    options: CountOptions | None = None,
+    field_size_limit: int = DEFAULT_FIELD_SIZE_LIMIT,
+) -> FileProfile:
+    """バイナリストリームのCSVを先頭から読み込んでカウントし、ファイルを書き込まずに結果を返す
+
+    メモリ上のデータやネットワークから受信中のデータを、一時ファイルに書き出さずにカウントします。
+
+    Args:
+        stream (BinaryIO): 先頭から読み込むバイナリストリーム（io.BytesIO、ソケットの makefile("rb") など）
+        name (str): 結果とログに記録する名前
+        encoding (str): CSVの文字エンコーディング（ASCII と互換のもの）
+        options (CountOptions | None): その他のカウント処理の設定（engine と append は使わない）
+        field_size_limit (int): CSVフィールドサイズの制限値（バイト）
+
+    Returns:
+        FileProfile: カウント結果（エラーの場合はフィールド名リストが空の結果と、エラーのログ）
+
+    Raises:
+        ValueError: encoding が不正な場合（options.max_field_size と同時に使えない encoding を含む）
 
     Note:
-        - ファイルエンコーディングはcp932を使用
-        - 空のセルは値なしとして扱われる
-        - データ行のフィールド数がヘッダ行と異なる場合、エラーログを出力
-        - エラー発生時はログファイルに記録される
+        - stream は閉じない（読み込んだ位置は不定）
     """
-    field_count: Dict[str, int] = {}
-    fieldnames: list[str] = []
-    has_data: bool = False
-    data_row_count: int = 0  # データ行数（ヘッダを除く）
-
-    # CSVファイルのサイズ制限を設定
+    validate_encoding(encoding=encoding, max_field_size=options.max_field_size if options is not None else 0)
+    options = (options or CountOptions())._replace(encoding=encoding)
+    log_file: str = f"<profile {next(_profile_ids)}>"
+    log: io.StringIO = open_memory_log(log_file=log_file)
     csv.field_size_limit(new_limit=field_size_limit)
-
+    csvfile: io.TextIOWrapper = io.TextIOWrapper(stream, encoding=encoding)
+    start_time: float = time.perf_counter()
     try:
-        with open(file=file_path, mode="r", encoding="cp932") as csvfile:
-            try:
-                # ファイルサイズが0バイトかチェック（空ファイルの判定）
-                if os.stat(path=file_path).st_size == 0:
-                    log_message(log_file=log_file, message=f"{file_path}: 空ファイルです。")
-                    return field_count, fieldnames, has_data, data_row_count
-            except OSError as e:
-                log_message(log_file=log_file, message=f"{file_path}: ファイル情報の取得に失敗しました: {e}")
-                return field_count, fieldnames, has_data, data_row_count
+        result: CountResult = count_values_in_stream(
+            csvfile=csvfile, file_path=name, log_file=log_file, options=options
+        )._replace(elapsed_seconds=time.perf_counter() - start_time)
+    except Exception as e:
+        log_message(log_file=log_file, message=f"{name}: エラーが発生しました: {e}")
+        result = CountResult(counts={}, fieldnames=[], has_data=False, data_row_count=0)
+    finally:
+        csvfile.detach()  # stream を閉じないように切り離す
+        messages: list[str] = drain_memory_log(log=log)
+        close_log(log_file=log_file)
+    return FileProfile(path=name, result=result, messages=messages)
 
-            try:
-                # 【フェーズ1】フィールド数の整合性チェック
-                # まず、フィールド数チェック用にCSVファイルを読み込む
-                csvfile.seek(0)  # ファイルの先頭に戻る
-                raw_reader = csv.reader(csvfile)
-                header_row: list[str] | None = next(raw_reader, None)
-                expected_field_count: int = len(header_row) if header_row else 0
-
-                # データ行のフィールド数をチェック
-                row_index: int
-                raw_row: list[str]
-                for row_index, raw_row in enumerate(raw_reader, start=2):  # 2行目から開始（1行目はヘッダ）
-                    actual_field_count: int = len(raw_row)
-                    # ヘッダ行とデータ行のフィールド数が異なる場合はエラーログ出力
-                    if actual_field_count != expected_field_count:
-                        log_message(
-                            log_file=log_file,
-                            message=f"{file_path}: 行 {row_index} のフィールド数エラー - 期待値: {expected_field_count}, 実際: {actual_field_count}",
-                        )
 
-                # 【フェーズ2】データ処理とカウント
-                # 次に、データ処理用にファイルを再読み込み
-                csvfile.seek(0)  # ファイルの先頭に戻る
-                reader: csv.DictReader[str] = csv.DictReader(f=csvfile)
-                fieldnames = list(reader.fieldnames) if reader.fieldnames else []
-
-                row: Dict[str, str]
-                for row in reader:
-                    data_row_count += 1  # 行数をカウント
-
-                    # 行に何らかのデータが存在するかチェック
-                    if any(row.values()):
-                        has_data = True
-                        # 各フィールドの値をチェックし、空でない場合はカウント
-                        field: str
-                        value: str
-                        for field, value in row.items():
-                            if value:  # 空文字列でない場合
-                                if field in field_count:
-                                    field_count[field] += 1
-                                else:
-                                    field_count[field] = 1
-            except csv.Error as e:
-                log_message(
-                    log_file=log_file, message=f"{file_path}: CSVファイルの読み込み中にエラーが発生しました: {e}"
-                )
-                return field_count, fieldnames, has_data, data_row_count
+def format_top_value(value: str) -> str:
+    """頻出値を1行で出力できるように整形する
 
-    except FileNotFoundError:
-        log_message(log_file=log_file, message=f"{file_path}: ファイルが見つかりません。")
-    except Exception as e:
-        log_message(log_file=log_file, message=f"{file_path}: エラーが発生しました: {e}")
+    Args:
+        value (str): フィールドの値
 
-    return field_count, fieldnames, has_data, data_row_count
+    Returns:
+        str: 改行・タブをエスケープし、TOP_VALUE_DISPLAY_LENGTH 文字を超える部分を省略した値
+    """
+    escaped: str = value.replace("\\", "\\\\").replace("\r", "\\r").replace("\n", "\\n").replace("\t", "\\t")
+    if len(escaped) > TOP_VALUE_DISPLAY_LENGTH:
+        return f"{escaped[:TOP_VALUE_DISPLAY_LENGTH]}…"
+    return escaped
 
 
 def write_counts_to_file(
@@ -188,6 +2336,13 @@ def write_counts_to_file(
     has_data: bool,
     data_row_count: int,
     log_file: str,
+    top_values: Dict[str, list[TopValue]] | None = None,
+    sample: SampleResult | None = None,
+    oversized_fields: list[OversizedField] | None = None,
+    null_patterns: NullPatternSummary | None = None,
+    field_types: Dict[str, FieldType] | None = None,
+    duplicates: DuplicateSummary | None = None,
+    group_counts: GroupSummary | None = None,
 ) -> None:
     """カウント結果を個別のテキストファイルに書き込む
 
@@ -202,6 +2357,14 @@ def write_counts_to_file(
         has_data (bool): データが存在するかのフラグ
         data_row_count (int): データ行数（ヘッダを除く）
         log_file (str): ログファイルのパス
+        top_values (Dict[str, list[TopValue]] | None): 各フィールド名と頻出値（出力しない場合は None）
+        sample (SampleResult | None): 抽出による推定結果（--sample N の場合のみ。counts と data_row_count は推定値）
+        oversized_fields (list[OversizedField] | None): 閾値を超えたため値を読み込まなかったフィールド
+            （--max-field-size の場合のみ）
+        null_patterns (NullPatternSummary | None): 行毎の空値パターン（--null-patterns N の場合のみ）
+        field_types (Dict[str, FieldType] | None): 各フィールド名と型の推定結果（--infer-types の場合のみ）
+        duplicates (DuplicateSummary | None): 重複の集計結果（--duplicates の場合のみ）
+        group_counts (GroupSummary | None): グループ毎の値の個数（--group-by の場合のみ）
 
     Returns:
         None
@@ -212,17 +2375,38 @@ def write_counts_to_file(
         Exception: その他の予期しないエラーが発生した場合
 
     Note:
-        - 出力ファイル名は "{base_name}.txt" 形式
+        - 出力ファイル名は "{base_name}.txt" 形式（sample を指定した場合は "{base_name}.sample.txt"）
+        - sample を指定した場合は、推定値であることと抽出方法・抽出したデータ行数を先頭に出力し、
+          各フィールドの行に充填率の推定値と信頼区間を出力する
         - ファイルエンコーディングはcp932を使用
         - フィールドはCSVのヘッダ順で出力される
+        - field_types を指定した場合は、各フィールドの行に推定した型と型に合わない値の個数を併記する
+        - top_values を指定した場合は、各フィールドの行の下に頻出値を出現回数の多い順に字下げして出力する
+          （出現回数は推定値。誤差がある場合は上限を併記する）
+        - group_counts を指定した場合は、各フィールドの結果の後にグループ毎のデータ行数と
+          各フィールドの値の個数・充填率を最初に現れたグループの順に出力する
+        - null_patterns を指定した場合は、各フィールドの結果の後に空値パターンを行数の多い順に
+          行数・データ行数に対する割合・値が空のフィールド名で出力する
+        - duplicates を指定した場合は、重複行の数と、重複する行の組を先頭の行番号の順に
+          行数・行番号（先頭の数件）・キー項目の値で出力する
+        - oversized_fields がある場合は、最後に行番号・列位置（1始まりと項目名）・バイト数を出力する
         - エラー発生時はログファイルに記録される
     """
-    output_file: str = f"{base_name}.txt"
+    output_file: str = f"{base_name}.sample.txt" if sample is not None else f"{base_name}.txt"
     try:
         with open(file=output_file, mode="w", encoding="cp932") as f:
             # ファイルヘッダー情報の出力
             f.write(f"処理対象のCSVファイル: {csv_file_name}\n")
-            f.write(f"データ行数: {data_row_count}\n\n")
+            if sample is None:
+                f.write(f"データ行数: {data_row_count}\n\n")
+            else:
+                f.write(
+                    f"【抽出による推定値】抽出方法: {SAMPLE_METHODS[sample.method]}, "
+                    f"抽出したデータ行数: {sample.sample_rows}\n"
+                )
+                f.write(
+                    f"データ行数（推定）: {'不明' if sample.estimated_row_count is None else data_row_count}\n\n"
+                )
 
             # データの有無によって出力内容を分岐
             if not has_data:
@@ -231,7 +2415,114 @@ def write_counts_to_file(
                 # 各フィールドのカウント結果をヘッダ順で出力
                 for field in fieldnames:
                     count: int = counts.get(field, 0)
-                    f.write(f"{field}: {count}\n")
+                    if sample is None:
+                        f.write(f"{field}: {count}")
+                        field_type: FieldType | None = (field_types or {}).get(field)
+                        if field_type is not None:
+                            f.write(f" (型: {TYPE_LABELS[field_type.type_name]}")
+                            if field_type.mismatch_count:
+                                f.write(f", 型に合わない値: {field_type.mismatch_count}")
+                            f.write(")")
+                        f.write("\n")
+                    else:
+                        estimate: FieldEstimate = sample.estimates[field]
+                        f.write(
+                            f"{field}: {count} (充填率 {estimate.fill_rate:.1%}, "
+                            f"{CONFIDENCE_LEVEL}信頼区間 {estimate.lower:.1%}～{estimate.upper:.1%})\n"
+                        )
+                    if top_values is not None:
+                        rank: int
+                        top_value: TopValue
+                        for rank, top_value in enumerate(top_values.get(field, []), start=1):
+                            f.write(f"    {rank}. {format_top_value(value=top_value.value)}: {top_value.count}")
+                            if top_value.error:
+                                f.write(f" (誤差 {top_value.error} 以内)")
+                            f.write("\n")
+
+                if group_counts is not None:
+                    # グループ項目の値毎のデータ行数と各フィールドの値の個数
+                    f.write(f"\nグループ別の値の個数（グループ項目: {', '.join(group_counts.group_fields)}）: ")
+                    if group_counts.missing_fields:
+                        f.write(
+                            f"グループ項目 {', '.join(group_counts.missing_fields)} がヘッダ行に無いため集計していません\n"
+                        )
+                    else:
+                        group_count: int = sum(1 for group in group_counts.groups if group.values is not None)
+                        f.write(f"{group_count} グループ\n")
+                    group_result: GroupCount
+                    for group_result in group_counts.groups:
+                        label: str = format_group_label(group_fields=group_counts.group_fields, group=group_result)
+                        f.write(f"  {format_top_value(value=label)}: {group_result.data_row_count} 行\n")
+                        for field in fieldnames:
+                            group_field_count: int = group_result.counts.get(field, 0)
+                            f.write(
+                                f"    {field}: {group_field_count} "
+                                f"({group_field_count / group_result.data_row_count:.1%})\n"
+                            )
+                    if group_counts.groups and group_counts.groups[-1].values is None:
+                        f.write(
+                            f"    ※ 異なるグループの数が上限 ({group_counts.capacity}) に達したため、"
+                            "以降に現れたグループは (その他) にまとめました\n"
+                        )
+
+                if null_patterns is not None:
+                    # 行毎の空値パターン（値が空のフィールドの組み合わせ）
+                    f.write(
+                        f"\n空値パターン（上位 {len(null_patterns.patterns)} 件 / "
+                        f"{null_patterns.distinct_count} 種類）:\n"
+                    )
+                    pattern: NullPattern
+                    for rank, pattern in enumerate(null_patterns.patterns, start=1):
+                        empty_fields: list[str] = empty_field_names(pattern=pattern, fieldnames=fieldnames)
+                        f.write(
+                            f"    {rank}. {pattern.row_count} 行 ({pattern.row_count / data_row_count:.1%}): "
+                            f"{', '.join(empty_fields) if empty_fields else '空のフィールドなし'}\n"
+                        )
+                    if null_patterns.uncounted_rows:
+                        f.write(
+                            f"    ※ 異なるパターンの数が上限 ({null_patterns.capacity}) に達したため、"
+                            f"{null_patterns.uncounted_rows} 行は集計していません\n"
+                        )
+
+                if duplicates is not None:
+                    # 行全体（またはキー項目の値）が重複する行
+                    target: str = f"キー: {', '.join(duplicates.key_fields)}" if duplicates.key_fields else "行全体"
+                    if duplicates.missing_fields:
+                        f.write(
+                            f"\n重複行（{target}）: キー項目 {', '.join(duplicates.missing_fields)} が"
+                            "ヘッダ行に無いため確認していません\n"
+                        )
+                    else:
+                        f.write(
+                            f"\n重複行（{target}）: {duplicates.duplicate_rows} 行"
+                            f"（{duplicates.duplicate_groups} 組）\n"
+                        )
+                    group: DuplicateGroup
+                    for rank, group in enumerate(duplicates.groups, start=1):
+                        row_indexes: str = ", ".join(map(str, group.row_indexes))
+                        if group.row_count > len(group.row_indexes):
+                            row_indexes += ", …"
+                        f.write(f"    {rank}. {group.row_count} 行: 行 {row_indexes}")
+                        if group.key:
+                            f.write(f" ({', '.join(format_top_value(value=value) for value in group.key)})")
+                        f.write("\n")
+                    if duplicates.spilled:
+                        f.write("    ※ メモリ使用量の上限を超えたため、一時ファイルに書き出して数えました\n")
+
+            if oversized_fields:
+                # 閾値を超えたフィールドの位置（値は読み込んでいないため長さだけを出力する）
+                f.write(f"\n巨大なフィールド（値を読み込まずに長さだけを計測）: {len(oversized_fields)} 個\n")
+                oversized_field: OversizedField
+                for oversized_field in oversized_fields:
+                    column_name: str = (
+                        fieldnames[oversized_field.column]
+                        if oversized_field.column < len(fieldnames)
+                        else "余剰フィールド"
+                    )
+                    f.write(
+                        f"    行 {oversized_field.row_index}, 列 {oversized_field.column + 1} ({column_name}): "
+                        f"{oversized_field.size:,} バイト\n"
+                    )
     except (OSError, IOError) as e:
         log_message(log_file=log_file, message=f"{output_file}: ファイル操作中にエラーが発生しました: {e}")
     except Exception as e:
@@ -244,6 +2535,10 @@ def write_summary_to_file(
     data_row_counts: Dict[str, int],
     log_file: str,
     summary_file: str,
+    field_stats_data: Dict[str, Dict[str, FieldStats]] | None = None,
+    sample_data: Dict[str, SampleResult] | None = None,
+    field_types_data: Dict[str, Dict[str, FieldType]] | None = None,
+    group_counts_data: Dict[str, GroupSummary] | None = None,
 ) -> None:
     """全てのカウント結果をまとめて1つのCSVファイルに書き込む
 
@@ -259,6 +2554,14 @@ def write_summary_to_file(
             キー: CSVファイル名, 値: データ行数（ヘッダを除く）
         log_file (str): ログファイルのパス
         summary_file (str): まとめた結果を出力するファイル名
+        field_stats_data (Dict[str, Dict[str, FieldStats]] | None): 各CSVファイルの項目毎の統計情報
+            キー: CSVファイル名, 値: フィールド名と統計情報の辞書（None の場合は統計情報の列を出力しない）
+        sample_data (Dict[str, SampleResult] | None): 各CSVファイルの抽出による推定結果（--sample N の場合のみ）
+            キー: CSVファイル名, 値: 推定結果（summary_data と data_row_counts は推定値）
+        field_types_data (Dict[str, Dict[str, FieldType]] | None): 各CSVファイルの項目毎の型の推定結果
+            キー: CSVファイル名, 値: フィールド名と型の推定結果の辞書（None の場合は型の列を出力しない）
+        group_counts_data (Dict[str, GroupSummary] | None): 各CSVファイルのグループ毎の値の個数
+            キー: CSVファイル名, 値: グループ毎の集計結果（None の場合はグループの列を出力しない）
 
     Returns:
         None
@@ -270,15 +2573,42 @@ def write_summary_to_file(
 
     Note:
         - 出力形式: "CSVファイル名,データ総行数,項目名,項目の値の個数"
+        - field_stats_data を指定した場合は、値の種類数（推定）・最小/最大/平均文字数・
+          空白のみの値の割合の列を追加する（統計情報が無い項目は空欄）
+        - sample_data を指定した場合は、抽出方法・抽出したデータ行数・充填率の推定値と信頼区間の列を追加する
+          （データ行数を推定できないファイルはデータ総行数を空欄とする）
+        - field_types_data を指定した場合は、推定した型と型に合わない値の個数の列を追加する
+        - group_counts_data を指定した場合は、最後にグループの列を追加し、各CSVファイルのフィールド毎の行
+          （グループの列は空欄）の後にグループ毎の行を出力する（データ総行数の列はグループのデータ行数、
+          他に追加した列は空欄）
         - ファイルエンコーディングはcp932を使用
+        - 一時ファイル（[統合結果ファイル名].tmp）に書き込んでから置き換える
         - フィールドはCSVのヘッダ順で出力される
         - ヘッダ行が自動的に追加される
         - エラー発生時はログファイルに記録される
     """
     try:
-        with open(file=summary_file, mode="w", encoding="cp932") as f:
+        # 一時ファイルに書き込んでから置き換える（書き込み途中の統合結果ファイルを他のプログラムに読み込ませない）
+        temporary_file: str = f"{summary_file}.tmp"
+        with open(file=temporary_file, mode="w", encoding="cp932") as f:
             # CSVヘッダー行の出力
-            f.write("CSVファイル名,CSVファイルデータ総行数,CSVファイルの項目名,CSVファイルの項目の値の個数\n")
+            f.write("CSVファイル名,CSVファイルデータ総行数,CSVファイルの項目名,CSVファイルの項目の値の個数")
+            if field_stats_data is not None:
+                f.write(
+                    ",CSVファイルの項目の値の種類数(推定),CSVファイルの項目の値の最小文字数,"
+                    "CSVファイルの項目の値の最大文字数,CSVファイルの項目の値の平均文字数,"
+                    "CSVファイルの項目の空白のみの値の割合"
+                )
+            if sample_data is not None:
+                f.write(
+                    f",抽出方法,抽出したデータ行数,CSVファイルの項目の値の充填率(推定),"
+                    f"充填率の{CONFIDENCE_LEVEL}信頼区間の下限,充填率の{CONFIDENCE_LEVEL}信頼区間の上限"
+                )
+            if field_types_data is not None:
+                f.write(",CSVファイルの項目の型(推定),CSVファイルの項目の型に合わない値の個数")
+            if group_counts_data is not None:
+                f.write(",CSVファイルのグループ(項目名=値)")
+            f.write("\n")
 
             # 各CSVファイルの結果を統合して出力
             base_name: str
@@ -286,25 +2616,1108 @@ def write_summary_to_file(
             for base_name, counts in summary_data.items():
                 fieldnames: list[str] = fieldnames_data.get(base_name, [])
                 data_row_count: int = data_row_counts.get(base_name, 0)
+                sample: SampleResult | None = sample_data.get(base_name) if sample_data is not None else None
+                data_row_count_text: str = (
+                    "" if sample is not None and sample.estimated_row_count is None else str(data_row_count)
+                )
 
                 # 各フィールドの結果を1行ずつ出力
                 field: str
                 for field in fieldnames:
                     count: int = counts.get(field, 0)
-                    f.write(f"{base_name},{data_row_count},{field},{count}\n")
+                    f.write(f"{base_name},{data_row_count_text},{field},{count}")
+                    if field_stats_data is not None:
+                        stats: FieldStats | None = (field_stats_data.get(base_name) or {}).get(field)
+                        if stats is None:
+                            f.write(",,,,,")
+                        else:
+                            f.write(
+                                f",{stats.distinct_count},{stats.min_length},{stats.max_length},"
+                                f"{stats.average_length:.2f},{stats.whitespace_ratio:.4f}"
+                            )
+                    if sample_data is not None:
+                        if sample is None:
+                            f.write(",,,,,")
+                        else:
+                            estimate: FieldEstimate = sample.estimates[field]
+                            f.write(
+                                f",{SAMPLE_METHODS[sample.method]},{sample.sample_rows},{estimate.fill_rate:.4f},"
+                                f"{estimate.lower:.4f},{estimate.upper:.4f}"
+                            )
+                    if field_types_data is not None:
+                        field_type: FieldType | None = (field_types_data.get(base_name) or {}).get(field)
+                        if field_type is None:
+                            f.write(",,")
+                        else:
+                            f.write(f",{TYPE_LABELS[field_type.type_name]},{field_type.mismatch_count}")
+                    if group_counts_data is not None:
+                        f.write(",")
+                    f.write("\n")
+
+                group_counts: GroupSummary | None = (
+                    group_counts_data.get(base_name) if group_counts_data is not None else None
+                )
+                if group_counts is None:
+                    continue
+                # グループ毎の結果を1行ずつ出力（値に区切り文字などを含むグループはダブルクォートで囲む）
+                empty_columns: str = (
+                    (",,,,," if field_stats_data is not None else "")
+                    + (",,,,," if sample_data is not None else "")
+                    + (",," if field_types_data is not None else "")
+                )
+                group: GroupCount
+                for group in group_counts.groups:
+                    label: str = format_group_label(group_fields=group_counts.group_fields, group=group)
+                    if any(character in label for character in ',"\r\n'):
+                        label = '"' + label.replace('"', '""') + '"'
+                    for field in fieldnames:
+                        f.write(
+                            f"{base_name},{group.data_row_count},{field},{group.counts.get(field, 0)}"
+                            f"{empty_columns},{label}\n"
+                        )
+        os.replace(temporary_file, summary_file)
     except (OSError, IOError) as e:
         log_message(log_file=log_file, message=f"{summary_file}: ファイル操作中にエラーが発生しました: {e}")
     except Exception as e:
         log_message(log_file=log_file, message=f"{summary_file}: 書き込み中にエラーが発生しました: {e}")
 
 
-def main() -> None:
+def plan_file_job(
+    item: DiscoveredFile,
+    manifest: Dict[str, ManifestEntry],
+    base_directory: str,
+    with_hash: bool,
+    require_stats: bool = False,
+    top_k: int = 0,
+    max_field_size: int = 0,
+    append: bool = False,
+    null_patterns: int = 0,
+    null_pattern_capacity: int = DEFAULT_NULL_PATTERN_CAPACITY,
+    require_types: bool = False,
+    duplicate_keys: Tuple[str, ...] | None = None,
+    group_fields: Tuple[str, ...] | None = None,
+    group_capacity: int = DEFAULT_GROUP_CAPACITY,
+    encoding: str = DEFAULT_ENCODING,
+) -> FileJob:
+    """検索で見つかったCSVファイルをマニフェストと比較し、前回の結果を再利用できるかを判定する
+
+    profile_csv_files の plan_file として、必要な引数を functools.partial で指定して渡します。
+
+    Args:
+        item (DiscoveredFile): 検索で見つかったCSVファイル
+        manifest (Dict[str, ManifestEntry]): 前回のマニフェスト（キー: base_directory からの相対パス）
+        base_directory (str): マニフェストのパスの基準となるディレクトリ
+        with_hash (bool): ファイル内容のハッシュで変更を判定するか
+        require_stats (bool): 統計情報が記録されていないファイルも変更ありとして扱うか
+        top_k (int): 頻出値を求める件数（0 より大きい場合、同じ件数の頻出値が記録されていないファイルも
+            変更ありとして扱う）
+        max_field_size (int): 値を読み込まずに長さだけを計測するフィールドの閾値（0 より大きい場合、
+            同じ閾値で閾値を超えたフィールドが記録されていないファイルも変更ありとして扱う）
+        append (bool): 追記されるCSVファイルを前回の続きからカウントするか（続きからカウントするための記録が
+            無い圧縮されていないファイルも変更ありとして扱い、変更されたファイルには前回の記録を渡す）
+        null_patterns (int): 空値パターンを求める件数（0 より大きい場合、同じ件数・上限の空値パターンが
+            記録されていないファイルも変更ありとして扱う）
+        null_pattern_capacity (int): 集計する異なる空値パターンの数の上限
+        require_types (bool): 型の推定結果が記録されていないファイルも変更ありとして扱うか
+        duplicate_keys (Tuple[str, ...] | None): 重複を確認するキー項目（None 以外の場合、同じキー項目の
+            重複の集計結果が記録されていないファイルも変更ありとして扱う）
+        group_fields (Tuple[str, ...] | None): グループ項目（None 以外の場合、同じグループ項目・上限の
+            グループ毎の集計結果が記録されていないファイルも変更ありとして扱う）
+        group_capacity (int): 集計する異なるグループの数の上限
+        encoding (str): ファイルの文字コード（前回と異なる文字コードで読み込んだファイルも変更ありとして扱う）
+
+    Returns:
+        FileJob: CSVファイルの処理内容（前回の結果を再利用できる場合は entry にマニフェストの記録を設定する）
+
+    Note:
+        - ファイルサイズと更新日時は検索時（os.scandir）に取得したものを使う
+        - zip アーカイブ内のファイルは、アーカイブに記録されている CRC-32 とサイズで変更を判定する
+        - ハッシュを計算できないファイルは signature を None とする（カウント時にエラーを記録する）
+    """
+    try:
+        signature: FileSignature | None = FileSignature(
+            size=item.size,
+            mtime_ns=item.mtime_ns,
+            content_hash=(
+                item.content_hash
+                if item.content_hash is not None
+                else hash_file(file_path=item.path) if with_hash else None
+            ),
+        )
+    except OSError:
+        return FileJob(path=item.path, size=item.size, signature=None, entry=None)
+    entry: ManifestEntry | None = manifest.get(os.path.relpath(item.path, base_directory))
+    append_state: AppendState | None = None
+    if append and entry is not None and not is_compressed_path(path=item.path):
+        # 閾値を超えたフィールドの記録は同じ閾値でカウントした場合だけ引き継げる
+        append_state = entry.append_state if entry.max_field_size == max_field_size else None
+    if (
+        entry is None
+        or entry.encoding != encoding
+        or (append and append_state is None and not is_compressed_path(path=item.path))
+        or (require_stats and entry.field_stats is None)
+        or (require_types and entry.field_types is None)
+        or (
+            duplicate_keys is not None
+            and (entry.duplicates is None or entry.duplicates.key_fields != list(duplicate_keys))
+        )
+        or (
+            group_fields is not None
+            and (
+                entry.group_counts is None
+                or entry.group_counts.group_fields != list(group_fields)
+                or entry.group_counts.capacity != group_capacity
+            )
+        )
+        or (top_k > 0 and (entry.top_k != top_k or entry.top_values is None))
+        or (max_field_size > 0 and (entry.max_field_size != max_field_size or entry.oversized_fields is None))
+        or (
+            null_patterns > 0
+            and (
+                entry.null_pattern_limit != null_patterns
+                or entry.null_patterns is None
+                or entry.null_patterns.capacity != null_pattern_capacity
+            )
+        )
+        or not is_unchanged(entry=entry, signature=signature)
+    ):
+        entry = None
+    return FileJob(
+        path=item.path,
+        size=item.size,
+        signature=signature,
+        entry=entry,
+        append_state=append_state if entry is None else None,
+    )
+
+
+class SummaryData(NamedTuple):
+    """統合結果ファイルに出力する全CSVファイルの結果（キー: CSVファイル名）"""
+
+    counts: Dict[str, Dict[str, int]]  # フィールド名とカウントの辞書
+    fieldnames: Dict[str, list[str]]  # フィールド名のリスト（ヘッダ順）
+    data_row_counts: Dict[str, int]  # データ行数（ヘッダを除く）
+    field_stats: Dict[str, Dict[str, FieldStats]]  # フィールド名と統計情報の辞書（--stats）
+    file_names: Dict[str, str]  # キー: CSVファイルのパス, 値: CSVファイル名
+    field_types: Dict[str, Dict[str, FieldType]]  # フィールド名と型の推定結果の辞書（--infer-types）
+    group_counts: Dict[str, GroupSummary]  # グループ毎の値の個数（--group-by）
+    entries: Dict[str, ManifestEntry]  # キー: CSVファイルのパス, 値: カウント結果（--store sqlite / parquet）
+
+    def add(self, path: str, entry: ManifestEntry) -> None:
+        """CSVファイルの結果を追加する（同じCSVファイル名の結果は上書きし、順序は最初に追加した位置のままにする）"""
+        csv_filename: str = display_name(path=path)
+        self.file_names[path] = csv_filename
+        self.counts[csv_filename] = entry.counts
+        self.fieldnames[csv_filename] = entry.fieldnames
+        self.data_row_counts[csv_filename] = entry.data_row_count
+        self.entries[path] = entry
+        if entry.field_stats is not None:
+            self.field_stats[csv_filename] = entry.field_stats
+        if entry.field_types is not None:
+            self.field_types[csv_filename] = entry.field_types
+        if entry.group_counts is not None:
+            self.group_counts[csv_filename] = entry.group_counts
+
+    def sort(self, key: Callable[[str], Any]) -> None:
+        """CSVファイルのパスの順に結果を追加し直す（--watch で、全体を検索し直した場合と同じ順序・内容にする）
+
+        Args:
+            key (Callable[[str], Any]): CSVファイルのパスから並べ替えのキーを返す関数（discovery_sort_key など）
+        """
+        entries: list[Tuple[str, ManifestEntry]] = sorted(self.entries.items(), key=lambda item: key(item[0]))
+        data: Dict[str, Any]
+        for data in self:  # 全ての辞書を空にする
+            data.clear()
+        path: str
+        entry: ManifestEntry
+        for path, entry in entries:
+            self.add(path=path, entry=entry)
+
+    def remove(self, path: str) -> None:
+        """削除されたCSVファイルの結果を取り除く（同じCSVファイル名の他のファイルがある場合は残す）"""
+        self.entries.pop(path, None)
+        csv_filename: str | None = self.file_names.pop(path, None)
+        if csv_filename is None or csv_filename in self.file_names.values():
+            return
+        self.counts.pop(csv_filename, None)
+        self.fieldnames.pop(csv_filename, None)
+        self.data_row_counts.pop(csv_filename, None)
+        self.field_stats.pop(csv_filename, None)
+        self.field_types.pop(csv_filename, None)
+        self.group_counts.pop(csv_filename, None)
+
+
+def write_file_profiles(
+    profiles: Iterable[FileProfile],
+    summary: SummaryData,
+    manifest_entries: Dict[str, ManifestEntry],
+    base_directory: str,
+    log_file: str,
+    options: CountOptions,
+    scan_start_ns: int,
+    metrics: RunMetrics,
+) -> None:
+    """CSVファイルの結果を検索順に受け取り、個別結果ファイルを出力する
+
+    Args:
+        profiles (Iterable[FileProfile]): profile_csv_files（または iter_file_profiles）の戻り値
+            （plan_file に plan_file_job を指定したもの）
+        summary (SummaryData): 統合結果ファイル用の結果の蓄積先
+        manifest_entries (Dict[str, ManifestEntry]): 次回の実行のために記録するマニフェストの蓄積先
+            （キー: base_directory からの相対パス）
+        base_directory (str): マニフェストのパスの基準となるディレクトリ
+        log_file (str): ログファイルのパス
+        options (CountOptions): カウント処理の設定
+        scan_start_ns (int): 検索を開始した時刻（ナノ秒、直前に更新されたファイルの判定に使う）
+        metrics (RunMetrics): 進捗と処理速度の集計先
+
+    Returns:
+        None
+
+    Note:
+        - 検索中のエラー（job が None）は iter_file_profiles がログに記録済みのため読み飛ばす
+        - カウントしたがマニフェストに記録しないファイルは、manifest_entries から前回の記録を取り除く
+          （--watch で同じ manifest_entries と比較し直す場合に、古い記録を再利用しない）
+    """
+    profile: FileProfile
+    for profile in profiles:
+        job: FileJob | None = profile.job
+        if job is None:
+            continue
+        result: CountResult | None = profile.result
+        csv_file: str = job.path
+        base_name: str = output_base_name(path=csv_file)  # 個別結果ファイルのパス（拡張子なし）
+        manifest_key: str = os.path.relpath(csv_file, base_directory)
+        entry: ManifestEntry | None = job.entry
+        if entry is not None and job.signature is not None:
+            # 前回の結果を再利用（個別結果ファイルが無い場合と、頻出値・巨大なフィールド・空値パターン・型・重複・
+            # グループ毎の集計の出力内容が変わった場合だけ作り直す）
+            result = CountResult(
+                counts=entry.counts,
+                fieldnames=entry.fieldnames,
+                has_data=entry.has_data,
+                data_row_count=entry.data_row_count,
+                field_stats=entry.field_stats,
+                top_values=entry.top_values if options.top_k > 0 else None,
+                oversized_fields=entry.oversized_fields if options.max_field_size > 0 else None,
+                null_patterns=entry.null_patterns if options.null_patterns > 0 else None,
+                field_types=entry.field_types if options.infer_types else None,
+                duplicates=entry.duplicates if options.duplicate_keys is not None else None,
+                group_counts=entry.group_counts if options.group_fields is not None else None,
+            )
+            if (
+                not os.path.exists(f"{base_name}.txt")
+                or entry.top_k != options.top_k
+                or entry.max_field_size != options.max_field_size
+                or entry.null_pattern_limit != options.null_patterns
+                or (entry.field_types is not None) != options.infer_types
+                or (entry.duplicates is not None) != (options.duplicate_keys is not None)
+                or (entry.group_counts is not None) != (options.group_fields is not None)
+            ):
+                write_counts_to_file(
+                    base_name=base_name,
+                    counts=result.counts,
+                    fieldnames=result.fieldnames,
+                    csv_file_name=display_name(path=csv_file),
+                    has_data=result.has_data,
+                    data_row_count=result.data_row_count,
+                    log_file=log_file,
+                    top_values=result.top_values,
+                    oversized_fields=result.oversized_fields,
+                    null_patterns=result.null_patterns,
+                    field_types=result.field_types,
+                    duplicates=result.duplicates,
+                    group_counts=result.group_counts,
+                )
+            entry = manifest_entries[manifest_key] = entry._replace(
+                signature=job.signature,
+                top_k=options.top_k,
+                top_values=result.top_values,
+                max_field_size=options.max_field_size,
+                oversized_fields=result.oversized_fields,
+                null_pattern_limit=options.null_patterns,
+                null_patterns=result.null_patterns,
+                field_types=result.field_types,
+                duplicates=result.duplicates,
+                group_counts=result.group_counts,
+            )
+            metrics.add_file(
+                metrics=FileMetrics(
+                    path=csv_file, size=job.size, rows=result.data_row_count, seconds=0.0, reused=True
+                )
+            )
+            log_message(log_file=log_file, message=f"{csv_file}: 前回の結果を再利用しました。")
+        elif result is not None:
+            # 個別結果ファイルの生成
+            write_counts_to_file(
+                base_name=base_name,
+                counts=result.counts,
+                fieldnames=result.fieldnames,
+                csv_file_name=display_name(path=csv_file),
+                has_data=result.has_data,
+                data_row_count=result.data_row_count,
+                log_file=log_file,
+                top_values=result.top_values,
+                oversized_fields=result.oversized_fields,
+                null_patterns=result.null_patterns,
+                field_types=result.field_types,
+                duplicates=result.duplicates,
+                group_counts=result.group_counts,
+            )
+            # ヘッダ行を読み込めなかったファイル（エラーを含む）は記録せず、次回もカウントする
+            # 走査開始の直前に更新されたファイルも記録しないが、続きからカウントするための記録がある場合は
+            # 更新日時を 0 として記録する（次回は変更ありとして扱い、ハッシュを確認して続きからカウントする）
+            # 統合結果の保存先（--store）には全てのファイルを記録する（走査開始の直前に更新されたファイルと
+            # ファイル情報を取得できなかったファイルは更新日時を 0 とし、次回も書き直す）
+            racy: bool = job.signature is not None and is_racy(signature=job.signature, scan_start_ns=scan_start_ns)
+            entry = ManifestEntry(
+                signature=(
+                    job.signature._replace(mtime_ns=0)
+                    if job.signature is not None and racy
+                    else job.signature or FileSignature(size=job.size, mtime_ns=0)
+                ),
+                counts=result.counts,
+                fieldnames=result.fieldnames,
+                has_data=result.has_data,
+                data_row_count=result.data_row_count,
+                field_stats=result.field_stats,
+                top_k=options.top_k,
+                top_values=result.top_values,
+                max_field_size=options.max_field_size,
+                oversized_fields=result.oversized_fields,
+                append_state=result.append_state,
+                null_pattern_limit=options.null_patterns,
+                null_patterns=result.null_patterns,
+                field_types=result.field_types,
+                duplicates=result.duplicates,
+                group_counts=result.group_counts,
+                encoding=options.encoding,
+            )
+            if job.signature is not None and result.fieldnames and (not racy or result.append_state is not None):
+                manifest_entries[manifest_key] = entry
+            else:
+                manifest_entries.pop(manifest_key, None)
+            file_metrics: FileMetrics = FileMetrics(
+                path=csv_file,
+                size=job.size,
+                rows=result.data_row_count,
+                seconds=result.elapsed_seconds,
+                reused=False,
+            )
+            metrics.add_file(metrics=file_metrics)
+            log_message(
+                log_file=log_file,
+                message=(
+                    f"{csv_file}: 処理が完了しました。（{file_metrics.size:,} バイト, {file_metrics.rows:,} 行, "
+                    f"{file_metrics.seconds:.2f} 秒, {file_metrics.rows_per_sec:,.0f} 行/秒）"
+                ),
+            )
+        else:
+            continue
+
+        if metrics.processed_files == 1:
+            log_message(
+                log_file=log_file,
+                message=f"最初のCSVファイルの結果を出力するまでの時間: {metrics.first_result_seconds:.2f} 秒",
+            )
+        metrics.report_progress()
+
+        # 統合ファイル用にデータを蓄積
+        summary.add(path=csv_file, entry=entry)
+
+
+def process_sampled_files(
+    discovered: Iterable[DiscoveredFile | DiscoveryError],
+    log_file: str,
+    summary_file: str,
+    field_size_limit: int,
+    sample_size: int,
+    seed: int,
+    options: CountOptions,
+    metrics: RunMetrics,
+) -> None:
+    """検索で見つかったCSVファイルを順に抽出して充填率を推定し、個別結果と統合結果を出力する（--sample N）
+
+    Args:
+        discovered (Iterable[DiscoveredFile | DiscoveryError]): iter_csv_roots の戻り値
+        log_file (str): ログファイルのパス
+        summary_file (str): 推定結果をまとめて出力するファイル名
+        field_size_limit (int): CSVフィールドサイズの制限値（バイト）
+        sample_size (int): 1ファイルあたりに抽出するレコード数
+        seed (int): 乱数シード
+        options (CountOptions): 小さなファイルを全件カウントする場合のカウント処理の設定
+        metrics (RunMetrics): 進捗と処理速度の集計先
+
+    Returns:
+        None
+
+    Note:
+        - 推定結果は全件カウントの結果を上書きしないよう、別の名前のファイル（.sample.txt）に出力する
+        - マニフェストは読み込みも更新もしない（推定結果は再利用しない）
+        - ファイルは検索順に1件ずつ処理する（1ファイルの読み込み量が少ないため並列処理しない）
+    """
+    summary_data: Dict[str, Dict[str, int]] = {}
+    fieldnames_data: Dict[str, list[str]] = {}
+    data_row_counts: Dict[str, int] = {}
+    sample_data: Dict[str, SampleResult] = {}
+
+    item: DiscoveredFile | DiscoveryError
+    for item in discovered:
+        if isinstance(item, DiscoveryError):
+            log_message(log_file=log_file, message=f"{item.path}: 検索中にエラーが発生しました: {item.message}")
+            continue
+        csv_file: str = item.path
+        start_time: float = time.perf_counter()
+        sample: SampleResult = sample_values_in_csv(
+            file_path=csv_file,
+            log_file=log_file,
+            field_size_limit=field_size_limit,
+            sample_size=sample_size,
+            seed=seed,
+            options=options,
+        )
+        counts: Dict[str, int] = sample.estimated_counts()
+        data_row_count: int = sample.estimated_row_count or 0
+        csv_filename: str = display_name(path=csv_file)
+        write_counts_to_file(
+            base_name=output_base_name(path=csv_file),
+            counts=counts,
+            fieldnames=sample.fieldnames,
+            csv_file_name=csv_filename,
+            has_data=sample.sample_rows > 0,
+            data_row_count=data_row_count,
+            log_file=log_file,
+            sample=sample,
+        )
+        metrics.add_file(
+            metrics=FileMetrics(
+                path=csv_file,
+                size=item.size,
+                rows=sample.sample_rows,
+                seconds=time.perf_counter() - start_time,
+                reused=False,
+            )
+        )
+        log_message(
+            log_file=log_file,
+            message=(
+                f"{csv_file}: 抽出による推定が完了しました。（{SAMPLE_METHODS[sample.method]}, "
+                f"{sample.sample_rows:,} 行）"
+            ),
+        )
+        metrics.report_progress()
+
+        summary_data[csv_filename] = counts
+        fieldnames_data[csv_filename] = sample.fieldnames
+        data_row_counts[csv_filename] = data_row_count
+        sample_data[csv_filename] = sample
+
+    if not metrics.processed_files:
+        return
+    write_summary_to_file(
+        summary_data=summary_data,
+        fieldnames_data=fieldnames_data,
+        data_row_counts=data_row_counts,
+        log_file=log_file,
+        summary_file=summary_file,
+        sample_data=sample_data,
+    )
+
+
+def write_count_outputs(
+    summary: SummaryData,
+    manifest_entries: Dict[str, ManifestEntry],
+    log_file: str,
+    summary_file: str,
+    manifest_file: str,
+    metrics_file: str,
+    options: CountOptions,
+    metrics: RunMetrics,
+    settings: Dict[str, Any],
+    store: str = "text",
+    metrics_history: list[Dict[str, Any]] | None = None,
+) -> None:
+    """統合結果ファイル・マニフェスト・計測結果ファイルを書き込み、処理時間をログに記録する
+
+    Args:
+        summary (SummaryData): 全CSVファイルの結果
+        manifest_entries (Dict[str, ManifestEntry]): 次回の実行のために記録するマニフェスト
+        log_file (str): ログファイルのパス
+        summary_file (str): 統合結果ファイルのパス
+        manifest_file (str): マニフェストファイルのパス
+        metrics_file (str): 計測結果ファイルのパス
+        options (CountOptions): カウント処理の設定
+        metrics (RunMetrics): 処理速度の集計結果
+        settings (Dict[str, Any]): 計測結果に記録する実行時の設定
+        store (str): 統合結果の保存形式（STORE_FORMATS のいずれか）
+        metrics_history (list[Dict[str, Any]] | None): これまでの計測結果（--watch の場合。
+            RunMetrics.write を参照）
+
+    Returns:
+        None
+
+    Note:
+        - store が "sqlite" / "parquet" の場合は、統合結果ファイルの代わりに
+          [統合結果ファイル名（.txt を除く）].db / .files.parquet, .fields.parquet に保存する
+          （csv_summary_store を参照。SQLite は前回から変更されたファイルだけを書き直す）
+    """
+    if store == "text":
+        # 全CSVファイルの結果を統合したファイルを生成
+        write_summary_to_file(
+            summary_data=summary.counts,
+            fieldnames_data=summary.fieldnames,
+            data_row_counts=summary.data_row_counts,
+            log_file=log_file,
+            summary_file=summary_file,
+            field_stats_data=summary.field_stats if options.collect_stats else None,
+            field_types_data=summary.field_types if options.infer_types else None,
+            group_counts_data=summary.group_counts if options.group_fields is not None else None,
+        )
+    else:
+        # 全CSVファイルの結果を検索可能な形式で保存
+        store_prefix: str = os.path.splitext(summary_file)[0]
+        store_file: str = f"{store_prefix}.db" if store == "sqlite" else f"{store_prefix}.*.parquet"
+        try:
+            update: StoreUpdate = (
+                write_sqlite_summary(
+                    database_file=store_file, entries=summary.entries, settings=settings, started_at=metrics.started_at
+                )
+                if store == "sqlite"
+                else write_parquet_summary(
+                    prefix=store_prefix, entries=summary.entries, settings=settings, started_at=metrics.started_at
+                )
+            )
+            log_message(
+                log_file=log_file,
+                message=(
+                    f"{store_file}: 統合結果を保存しました。（ファイル数: {update.file_count}, "
+                    f"書き込み: {update.updated_files}, 削除: {update.removed_files}）"
+                ),
+            )
+        except (OSError, sqlite3.Error) as e:
+            log_message(log_file=log_file, message=f"{store_file}: 統合結果の保存中にエラーが発生しました: {e}")
+
+    # 次回の実行のためにマニフェストを保存（今回見つからなかったファイルは取り除かれる）
+    try:
+        save_manifest(manifest_file=manifest_file, entries=manifest_entries)
+    except OSError as e:
+        log_message(log_file=log_file, message=f"{manifest_file}: マニフェストの保存中にエラーが発生しました: {e}")
+
+    # 処理速度と処理時間の長いファイルを書き込む
+    try:
+        metrics.write(metrics_file=metrics_file, settings=settings, history=metrics_history)
+    except OSError as e:
+        log_message(log_file=log_file, message=f"{metrics_file}: 計測結果の保存中にエラーが発生しました: {e}")
+
+    wall_seconds: float = metrics.elapsed()
+    log_message(
+        log_file=log_file,
+        message=(
+            f"処理時間: {wall_seconds:.2f} 秒（カウントしたファイル: {metrics.counted_files}, "
+            f"{metrics.counted_bytes / (1024 * 1024):,.1f} MB, {metrics.counted_rows:,} 行, "
+            f"{metrics.counted_rows / wall_seconds if wall_seconds > 0 else 0:,.0f} 行/秒）"
+        ),
+    )
+
+
+def watch_csv_files(
+    watcher: ChangeWatcher,
+    summary: SummaryData,
+    manifest_entries: Dict[str, ManifestEntry],
+    base_directory: str,
+    log_file: str,
+    summary_file: str,
+    manifest_file: str,
+    metrics_file: str,
+    field_size_limit: int,
+    options: CountOptions,
+    settings: Dict[str, Any],
+    include: list[str],
+    exclude: list[str],
+    max_depth: int | None,
+    with_hash: bool,
+    workers: int,
+    chunk_size: int,
+    quiet_seconds: float,
+    progress_stream: TextIO | None,
+    store: str = "text",
+    metrics_history: list[Dict[str, Any]] | None = None,
+) -> None:
+    """CSVファイルの作成・変更・削除を監視し、変更されたファイルだけをカウントして統合結果ファイルを書き直す（--watch）
+
+    Args:
+        watcher (ChangeWatcher): 開始済みの監視（終了時に閉じる）
+        summary (SummaryData): 初回の実行までの全CSVファイルの結果（監視中に更新する）
+        manifest_entries (Dict[str, ManifestEntry]): 初回の実行までのマニフェスト（監視中に更新する）
+        base_directory (str): 監視の起点となるディレクトリ（マニフェストのパスの基準）
+        log_file (str): ログファイルのパス
+        summary_file (str): 統合結果ファイルのパス
+        manifest_file (str): マニフェストファイルのパス
+        metrics_file (str): 計測結果ファイルのパス
+        field_size_limit (int): CSVフィールドサイズの制限値（バイト）
+        options (CountOptions): カウント処理の設定
+        settings (Dict[str, Any]): 計測結果に記録する実行時の設定
+        include (list[str]): 検索対象とするファイルのパターン
+        exclude (list[str]): 除外するファイル・ディレクトリのパターン
+        max_depth (int | None): 検索するサブディレクトリの深さ（None: 制限なし）
+        with_hash (bool): ファイル内容のハッシュで変更を判定するか
+        workers (int): ワーカープロセス数（1以下の場合は親プロセスで順次処理）
+        chunk_size (int): 大きなファイルを分割する場合の1範囲あたりの目安のバイト数
+        quiet_seconds (float): 最後の変更からカウントを始めるまでの待機時間（秒）
+        progress_stream (TextIO | None): 進捗を表示するストリーム（None の場合は表示しない）
+        store (str): 統合結果の保存形式（STORE_FORMATS のいずれか）
+        metrics_history (list[Dict[str, Any]] | None): 初回の実行の計測結果（None の場合は空のリストから始める。
+            変更をカウントする毎に計測結果を追加し、計測結果ファイルを書き直す）
+
+    Returns:
+        None（Ctrl+C で中断されるまで監視を続ける）
+
+    Note:
+        - 変更されたファイルは、書き込みが終わるよう最後の変更から quiet_seconds 秒待ってからカウントする
+        - 変更を通知されたファイルもマニフェストと比較し、内容が変わっていなければ前回の結果を再利用する
+        - 削除されたファイルは統合結果ファイルとマニフェストから取り除く（個別結果ファイルは残す）
+        - 統合結果ファイルは検索順（discovery_sort_key）に並べ直して書き込む
+          （新しいファイルも、全体をカウントし直した場合と同じ位置に出力する）
+        - 計測結果ファイルには初回の実行の計測結果に加えて、変更をカウントする毎の計測結果を記録する
+        - 統合結果ファイルとマニフェストは一時ファイルに書き込んでから置き換える
+          （監視中に他のプログラムが読み込んでも、書き込み途中の内容を読み込まない）
+        - ログは変更をカウントする毎に書き出す
+    """
+    log_message(
+        log_file=log_file,
+        message=f"CSVファイルの変更の監視を開始しました。（{watcher.method}, 待機時間: {quiet_seconds:g} 秒）",
+    )
+    close_log(log_file=log_file)
+    if metrics_history is None:
+        metrics_history = []
+    try:
+        while True:
+            changed_paths: list[str] = watcher.wait_for_changes(quiet_seconds=quiet_seconds)
+            error: DiscoveryError
+            for error in watcher.errors:
+                log_message(log_file=log_file, message=f"{error.path}: 監視中にエラーが発生しました: {error.message}")
+            watcher.errors.clear()
+
+            scan_start_ns: int = time.time_ns()
+            metrics: RunMetrics = RunMetrics(progress_stream=progress_stream)
+            found: set[str] = set()  # 変更されたパスの下で見つかったCSVファイル
+
+            def record_found(
+                items: Iterable[DiscoveredFile | DiscoveryError],
+            ) -> Iterator[DiscoveredFile | DiscoveryError]:
+                item: DiscoveredFile | DiscoveryError
+                for item in items:
+                    if isinstance(item, DiscoveredFile):
+                        found.add(item.path)
+                    yield item
+
+            write_file_profiles(
+                profiles=iter_file_profiles(
+                    discovered=metrics.iter_discovered(
+                        items=record_found(
+                            items=iter_changed_files(
+                                top=base_directory,
+                                paths=changed_paths,
+                                include=include,
+                                exclude=exclude,
+                                max_depth=max_depth,
+                            )
+                        )
+                    ),
+                    log_file=log_file,
+                    field_size_limit=field_size_limit,
+                    workers=workers,
+                    chunk_size=chunk_size,
+                    options=options,
+                    plan_file=partial(
+                        plan_file_job,
+                        manifest=manifest_entries,
+                        base_directory=base_directory,
+                        with_hash=with_hash,
+                        require_stats=options.collect_stats,
+                        top_k=options.top_k,
+                        max_field_size=options.max_field_size,
+                        append=options.append,
+                        null_patterns=options.null_patterns,
+                        null_pattern_capacity=options.null_pattern_capacity,
+                        require_types=options.infer_types,
+                        duplicate_keys=options.duplicate_keys,
+                        group_fields=options.group_fields,
+                        group_capacity=options.group_capacity,
+                        encoding=options.encoding,
+                    ),
+                ),
+                summary=summary,
+                manifest_entries=manifest_entries,
+                base_directory=base_directory,
+                log_file=log_file,
+                options=options,
+                scan_start_ns=scan_start_ns,
+                metrics=metrics,
+            )
+
+            # 変更されたパスの下で見つからなかったファイル（削除・移動されたファイル）の結果を取り除く
+            removed_files: int = 0
+            path: str
+            for path in list(summary.file_names):
+                if path in found or not any(is_under(path=path, directory=changed) for changed in changed_paths):
+                    continue
+                summary.remove(path=path)
+                manifest_entries.pop(os.path.relpath(path, base_directory), None)
+                removed_files += 1
+                log_message(log_file=log_file, message=f"{path}: 削除されたため統合結果から取り除きました。")
+
+            if metrics.processed_files or removed_files:
+                metrics.finish_progress()
+                log_message(
+                    log_file=log_file,
+                    message=(
+                        f"変更されたCSVファイル数: {metrics.processed_files}"
+                        f"（うち内容が変わっていないファイル: {metrics.processed_files - metrics.counted_files}）, "
+                        f"削除されたCSVファイル数: {removed_files}"
+                    ),
+                )
+                summary.sort(key=lambda path: discovery_sort_key(path=path, top=base_directory))
+                write_count_outputs(
+                    summary=summary,
+                    manifest_entries=manifest_entries,
+                    log_file=log_file,
+                    summary_file=summary_file,
+                    manifest_file=manifest_file,
+                    metrics_file=metrics_file,
+                    options=options,
+                    metrics=metrics,
+                    settings=settings,
+                    store=store,
+                    metrics_history=metrics_history,
+                )
+            close_log(log_file=log_file)
+    finally:
+        watcher.close()
+        log_message(log_file=log_file, message="CSVファイルの変更の監視を終了しました。")
+
+
+def parse_arguments(argv: list[str] | None = None) -> argparse.Namespace:
+    """コマンドライン引数を解析する
+
+    Args:
+        argv (list[str] | None): コマンドライン引数（None の場合は sys.argv を使用）
+
+    Returns:
+        argparse.Namespace: 解析結果
+    """
+    parser = argparse.ArgumentParser(description="CSVファイルのフィールド値カウントツール")
+    parser.add_argument(
+        "roots",
+        nargs="*",
+        metavar="PATH",
+        help=(
+            "検索の起点とするディレクトリまたはCSVファイル（複数指定可、既定値: カレントディレクトリ）。"
+            "ファイルは --include に関わらず処理する"
+        ),
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        metavar="N",
+        help="CSVファイルを並列処理するプロセス数（0: CPUコア数, 既定値: 1 = 順次処理）",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE // (1024 * 1024),
+        metavar="MB",
+        help="並列処理時に1つのCSVファイルを分割する目安のサイズ（MB、既定値: %(default)s）",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=ENGINES,
+        default="python",
+        help=(
+            "カウント方式（python: csv.reader でテキストとして読み込む, bytes: デコードせずにバイト列を走査する,"
+            " arrow: pyarrow の列指向CSVリーダーで読み込む）"
+        ),
+    )
+    parser.add_argument(
+        "--encoding",
+        default=DEFAULT_ENCODING,
+        help=(
+            "CSVファイルの文字エンコーディング（utf-8 など ASCII と互換のもの、既定値: %(default)s。"
+            "iso-2022-jp などは --engine python で先頭から読み込み、--max-field-size とは同時に使えない）"
+        ),
+    )
+    parser.add_argument(
+        "--output-dir",
+        default=None,
+        metavar="DIR",
+        help=(
+            "統合結果ファイル・ログファイル・マニフェスト・計測結果を作成するディレクトリ"
+            "（既定値: カレントディレクトリ。個別結果ファイルは各CSVファイルと同じディレクトリに作成する）"
+        ),
+    )
+    parser.add_argument(
+        "--store",
+        choices=STORE_FORMATS,
+        default="text",
+        help=(
+            "統合結果の保存形式（text: count_CSV_FieldValue.txt, sqlite: count_CSV_FieldValue.db に変更された"
+            "ファイルだけを書き込む, parquet: count_CSV_FieldValue.files.parquet と .fields.parquet、"
+            "pyarrow が必要。既定値: %(default)s）"
+        ),
+    )
+    parser.add_argument(
+        "--error-samples",
+        type=int,
+        default=DEFAULT_ERROR_SAMPLE_LIMIT,
+        metavar="N",
+        help="フィールド数エラーの行番号をログに記録する件数（ファイル毎、既定値: %(default)s）",
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="項目毎の値の種類数（推定）・文字数・空白のみの値の割合を集計し、統合結果ファイルに列を追加する",
+    )
+    parser.add_argument(
+        "--top-k",
+        type=int,
+        default=0,
+        metavar="K",
+        help="項目毎に出現回数の多い値を K 件求め、個別結果ファイルに出力する（既定値: 0 = 求めない）",
+    )
+    parser.add_argument(
+        "--infer-types",
+        action="store_true",
+        help=(
+            "項目毎に値の型（整数・小数・日付・日時・真偽値・文字列）を推定し、型に合わない値の個数と一緒に"
+            "個別結果ファイルと統合結果ファイルに出力する"
+        ),
+    )
+    parser.add_argument(
+        "--max-field-size",
+        type=int,
+        default=0,
+        metavar="MB",
+        help=(
+            "これを超えるフィールドは値を読み込まずに長さだけを計測し、行番号・列位置を個別結果ファイルに出力する"
+            "（MB、壊れたファイルの巨大なフィールドでメモリを使い切らないようにする。既定値: 0 = 制限しない）"
+        ),
+    )
+    parser.add_argument(
+        "--append",
+        action="store_true",
+        help=(
+            "追記されるCSVファイルは、前回カウントした位置までの内容が変わっていなければ追記された部分だけをカウントする"
+            "（変わっていればファイル全体をカウントし直す。--stats, --top-k, --null-patterns, --infer-types,"
+            " --duplicates とは同時に使えない）"
+        ),
+    )
+    parser.add_argument(
+        "--null-patterns",
+        type=int,
+        default=0,
+        metavar="N",
+        help=(
+            "データ行毎に値が空のフィールドの組み合わせ（空値パターン）を数え、行数の多い N 件を"
+            "個別結果ファイルに出力する（既定値: 0 = 求めない）"
+        ),
+    )
+    parser.add_argument(
+        "--null-pattern-cap",
+        type=int,
+        default=DEFAULT_NULL_PATTERN_CAPACITY,
+        metavar="M",
+        help=(
+            "ファイル毎に集計する異なる空値パターンの数の上限（超えた後に現れたパターンの行は数えずに行数だけを"
+            "出力する。既定値: %(default)s）"
+        ),
+    )
+    parser.add_argument(
+        "--duplicates",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="KEYS",
+        help=(
+            "行全体が重複するデータ行（KEYS にカンマ区切りで項目名を指定した場合はそれらの値の組み合わせが重複する行）を"
+            "数え、重複する行数と行番号の例を個別結果ファイルに出力する"
+        ),
+    )
+    parser.add_argument(
+        "--duplicate-memory",
+        type=int,
+        default=DEFAULT_DUPLICATE_MEMORY // (1024 * 1024),
+        metavar="MB",
+        help=(
+            "--duplicates で使うメモリ使用量の上限（MB、プロセス毎。超える分はハッシュで振り分けた一時ファイルに"
+            "書き出して数える。既定値: %(default)s）"
+        ),
+    )
+    parser.add_argument(
+        "--group-by",
+        default=None,
+        metavar="FIELDS",
+        help=(
+            "カンマ区切りで指定した項目（読み込み日・連携元システムなど）の値毎にデータ行数と各項目の値の個数を数え、"
+            "個別結果ファイルと統合結果ファイル（グループの列を追加）に出力する"
+        ),
+    )
+    parser.add_argument(
+        "--group-capacity",
+        type=int,
+        default=DEFAULT_GROUP_CAPACITY,
+        metavar="N",
+        help=(
+            "--group-by で集計する異なるグループの数の上限（超えた後に現れたグループは (その他) にまとめる、"
+            "既定値: %(default)s）"
+        ),
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help=(
+            "カウントした後も終了せず、CSVファイルの作成・変更・削除を監視して変更されたファイルだけをカウントし、"
+            "統合結果ファイルを書き直す（Ctrl+C で終了）"
+        ),
+    )
+    parser.add_argument(
+        "--watch-quiet",
+        type=float,
+        default=DEFAULT_QUIET_SECONDS,
+        metavar="SEC",
+        help="--watch で、最後の変更からカウントを始めるまでの待機時間（秒、既定値: %(default)s）",
+    )
+    parser.add_argument(
+        "--watch-poll",
+        type=float,
+        default=None,
+        metavar="SEC",
+        help=(
+            "--watch で、inotify を使わずに SEC 秒間隔のポーリングで変更を確認する（ネットワークドライブ向け。"
+            f"既定値: inotify を使えなければ {DEFAULT_POLL_INTERVAL:g} 秒間隔のポーリング）"
+        ),
+    )
+    parser.add_argument(
+        "--sample",
+        type=int,
+        default=0,
+        metavar="N",
+        help=(
+            "ファイル全体を読み込まず、無作為な位置から N 件のレコードを抽出して充填率を推定する"
+            "（結果は [CSVファイル名].sample.txt と count_CSV_FieldValue.sample.txt に出力、既定値: 0 = 全件カウント）"
+        ),
+    )
+    parser.add_argument(
+        "--sample-seed",
+        type=int,
+        default=DEFAULT_SAMPLE_SEED,
+        metavar="SEED",
+        help="--sample でレコードを抽出する位置の乱数シード（既定値: %(default)s）",
+    )
+    parser.add_argument(
+        "--include",
+        action="append",
+        metavar="PATTERN",
+        help=(
+            "処理対象とするCSVファイルの glob パターン（複数指定可、既定値: *.csv *.csv.gz *.csv.bz2 *.csv.xz *.zip）。"
+            "/ を含むパターンは検索の起点からの相対パスと比較する"
+        ),
+    )
+    parser.add_argument(
+        "--exclude",
+        action="append",
+        default=[],
+        metavar="PATTERN",
+        help="除外するファイル・ディレクトリの glob パターン（複数指定可、一致するディレクトリの下は検索しない）",
+    )
+    parser.add_argument(
+        "--max-depth",
+        type=int,
+        default=None,
+        metavar="N",
+        help="検索するサブディレクトリの深さ（0: 検索の起点の直下のみ, 既定値: 制限なし）",
+    )
+    parser.add_argument(
+        "--no-progress",
+        action="store_true",
+        help="標準エラー出力に進捗（処理速度と残り時間の目安）を表示しない",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="前回のカウント結果（マニフェスト）を使わずに全てのCSVファイルをカウントする",
+    )
+    parser.add_argument(
+        "--hash",
+        action="store_true",
+        help="ファイルサイズと更新日時ではなく、ファイル内容のハッシュで変更を判定する",
+    )
+    parser.add_argument(
+        "-v",
+        "--verbose",
+        action="store_true",
+        help="フィールド数エラーを1行ずつログに記録する",
+    )
+    args = parser.parse_args(args=argv)
+    if args.workers < 0:
+        parser.error("--workers には0以上の値を指定してください。")
+    if args.chunk_size <= 0:
+        parser.error("--chunk-size には1以上の値を指定してください。")
+    if args.error_samples < 0:
+        parser.error("--error-samples には0以上の値を指定してください。")
+    if args.top_k < 0:
+        parser.error("--top-k には0以上の値を指定してください。")
+    if args.max_field_size < 0:
+        parser.error("--max-field-size には0以上の値を指定してください。")
+    if args.null_patterns < 0:
+        parser.error("--null-patterns には0以上の値を指定してください。")
+    if args.null_pattern_cap <= 0:
+        parser.error("--null-pattern-cap には1以上の値を指定してください。")
+    if args.duplicate_memory <= 0:
+        parser.error("--duplicate-memory には1以上の値を指定してください。")
+    if args.group_by is not None and not args.group_by.strip(", "):
+        parser.error("--group-by には項目名を指定してください。")
+    if args.group_capacity <= 0:
+        parser.error("--group-capacity には1以上の値を指定してください。")
+    if args.sample < 0:
+        parser.error("--sample には0以上の値を指定してください。")
+    if args.watch_quiet < 0:
+        parser.error("--watch-quiet には0以上の値を指定してください。")
+    if args.watch_poll is not None and args.watch_poll <= 0:
+        parser.error("--watch-poll には0より大きい値を指定してください。")
+    if args.watch and args.sample > 0:
+        parser.error("--watch と --sample は同時に指定できません。")
+    if args.max_depth is not None and args.max_depth < 0:
+        parser.error("--max-depth には0以上の値を指定してください。")
+    try:
+        validate_encoding(encoding=args.encoding, max_field_size=args.max_field_size)
+    except ValueError as e:
+        parser.error(f"--encoding: {e}")
+    if args.output_dir is not None and not os.path.isdir(args.output_dir):
+        parser.error(f"--output-dir: ディレクトリが見つかりません: {args.output_dir}")
+    if not args.roots:
+        args.roots = [os.getcwd()]
+    if args.watch and (len(args.roots) != 1 or not os.path.isdir(args.roots[0])):
+        parser.error("--watch の場合は検索の起点として1つのディレクトリを指定してください。")
+    if not args.include:
+        args.include = list(DEFAULT_INCLUDE_PATTERNS)
+    args.chunk_size *= 1024 * 1024
+    args.max_field_size *= 1024 * 1024
+    if args.workers == 0:
+        args.workers = os.cpu_count() or 1
+    return args
+
+
+def main(argv: list[str] | None = None) -> None:
     """メイン処理を実行する
 
-    カレントディレクトリとサブディレクトリからCSVファイルを検索し、
+    検索の起点（既定値: カレントディレクトリ）とサブディレクトリからCSVファイルを検索し、
     各ファイルのフィールド値カウントを実行します。結果は個別ファイルと
     統合ファイルの両方に出力されます。
 
+    Args:
+        argv (list[str] | None): コマンドライン引数（None の場合は sys.argv を使用）
+
     Returns:
         None
 
@@ -313,86 +3726,340 @@ def main() -> None:
         Exception: その他の予期しないエラー
 
     Note:
-        - 処理対象: カレントディレクトリ以下の全ての.csvファイル
+        - 処理対象: 検索の起点以下の全ての.csvファイル、圧縮されたCSVファイル（.csv.gz, .csv.bz2, .csv.xz）、
+          zip アーカイブ内の.csvファイル（アーカイブ内のファイル毎に1つのCSVファイルとして集計する）
+          （--include / --exclude でパターンを、--max-depth で検索する深さを指定できる）
+        - CSVファイルの検索はバックグラウンドで行い、検索の完了を待たずに見つかった順にカウントする
+          （最初の結果を出力するまでの時間と全体の処理時間をログに記録する）
+        - ファイル毎の読み込みバイト数・データ行数・処理時間・処理速度をログに記録し、
+          標準エラー出力に進捗と残り時間の目安を表示する（--no-progress で非表示）
+        - 処理速度と処理時間の長いファイルを計測結果ファイル（スクリプト名.metrics.json）に書き込む
         - 出力ファイル: 各CSVファイルに対応する.txtファイル + 統合.txtファイル
         - ログファイル: スクリプト名.log
+          （統合結果ファイル・ログファイル・マニフェスト・計測結果は --output-dir に作成する）
         - フィールドサイズ制限: 1 GB
+        - 文字エンコーディング: --encoding（既定値: cp932、ASCII と互換のもののみ）
+        - --store sqlite / parquet を指定すると、統合結果ファイルの代わりに SQLite データベース / Parquet ファイルに
+          ファイル・項目毎の表として保存する（SQLite は前回から変更されたファイルだけを書き直す）
+        - 検索とカウントは profile_csv_files（ファイルを書き込まないライブラリ関数）で行い、main() はその結果から
+          出力ファイルを書き込む（--watch の変更毎のカウントも同じ iter_file_profiles を使う）
+        - --workers N を指定するとCSVファイルをN個のプロセスで並列処理する
+          （出力ファイルとログの順序は順次処理と同じ）
+        - 並列処理時、--chunk-size を超えるCSVファイルはレコード境界で分割して並列にカウントする
+        - フィールド数エラーはファイル毎に集計してログに記録する（--verbose で1行ずつ記録）
+        - ログファイルは実行中開いたままにしてバッファリングし、終了時にまとめて書き出す
+        - マニフェストと比較して変更されていないCSVファイルは前回のカウント結果を再利用する
+          （--force で全てカウント、--hash でファイル内容のハッシュにより判定）
+        - マニフェストには今回見つかったCSVファイルだけを記録する（削除されたファイルは取り除かれる）
+        - --stats を指定すると項目毎の統計情報を集計し、統合結果ファイルに列を追加する
+        - --top-k K を指定すると項目毎の頻出値を K 件求め、個別結果ファイルに出力する
+        - --infer-types を指定すると項目毎の値の型と型に合わない値の個数を求め、
+          個別結果ファイルと統合結果ファイルに出力する
+        - --max-field-size MB を指定すると、それを超えるフィールドは値を読み込まずに長さだけを計測し、
+          行番号・列位置・バイト数を個別結果ファイルに出力する（メモリ使用量がフィールドの大きさに依存しない）
+        - --null-patterns N を指定すると、データ行毎の空値パターン（値が空のフィールドの組み合わせ）を数え、
+          行数の多い N 件を個別結果ファイルに出力する（異なるパターンは --null-pattern-cap 個まで集計する）
+        - --duplicates [KEYS] を指定すると、行全体（またはキー項目の値）が重複するデータ行を数え、
+          重複する行数と行番号の例を個別結果ファイルに出力する（--duplicate-memory MB を超える分は一時ファイルで数える）
+        - --group-by FIELDS を指定すると、グループ項目の値毎にデータ行数と各項目の値の個数を数え、個別結果ファイルと
+          統合結果ファイルに出力する（異なるグループは --group-capacity 個まで、それ以降は (その他) にまとめる）
+        - --append を指定すると、最後の完結したレコードまでのカウント結果とその範囲のハッシュをマニフェストに記録し、
+          次回はハッシュが一致すれば追記された部分だけをカウントする（一致しなければファイル全体をカウントし直す）
+        - --watch を指定するとカウントした後も終了せず、最後の変更から --watch-quiet 秒変更されなかった
+          CSVファイルだけをカウントし、統合結果ファイル・マニフェストを一時ファイル経由で書き直す
+        - --sample N を指定すると各CSVファイルから N 件のレコードを抽出して充填率を推定し、
+          信頼区間と一緒に .sample.txt の個別結果ファイルと統合結果ファイルに出力する（マニフェストは使わない）
         - エラー発生時は適切なログ記録と終了処理を実行
     """
-    current_directory: str = os.getcwd()
-    csv_files: list[str] = []
-    log_file: str = os.path.splitext(p=os.path.basename(p=__file__))[0] + ".log"
-    field_size_limit: int = 1024 * 1024 * 1024  # 1 GB
+    args: argparse.Namespace = parse_arguments(argv=argv)
+    options: CountOptions = CountOptions(
+        error_sample_limit=args.error_samples,
+        verbose=args.verbose,
+        engine=args.engine,
+        collect_stats=args.stats,
+        top_k=args.top_k,
+        max_field_size=args.max_field_size,
+        append=args.append,
+        null_patterns=args.null_patterns,
+        null_pattern_capacity=args.null_pattern_cap,
+        infer_types=args.infer_types,
+        duplicate_keys=(
+            tuple(field.strip() for field in args.duplicates.split(",") if field.strip())
+            if args.duplicates is not None
+            else None
+        ),
+        duplicate_memory=args.duplicate_memory * 1024 * 1024,
+        group_fields=(
+            tuple(field.strip() for field in args.group_by.split(",") if field.strip())
+            if args.group_by is not None
+            else None
+        ),
+        group_capacity=args.group_capacity,
+        encoding=args.encoding,
+    )
+    # 検索の起点が1つのディレクトリの場合はそのディレクトリを、それ以外はカレントディレクトリを
+    # マニフェストのパスの基準とする
+    base_directory: str = (
+        args.roots[0] if len(args.roots) == 1 and os.path.isdir(args.roots[0]) else os.getcwd()
+    )
+    output_prefix: str = os.path.join(args.output_dir or "", os.path.splitext(p=os.path.basename(p=__file__))[0])
+    log_file: str = output_prefix + ".log"
+    manifest_file: str = output_prefix + ".manifest.json"
+    metrics_file: str = output_prefix + ".metrics.json"
+    field_size_limit: int = DEFAULT_FIELD_SIZE_LIMIT
+    scan_start_ns: int = time.time_ns()
+    metrics: RunMetrics = RunMetrics(progress_stream=None if args.no_progress else sys.stderr)
 
     # ログファイルを新規作成してプログラム開始ログを記録
     log_message(log_file=log_file, message="プログラム実行を開始しました。", create_new=True)
-
-    # カレントディレクトリ以下のすべてのCSVファイルを検索
-    dirpath: str
-    filenames: list[str]
-    filename: str
-    for dirpath, _, filenames in os.walk(top=current_directory):
-        for filename in filenames:
-            if filename.endswith(".csv"):
-                csv_files.append(os.path.join(dirpath, filename))
-
-    # CSVファイルが見つからない場合は処理終了
-    if not csv_files:
-        log_message(log_file=log_file, message="処理対象のCSVファイルが見つかりません。")
-        return
-
-    log_message(log_file=log_file, message=f"処理対象のCSVファイル数: {len(csv_files)}")
-
-    # 処理結果を保存するための辞書を初期化
-    summary_data: Dict[str, Dict[str, int]] = {}  # 全てのカウント結果を保持する辞書
-    fieldnames_data: Dict[str, list[str]] = {}  # 全てのフィールド名を保持する辞書
-    data_row_counts: Dict[str, int] = {}  # 全てのデータ行数を保持する辞書
-    summary_file: str = (
-        os.path.splitext(os.path.basename(p=__file__))[0] + ".txt"
-    )  # スクリプトのベース名に .txt を付けたファイル名
-
-    # 各CSVファイルを順次処理
-    csv_file: str
-    for csv_file in csv_files:
-        # CSVファイルの解析とカウント処理
-        counts: Dict[str, int]
-        fieldnames: list[str]
-        has_data: bool
-        data_row_count: int
-        counts, fieldnames, has_data, data_row_count = count_values_in_csv(
-            file_path=csv_file, log_file=log_file, field_size_limit=field_size_limit
+    if options.engine == "arrow" and csv_arrow_engine is None:
+        log_message(log_file=log_file, message="pyarrow がインストールされていないため --engine python で処理します。")
+        options = options._replace(engine="python")
+    uses_values: bool = (
+        options.collect_stats
+        or options.top_k > 0
+        or options.null_patterns > 0
+        or options.infer_types
+        or options.duplicate_keys is not None
+        or options.group_fields is not None
+    )
+    if args.store == "parquet" and not PARQUET_AVAILABLE:
+        log_message(log_file=log_file, message="pyarrow がインストールされていないため統合結果をテキストで出力します。")
+        args.store = "text"
+    if args.sample > 0 and args.store != "text":
+        log_message(log_file=log_file, message="--sample を指定したため統合結果をテキストで出力します。")
+    if args.sample > 0 and uses_values:
+        log_message(
+            log_file=log_file,
+            message=(
+                "--sample を指定したため --stats, --top-k, --null-patterns, --infer-types, --duplicates と"
+                " --group-by は使いません。"
+            ),
+        )
+        options = options._replace(
+            collect_stats=False, top_k=0, null_patterns=0, infer_types=False, duplicate_keys=None, group_fields=None
+        )
+    if options.append and uses_values:
+        log_message(
+            log_file=log_file,
+            message=(
+                "--stats, --top-k, --null-patterns, --infer-types, --duplicates または --group-by を指定したため"
+                " --append は使わずにファイル全体をカウントします。"
+            ),
+        )
+        options = options._replace(append=False)
+    if not options.byte_safe and (options.engine != "python" or options.append or args.workers > 1):
+        log_message(
+            log_file=log_file,
+            message=(
+                f"--encoding {options.encoding} は区切り文字をバイト列のまま検出できないため、--engine python で"
+                "先頭から読み込みます（ファイルの分割と --append は使いません）。"
+            ),
+        )
+        options = options._replace(engine="python", append=False)
+    if options.engine != options.counting_engine:
+        log_message(
+            log_file=log_file,
+            message=(
+                "--stats, --top-k, --infer-types, --duplicates, --group-by, --max-field-size または --null-patterns を"
+                "指定したため --engine python で処理します。"
+            ),
         )
 
-        # 個別結果ファイルの生成
-        base_name: str = os.path.splitext(p=csv_file)[0]  # 拡張子を除いたファイル名
-        write_counts_to_file(
-            base_name=base_name,
-            counts=counts,
-            fieldnames=fieldnames,
-            csv_file_name=os.path.basename(p=csv_file),
-            has_data=has_data,
-            data_row_count=data_row_count,
+    if args.sample > 0:
+        # 抽出による充填率の推定（マニフェストは使わず、結果は全件カウントとは別のファイルに出力する）
+        process_sampled_files(
+            discovered=iter_in_background(
+                items=metrics.iter_discovered(
+                    items=iter_csv_roots(
+                        roots=args.roots, include=args.include, exclude=args.exclude, max_depth=args.max_depth
+                    )
+                )
+            ),
             log_file=log_file,
+            summary_file=output_prefix + ".sample.txt",
+            field_size_limit=field_size_limit,
+            sample_size=args.sample,
+            seed=args.sample_seed,
+            options=options,
+            metrics=metrics,
         )
-        log_message(log_file=log_file, message=f"{csv_file}: 処理が完了しました。")
+        if not metrics.processed_files:
+            log_message(log_file=log_file, message="処理対象のCSVファイルが見つかりません。")
+            close_log(log_file=log_file)
+            return
+        metrics.finish_progress()
+        log_message(log_file=log_file, message=f"処理対象のCSVファイル数: {metrics.processed_files}")
+        try:
+            metrics.write(
+                metrics_file=metrics_file,
+                settings={
+                    "engine": options.counting_engine,
+                    "encoding": options.encoding,
+                    "sample": args.sample,
+                    "sample_seed": args.sample_seed,
+                },
+            )
+        except OSError as e:
+            log_message(log_file=log_file, message=f"{metrics_file}: 計測結果の保存中にエラーが発生しました: {e}")
+        log_message(log_file=log_file, message=f"処理時間: {metrics.elapsed():.2f} 秒")
+        log_message(log_file=log_file, message="プログラム実行が正常に完了しました。")
+        close_log(log_file=log_file)
+        return
 
-        # 統合ファイル用にデータを蓄積
-        csv_filename: str = os.path.basename(p=csv_file)
-        summary_data[csv_filename] = counts
-        fieldnames_data[csv_filename] = fieldnames
-        data_row_counts[csv_filename] = data_row_count
+    # 前回のマニフェストを読み込む
+    manifest: Dict[str, ManifestEntry] = {}
+    if not args.force:
+        try:
+            manifest = load_manifest(manifest_file=manifest_file)
+        except (OSError, ValueError) as e:
+            log_message(
+                log_file=log_file,
+                message=f"{manifest_file}: マニフェストを読み込めないため全てのCSVファイルをカウントします: {e}",
+            )
+    new_manifest: Dict[str, ManifestEntry] = {}
 
-    # 全CSVファイルの結果を統合したファイルを生成
-    write_summary_to_file(
-        summary_data=summary_data,
-        fieldnames_data=fieldnames_data,
-        data_row_counts=data_row_counts,
+    # 処理結果を保存するための辞書を初期化（キー: CSVファイル名）
+    summary: SummaryData = SummaryData(
+        counts={},
+        fieldnames={},
+        data_row_counts={},
+        field_stats={},
+        file_names={},
+        field_types={},
+        group_counts={},
+        entries={},
+    )
+    summary_file: str = output_prefix + ".txt"  # スクリプトのベース名に .txt を付けたファイル名
+    settings: Dict[str, Any] = {
+        "engine": options.counting_engine,
+        "encoding": options.encoding,
+        "workers": args.workers,
+        "chunk_size": args.chunk_size,
+        "max_field_size": options.max_field_size,
+        "append": options.append,
+        "null_patterns": options.null_patterns,
+        "infer_types": options.infer_types,
+        "duplicate_keys": list(options.duplicate_keys) if options.duplicate_keys is not None else None,
+        "group_fields": list(options.group_fields) if options.group_fields is not None else None,
+        "watch": args.watch,
+        "store": args.store,
+    }
+
+    # --watch の場合は、初回のカウント中の変更も見落とさないよう検索を始める前に監視を開始する
+    watcher: ChangeWatcher | None = None
+    metrics_history: list[Dict[str, Any]] | None = [] if args.watch else None  # 初回と変更毎の計測結果
+    if args.watch:
+        watcher = create_watcher(
+            top=base_directory,
+            include=args.include,
+            exclude=args.exclude,
+            max_depth=args.max_depth,
+            poll_interval=args.watch_poll,
+        )
+
+    # 検索の起点以下のCSVファイルをバックグラウンドで検索しながら、見つかった順にカウント
+    # （変更されていないCSVファイルは前回の結果を再利用し、並列実行時もファイルの検索順に結果を受け取る）
+    # 各CSVファイルの結果から個別結果ファイルを出力
+    write_file_profiles(
+        profiles=profile_csv_files(
+            roots=args.roots,
+            include=args.include,
+            exclude=args.exclude,
+            max_depth=args.max_depth,
+            encoding=options.encoding,
+            workers=args.workers,
+            engine=options.engine,
+            options=options,
+            chunk_size=args.chunk_size,
+            field_size_limit=field_size_limit,
+            plan_file=partial(
+                plan_file_job,
+                manifest=manifest,
+                base_directory=base_directory,
+                with_hash=args.hash,
+                require_stats=options.collect_stats,
+                top_k=options.top_k,
+                max_field_size=options.max_field_size,
+                append=options.append,
+                null_patterns=options.null_patterns,
+                null_pattern_capacity=options.null_pattern_capacity,
+                require_types=options.infer_types,
+                duplicate_keys=options.duplicate_keys,
+                group_fields=options.group_fields,
+                group_capacity=options.group_capacity,
+                encoding=options.encoding,
+            ),
+            log_file=log_file,
+            on_discovered=metrics.iter_discovered,
+        ),
+        summary=summary,
+        manifest_entries=new_manifest,
+        base_directory=base_directory,
         log_file=log_file,
-        summary_file=summary_file,
+        options=options,
+        scan_start_ns=scan_start_ns,
+        metrics=metrics,
     )
 
+    # CSVファイルが見つからない場合は処理終了（--watch の場合は作成されるまで監視する）
+    if not metrics.processed_files:
+        log_message(log_file=log_file, message="処理対象のCSVファイルが見つかりません。")
+        if watcher is None:
+            close_log(log_file=log_file)
+            return
+    else:
+        metrics.finish_progress()
+        log_message(log_file=log_file, message=f"処理対象のCSVファイル数: {metrics.processed_files}")
+        if metrics.counted_files < metrics.processed_files:
+            log_message(
+                log_file=log_file,
+                message=f"前回の結果を再利用したCSVファイル数: {metrics.processed_files - metrics.counted_files}",
+            )
+
+        # 全CSVファイルの結果を統合したファイル・マニフェスト・計測結果を書き込む
+        write_count_outputs(
+            summary=summary,
+            manifest_entries=new_manifest,
+            log_file=log_file,
+            summary_file=summary_file,
+            manifest_file=manifest_file,
+            metrics_file=metrics_file,
+            options=options,
+            metrics=metrics,
+            settings=settings,
+            store=args.store,
+            metrics_history=metrics_history,
+        )
+
+    if watcher is not None:
+        watch_csv_files(
+            watcher=watcher,
+            summary=summary,
+            manifest_entries=new_manifest,
+            base_directory=base_directory,
+            log_file=log_file,
+            summary_file=summary_file,
+            manifest_file=manifest_file,
+            metrics_file=metrics_file,
+            field_size_limit=field_size_limit,
+            options=options,
+            settings=settings,
+            include=args.include,
+            exclude=args.exclude,
+            max_depth=args.max_depth,
+            with_hash=args.hash,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+            quiet_seconds=args.watch_quiet,
+            progress_stream=None if args.no_progress else sys.stderr,
+            store=args.store,
+            metrics_history=metrics_history,
+        )
+
     # プログラム終了ログを記録
     log_message(log_file=log_file, message="プログラム実行が正常に完了しました。")
+    close_log(log_file=log_file)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,255 @@
+"""
+巨大なフィールドを文字列にせずに読み込むCSVリーダー（--max-field-size MB）
+
+csv.reader はフィールドの値を文字列として組み立て、テキストファイルも改行までの1行を
+まとめて読み込むため、壊れたファイルに数 GB のフィールドが1つあるだけで、
+値が空かどうかを知るために同じ大きさのメモリを確保してしまいます。
+
+このリーダーはバイナリストリームをブロック単位で読み込み、
+- 閾値以下のレコードはまとめてデコードして csv.reader で読み込み（通常と同じ速さ・結果）
+- 閾値を超えるレコードはバイト列のまま走査し、各フィールドが空かどうかと長さ（バイト数）だけを求める
+ことで、フィールドの大きさに関わらずメモリ使用量を「閾値 + ブロックサイズ」程度に抑えます。
+
+レコード境界の判定:
+- クォートを含まない範囲は最後の改行をレコードの終わりとする
+- クォートを含む範囲は csv.reader（既定の dialect）と同じ規則でレコードに一致する正規表現で、
+  読み込んだブロックのうち完結しているレコードの終わりを求める
+  （フィールドの先頭の " だけがクォートの開始。クォートの外側の " は通常の文字）
+- 正規表現の各選択肢は互いに排他的なため、バックトラックで誤った境界に一致することはない
+- cp932 の2バイト文字の2バイト目は " (0x22), カンマ (0x2C), CR (0x0D), LF (0x0A) と一致しないため、
+  デコードせずにバイト列のまま判定できる
+
+Note:
+    - 閾値を超えるレコードのフィールドは、値の一部もデコードしない（cp932 として不正なバイト列も検出しない）
+    - フィールドの長さは、囲みのクォートを除き "" を1バイトとして数えたバイト数
+"""
+
+import csv
+import io
+import re
+from typing import IO, Iterator, NamedTuple, Tuple
+
+BOUNDED_READ_BLOCK_SIZE: int = 1024 * 1024  # 1回に読み込むバイト数の上限（1 MB、閾値の方が小さい場合は閾値）
+
+# csv.reader と同じ規則の1フィールド（クォートで囲まれたフィールド / 囲まれていないフィールド / 空）
+#   クォートを閉じた直後に続く文字は " 以外（"" はクォート内の " として扱う）
+_FIELD: bytes = rb'(?:"[^"]*(?:""[^"]*)*"(?:[^,\r\n"][^,\r\n]*)?|[^,\r\n"][^,\r\n]*|)'
+_RECORD: bytes = rb"%s(?:,%s)*(?:\r\n|\r|\n)" % (_FIELD, _FIELD)
+_RECORDS_PATTERN: re.Pattern[bytes] = re.compile(rb"(?:%s)*" % _RECORD)  # 先頭から続く完結したレコード
+_UNQUOTED_END_PATTERN: re.Pattern[bytes] = re.compile(rb"[,\r\n]")  # クォートの外側のフィールドの終わり
+
+# 巨大なレコードを走査する際の状態（csv モジュールの状態遷移と同じ）
+_START_FIELD: int = 0  # フィールドの先頭
+_IN_FIELD: int = 1  # クォートで囲まれていないフィールドの途中
+_IN_QUOTED_FIELD: int = 2  # クォートで囲まれたフィールドの途中
+_QUOTE_IN_QUOTED_FIELD: int = 3  # クォートで囲まれたフィールドの中の " の直後
+_EAT_CRNL: int = 4  # レコード末尾の CR の直後（続く LF を読み飛ばす）
+
+
+class OversizedField(NamedTuple):
+    """閾値を超えたため値を読み込まずに長さだけを計測したフィールド"""
+
+    row_index: int  # 行番号（ヘッダ行を1行目としたレコード番号。フィールド数エラーの行番号と同じ数え方）
+    column: int  # 列位置（0始まり）
+    size: int  # 値のバイト数
+
+
+class LargeRecord(NamedTuple):
+    """閾値を超えるため値を読み込まずに走査したレコード"""
+
+    field_count: int  # フィールド数
+    filled_columns: list[int]  # 値が空でない列位置（column_limit 未満のもののみ）
+    oversized_fields: list[Tuple[int, int]]  # 閾値を超えるフィールドの (列位置, バイト数)
+
+
+class _LargeRecordScanner:
+    """1レコードをバイト列のまま走査し、フィールド毎に空かどうかと長さを求める"""
+
+    def __init__(self, max_field_size: int, column_limit: int | None) -> None:
+        self._max_field_size: int = max_field_size
+        self._column_limit: int | None = column_limit
+        self._state: int = _START_FIELD
+        self._field_size: int = 0
+        self.field_count: int = 0
+        self.filled_columns: list[int] = []
+        self.oversized_fields: list[Tuple[int, int]] = []
+
+    def _end_field(self) -> None:
+        if self._field_size > 0 and (self._column_limit is None or self.field_count < self._column_limit):
+            self.filled_columns.append(self.field_count)
+        if self._field_size > self._max_field_size:
+            self.oversized_fields.append((self.field_count, self._field_size))
+        self.field_count += 1
+        self._field_size = 0
+        self._state = _START_FIELD
+
+    def feed(self, data: bytes, start: int, at_eof: bool) -> int | None:
+        """レコードの続きのバイト列を走査する
+
+        Args:
+            data (bytes): 読み込んだバイト列
+            start (int): data 内の走査開始位置
+            at_eof (bool): data がストリームの末尾まで含むか
+
+        Returns:
+            int | None: レコードが終わった場合は次のレコードの開始位置、data の末尾まで続く場合は None
+        """
+        position: int = start
+        size: int = len(data)
+        while True:
+            if position >= size:
+                if not at_eof:
+                    return None
+                if self._state != _EAT_CRNL:
+                    self._end_field()
+                return size
+            state: int = self._state
+            byte: int = data[position]
+            if state == _EAT_CRNL:
+                return position + 1 if byte == 0x0A else position
+            if state == _IN_QUOTED_FIELD:
+                # 次の " までは全てフィールドの値
+                quote: int = data.find(b'"', position)
+                if quote < 0:
+                    self._field_size += size - position
+                    position = size
+                else:
+                    self._field_size += quote - position
+                    position = quote + 1
+                    self._state = _QUOTE_IN_QUOTED_FIELD
+            elif byte == 0x22 and state == _START_FIELD:
+                self._state = _IN_QUOTED_FIELD
+                position += 1
+            elif byte == 0x22 and state == _QUOTE_IN_QUOTED_FIELD:
+                self._field_size += 1  # "" はクォート内の " 1文字
+                self._state = _IN_QUOTED_FIELD
+                position += 1
+            elif byte == 0x2C:
+                self._end_field()
+                position += 1
+            elif byte == 0x0D or byte == 0x0A:
+                if state != _START_FIELD or self.field_count > 0:
+                    self._end_field()  # 空行（改行だけのレコード）はフィールド数 0
+                position += 1
+                if byte == 0x0A:
+                    return position
+                self._state = _EAT_CRNL
+            else:
+                # クォートの外側の値（クォートを閉じた後に続く文字を含む）は区切り文字まで読み飛ばす
+                self._state = _IN_FIELD
+                end: re.Match[bytes] | None = _UNQUOTED_END_PATTERN.search(data, position)
+                next_position: int = end.start() if end is not None else size
+                self._field_size += next_position - position
+                position = next_position
+
+    def result(self) -> LargeRecord:
+        return LargeRecord(
+            field_count=self.field_count, filled_columns=self.filled_columns, oversized_fields=self.oversized_fields
+        )
+
+
+class BoundedCsvReader:
+    """メモリ使用量を閾値 + ブロックサイズ程度に抑えてCSVを読み込むリーダー
+
+    イテレートすると、閾値以下のレコードをまとめた csv.reader（行のイテレータ）と、
+    閾値を超えるレコードの LargeRecord をファイルの先頭から順に返します。
+    行のイテレータは次の要素を取り出す前に読み終える必要があります。
+    """
+
+    def __init__(
+        self,
+        stream: IO[bytes],
+        max_field_size: int,
+        column_limit: int | None = None,
+        block_size: int = BOUNDED_READ_BLOCK_SIZE,
+        encoding: str = "cp932",
+    ) -> None:
+        """
+        Args:
+            stream (IO[bytes]): CSVファイルのバイナリストリーム（レコードの先頭から読み込む）
+            max_field_size (int): 値を読み込まずに長さだけを計測するレコード・フィールドの閾値（バイト）
+            column_limit (int | None): LargeRecord に値が空でない列位置を記録する列数（ヘッダ行のフィールド数）
+                read_header() でヘッダ行を読み込んだ場合はそのフィールド数になる
+            block_size (int): 1回に読み込むバイト数の上限
+            encoding (str): 閾値以下のレコードをデコードする文字エンコーディング
+        """
+        self._stream: IO[bytes] = stream
+        self._max_field_size: int = max_field_size
+        self._block_size: int = max(1, min(block_size, max_field_size))
+        self.column_limit: int | None = column_limit
+        self._encoding: str = encoding
+        self._items: Iterator[Iterator[list[str]] | LargeRecord] = self._iter_items()
+        self._first_rows: Iterator[list[str]] | None = None
+
+    def read_header(self) -> list[str] | None:
+        """先頭のレコードをヘッダ行として読み込み、column_limit をそのフィールド数にする
+
+        Returns:
+            list[str] | None: ヘッダ行のフィールド名リスト（ストリームが空の場合は None）
+
+        Raises:
+            csv.Error: ヘッダ行が閾値を超える場合
+        """
+        item: Iterator[list[str]] | LargeRecord | None = next(self._items, None)
+        if item is None:
+            return None
+        if isinstance(item, LargeRecord):
+            raise csv.Error(f"ヘッダ行が {self._max_field_size} バイトを超えています")
+        header: list[str] = list(next(item, None) or [])
+        self._first_rows = item
+        self.column_limit = len(header)
+        return header
+
+    def __iter__(self) -> Iterator[Iterator[list[str]] | LargeRecord]:
+        if self._first_rows is not None:
+            rows, self._first_rows = self._first_rows, None
+            yield rows
+        yield from self._items
+
+    def _iter_items(self) -> Iterator[Iterator[list[str]] | LargeRecord]:
+        buffer: bytes = b""  # レコードの先頭から始まる未処理のバイト列
+        at_eof: bool = False
+        while True:
+            # 未処理のバイト列が閾値を超える間は読み込まない（バッファは閾値 + ブロックサイズ以下）
+            if not at_eof and len(buffer) <= self._max_field_size:
+                block: bytes = self._stream.read(self._block_size)
+                at_eof = not block
+                buffer = buffer + block if buffer else block
+            if not buffer:
+                return
+
+            # 先頭から閾値までに完結しているレコードの終わりを求める（いずれのレコードも閾値以下になる）
+            # CRLF の間で区切ると LF が空行になるため、CR の直後が LF か未読の場合は CR の手前までを判定する
+            limit: int = min(len(buffer), self._max_field_size)
+            if buffer[limit - 1] == 0x0D and (
+                buffer[limit : limit + 1] == b"\n" or (limit == len(buffer) and not at_eof)
+            ):
+                limit -= 1
+            end: int
+            if buffer.find(b'"', 0, limit) < 0:
+                # クォートを含まない場合は最後の改行がレコードの終わり
+                end = max(buffer.rfind(b"\n", 0, limit), buffer.rfind(b"\r", 0, limit)) + 1
+            else:
+                end = _RECORDS_PATTERN.match(buffer, 0, limit).end()  # type: ignore[union-attr]
+            if at_eof and end < len(buffer) and len(buffer) <= self._max_field_size:
+                end = len(buffer)  # 改行の無い最後のレコード（閉じていないクォートを含む）
+
+            if end == 0:
+                if len(buffer) <= self._max_field_size:
+                    continue  # 先頭のレコードの続きを読み込む
+                # 先頭のレコードが閾値を超える（完結していないものを含む）ため値を読み込まずに走査する
+                scanner: _LargeRecordScanner = _LargeRecordScanner(
+                    max_field_size=self._max_field_size, column_limit=self.column_limit
+                )
+                next_start: int | None = scanner.feed(data=buffer, start=0, at_eof=at_eof)
+                while next_start is None:
+                    buffer = self._stream.read(self._block_size)
+                    at_eof = not buffer
+                    next_start = scanner.feed(data=buffer, start=0, at_eof=at_eof)
+                buffer = buffer[next_start:]
+                yield scanner.result()
+                continue
+
+            text: io.TextIOWrapper = io.TextIOWrapper(io.BytesIO(buffer[:end]), encoding=self._encoding)
+            buffer = buffer[end:]
+            yield csv.reader(text)
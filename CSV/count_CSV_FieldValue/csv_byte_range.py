@@ -0,0 +1,245 @@
+"""
+CSVファイルをレコード境界で分割するためのバイト範囲ユーティリティ
+
+巨大なCSVファイルを複数プロセスで並列にカウントするため、ファイルを
+レコード（行）の区切りで終わるバイト範囲に分割し、各範囲をテキストとして
+読み込む機能を提供します。
+
+境界の判定:
+- 改行（\\n）の位置までに現れたダブルクォート（"）の個数が偶数であれば、
+  その改行はクォートで囲まれたフィールドの外側にあり、レコードの区切りとなる
+- cp932 の2バイト文字の2バイト目は 0x40～0xFC の範囲のため、
+  " (0x22), カンマ (0x2C), CR (0x0D), LF (0x0A) と一致することはない
+  したがってバイト単位で判定しても、マルチバイト文字の途中で分割されることはない
+
+Note:
+    - クォートされていないフィールドの途中に単独の " を含むような不正なCSVでは、
+      クォートの個数の偶奇が崩れるため正しい境界を判定できない
+"""
+
+import io
+import re
+from typing import Iterator, Tuple
+
+SCAN_BLOCK_SIZE: int = 16 * 1024 * 1024  # 境界探索時に一度に読み込むバイト数（16 MB）
+READ_BUFFER_SIZE: int = 1024 * 1024  # バイト範囲を読み込む際のバッファサイズ（1 MB）
+
+_NEWLINE_PATTERN: re.Pattern[bytes] = re.compile(rb"\r\n?|\n")  # open() のテキストモードと同じ改行
+
+
+class _ByteRangeReader(io.RawIOBase):
+    """ファイルの [start, end) のバイト範囲だけを読み込む RawIOBase"""
+
+    def __init__(self, file_path: str, start: int, end: int) -> None:
+        super().__init__()
+        self._file = open(file=file_path, mode="rb", buffering=0)
+        self._file.seek(start)
+        self._remaining: int = max(0, end - start)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:  # type: ignore[no-untyped-def]
+        if self._remaining <= 0:
+            return 0
+        view = memoryview(buffer)[: min(len(buffer), self._remaining)]
+        size: int = self._file.readinto(view) or 0
+        self._remaining -= size
+        return size
+
+    def close(self) -> None:
+        if not self.closed:
+            self._file.close()
+        super().close()
+
+
+def open_byte_range(file_path: str, start: int, end: int, encoding: str = "cp932") -> io.TextIOWrapper:
+    """ファイルの [start, end) のバイト範囲をテキストファイルとして開く
+
+    Args:
+        file_path (str): 対象ファイルのパス
+        start (int): 読み込み開始位置（バイト）
+        end (int): 読み込み終了位置（バイト、この位置は含まない）
+        encoding (str): 文字エンコーディング
+
+    Returns:
+        io.TextIOWrapper: open() でテキストモードで開いた場合と同じ改行変換を行うテキストストリーム
+    """
+    raw: _ByteRangeReader = _ByteRangeReader(file_path=file_path, start=start, end=end)
+    return io.TextIOWrapper(io.BufferedReader(raw, buffer_size=READ_BUFFER_SIZE), encoding=encoding)
+
+
+def split_csv_byte_ranges(file_path: str, chunk_size: int) -> Tuple[int, list[Tuple[int, int]]]:
+    """CSVファイルをヘッダ行と、レコード境界で終わるデータ部のバイト範囲に分割する
+
+    Args:
+        file_path (str): 対象のCSVファイルのパス
+        chunk_size (int): 1範囲あたりの目安のバイト数
+
+    Returns:
+        Tuple[int, list[Tuple[int, int]]]: 以下の要素を含むタプル
+            - int: ヘッダ行の終了位置（ヘッダ行の改行の直後のバイト位置）
+            - list[Tuple[int, int]]: データ部の (開始位置, 終了位置) のリスト（ファイル末尾まで連続）
+
+    Raises:
+        OSError: ファイルの読み込みに失敗した場合
+
+    Note:
+        - 各範囲はクォートの外側の改行の直後で終わる
+        - ヘッダ行の後に改行が無い場合、データ部の範囲は空リストとなる
+    """
+    boundaries: list[int] = []
+    quote_is_open: bool = False  # 現在位置までの " の個数が奇数か
+    target: int = 0  # 次の境界を探し始めるバイト位置（最初はヘッダ行の終わり）
+    base: int = 0  # 読み込んだブロックの先頭のバイト位置
+
+    with open(file=file_path, mode="rb") as f:
+        while True:
+            block: bytes = f.read(SCAN_BLOCK_SIZE)
+            if not block:
+                break
+            position: int = 0  # ブロック内で " の個数を数え終えた位置
+            while True:
+                relative_target: int = target - base
+                if relative_target >= len(block):
+                    quote_is_open ^= bool(block.count(b'"', position) & 1)
+                    break
+                if relative_target > position:
+                    quote_is_open ^= bool(block.count(b'"', position, relative_target) & 1)
+                    position = relative_target
+
+                newline: int = block.find(b"\n", position)
+                if newline < 0:
+                    # このブロックには改行が無いので、次のブロックの先頭から探す
+                    quote_is_open ^= bool(block.count(b'"', position) & 1)
+                    target = base + len(block)
+                    break
+
+                quote_is_open ^= bool(block.count(b'"', position, newline) & 1)
+                position = newline + 1
+                if quote_is_open:
+                    # クォートで囲まれたフィールド内の改行なので、次の改行を探す
+                    target = base + position
+                    continue
+                boundaries.append(base + position)
+                target = base + position + chunk_size
+            base += len(block)
+
+    file_size: int = base
+    if not boundaries:
+        return file_size, []
+
+    header_end: int = boundaries[0]
+    starts: list[int] = boundaries
+    ends: list[int] = boundaries[1:] + [file_size]
+    ranges: list[Tuple[int, int]] = [(start, end) for start, end in zip(starts, ends) if start < end]
+    return header_end, ranges
+
+
+def find_record_end(data: bytes, start: int = 0) -> int:
+    """start から始まるレコードの終了位置（レコードの区切りの直後）を返す
+
+    Args:
+        data (bytes): CSVファイルの内容（bytes または mmap）
+        start (int): レコードの開始位置
+
+    Returns:
+        int: クォートの外側にある最初の改行（CRLF, CR, LF）の直後の位置（改行が無い場合はデータの末尾）
+    """
+    quote_is_open: bool = False
+    position: int = start
+    while True:
+        newline: re.Match[bytes] | None = _NEWLINE_PATTERN.search(data, position)
+        if newline is None:
+            return len(data)
+        quote_is_open ^= bool(data[position : newline.start()].count(b'"') & 1)
+        position = newline.end()
+        if not quote_is_open:
+            return position
+
+
+def find_last_record_end(data: bytes, start: int, end: int) -> int:
+    """[start, end) 内の最後のレコード境界（クォートの外側にある最後の LF の直後）を返す
+
+    Args:
+        data (bytes): CSVファイルの内容（bytes または mmap）
+        start (int): 開始位置（レコードの先頭）
+        end (int): 終了位置
+
+    Returns:
+        int: 最後のレコード境界の位置（[start, end) に完結したレコードが無い場合は start）
+
+    Note:
+        - 書き込み途中の最後のレコードを除いた、完結しているレコードの終わりを求める
+          （CR だけで終わる位置は、続く LF が書き込まれる前の可能性があるため境界としない）
+    """
+    quote_is_open_at_end: bool = False  # [start, end) の " の個数が奇数か
+    position: int
+    for position in range(start, end, SCAN_BLOCK_SIZE):
+        quote_is_open_at_end ^= bool(data[position : min(position + SCAN_BLOCK_SIZE, end)].count(b'"') & 1)
+
+    # 末尾から改行をたどり、改行より後ろの " の個数の偶奇が全体と一致する（改行の位置でクォートが閉じている）改行を探す
+    quote_is_open_after: bool = False
+    after: int = end
+    newline: int = data.rfind(b"\n", start, end)
+    while newline >= 0:
+        quote_is_open_after ^= bool(data[newline:after].count(b'"') & 1)
+        if quote_is_open_at_end == quote_is_open_after:
+            return newline + 1
+        after = newline
+        newline = data.rfind(b"\n", start, newline)
+    return start
+
+
+def _last_record_boundary(block: bytes) -> int:
+    """ブロック内の最後のレコード境界（クォートの外側にある最後の改行の直後）を返す
+
+    Args:
+        block (bytes): レコードの先頭から始まるバイト列
+
+    Returns:
+        int: ブロック内の位置（レコード境界が無い場合は -1）
+    """
+    quote_is_open_at_end: bool = bool(block.count(b'"') & 1)
+    quote_is_open_after: bool = False  # 改行より後ろにある " の個数が奇数か
+    after: int = len(block)
+    newline: int = block.rfind(b"\n")
+    while newline >= 0:
+        quote_is_open_after ^= bool(block.count(b'"', newline, after) & 1)
+        if quote_is_open_at_end == quote_is_open_after:
+            return newline + 1
+        after = newline
+        newline = block.rfind(b"\n", 0, newline)
+    return -1
+
+
+def iter_record_blocks(data: bytes, start: int, end: int, block_size: int) -> Iterator[bytes]:
+    """[start, end) をレコード境界で終わるブロックに分けて順に返す
+
+    Args:
+        data (bytes): CSVファイルの内容（bytes または mmap）
+        start (int): 開始位置（レコードの先頭）
+        end (int): 終了位置（レコードの区切りの直後、またはデータの末尾）
+        block_size (int): 1ブロックあたりの目安のバイト数
+
+    Returns:
+        Iterator[bytes]: ブロックのバイト列（最後のブロック以外はレコードの区切りで終わる）
+
+    Note:
+        - 1レコードが block_size を超える場合は、レコード境界が見つかるまでブロックを広げる
+    """
+    position: int = start
+    while position < end:
+        size: int = block_size
+        while True:
+            target: int = min(position + size, end)
+            block: bytes = data[position:target]
+            if target == end:
+                yield block
+                return
+            boundary: int = _last_record_boundary(block)
+            if boundary > 0:
+                yield block[:boundary]
+                position += boundary
+                break
+            size *= 2
@@ -0,0 +1,132 @@
+"""
+cp932 のCSVをデコードせずにバイト列のまま走査して、フィールドの空/非空を判定する
+
+値の個数のカウントに必要なのは各フィールドが空かどうかだけなので、
+文字列へのデコードやフィールド毎の文字列の生成を行わずに、
+ブロック単位のバイト列操作（translate、多倍長整数のシフト）だけで
+各フィールドの空/非空を1フィールド1バイトのフラグ列に変換します。
+
+フラグ列の作り方:
+1. 各バイトを 0: データ, 1: カンマ, 2: 改行 に分類する
+2. 分類したバイト列を多倍長整数とみなし、1バイト右シフトしたものと重ねて
+   「自分の分類 × 4 + 直前のバイトの分類」を全バイト同時に求める
+3. 区切り文字（カンマ・改行）の位置だけを残し、直前がデータなら非空、
+   直前が区切り文字（または行頭）なら空のフィールドとしてフラグに変換する
+
+cp932 の2バイト文字の2バイト目に " (0x22), カンマ (0x2C), CR (0x0D), LF (0x0A) が
+現れることはないため、バイト単位で区切り文字を判定しても結果は変わりません。
+
+Note:
+    - ダブルクォートや NUL を含むブロックはバイト列では判定せず None を返す
+      （呼び出し側でテキストとして読み込む）
+    - cp932 として不正なバイト列は検出しない（区切り文字以外のバイトは内容を見ない）
+"""
+
+import re
+from collections import Counter
+from itertools import compress
+from typing import Callable, Tuple
+
+# バイトの分類（0: データ, 1: カンマ, 2: 改行）
+_BYTE_CLASS: bytes = bytes(1 if b == 0x2C else 2 if b == 0x0A else 0 for b in range(256))
+
+# 「自分の分類 × 4 + 直前のバイトの分類」からフラグへの変換表
+#   カンマ: 直前がデータ → 0x01 (値あり), 直前がカンマ/改行 → 0x00 (空)
+#   改行  : 直前がデータ → 0x03 (行末の値あり), 直前がカンマ → 0x02 (行末の空), 直前が改行 → 0x04 (空行)
+_FLAG_CODE: bytes = bytes({4: 0x01, 5: 0x00, 6: 0x00, 8: 0x03, 9: 0x02, 10: 0x04}.get(b, 0) for b in range(256))
+_DATA_CODES: bytes = bytes((0, 1, 2))  # データのバイト（分類 0）に対応するコード
+
+FLAG_EMPTY: int = 0x00  # 空のフィールド
+FLAG_VALUE: int = 0x01  # 値があるフィールド
+FLAG_EMPTY_EOL: int = 0x02  # 行末の空のフィールド
+FLAG_VALUE_EOL: int = 0x03  # 行末の値があるフィールド
+FLAG_BLANK_LINE: int = 0x04  # 空行（フィールド数 0）
+
+# 行末のフラグを通常のフラグに揃える変換表（値あり → 1, それ以外 → 0）
+_HAS_VALUE: bytes = bytes(1 if b in (FLAG_VALUE, FLAG_VALUE_EOL) else 0 for b in range(256))
+
+# フラグ列を1行ずつに分割するパターン
+_ROW_PATTERN: re.Pattern[bytes] = re.compile(rb"[\x00\x01]*[\x02\x03\x04]")
+
+
+def encode_field_flags(block: bytes) -> bytes:
+    """改行で終わるブロックを、1フィールド1バイトのフラグ列に変換する
+
+    Args:
+        block (bytes): ダブルクォートを含まない、改行（\\n）で終わるCSVのバイト列
+
+    Returns:
+        bytes: フラグ列（FLAG_EMPTY / FLAG_VALUE / FLAG_EMPTY_EOL / FLAG_VALUE_EOL / FLAG_BLANK_LINE）
+
+    Note:
+        - 先頭に改行を1つ補い、ブロックの先頭を行頭として扱う（補った分は結果から取り除く）
+    """
+    data: bytes = b"\n" + block
+    classes: int = int.from_bytes(data.translate(_BYTE_CLASS), "big")
+    # 分類 × 4（各バイトは 2 以下なので桁あふれしない）と、1バイト右（直前）の分類を重ねる
+    codes: bytes = ((classes << 2) | (classes >> 8)).to_bytes(len(data), "big")
+    return codes.translate(_FLAG_CODE, _DATA_CODES)[1:]
+
+
+def scan_field_flags(
+    block: bytes,
+    expected_field_count: int,
+    positional_count: Counter[int],
+    on_field_count_error: Callable[[int, int], None],
+) -> Tuple[int, int, bool] | None:
+    """ブロック内の各行について、列位置ごとに値が存在する行数を positional_count に加算する
+
+    Args:
+        block (bytes): レコードの先頭から始まり、レコードの区切りで終わるCSVのバイト列
+        expected_field_count (int): ヘッダ行のフィールド数
+        positional_count (Counter[int]): 列位置をキーとした値が存在する行数（加算される）
+        on_field_count_error (Callable[[int, int], None]): フィールド数が異なる行で呼び出す関数
+            引数: (ブロック内のレコード番号(0始まり), 実際のフィールド数)
+
+    Returns:
+        Tuple[int, int, bool] | None: 以下の要素を含むタプル
+            - int: レコード数（空行を含む）
+            - int: データ行数（空行を除く）
+            - bool: 余剰フィールドを持つ行があるか
+            バイト列のままでは判定できないブロックの場合は None（positional_count は変更しない）
+
+    Note:
+        - 改行は open() のテキストモードと同様に CRLF, CR を LF とみなす
+        - 全ての行のフィールド数がヘッダ行と等しいブロックは、列毎に bytes.count で一括して数える
+    """
+    if b'"' in block or b"\x00" in block:
+        return None
+    if b"\r" in block:
+        block = block.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+    if not block.endswith(b"\n"):
+        block += b"\n"
+
+    flags: bytes = encode_field_flags(block)
+    field_count: int = expected_field_count
+
+    # 全ての行がヘッダ行と同じフィールド数の場合は、列毎にフラグを数える
+    if field_count > 0 and re.fullmatch(rb"(?:[\x00\x01]{%d}[\x02\x03])*" % (field_count - 1), flags):
+        row_count: int = len(flags) // field_count
+        column: int
+        for column in range(field_count - 1):
+            positional_count[column] += flags[column::field_count].count(FLAG_VALUE)
+        positional_count[field_count - 1] += flags[field_count - 1 :: field_count].count(FLAG_VALUE_EOL)
+        return row_count, row_count, False
+
+    # フィールド数が異なる行や空行を含む場合は1行ずつ数える
+    column_indexes: range = range(field_count)
+    record_count: int = 0
+    data_row_count: int = 0
+    has_extra_field: bool = False
+    row: bytes
+    for record_count, row in enumerate(_ROW_PATTERN.findall(flags), start=1):
+        actual_field_count: int = 0 if row[-1] == FLAG_BLANK_LINE else len(row)
+        if actual_field_count != field_count:
+            on_field_count_error(record_count - 1, actual_field_count)
+            if actual_field_count > field_count:
+                has_extra_field = True
+        if actual_field_count == 0:
+            continue
+        data_row_count += 1
+        positional_count.update(compress(column_indexes, row.translate(_HAS_VALUE)))
+    return record_count, data_row_count, has_extra_field
@@ -0,0 +1,252 @@
+"""
+圧縮されたCSVファイル（.gz, .bz2, .xz, zip アーカイブ内のファイル）の読み込み
+
+圧縮されたCSVファイルを一時ファイルに展開せず、展開しながらストリームとして読み込みます。
+展開はバックグラウンドのスレッドで行い、展開済みのブロックをキューで受け渡すため、
+展開と csv.reader による解析が並行して進みます（zlib / bz2 / lzma は展開中に GIL を解放する）。
+
+zip アーカイブ内のCSVファイルは、それぞれを1つのCSVファイルとして扱います。
+アーカイブ内のファイルは "アーカイブのパス::アーカイブ内のパス" 形式の論理パスで表します。
+  例: data/bundle.zip::2025/sales.csv
+
+Note:
+    - 圧縮されたCSVファイルは先頭から順に読み込む必要があるため、分割して並列にカウントしない
+    - アーカイブ内のファイルの変更判定には、アーカイブ内に記録されている CRC-32 とサイズを使う
+"""
+
+import bz2
+import gzip
+import io
+import lzma
+import os
+import threading
+import zipfile
+from queue import Empty, Full, Queue
+from typing import IO, Callable, Dict, Iterator, NamedTuple, TextIO, Tuple
+
+ZIP_MEMBER_SEPARATOR: str = "::"  # アーカイブのパスとアーカイブ内のパスの区切り
+DECOMPRESS_BLOCK_SIZE: int = 1024 * 1024  # 展開したデータを受け渡す1ブロックのサイズ（1 MB）
+DECOMPRESS_QUEUE_BLOCKS: int = 8  # 展開済みで未読み込みのブロックを保持する最大数
+
+# 圧縮形式の拡張子と展開したストリームを開く関数
+COMPRESSED_OPENERS: Dict[str, Callable[[str], IO[bytes]]] = {
+    ".gz": lambda path: gzip.open(path, mode="rb"),
+    ".bz2": lambda path: bz2.open(path, mode="rb"),
+    ".xz": lambda path: lzma.open(path, mode="rb"),
+}
+
+
+class ArchiveMember(NamedTuple):
+    """zip アーカイブ内のCSVファイル"""
+
+    path: str  # 論理パス（アーカイブのパス::アーカイブ内のパス）
+    compressed_size: int  # 圧縮後のサイズ（バイト、読み込むバイト数）
+    content_hash: str  # 変更判定用の値（CRC-32 と展開後のサイズ）
+
+
+def split_archive_member(path: str) -> Tuple[str, str | None]:
+    """論理パスをアーカイブのパスとアーカイブ内のパスに分ける
+
+    Args:
+        path (str): CSVファイルのパスまたは論理パス
+
+    Returns:
+        Tuple[str, str | None]: (ファイルシステム上のパス, アーカイブ内のパス（アーカイブ内のファイルでない場合は None）)
+    """
+    archive, separator, member = path.partition(ZIP_MEMBER_SEPARATOR)
+    return (archive, member) if separator else (path, None)
+
+
+def is_compressed_path(path: str) -> bool:
+    """圧縮されたCSVファイル（アーカイブ内のファイルを含む）かを判定する
+
+    Args:
+        path (str): CSVファイルのパスまたは論理パス
+
+    Returns:
+        bool: 展開しながら読み込む必要がある場合は True
+    """
+    _, member = split_archive_member(path=path)
+    return member is not None or os.path.splitext(path)[1] in COMPRESSED_OPENERS
+
+
+def display_name(path: str) -> str:
+    """個別結果ファイルや統合結果ファイルに表示するCSVファイル名を返す
+
+    Args:
+        path (str): CSVファイルのパスまたは論理パス
+
+    Returns:
+        str: ファイル名（アーカイブ内のファイルは "アーカイブ名::アーカイブ内のパス"）
+    """
+    archive, member = split_archive_member(path=path)
+    if member is None:
+        return os.path.basename(path)
+    return f"{os.path.basename(archive)}{ZIP_MEMBER_SEPARATOR}{member}"
+
+
+def output_base_name(path: str) -> str:
+    """個別結果ファイルのパス（拡張子なし）を返す
+
+    Args:
+        path (str): CSVファイルのパスまたは論理パス
+
+    Returns:
+        str: 個別結果ファイルのパスから .txt を除いたもの
+            - 通常のCSVファイル: 拡張子を除いたパス（data/a.csv → data/a）
+            - 圧縮されたCSVファイル: パスそのもの（data/a.csv.gz → data/a.csv.gz）
+            - アーカイブ内のファイル: アーカイブのパスの後ろに "_" 区切りでアーカイブ内のパスを付けたもの
+              （data/bundle.zip::2025/sales.csv → data/bundle.zip_2025_sales.csv）
+    """
+    archive, member = split_archive_member(path=path)
+    if member is not None:
+        return f"{archive}_{member.replace('/', '_')}"
+    if os.path.splitext(path)[1] in COMPRESSED_OPENERS:
+        return path
+    return os.path.splitext(path)[0]
+
+
+def iter_archive_members(archive_path: str, accept: Callable[[str], bool]) -> Iterator[ArchiveMember]:
+    """zip アーカイブ内のCSVファイルをアーカイブ内の順に返す
+
+    Args:
+        archive_path (str): zip アーカイブのパス
+        accept (Callable[[str], bool]): アーカイブ内のパスを受け取り、対象とするかを返す関数
+
+    Returns:
+        Iterator[ArchiveMember]: アーカイブ内のCSVファイル
+
+    Raises:
+        OSError: アーカイブの読み込みに失敗した場合
+        zipfile.BadZipFile: zip アーカイブとして読み込めない場合
+    """
+    with zipfile.ZipFile(archive_path) as archive:
+        info: zipfile.ZipInfo
+        for info in archive.infolist():
+            if info.is_dir() or not accept(info.filename):
+                continue
+            yield ArchiveMember(
+                path=f"{archive_path}{ZIP_MEMBER_SEPARATOR}{info.filename}",
+                compressed_size=info.compress_size,
+                content_hash=f"zip-crc32:{info.CRC:08x}:{info.file_size}",
+            )
+
+
+def open_decompressed(path: str) -> IO[bytes]:
+    """圧縮されたCSVファイルを展開しながら読み込むバイナリストリームを開く
+
+    Args:
+        path (str): 圧縮されたCSVファイルのパスまたは論理パス
+
+    Returns:
+        IO[bytes]: 展開後のデータを返すストリーム
+
+    Raises:
+        OSError: ファイルの読み込みに失敗した場合
+        KeyError: アーカイブ内に指定されたファイルが無い場合
+        zipfile.BadZipFile: zip アーカイブとして読み込めない場合
+    """
+    archive_path, member = split_archive_member(path=path)
+    if member is not None:
+        # アーカイブを閉じても、開いたファイルを閉じるまではアーカイブのファイルは開いたままになる
+        with zipfile.ZipFile(archive_path) as archive:
+            return archive.open(member)
+    return COMPRESSED_OPENERS[os.path.splitext(path)[1]](path)
+
+
+class ThreadedDecompressionReader(io.RawIOBase):
+    """展開をバックグラウンドのスレッドで先行して行う読み込み専用ストリーム
+
+    展開済みのブロックを最大 queue_blocks 個までキューに保持し、
+    読み込み側（csv.reader）が解析している間も展開を進めます。
+    展開中のエラーは、それまでのデータを読み終えた後の read で送出します。
+    """
+
+    def __init__(
+        self, source: IO[bytes], block_size: int = DECOMPRESS_BLOCK_SIZE, queue_blocks: int = DECOMPRESS_QUEUE_BLOCKS
+    ) -> None:
+        super().__init__()
+        self._source: IO[bytes] = source
+        self._block_size: int = block_size
+        self._queue: Queue[bytes | BaseException] = Queue(maxsize=queue_blocks)
+        self._stopped: threading.Event = threading.Event()
+        self._buffer: memoryview = memoryview(b"")
+        self._finished: bool = False
+        self._thread: threading.Thread = threading.Thread(target=self._produce, name="csv-decompress", daemon=True)
+        self._thread.start()
+
+    def _put(self, item: bytes | BaseException) -> bool:
+        # 読み込み側が閉じられた場合は待つのをやめる
+        while not self._stopped.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except Full:
+                continue
+        return False
+
+    def _produce(self) -> None:
+        try:
+            while not self._stopped.is_set():
+                block: bytes = self._source.read(self._block_size)
+                if not self._put(block) or not block:
+                    return
+        except BaseException as e:
+            self._put(e)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: bytearray | memoryview) -> int:  # type: ignore[override]
+        while not self._buffer:
+            if self._finished:
+                return 0
+            item: bytes | BaseException = self._queue.get()
+            if isinstance(item, BaseException):
+                self._finished = True
+                raise item
+            if not item:
+                self._finished = True
+                return 0
+            self._buffer = memoryview(item)
+        size: int = min(len(buffer), len(self._buffer))
+        buffer[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+    def close(self) -> None:
+        if not self.closed:
+            self._stopped.set()
+            # 展開側がキューへの追加で待っている場合に備えて、キューを空にしてから終了を待つ
+            while self._thread.is_alive():
+                try:
+                    self._queue.get(timeout=0.1)
+                except Empty:
+                    pass
+            self._source.close()
+        super().close()
+
+
+def open_csv_text(path: str, encoding: str = "cp932", newline: str | None = None) -> TextIO:
+    """CSVファイルをテキストとして開く（圧縮されたCSVファイルは展開しながら読み込む）
+
+    Args:
+        path (str): CSVファイルのパスまたは論理パス
+        encoding (str): 文字エンコーディング
+        newline (str | None): open() の newline と同じ改行の扱い（None: CRLF, CR を LF とみなす、
+            "": 変換しない。引用符で囲まれたフィールド内の改行をそのまま読み込む場合に指定する）
+
+    Returns:
+        TextIO: newline で指定した改行の扱いのストリーム
+
+    Raises:
+        OSError: ファイルの読み込みに失敗した場合
+        KeyError: アーカイブ内に指定されたファイルが無い場合
+        zipfile.BadZipFile: zip アーカイブとして読み込めない場合
+    """
+    if not is_compressed_path(path=path):
+        return open(file=path, mode="r", encoding=encoding, newline=newline)
+    reader: ThreadedDecompressionReader = ThreadedDecompressionReader(source=open_decompressed(path=path))
+    return io.TextIOWrapper(
+        io.BufferedReader(reader, buffer_size=DECOMPRESS_BLOCK_SIZE), encoding=encoding, newline=newline
+    )
@@ -0,0 +1,413 @@
+"""
+CSVファイルのカウント結果を再利用するためのマニフェスト
+
+前回の実行で処理したCSVファイルのサイズ・更新日時（と任意でファイル内容のハッシュ）と
+カウント結果をJSONファイルに保存し、次回の実行で変更されていないファイルの
+カウントを省略できるようにします。
+
+変更の判定:
+- 既定ではファイルサイズと更新日時（ナノ秒）が一致すれば変更なしとみなす
+- ハッシュを記録している場合は、ファイルサイズとハッシュが一致すれば変更なしとみなす
+  （コピーし直しなどで更新日時だけが変わったファイルも再利用できる）
+- 追記されるCSVファイル（--append）は、最後の完結したレコードまでのカウント結果とその範囲のハッシュも記録し、
+  次回は先頭部分が変わっていなければ追記された部分だけをカウントする
+
+Note:
+    - 更新日時の分解能の範囲内で書き換えられたファイルを見落とさないよう、
+      走査開始の直前に更新されたファイルはマニフェストに記録しない（次回もカウントする）
+    - マニフェストのバージョンが異なる場合は全て無効とする
+"""
+
+import hashlib
+import json
+import os
+from typing import Any, Dict, NamedTuple
+
+from csv_bounded_reader import OversizedField
+from csv_duplicates import DuplicateGroup, DuplicateSummary
+from csv_field_stats import FieldStats, TopValue
+from csv_group_counts import GroupCount, GroupSummary
+from csv_null_patterns import NullPattern, NullPatternSummary
+from csv_type_inference import FieldType
+
+MANIFEST_VERSION: int = 1  # マニフェストの形式のバージョン
+HASH_BLOCK_SIZE: int = 1024 * 1024  # ハッシュ計算時に一度に読み込むバイト数（1 MB）
+HASH_DIGEST_SIZE: int = 32  # ハッシュ（BLAKE2b）のバイト数
+RACY_WINDOW_NS: int = 2 * 1000 * 1000 * 1000  # 更新日時を信用しない走査開始直前の期間（2 秒）
+
+
+class FileSignature(NamedTuple):
+    """CSVファイルが変更されたかを判定するための情報"""
+
+    size: int  # ファイルサイズ（バイト）
+    mtime_ns: int  # 更新日時（ナノ秒）
+    content_hash: str | None = None  # ファイル内容のハッシュ（記録しない場合は None）
+
+
+class AppendState(NamedTuple):
+    """追記されるCSVファイルを前回の続きからカウントするための記録（--append）
+
+    ファイルの先頭から最後の完結したレコードまでのカウント結果と、その範囲のハッシュを記録します。
+    次回はハッシュが一致すれば（先頭部分が変わっていなければ）record_end より後ろだけをカウントします。
+    """
+
+    record_end: int  # カウント済みの最後の完結したレコードの終了位置（バイト）
+    prefix_hash: str  # ファイルの先頭から record_end までのハッシュ（BLAKE2b）
+    record_count: int  # record_end までのデータ部のレコード数（空行を含む）
+    data_row_count: int  # record_end までのデータ行数（空行を除く）
+    positional_counts: list[int]  # record_end までの列位置毎の値が存在する行数（ヘッダ行のフィールド数）
+    has_extra_field: bool  # record_end までに余剰フィールドを持つ行があるか
+    oversized_fields: list[OversizedField] | None = None  # record_end までの閾値を超えたフィールド
+    # （--max-field-size の場合のみ。行番号はデータ部のレコード番号(0始まり)）
+
+
+class ManifestEntry(NamedTuple):
+    """マニフェストに記録する1ファイル分の情報"""
+
+    signature: FileSignature
+    counts: Dict[str, int]  # 各フィールド名と値が存在する行数
+    fieldnames: list[str]  # フィールド名リスト（ヘッダ順）
+    has_data: bool  # データが存在するか
+    data_row_count: int  # データ行数（ヘッダを除く）
+    field_stats: Dict[str, FieldStats] | None = None  # 項目毎の統計情報（--stats で集計した場合のみ）
+    top_k: int = 0  # 頻出値を求めた件数（--top-k、求めていない場合は 0）
+    top_values: Dict[str, list[TopValue]] | None = None  # 項目毎の頻出値（--top-k で求めた場合のみ）
+    max_field_size: int = 0  # 値を読み込まずに長さだけを計測したフィールドの閾値（--max-field-size、バイト）
+    oversized_fields: list[OversizedField] | None = None  # 閾値を超えたフィールド（--max-field-size の場合のみ）
+    append_state: AppendState | None = None  # 前回の続きからカウントするための記録（--append の場合のみ）
+    null_pattern_limit: int = 0  # 空値パターンを求めた件数（--null-patterns、求めていない場合は 0）
+    null_patterns: NullPatternSummary | None = None  # 行毎の空値パターン（--null-patterns で求めた場合のみ）
+    field_types: Dict[str, FieldType] | None = None  # 項目毎の型の推定結果（--infer-types で求めた場合のみ）
+    duplicates: DuplicateSummary | None = None  # 重複の集計結果（--duplicates で求めた場合のみ）
+    group_counts: GroupSummary | None = None  # グループ毎の値の個数（--group-by で求めた場合のみ）
+    encoding: str = "cp932"  # ファイルを読み込んだ文字コード（--encoding）
+
+
+def new_digest() -> hashlib.blake2b:
+    """変更判定に使うハッシュ（BLAKE2b）の計算を開始する
+
+    Returns:
+        hashlib.blake2b: ハッシュオブジェクト
+    """
+    return hashlib.blake2b(digest_size=HASH_DIGEST_SIZE)
+
+
+def update_digest(digest: hashlib.blake2b, data: bytes, start: int, end: int) -> None:
+    """data の [start, end) をハッシュに追加する
+
+    Args:
+        digest (hashlib.blake2b): new_digest で作成したハッシュオブジェクト
+        data (bytes): ファイルの内容（bytes または mmap）
+        start (int): 開始位置
+        end (int): 終了位置
+
+    Returns:
+        None
+    """
+    position: int
+    for position in range(start, end, HASH_BLOCK_SIZE):
+        digest.update(data[position : min(position + HASH_BLOCK_SIZE, end)])
+
+
+def hash_file(file_path: str) -> str:
+    """ファイル内容のハッシュ（BLAKE2b）を返す
+
+    Args:
+        file_path (str): 対象ファイルのパス
+
+    Returns:
+        str: 16進数のハッシュ文字列
+
+    Raises:
+        OSError: ファイルの読み込みに失敗した場合
+    """
+    digest: hashlib.blake2b = new_digest()
+    with open(file=file_path, mode="rb") as f:
+        block: bytes
+        while block := f.read(HASH_BLOCK_SIZE):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def get_file_signature(file_path: str, with_hash: bool = False) -> FileSignature:
+    """CSVファイルのサイズ・更新日時（と任意でハッシュ）を取得する
+
+    Args:
+        file_path (str): 対象ファイルのパス
+        with_hash (bool): ファイル内容のハッシュを計算するか
+
+    Returns:
+        FileSignature: ファイルの変更判定用の情報
+
+    Raises:
+        OSError: ファイル情報の取得や読み込みに失敗した場合
+    """
+    stat: os.stat_result = os.stat(file_path)
+    content_hash: str | None = hash_file(file_path=file_path) if with_hash else None
+    return FileSignature(size=stat.st_size, mtime_ns=stat.st_mtime_ns, content_hash=content_hash)
+
+
+def is_unchanged(entry: ManifestEntry, signature: FileSignature) -> bool:
+    """マニフェストに記録したときからCSVファイルが変更されていないかを判定する
+
+    Args:
+        entry (ManifestEntry): マニフェストに記録されている情報
+        signature (FileSignature): 現在のファイルの情報
+
+    Returns:
+        bool: 変更されていない場合は True
+    """
+    if entry.signature.size != signature.size:
+        return False
+    if entry.signature.content_hash is not None and signature.content_hash is not None:
+        return entry.signature.content_hash == signature.content_hash
+    return entry.signature.mtime_ns == signature.mtime_ns
+
+
+def is_racy(signature: FileSignature, scan_start_ns: int) -> bool:
+    """更新日時だけでは以降の変更を検出できない可能性があるかを判定する
+
+    Args:
+        signature (FileSignature): ファイルの情報
+        scan_start_ns (int): ファイルの走査を開始した時刻（time.time_ns()）
+
+    Returns:
+        bool: 走査開始の直前以降に更新されたファイルの場合は True
+    """
+    return signature.content_hash is None and signature.mtime_ns >= scan_start_ns - RACY_WINDOW_NS
+
+
+def load_manifest(manifest_file: str) -> Dict[str, ManifestEntry]:
+    """マニフェストファイルを読み込む
+
+    Args:
+        manifest_file (str): マニフェストファイルのパス
+
+    Returns:
+        Dict[str, ManifestEntry]: キー: CSVファイルのパス（マニフェストの記録どおり）, 値: 記録されている情報
+            マニフェストファイルが存在しない場合やバージョンが異なる場合は空の辞書
+
+    Raises:
+        OSError: ファイルの読み込みに失敗した場合
+        ValueError: マニフェストファイルの内容が不正な場合
+    """
+    try:
+        with open(file=manifest_file, mode="r", encoding="utf-8") as f:
+            data: Any = json.load(f)
+    except FileNotFoundError:
+        return {}
+
+    if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+        return {}
+
+    entries: Dict[str, ManifestEntry] = {}
+    try:
+        path: str
+        item: Dict[str, Any]
+        for path, item in data["files"].items():
+            entries[path] = ManifestEntry(
+                signature=FileSignature(
+                    size=int(item["size"]), mtime_ns=int(item["mtime_ns"]), content_hash=item.get("hash")
+                ),
+                counts={str(field): int(count) for field, count in item["counts"].items()},
+                fieldnames=[str(field) for field in item["fieldnames"]],
+                has_data=bool(item["has_data"]),
+                data_row_count=int(item["data_row_count"]),
+                field_stats=(
+                    {str(field): FieldStats(*values) for field, values in item["field_stats"].items()}
+                    if item.get("field_stats") is not None
+                    else None
+                ),
+                top_k=int(item.get("top_k", 0)),
+                top_values=(
+                    {
+                        str(field): [TopValue(str(value), int(count), int(error)) for value, count, error in values]
+                        for field, values in item["top_values"].items()
+                    }
+                    if item.get("top_values") is not None
+                    else None
+                ),
+                max_field_size=int(item.get("max_field_size", 0)),
+                oversized_fields=(
+                    [OversizedField(*(int(value) for value in values)) for values in item["oversized_fields"]]
+                    if item.get("oversized_fields") is not None
+                    else None
+                ),
+                append_state=(
+                    AppendState(
+                        record_end=int(item["append_state"]["record_end"]),
+                        prefix_hash=str(item["append_state"]["prefix_hash"]),
+                        record_count=int(item["append_state"]["record_count"]),
+                        data_row_count=int(item["append_state"]["data_row_count"]),
+                        positional_counts=[int(count) for count in item["append_state"]["positional_counts"]],
+                        has_extra_field=bool(item["append_state"]["has_extra_field"]),
+                        oversized_fields=(
+                            [
+                                OversizedField(*(int(value) for value in values))
+                                for values in item["append_state"]["oversized_fields"]
+                            ]
+                            if item["append_state"].get("oversized_fields") is not None
+                            else None
+                        ),
+                    )
+                    if item.get("append_state") is not None
+                    else None
+                ),
+                null_pattern_limit=int(item.get("null_pattern_limit", 0)),
+                null_patterns=(
+                    NullPatternSummary(
+                        patterns=[
+                            NullPattern(filled_mask=int(mask), row_count=int(count))
+                            for mask, count in item["null_patterns"]["patterns"]
+                        ],
+                        distinct_count=int(item["null_patterns"]["distinct_count"]),
+                        uncounted_rows=int(item["null_patterns"]["uncounted_rows"]),
+                        capacity=int(item["null_patterns"]["capacity"]),
+                    )
+                    if item.get("null_patterns") is not None
+                    else None
+                ),
+                field_types=(
+                    {
+                        str(field): FieldType(type_name=str(type_name), mismatch_count=int(mismatch_count))
+                        for field, (type_name, mismatch_count) in item["field_types"].items()
+                    }
+                    if item.get("field_types") is not None
+                    else None
+                ),
+                duplicates=(
+                    DuplicateSummary(
+                        key_fields=[str(field) for field in item["duplicates"]["key_fields"]],
+                        duplicate_rows=int(item["duplicates"]["duplicate_rows"]),
+                        duplicate_groups=int(item["duplicates"]["duplicate_groups"]),
+                        groups=[
+                            DuplicateGroup(
+                                row_count=int(row_count),
+                                row_indexes=[int(row_index) for row_index in row_indexes],
+                                key=[str(value) for value in key],
+                            )
+                            for row_count, row_indexes, key in item["duplicates"]["groups"]
+                        ],
+                        missing_fields=[str(field) for field in item["duplicates"]["missing_fields"]],
+                        spilled=bool(item["duplicates"]["spilled"]),
+                    )
+                    if item.get("duplicates") is not None
+                    else None
+                ),
+                group_counts=(
+                    GroupSummary(
+                        group_fields=[str(field) for field in item["group_counts"]["group_fields"]],
+                        groups=[
+                            GroupCount(
+                                values=[str(value) for value in values] if values is not None else None,
+                                data_row_count=int(data_row_count),
+                                counts={str(field): int(count) for field, count in counts.items()},
+                            )
+                            for values, data_row_count, counts in item["group_counts"]["groups"]
+                        ],
+                        missing_fields=[str(field) for field in item["group_counts"]["missing_fields"]],
+                        capacity=int(item["group_counts"]["capacity"]),
+                    )
+                    if item.get("group_counts") is not None
+                    else None
+                ),
+                encoding=str(item.get("encoding", "cp932")),
+            )
+    except (AttributeError, KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"マニフェストの形式が不正です: {e!r}") from e
+    return entries
+
+
+def save_manifest(manifest_file: str, entries: Dict[str, ManifestEntry]) -> None:
+    """マニフェストファイルを書き込む
+
+    一時ファイルに書き込んでから置き換えるため、書き込み中に中断されても
+    前回のマニフェストが壊れることはありません。
+
+    Args:
+        manifest_file (str): マニフェストファイルのパス
+        entries (Dict[str, ManifestEntry]): キー: CSVファイルのパス, 値: 記録する情報
+
+    Returns:
+        None
+
+    Raises:
+        OSError: ファイルの書き込みに失敗した場合
+    """
+    data: Dict[str, Any] = {
+        "version": MANIFEST_VERSION,
+        "files": {
+            path: {
+                "size": entry.signature.size,
+                "mtime_ns": entry.signature.mtime_ns,
+                "hash": entry.signature.content_hash,
+                "counts": entry.counts,
+                "fieldnames": entry.fieldnames,
+                "has_data": entry.has_data,
+                "data_row_count": entry.data_row_count,
+                "field_stats": (
+                    {field: list(stats) for field, stats in entry.field_stats.items()}
+                    if entry.field_stats is not None
+                    else None
+                ),
+                "top_k": entry.top_k,
+                "top_values": (
+                    {field: [list(top_value) for top_value in values] for field, values in entry.top_values.items()}
+                    if entry.top_values is not None
+                    else None
+                ),
+                "max_field_size": entry.max_field_size,
+                "oversized_fields": (
+                    [list(field) for field in entry.oversized_fields] if entry.oversized_fields is not None else None
+                ),
+                "append_state": (
+                    {
+                        **entry.append_state._asdict(),
+                        "oversized_fields": (
+                            [list(field) for field in entry.append_state.oversized_fields]
+                            if entry.append_state.oversized_fields is not None
+                            else None
+                        ),
+                    }
+                    if entry.append_state is not None
+                    else None
+                ),
+                "null_pattern_limit": entry.null_pattern_limit,
+                "null_patterns": (
+                    {
+                        **entry.null_patterns._asdict(),
+                        "patterns": [list(pattern) for pattern in entry.null_patterns.patterns],
+                    }
+                    if entry.null_patterns is not None
+                    else None
+                ),
+                "field_types": (
+                    {field: list(field_type) for field, field_type in entry.field_types.items()}
+                    if entry.field_types is not None
+                    else None
+                ),
+                "duplicates": (
+                    {
+                        **entry.duplicates._asdict(),
+                        "groups": [list(group) for group in entry.duplicates.groups],
+                    }
+                    if entry.duplicates is not None
+                    else None
+                ),
+                "group_counts": (
+                    {
+                        **entry.group_counts._asdict(),
+                        "groups": [list(group) for group in entry.group_counts.groups],
+                    }
+                    if entry.group_counts is not None
+                    else None
+                ),
+                "encoding": entry.encoding,
+            }
+            for path, entry in entries.items()
+        },
+    }
+    temporary_file: str = f"{manifest_file}.tmp"
+    with open(file=temporary_file, mode="w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(temporary_file, manifest_file)
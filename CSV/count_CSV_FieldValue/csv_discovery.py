@@ -0,0 +1,285 @@
+"""
+処理対象のCSVファイルの検索
+
+os.scandir でディレクトリを走査し、ファイル名のパターンと深さで絞り込んだ
+CSVファイルを、ファイルサイズ・更新日時と一緒に1件ずつ返します。
+ディレクトリ走査時に取得したファイル情報を再利用するため、
+ファイル毎に改めて os.stat を呼び出す必要がありません（Windows では追加の問い合わせが発生しない）。
+
+複数のディレクトリやファイルを検索の起点とする場合は iter_csv_roots を使います。
+
+検索をバックグラウンドのスレッドで実行すると、ネットワークドライブなどで
+ディレクトリの走査に時間がかかる場合でも、見つかったファイルから順にカウントを開始できます。
+
+検索順:
+- os.walk（topdown=True）と同じ順序（ディレクトリ直下のファイル → サブディレクトリの順に再帰）
+- ディレクトリ内はファイル名の順（ファイルシステムによらず同じ順序になる。discovery_sort_key を参照）
+- シンボリックリンクのディレクトリはたどらない
+- zip アーカイブはアーカイブ内のCSVファイルをアーカイブ内のパスの順に返す
+  （論理パスは "アーカイブのパス::アーカイブ内のパス"、csv_compressed を参照）
+"""
+
+import os
+import threading
+import zipfile
+from fnmatch import fnmatchcase
+from queue import Queue
+from typing import Iterable, Iterator, NamedTuple, Tuple, TypeVar
+
+from csv_compressed import ZIP_MEMBER_SEPARATOR, ArchiveMember, iter_archive_members, split_archive_member
+
+# 既定の検索対象のファイル名パターン（圧縮されたCSVファイルと zip アーカイブを含む）
+DEFAULT_INCLUDE_PATTERNS: Tuple[str, ...] = ("*.csv", "*.csv.gz", "*.csv.bz2", "*.csv.xz", "*.zip")
+ARCHIVE_MEMBER_PATTERNS: Tuple[str, ...] = ("*.csv",)  # zip アーカイブ内の検索対象のファイル名パターン
+
+T = TypeVar("T")
+
+
+class DiscoveredFile(NamedTuple):
+    """検索で見つかったCSVファイル"""
+
+    path: str  # ファイルのパス（zip アーカイブ内のファイルは論理パス）
+    size: int  # ファイルサイズ（バイト、zip アーカイブ内のファイルは圧縮後のサイズ）
+    mtime_ns: int  # 更新日時（ナノ秒、zip アーカイブ内のファイルはアーカイブの更新日時）
+    content_hash: str | None = None  # ファイル内容から求めた変更判定用の値（zip アーカイブ内のファイルのみ）
+
+
+class DiscoveryError(NamedTuple):
+    """検索中に読み込めなかったディレクトリやファイル"""
+
+    path: str  # ディレクトリまたはファイルのパス
+    message: str  # エラーメッセージ
+
+
+def matches_any(relative_path: str, patterns: Iterable[str]) -> bool:
+    """相対パスがいずれかのパターンに一致するかを判定する
+
+    Args:
+        relative_path (str): 検索の起点からの相対パス（区切り文字は "/"）
+        patterns (Iterable[str]): glob 形式のパターン
+            "/" を含むパターンは相対パス全体と、含まないパターンはファイル名（ディレクトリ名）と比較する
+
+    Returns:
+        bool: 一致するパターンがある場合は True
+
+    Note:
+        - 大文字と小文字は区別する（"*" は "/" にも一致する）
+    """
+    name: str = relative_path.rsplit("/", 1)[-1]
+    pattern: str
+    for pattern in patterns:
+        if fnmatchcase(relative_path if "/" in pattern else name, pattern):
+            return True
+    return False
+
+
+def iter_archive_files(
+    archive_path: str, relative_path: str, mtime_ns: int, exclude: Tuple[str, ...] = ()
+) -> Iterator[DiscoveredFile | DiscoveryError]:
+    """zip アーカイブ内のCSVファイルをアーカイブ内のパスの順に返す
+
+    Args:
+        archive_path (str): zip アーカイブのパス
+        relative_path (str): 検索の起点からのアーカイブの相対パス（区切り文字は "/"）
+        mtime_ns (int): アーカイブの更新日時（ナノ秒）
+        exclude (Tuple[str, ...]): 除外するファイルのパターン（論理パスの相対パスと比較する）
+
+    Returns:
+        Iterator[DiscoveredFile | DiscoveryError]: アーカイブ内のCSVファイル、またはアーカイブを読み込めなかったエラー
+    """
+
+    def accept(member: str) -> bool:
+        relative_member: str = f"{relative_path}{ZIP_MEMBER_SEPARATOR}{member}"
+        return matches_any(relative_path=relative_member, patterns=ARCHIVE_MEMBER_PATTERNS) and not (
+            exclude and matches_any(relative_path=relative_member, patterns=exclude)
+        )
+
+    try:
+        members: list[ArchiveMember] = list(iter_archive_members(archive_path=archive_path, accept=accept))
+    except (OSError, zipfile.BadZipFile) as e:
+        yield DiscoveryError(path=archive_path, message=str(e))
+        return
+    member: ArchiveMember
+    for member in sorted(members, key=lambda member: member.path):
+        yield DiscoveredFile(
+            path=member.path, size=member.compressed_size, mtime_ns=mtime_ns, content_hash=member.content_hash
+        )
+
+
+def iter_csv_files(
+    top: str,
+    include: Iterable[str] = DEFAULT_INCLUDE_PATTERNS,
+    exclude: Iterable[str] = (),
+    max_depth: int | None = None,
+    start: str | None = None,
+    expand_archives: bool = True,
+) -> Iterator[DiscoveredFile | DiscoveryError]:
+    """ディレクトリ以下のCSVファイルを検索順に1件ずつ返す
+
+    Args:
+        top (str): 検索の起点となるディレクトリ
+        include (Iterable[str]): 検索対象とするファイルのパターン（いずれかに一致するファイルを返す）
+            一致した .zip ファイルは、アーカイブ内で ARCHIVE_MEMBER_PATTERNS に一致するファイルを返す
+        exclude (Iterable[str]): 除外するファイル・ディレクトリのパターン
+            （一致するディレクトリの下は走査しない。アーカイブ内のファイルは論理パスと比較する）
+        max_depth (int | None): 走査するサブディレクトリの深さ（0: top の直下のみ, None: 制限なし）
+        start (str | None): 走査を開始する top 以下のディレクトリ（None の場合は top。
+            パターンと深さは top を起点として判定する）
+        expand_archives (bool): 一致した .zip ファイルをアーカイブ内のCSVファイルに展開するか
+            （False の場合は .zip ファイルそのものを返し、アーカイブを開かない）
+
+    Returns:
+        Iterator[DiscoveredFile | DiscoveryError]: 見つかったファイル、または読み込めなかったディレクトリ・ファイル
+
+    Note:
+        - パターンは top からの相対パス（区切り文字は "/"）と比較する
+    """
+    include = tuple(include)
+    exclude = tuple(exclude)
+    # (ディレクトリのパス, top からの相対パス, 深さ) を後で走査する順に積む
+    stack: list[Tuple[str, str, int]] = [(top, "", 0)]
+    if start is not None:
+        relative_start: str = os.path.relpath(start, top).replace(os.sep, "/")
+        if relative_start != ".":
+            start_depth: int = relative_start.count("/") + 1
+            if max_depth is not None and start_depth > max_depth:
+                return
+            stack = [(start, f"{relative_start}/", start_depth)]
+    while stack:
+        directory, relative_directory, depth = stack.pop()
+        subdirectories: list[Tuple[str, str, int]] = []
+        try:
+            with os.scandir(directory) as entries:
+                entry: os.DirEntry[str]
+                for entry in sorted(entries, key=lambda entry: entry.name):
+                    relative_path: str = f"{relative_directory}{entry.name}"
+                    if exclude and matches_any(relative_path=relative_path, patterns=exclude):
+                        continue
+                    try:
+                        is_directory: bool = entry.is_dir()
+                        if is_directory:
+                            if (max_depth is None or depth < max_depth) and not entry.is_symlink():
+                                subdirectories.append((entry.path, f"{relative_path}/", depth + 1))
+                            continue
+                        if not matches_any(relative_path=relative_path, patterns=include):
+                            continue
+                        stat: os.stat_result = entry.stat()
+                    except OSError as e:
+                        yield DiscoveryError(path=entry.path, message=str(e))
+                        continue
+                    if expand_archives and os.path.splitext(entry.name)[1] == ".zip":
+                        yield from iter_archive_files(
+                            archive_path=entry.path,
+                            relative_path=relative_path,
+                            mtime_ns=stat.st_mtime_ns,
+                            exclude=exclude,
+                        )
+                        continue
+                    yield DiscoveredFile(path=entry.path, size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+        except OSError as e:
+            yield DiscoveryError(path=directory, message=str(e))
+        # サブディレクトリは見つかった順に走査する（スタックには逆順に積む）
+        stack.extend(reversed(subdirectories))
+
+
+def discovery_sort_key(path: str, top: str) -> Tuple[Tuple[int, str], ...]:
+    """iter_csv_files(top) の検索順に並べるためのキーを返す
+
+    Args:
+        path (str): iter_csv_files(top) で見つかったファイルのパスまたは論理パス
+        top (str): 検索の起点となるディレクトリ
+
+    Returns:
+        Tuple[Tuple[int, str], ...]: パスの要素毎の (0: ファイル / 1: ディレクトリ, 名前) のタプル
+            （同じディレクトリではファイルがサブディレクトリより前に、それぞれ名前の順に並ぶ）
+    """
+    archive_path, member = split_archive_member(path=path)
+    parts: list[str] = os.path.relpath(archive_path, top).split(os.sep)
+    key: Tuple[Tuple[int, str], ...] = tuple((1, part) for part in parts[:-1]) + ((0, parts[-1]),)
+    return key if member is None else key + ((0, member),)
+
+
+def iter_csv_roots(
+    roots: Iterable[str],
+    include: Iterable[str] = DEFAULT_INCLUDE_PATTERNS,
+    exclude: Iterable[str] = (),
+    max_depth: int | None = None,
+) -> Iterator[DiscoveredFile | DiscoveryError]:
+    """複数の検索の起点（ディレクトリまたはファイル）のCSVファイルを、起点の順に1件ずつ返す
+
+    Args:
+        roots (Iterable[str]): 検索の起点となるディレクトリまたはファイル
+        include (Iterable[str]): 検索対象とするファイルのパターン（ディレクトリの起点のみ、iter_csv_files を参照）
+        exclude (Iterable[str]): 除外するファイル・ディレクトリのパターン（iter_csv_files を参照）
+        max_depth (int | None): 走査するサブディレクトリの深さ（ディレクトリの起点のみ、None: 制限なし）
+
+    Returns:
+        Iterator[DiscoveredFile | DiscoveryError]: 見つかったファイル、または読み込めなかったディレクトリ・ファイル
+
+    Note:
+        - ディレクトリの起点は iter_csv_files で検索し、パターンはその起点からの相対パスと比較する
+        - ファイルの起点は include に関わらず返す（.zip ファイルはアーカイブ内のCSVファイルに展開する）
+    """
+    include = tuple(include)
+    exclude = tuple(exclude)
+    root: str
+    for root in roots:
+        try:
+            stat: os.stat_result = os.stat(root)
+        except OSError as e:
+            yield DiscoveryError(path=root, message=str(e))
+            continue
+        if os.path.isdir(root):
+            yield from iter_csv_files(top=root, include=include, exclude=exclude, max_depth=max_depth)
+        elif os.path.splitext(root)[1] == ".zip":
+            yield from iter_archive_files(
+                archive_path=root,
+                relative_path=os.path.basename(root),
+                mtime_ns=stat.st_mtime_ns,
+                exclude=exclude,
+            )
+        else:
+            yield DiscoveredFile(path=root, size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+
+
+def iter_in_background(items: Iterable[T]) -> Iterator[T]:
+    """イテレータをバックグラウンドのスレッドで先読みし、同じ順序で1件ずつ返す
+
+    Args:
+        items (Iterable[T]): 先読みするイテレータ（ディレクトリの走査など）
+
+    Returns:
+        Iterator[T]: items と同じ要素
+
+    Raises:
+        Exception: items の取得中に発生した例外（取得済みの要素を返した後に送出する）
+
+    Note:
+        - 呼び出し側が途中で読み込みをやめた場合は、次の要素の取得後にスレッドを終了する
+    """
+    queue: Queue[Tuple[bool, T | BaseException | None]] = Queue()
+    stopped: threading.Event = threading.Event()
+
+    def produce() -> None:
+        try:
+            item: T
+            for item in items:
+                if stopped.is_set():
+                    return
+                queue.put((True, item))
+            queue.put((False, None))
+        except BaseException as e:
+            queue.put((False, e))
+
+    thread: threading.Thread = threading.Thread(target=produce, name="csv-discovery", daemon=True)
+    thread.start()
+    try:
+        while True:
+            has_item, value = queue.get()
+            if not has_item:
+                if isinstance(value, BaseException):
+                    raise value
+                return
+            yield value  # type: ignore[misc]
+    finally:
+        stopped.set()
@@ -0,0 +1,346 @@
+"""
+CSVの重複行・重複キーの検出（メモリに収まらない大きさのファイルも一定のメモリ使用量で処理する）
+
+値の個数のカウントと同じ1回の読み込みで、行全体（またはキー項目の値の組み合わせ）が同じデータ行を探し、
+重複する行数と、重複する行の組毎の行番号の例を求めます。
+
+集計方法:
+- キー（行全体またはキー項目の値）毎に、行数と先頭の DUPLICATE_SAMPLE_ROWS 件の行番号を辞書で数える
+- 辞書の推定メモリ使用量が上限（memory_limit）を超えたら、辞書の内容とそれ以降の行を
+  キーのハッシュ値（crc32）で DUPLICATE_PARTITIONS 個の一時ファイルに振り分ける（ハッシュ分割）
+- 集計結果を求める際に一時ファイルを1つずつ読み込んで同じキーの行数を正確に数える
+  （同じキーの行は必ず同じ一時ファイルに入る。1つの一時ファイルの内容が上限を超える場合は、
+  ハッシュ値の別のビットでさらに分割してから数える）
+- 一時ファイルは cleanup() で削除する
+
+並列処理:
+- ファイルを分割して別プロセスで集計した結果は、辞書と一時ファイルの一覧をマージする
+  （振り分けにはプロセスによらないハッシュ値を使うため、同じキーは同じ番号の一時ファイルに入る）
+- メモリ使用量の上限はプロセス毎に適用する
+"""
+
+import csv
+import heapq
+import os
+import shutil
+import tempfile
+import zlib
+from operator import itemgetter
+from typing import Any, Callable, Dict, Iterator, NamedTuple, TextIO, Tuple
+
+DEFAULT_DUPLICATE_MEMORY: int = 256 * 1024 * 1024  # 重複の検出に使うメモリ使用量の上限（既定値、バイト）
+DUPLICATE_PARTITIONS: int = 64  # 一時ファイルに振り分ける数（ハッシュ値の 6 ビット分）
+DUPLICATE_SAMPLE_GROUPS: int = 10  # 結果に含める重複する行の組の数（先頭の行番号の順）
+DUPLICATE_SAMPLE_ROWS: int = 5  # 重複する行の組毎に記録する行番号の数
+_PARTITION_BITS: int = 6  # 1回の振り分けに使うハッシュ値のビット数（DUPLICATE_PARTITIONS = 2 ** 6）
+_MAX_PARTITION_DEPTH: int = 4  # 一時ファイルを分割し直す回数の上限（crc32 の 32 ビットの範囲）
+_ENTRY_SIZE: int = 160  # 辞書の1件あたりの推定メモリ使用量（キーの値を除く、バイト）
+_VALUE_SIZE: int = 56  # キーの値1つあたりの推定メモリ使用量（文字数分を除く、バイト）
+
+DuplicateKey = Tuple[str, ...] | str  # 行全体・複数のキー項目の場合は値のタプル、キー項目が1つの場合は値
+
+
+class DuplicateGroup(NamedTuple):
+    """重複する行の組の1件分"""
+
+    row_count: int  # 同じキーの行数
+    row_indexes: list[int]  # 先頭の行番号（DUPLICATE_SAMPLE_ROWS 件まで、ファイルの行番号）
+    key: list[str]  # キー項目の値（行全体の場合は空リスト）
+
+
+class DuplicateSummary(NamedTuple):
+    """1ファイル分の重複の集計結果"""
+
+    key_fields: list[str]  # キー項目のフィールド名（行全体の場合は空リスト）
+    duplicate_rows: int  # 先に同じキーの行がある行数（最初の1行を除いた重複行の数）
+    duplicate_groups: int  # 重複する行の組の数（2行以上ある異なるキーの数）
+    groups: list[DuplicateGroup]  # 先頭の行番号の順の重複する行の組（DUPLICATE_SAMPLE_GROUPS 件まで）
+    missing_fields: list[str]  # ヘッダ行に無いキー項目（ある場合は重複を確認しない）
+    spilled: bool  # メモリ使用量の上限を超えたため一時ファイルを使ったか
+
+
+def _partition_hash(key: DuplicateKey) -> int:
+    """一時ファイルの振り分けに使う、プロセスによらないキーのハッシュ値を返す"""
+    text: str = key if isinstance(key, str) else "\x1f".join(key)
+    return zlib.crc32(text.encode("utf-8", "surrogatepass"))
+
+
+def _entry_size(key: DuplicateKey) -> int:
+    """辞書の1件分の推定メモリ使用量を返す（全角文字を含む値は1文字2バイトとみなす）"""
+    if isinstance(key, str):
+        return _ENTRY_SIZE + _VALUE_SIZE + 2 * len(key)
+    return _ENTRY_SIZE + _VALUE_SIZE * len(key) + 2 * sum(map(len, key))
+
+
+def _add_fragment(entries: Dict[DuplicateKey, list[int]], key: DuplicateKey, entry: list[int]) -> int:
+    """キー毎の行数と行番号（[行数, 行番号...]）を辞書に加え、増えた推定メモリ使用量を返す"""
+    current: list[int] | None = entries.get(key)
+    if current is None:
+        entries[key] = entry
+        return _entry_size(key=key)
+    current[0] += entry[0]
+    current[1:] = sorted(current[1:] + entry[1:])[:DUPLICATE_SAMPLE_ROWS]
+    return 0
+
+
+class DuplicateFinder:
+    """データ行の重複を数える（マージ可能、メモリ使用量が上限を超えた分は一時ファイルに書き出す）
+
+    Attributes:
+        key_fields (list[str]): キー項目のフィールド名（行全体の場合は空リスト）
+        missing_fields (list[str]): ヘッダ行に無いキー項目（ある場合は重複を数えない）
+        memory_limit (int): 辞書の推定メモリ使用量の上限（バイト）
+    """
+
+    def __init__(
+        self,
+        header: list[str],
+        key_fields: list[str],
+        memory_limit: int = DEFAULT_DUPLICATE_MEMORY,
+        temp_directory: str | None = None,
+    ) -> None:
+        self.key_fields: list[str] = key_fields
+        self.missing_fields: list[str] = [field for field in key_fields if field not in header]
+        self.memory_limit: int = memory_limit
+        self._temp_directory: str | None = temp_directory
+        # キー項目の列位置（項目名が重複する場合は csv.DictReader と同様に最後の列）
+        name_to_index: Dict[str, int] = {name: index for index, name in enumerate(header)}
+        self._key_columns: list[int] = [name_to_index[field] for field in key_fields if field in name_to_index]
+        self._key_getter: Callable[[list[str]], Any] | None = itemgetter(*self._key_columns) if key_fields else None
+        self._key_width: int = max(self._key_columns, default=-1) + 1
+        self._entries: Dict[DuplicateKey, list[int]] = {}  # キー毎の [行数, 行番号...]（範囲内のレコード番号）
+        self._memory: int = 0
+        # 一時ファイルの番号毎の (パス, 行番号に加える値) のリスト（一時ファイルに書き出していない場合は None）
+        self._partitions: list[list[Tuple[str, int]]] | None = None
+        self._spill_paths: list[str] = []
+        self._spill_files: list[TextIO] | None = None
+        self._spill_writers: list[Any] = []
+        self._directories: list[str] = []  # 削除する一時ディレクトリ（マージした集計結果のものを含む）
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # ワーカープロセスから結果を返す際はファイルを閉じてから送る（itemgetter は送れないため作り直す）
+        self.flush()
+        return {**self.__dict__, "_key_getter": None, "_spill_writers": []}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        if self.key_fields:
+            self._key_getter = itemgetter(*self._key_columns)
+
+    def _key(self, row: list[str]) -> DuplicateKey:
+        if self._key_getter is None:
+            return tuple(row)
+        if len(row) < self._key_width:
+            row = row + [""] * (self._key_width - len(row))  # フィールド数が不足する行の足りない列は空の値
+        return self._key_getter(row)
+
+    def _open_spill_files(self) -> None:
+        """自身の一時ファイルを開く（初回は一時ディレクトリとファイルを作成する）"""
+        if not self._spill_paths:
+            directory: str = tempfile.mkdtemp(prefix="count_CSV_FieldValue_", dir=self._temp_directory)
+            self._directories.append(directory)
+            self._spill_paths = [os.path.join(directory, f"{index:02d}.csv") for index in range(DUPLICATE_PARTITIONS)]
+            if self._partitions is None:
+                self._partitions = [[] for _ in range(DUPLICATE_PARTITIONS)]
+            for partition, path in zip(self._partitions, self._spill_paths):
+                partition.append((path, 0))
+        self._spill_files = [open(path, mode="a", encoding="utf-8", newline="") for path in self._spill_paths]
+        self._spill_writers = [csv.writer(file) for file in self._spill_files]
+
+    def _spill(self, key: DuplicateKey, entry: list[int]) -> None:
+        """キー毎の行数と行番号を一時ファイルに書き出す"""
+        if self._spill_files is None:
+            self._open_spill_files()
+        writer: Any = self._spill_writers[_partition_hash(key=key) % DUPLICATE_PARTITIONS]
+        indexes: str = " ".join(map(str, entry[1:]))
+        writer.writerow((entry[0], indexes, key) if isinstance(key, str) else (entry[0], indexes, *key))
+
+    def _spill_entries(self) -> None:
+        """辞書の内容を一時ファイルに書き出して空にする（以降の行は一時ファイルに書き出す）"""
+        if self._spill_files is None:
+            self._open_spill_files()
+        key: DuplicateKey
+        entry: list[int]
+        for key, entry in self._entries.items():
+            self._spill(key=key, entry=entry)
+        self._entries = {}
+        self._memory = 0
+
+    def add_row(self, record_index: int, row: list[str]) -> None:
+        """データ行を追加する
+
+        Args:
+            record_index (int): 範囲内のレコード番号（0始まり、空行を含む）
+            row (list[str]): csv.reader が返すデータ行（空行以外）
+
+        Returns:
+            None
+        """
+        if self.missing_fields:
+            return
+        key: DuplicateKey = self._key(row=row)
+        if self._partitions is not None:
+            self._spill(key=key, entry=[1, record_index])
+            return
+        entry: list[int] | None = self._entries.get(key)
+        if entry is not None:
+            entry[0] += 1
+            if len(entry) <= DUPLICATE_SAMPLE_ROWS:
+                entry.append(record_index)
+            return
+        self._entries[key] = [1, record_index]
+        self._memory += _entry_size(key=key)
+        if self._memory > self.memory_limit:
+            self._spill_entries()
+
+    def flush(self) -> None:
+        """一時ファイルへの書き込みを終えてファイルを閉じる（以降も追加・マージできる）
+
+        Returns:
+            None
+        """
+        if self._spill_files is None:
+            return
+        file: TextIO
+        for file in self._spill_files:
+            file.close()
+        self._spill_files = None
+        self._spill_writers = []
+
+    def merge(self, other: "DuplicateFinder", record_offset: int) -> None:
+        """別の集計結果をマージする
+
+        Args:
+            other (DuplicateFinder): マージする集計結果（キー項目が同じであること）
+            record_offset (int): other の行番号に加える値（ファイル上で前にある範囲のレコード数）
+
+        Returns:
+            None
+
+        Note:
+            - other の一時ファイルは移動せずに一覧に加える（削除は self の cleanup() で行う）
+        """
+        self._directories.extend(other._directories)
+        other._directories = []
+        if other._partitions is not None and self._partitions is None:
+            self._spill_entries()
+        key: DuplicateKey
+        entry: list[int]
+        for key, entry in other._entries.items():
+            shifted: list[int] = [entry[0], *(index + record_offset for index in entry[1:])]
+            if self._partitions is not None:
+                self._spill(key=key, entry=shifted)
+                continue
+            self._memory += _add_fragment(entries=self._entries, key=key, entry=shifted)
+            if self._memory > self.memory_limit:
+                self._spill_entries()
+        if other._partitions is not None and self._partitions is not None:
+            partition: list[Tuple[str, int]]
+            other_partition: list[Tuple[str, int]]
+            for partition, other_partition in zip(self._partitions, other._partitions):
+                partition.extend((path, offset + record_offset) for path, offset in other_partition)
+
+    def _read_fragments(self, sources: list[Tuple[str, int]]) -> Iterator[Tuple[DuplicateKey, list[int]]]:
+        """一時ファイルからキーと [行数, 行番号...] を読み込む"""
+        path: str
+        offset: int
+        for path, offset in sources:
+            if not os.path.exists(path):
+                continue  # 1行も振り分けられなかった一時ファイル
+            with open(path, encoding="utf-8", newline="") as file:
+                record: list[str]
+                for record in csv.reader(file):
+                    key: DuplicateKey = record[2] if len(self.key_fields) == 1 else tuple(record[2:])
+                    yield key, [int(record[0]), *(int(index) + offset for index in record[1].split())]
+
+    def _iter_partition(self, sources: list[Tuple[str, int]], depth: int) -> Iterator[Dict[DuplicateKey, list[int]]]:
+        """一時ファイルの内容をキー毎に数えた辞書を返す（上限を超える場合は分割し直して複数返す）"""
+        entries: Dict[DuplicateKey, list[int]] = {}
+        memory: int = 0
+        key: DuplicateKey
+        entry: list[int]
+        for key, entry in self._read_fragments(sources=sources):
+            memory += _add_fragment(entries=entries, key=key, entry=entry)
+            if memory > self.memory_limit and depth < _MAX_PARTITION_DEPTH:
+                entries = {}
+                yield from self._split_partition(sources=sources, depth=depth + 1)
+                return
+        yield entries
+
+    def _split_partition(self, sources: list[Tuple[str, int]], depth: int) -> Iterator[Dict[DuplicateKey, list[int]]]:
+        """一時ファイルの内容をハッシュ値の別のビットで振り分け直し、それぞれを数える"""
+        directory: str = tempfile.mkdtemp(prefix="count_CSV_FieldValue_", dir=self._temp_directory)
+        try:
+            paths: list[str] = [os.path.join(directory, f"{index:02d}.csv") for index in range(DUPLICATE_PARTITIONS)]
+            files: list[TextIO] = [open(path, mode="w", encoding="utf-8", newline="") for path in paths]
+            try:
+                writers: list[Any] = [csv.writer(file) for file in files]
+                shift: int = _PARTITION_BITS * depth
+                key: DuplicateKey
+                entry: list[int]
+                for key, entry in self._read_fragments(sources=sources):
+                    indexes: str = " ".join(map(str, entry[1:]))
+                    writers[(_partition_hash(key=key) >> shift) % DUPLICATE_PARTITIONS].writerow(
+                        (entry[0], indexes, key) if isinstance(key, str) else (entry[0], indexes, *key)
+                    )
+            finally:
+                for file in files:
+                    file.close()
+            path: str
+            for path in paths:
+                yield from self._iter_partition(sources=[(path, 0)], depth=depth)
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    def summarize(self, row_index_offset: int) -> DuplicateSummary:
+        """重複する行数と、先頭の行番号の順に DUPLICATE_SAMPLE_GROUPS 件の重複する行の組を返す
+
+        Args:
+            row_index_offset (int): 範囲内のレコード番号に加えてファイルの行番号にする値
+                （ファイル全体を集計した場合は 2。1行目はヘッダ）
+
+        Returns:
+            DuplicateSummary: 集計結果
+        """
+        self.flush()
+        tables: Iterator[Dict[DuplicateKey, list[int]]] = iter([self._entries])
+        if self._partitions is not None:
+            tables = (
+                entries for sources in self._partitions for entries in self._iter_partition(sources=sources, depth=0)
+            )
+        duplicate_rows: int = 0
+        duplicate_groups: int = 0
+        samples: list[Tuple[DuplicateKey, list[int]]] = []
+        entries: Dict[DuplicateKey, list[int]]
+        for entries in tables:
+            duplicates: list[Tuple[DuplicateKey, list[int]]] = [item for item in entries.items() if item[1][0] > 1]
+            duplicate_groups += len(duplicates)
+            duplicate_rows += sum(entry[0] - 1 for _, entry in duplicates)
+            samples = heapq.nsmallest(DUPLICATE_SAMPLE_GROUPS, samples + duplicates, key=lambda item: item[1][1])
+        return DuplicateSummary(
+            key_fields=self.key_fields,
+            duplicate_rows=duplicate_rows,
+            duplicate_groups=duplicate_groups,
+            groups=[
+                DuplicateGroup(
+                    row_count=entry[0],
+                    row_indexes=[index + row_index_offset for index in entry[1:]],
+                    key=[] if not self.key_fields else [key] if isinstance(key, str) else list(key),
+                )
+                for key, entry in samples
+            ],
+            missing_fields=self.missing_fields,
+            spilled=self._partitions is not None,
+        )
+
+    def cleanup(self) -> None:
+        """一時ファイルを削除する（マージした集計結果の一時ファイルを含む）
+
+        Returns:
+            None
+        """
+        self.flush()
+        directory: str
+        for directory in self._directories:
+            shutil.rmtree(directory, ignore_errors=True)
+        self._directories = []
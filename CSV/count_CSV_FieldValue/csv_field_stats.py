@@ -0,0 +1,390 @@
+"""
+CSVのフィールド毎の統計情報（値の種類数・文字数・空白のみの値の割合・頻出値）の集計
+
+値の個数のカウントと同じ1回の読み込みで、フィールド毎に以下を集計します。
+- 値の種類数（HyperLogLog による推定値、空の値は除く）
+- 値の最小・最大・平均文字数（空の値は除く）
+- 空白文字だけからなる値の割合（空でない値に対する割合）
+- 出現回数の多い上位 K 件の値（Space-Saving による推定、空の値は除く）
+- 値の型（整数・小数・日付・日時・真偽値・文字列）と型に合わない値の個数（csv_type_inference）
+
+メモリ使用量:
+- 値の種類数は値そのものを保持せず、フィールド毎に 2^HLL_PRECISION バイトのレジスタだけで推定する
+- 頻出値はフィールド毎に K × TOP_K_CAPACITY_FACTOR 件のカウンタだけを保持する
+- 行は STATS_BATCH_ROWS 行ずつまとめて列毎に処理し、処理後は破棄する
+
+並列処理:
+- HyperLogLog はレジスタ毎の最大値でマージでき、ハッシュ値はプロセスに依存しない（BLAKE2b）ため、
+  ファイルを分割して別プロセスで集計した結果をマージしても、1プロセスで集計した場合と同じ結果になる
+- Space-Saving もマージできるが、推定値（と誤差の上限）は分割の仕方によって変わることがある
+"""
+
+import hashlib
+import heapq
+import math
+from collections import Counter
+from itertools import islice, zip_longest
+from typing import Dict, Iterable, NamedTuple
+
+from csv_type_inference import FieldType, TypeCounter
+
+HLL_PRECISION: int = 12  # HyperLogLog のレジスタ数の指数（2^12 = 4096 レジスタ、標準誤差 約1.6%）
+STATS_BATCH_ROWS: int = 4096  # 列毎にまとめて処理する行数
+TOP_K_CAPACITY_FACTOR: int = 10  # 上位 K 件を求めるために保持するカウンタ数の K に対する倍率
+
+
+class FieldStats(NamedTuple):
+    """1フィールド分の統計情報"""
+
+    distinct_count: int  # 値の種類数（推定値）
+    min_length: int  # 最小文字数（値が無い場合は 0）
+    max_length: int  # 最大文字数（値が無い場合は 0）
+    average_length: float  # 平均文字数（値が無い場合は 0.0）
+    whitespace_ratio: float  # 空白文字だけからなる値の割合（値が無い場合は 0.0）
+
+
+class TopValue(NamedTuple):
+    """頻出値の1件分"""
+
+    value: str  # 値
+    count: int  # 出現回数の推定値（実際の出現回数は count - error 以上 count 以下）
+    error: int  # 推定値の誤差の上限（0 の場合は正確な出現回数）
+
+
+def hash_value(value: str) -> int:
+    """値の64ビットハッシュを返す（プロセスや PYTHONHASHSEED に依存しない）
+
+    Args:
+        value (str): 対象の値
+
+    Returns:
+        int: 64ビットの符号なし整数
+    """
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class HyperLogLog:
+    """値の種類数を推定するための HyperLogLog スケッチ
+
+    Attributes:
+        precision (int): レジスタ数の指数（レジスタ数は 2^precision）
+        registers (bytearray): 各レジスタの値（ハッシュ値の先頭の0の個数 + 1 の最大値）
+    """
+
+    def __init__(self, precision: int = HLL_PRECISION) -> None:
+        self.precision: int = precision
+        self.registers: bytearray = bytearray(1 << precision)
+
+    def update(self, values: Iterable[str]) -> None:
+        """値を追加する
+
+        Args:
+            values (Iterable[str]): 追加する値（重複していてもよい）
+
+        Returns:
+            None
+        """
+        registers: bytearray = self.registers
+        index_shift: int = 64 - self.precision
+        rank_mask: int = (1 << index_shift) - 1
+        value: str
+        for value in values:
+            hashed: int = hash_value(value)
+            index: int = hashed >> index_shift
+            rank: int = index_shift - (hashed & rank_mask).bit_length() + 1
+            if rank > registers[index]:
+                registers[index] = rank
+
+    def merge(self, other: "HyperLogLog") -> None:
+        """別のスケッチをマージする（両方に追加した場合と同じ結果になる）
+
+        Args:
+            other (HyperLogLog): マージするスケッチ（precision が同じであること）
+
+        Returns:
+            None
+
+        Raises:
+            ValueError: precision が異なる場合
+        """
+        if other.precision != self.precision:
+            raise ValueError(f"HyperLogLog の precision が異なります: {self.precision}, {other.precision}")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def estimate(self) -> int:
+        """値の種類数の推定値を返す
+
+        Returns:
+            int: 推定値（値の種類が少ない場合は Linear Counting で補正する）
+        """
+        register_count: int = len(self.registers)
+        alpha: float = 0.7213 / (1 + 1.079 / register_count)
+        raw_estimate: float = alpha * register_count * register_count / sum(2.0**-rank for rank in self.registers)
+        zero_count: int = self.registers.count(0)
+        if raw_estimate <= 2.5 * register_count and zero_count:
+            return round(register_count * math.log(register_count / zero_count))
+        return round(raw_estimate)
+
+
+class SpaceSaving:
+    """出現回数の多い値を固定サイズのカウンタで推定する Space-Saving スケッチ
+
+    Attributes:
+        capacity (int): 保持するカウンタ数の上限
+        counts (Dict[str, int]): 値毎の出現回数の推定値（実際の出現回数以上）
+        errors (Dict[str, int]): 値毎の推定値の誤差の上限
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity: int = capacity
+        self.counts: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+
+    def _floor(self) -> int:
+        """保持していない値の出現回数の上限（カウンタが満杯でない場合は 0）"""
+        return min(self.counts.values()) if len(self.counts) >= self.capacity else 0
+
+    def _merge_counts(
+        self, other_counts: Dict[str, int], other_errors: Dict[str, int] | None, other_floor: int
+    ) -> None:
+        """カウンタを合算し、推定値の大きい順に capacity 件だけ残す"""
+        floor: int = self._floor()
+        other_errors = other_errors or {}
+        keys: set[str] = self.counts.keys() | other_counts.keys()
+        merged: Dict[str, int] = {
+            key: self.counts.get(key, floor) + other_counts.get(key, other_floor) for key in keys
+        }
+        # 推定値が同じ場合は値の順で選ぶ（実行毎に結果が変わらないようにする）
+        kept: list[str] = heapq.nsmallest(self.capacity, merged, key=lambda key: (-merged[key], key))
+        self.errors = {
+            key: (self.errors[key] if key in self.counts else floor)
+            + (other_errors.get(key, 0) if key in other_counts else other_floor)
+            for key in kept
+        }
+        self.counts = {key: merged[key] for key in kept}
+
+    def update(self, counts: Counter[str]) -> None:
+        """正確に数えた値毎の出現回数を追加する
+
+        Args:
+            counts (Counter[str]): 値毎の出現回数
+
+        Returns:
+            None
+        """
+        self._merge_counts(other_counts=counts, other_errors=None, other_floor=0)
+
+    def merge(self, other: "SpaceSaving") -> None:
+        """別のスケッチをマージする
+
+        Args:
+            other (SpaceSaving): マージするスケッチ
+
+        Returns:
+            None
+        """
+        self._merge_counts(other_counts=other.counts, other_errors=other.errors, other_floor=other._floor())
+
+    def top(self, k: int) -> list[TopValue]:
+        """推定値の大きい順に k 件の値を返す
+
+        Args:
+            k (int): 返す件数
+
+        Returns:
+            list[TopValue]: 頻出値のリスト
+        """
+        keys: list[str] = heapq.nsmallest(k, self.counts, key=lambda key: (-self.counts[key], key))
+        return [TopValue(value=key, count=self.counts[key], error=self.errors[key]) for key in keys]
+
+
+class FieldStatsCollector:
+    """列位置毎の統計情報と頻出値を集計する（マージ可能）
+
+    Attributes:
+        field_count (int): 集計する列数（ヘッダ行のフィールド数、余剰フィールドは集計しない）
+        collect_stats (bool): 統計情報（値の種類数・文字数・空白のみの値の割合）を集計するか
+        top_k (int): 頻出値を求める件数（0 の場合は求めない）
+        infer_types (bool): 値の型を推定するか
+        value_counts (list[int]): 列位置毎の空でない値の個数
+        min_lengths (list[int]): 列位置毎の最小文字数（値が無い場合は 0）
+        max_lengths (list[int]): 列位置毎の最大文字数
+        total_lengths (list[int]): 列位置毎の文字数の合計
+        whitespace_counts (list[int]): 列位置毎の空白文字だけからなる値の個数
+        sketches (list[HyperLogLog]): 列位置毎の値の種類数のスケッチ（collect_stats の場合のみ）
+        heavy_hitters (list[SpaceSaving]): 列位置毎の頻出値のスケッチ（top_k > 0 の場合のみ）
+        type_counter (TypeCounter | None): 列位置毎の型別の値の個数（infer_types の場合のみ）
+    """
+
+    def __init__(
+        self,
+        field_count: int,
+        collect_stats: bool = True,
+        top_k: int = 0,
+        infer_types: bool = False,
+        precision: int = HLL_PRECISION,
+    ) -> None:
+        self.field_count: int = field_count
+        self.collect_stats: bool = collect_stats
+        self.top_k: int = top_k
+        self.infer_types: bool = infer_types
+        self.value_counts: list[int] = [0] * field_count
+        self.min_lengths: list[int] = [0] * field_count
+        self.max_lengths: list[int] = [0] * field_count
+        self.total_lengths: list[int] = [0] * field_count
+        self.whitespace_counts: list[int] = [0] * field_count
+        self.sketches: list[HyperLogLog] = (
+            [HyperLogLog(precision=precision) for _ in range(field_count)] if collect_stats else []
+        )
+        self.heavy_hitters: list[SpaceSaving] = (
+            [SpaceSaving(capacity=top_k * TOP_K_CAPACITY_FACTOR) for _ in range(field_count)] if top_k > 0 else []
+        )
+        self.type_counter: TypeCounter | None = TypeCounter(field_count=field_count) if infer_types else None
+        self._pending_rows: list[list[str]] = []
+
+    @property
+    def types_only(self) -> bool:
+        """値の型の推定だけを行うか（行をためずに TypeCounter.update_rows で集計できる）"""
+        return self.type_counter is not None and not self.collect_stats and self.top_k <= 0
+
+    def add_row(self, row: list[str]) -> None:
+        """データ行を追加する（STATS_BATCH_ROWS 行たまるとまとめて集計する）
+
+        Args:
+            row (list[str]): csv.reader が返すデータ行（空行以外）
+
+        Returns:
+            None
+        """
+        self._pending_rows.append(row)
+        if len(self._pending_rows) >= STATS_BATCH_ROWS:
+            self.flush()
+
+    def flush(self) -> None:
+        """追加済みで未集計の行を列毎に集計する
+
+        Returns:
+            None
+
+        Note:
+            - フィールド数が不足する行の足りない列は空の値として扱う
+            - 値の種類数と頻出値は、まとめた行の中で値毎に数えてからスケッチに追加する
+            - 値の型は列毎にまとめて判定する（TypeCounter.update）
+        """
+        if not self._pending_rows:
+            return
+        columns = islice(zip_longest(*self._pending_rows, fillvalue=""), self.field_count)
+        self._pending_rows = []
+
+        column: int
+        values: tuple[str, ...]
+        for column, values in enumerate(columns):
+            if self.type_counter is not None:
+                self.type_counter.update(column=column, values=values)
+            if not self.collect_stats and self.top_k <= 0:
+                continue
+            non_empty: list[str] = [value for value in values if value]
+            if not non_empty:
+                continue
+            value_counts: Counter[str] | None = Counter(non_empty) if self.top_k > 0 else None
+            if self.collect_stats:
+                lengths: list[int] = [len(value) for value in non_empty]
+                shortest: int = min(lengths)
+                if not self.value_counts[column] or shortest < self.min_lengths[column]:
+                    self.min_lengths[column] = shortest
+                self.max_lengths[column] = max(self.max_lengths[column], max(lengths))
+                self.total_lengths[column] += sum(lengths)
+                self.whitespace_counts[column] += sum(1 for value in non_empty if value.isspace())
+                self.sketches[column].update(value_counts.keys() if value_counts is not None else set(non_empty))
+            if value_counts is not None:
+                self.heavy_hitters[column].update(value_counts)
+            self.value_counts[column] += len(non_empty)
+
+    def merge(self, other: "FieldStatsCollector") -> None:
+        """別の集計結果をマージする
+
+        Args:
+            other (FieldStatsCollector): マージする集計結果（field_count などの設定が同じであること）
+
+        Returns:
+            None
+        """
+        self.flush()
+        other.flush()
+        column: int
+        for column in range(self.field_count):
+            if other.value_counts[column]:
+                if not self.value_counts[column] or other.min_lengths[column] < self.min_lengths[column]:
+                    self.min_lengths[column] = other.min_lengths[column]
+            self.max_lengths[column] = max(self.max_lengths[column], other.max_lengths[column])
+            self.total_lengths[column] += other.total_lengths[column]
+            self.value_counts[column] += other.value_counts[column]
+            self.whitespace_counts[column] += other.whitespace_counts[column]
+            if self.collect_stats:
+                self.sketches[column].merge(other.sketches[column])
+            if self.top_k > 0:
+                self.heavy_hitters[column].merge(other.heavy_hitters[column])
+        if self.type_counter is not None and other.type_counter is not None:
+            self.type_counter.merge(other=other.type_counter)
+
+    def summarize(self, header: list[str]) -> Dict[str, FieldStats]:
+        """列位置毎の集計結果を項目名毎の統計情報に変換する
+
+        Args:
+            header (list[str]): ヘッダ行のフィールド名リスト
+
+        Returns:
+            Dict[str, FieldStats]: キー: 項目名, 値: 統計情報
+
+        Note:
+            - 項目名が重複する場合は、値の個数と同様に最後の列の統計情報を採用する
+        """
+        self.flush()
+        name_to_index: Dict[str, int] = {name: index for index, name in enumerate(header)}
+        field_stats: Dict[str, FieldStats] = {}
+        name: str
+        index: int
+        for name, index in name_to_index.items():
+            value_count: int = self.value_counts[index]
+            field_stats[name] = FieldStats(
+                distinct_count=self.sketches[index].estimate() if value_count else 0,
+                min_length=self.min_lengths[index],
+                max_length=self.max_lengths[index],
+                average_length=self.total_lengths[index] / value_count if value_count else 0.0,
+                whitespace_ratio=self.whitespace_counts[index] / value_count if value_count else 0.0,
+            )
+        return field_stats
+
+    def summarize_top_values(self, header: list[str]) -> Dict[str, list[TopValue]]:
+        """列位置毎の頻出値を項目名毎の上位 top_k 件に変換する
+
+        Args:
+            header (list[str]): ヘッダ行のフィールド名リスト
+
+        Returns:
+            Dict[str, list[TopValue]]: キー: 項目名, 値: 出現回数の多い順の頻出値
+
+        Note:
+            - 項目名が重複する場合は、値の個数と同様に最後の列の頻出値を採用する
+        """
+        self.flush()
+        name_to_index: Dict[str, int] = {name: index for index, name in enumerate(header)}
+        return {name: self.heavy_hitters[index].top(k=self.top_k) for name, index in name_to_index.items()}
+
+    def summarize_types(self, header: list[str]) -> Dict[str, FieldType]:
+        """列位置毎の型別の値の個数を項目名毎の型の推定結果に変換する
+
+        Args:
+            header (list[str]): ヘッダ行のフィールド名リスト
+
+        Returns:
+            Dict[str, FieldType]: キー: 項目名, 値: 推定した型とその型に合わない値の個数
+
+        Note:
+            - 項目名が重複する場合は、値の個数と同様に最後の列の推定結果を採用する
+        """
+        self.flush()
+        if self.type_counter is None:
+            return {}
+        name_to_index: Dict[str, int] = {name: index for index, name in enumerate(header)}
+        return {name: self.type_counter.summarize(column=index) for name, index in name_to_index.items()}
@@ -0,0 +1,211 @@
+"""
+CSVのグループ項目の値毎の値の個数の集計（読み込み日・連携元システム毎の充填率など）
+
+値の個数のカウントと同じ1回の読み込みで、グループ項目（1つ以上のフィールド）の値の組み合わせ毎に
+データ行数と各フィールドに値が存在する行数を数えます。
+
+集計方法:
+- グループ項目の値（C 実装の itemgetter で取り出す）をキーとした辞書で、グループ毎に
+  データ行数と列位置ごとの値が存在する行数（Counter.update(compress(...))、ファイル全体と同じ方法）を数える
+- 異なるグループの数が上限（capacity）に達した後に現れたグループの行は「その他」のグループにまとめて数える
+  （上限に達する前に現れたグループの行数は正確）
+- 結果のグループはファイル内で最初に現れた順に並べ、「その他」は最後に置く
+- 集計する行の列位置ごとの行数はグループ毎にだけ数え、ファイル全体の行数はグループ毎の行数の合計
+  （total_positional_count）から求める（1行あたりの追加の処理はキーの取り出しと辞書の検索だけ）
+
+並列処理:
+- ファイルを分割して別プロセスで集計した結果は、ファイル上で前の範囲から順にグループ毎に合算してマージする
+  （先頭以外の範囲で異なるグループの数が上限に達した場合は、ファイル全体では上限までに現れたグループの行が
+  その範囲の「その他」に含まれている可能性があるため、呼び出し側でファイル全体を読み込み直して数える）
+"""
+
+from collections import Counter
+from itertools import compress
+from operator import itemgetter
+from typing import Any, Callable, Dict, NamedTuple, Tuple
+
+DEFAULT_GROUP_CAPACITY: int = 1000  # 集計する異なるグループの数の上限（既定値）
+
+GroupKey = Tuple[str, ...] | str  # グループ項目が複数の場合は値のタプル、1つの場合は値
+
+
+class GroupCount(NamedTuple):
+    """グループ1件分の値の個数"""
+
+    values: list[str] | None  # グループ項目の値（上限を超えたグループをまとめた「その他」の場合は None）
+    data_row_count: int  # グループのデータ行数
+    counts: Dict[str, int]  # 各フィールド名と値が存在する行数
+
+
+class GroupSummary(NamedTuple):
+    """1ファイル分のグループ毎の集計結果"""
+
+    group_fields: list[str]  # グループ項目のフィールド名
+    groups: list[GroupCount]  # 最初に現れた順のグループ（「その他」がある場合は最後）
+    missing_fields: list[str]  # ヘッダ行に無いグループ項目（ある場合は集計しない）
+    capacity: int  # 集計する異なるグループの数の上限
+
+
+class GroupCounter:
+    """グループ項目の値毎に値の個数を数える（マージ可能）
+
+    Attributes:
+        group_fields (list[str]): グループ項目のフィールド名
+        missing_fields (list[str]): ヘッダ行に無いグループ項目（ある場合は集計しない）
+        capacity (int): 集計する異なるグループの数の上限
+        groups (Dict[GroupKey, list[Any]]): グループ毎の [データ行数, 列位置ごとの値が存在する行数]
+        overflow (list[Any]): 上限を超えたグループの [データ行数, 列位置ごとの値が存在する行数]
+    """
+
+    def __init__(self, header: list[str], group_fields: list[str], capacity: int = DEFAULT_GROUP_CAPACITY) -> None:
+        self.group_fields: list[str] = group_fields
+        self.missing_fields: list[str] = [field for field in group_fields if field not in header]
+        self.capacity: int = capacity
+        # グループ項目の列位置（項目名が重複する場合は csv.DictReader と同様に最後の列）
+        name_to_index: Dict[str, int] = {name: index for index, name in enumerate(header)}
+        self._group_columns: list[int] = [name_to_index[field] for field in group_fields if field in name_to_index]
+        self._key_getter: Callable[[list[str]], Any] | None = (
+            itemgetter(*self._group_columns) if self._group_columns else None
+        )
+        self._key_width: int = max(self._group_columns, default=-1) + 1
+        self._column_indexes: range = range(len(header))
+        self.groups: Dict[GroupKey, list[Any]] = {}
+        self.overflow: list[Any] = [0, Counter()]
+
+    @property
+    def active(self) -> bool:
+        """データ行を集計するか（グループ項目が全てヘッダ行にある場合のみ）"""
+        return self._key_getter is not None and not self.missing_fields
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # ワーカープロセスから結果を返す際、itemgetter は送れないため作り直す
+        return {**self.__dict__, "_key_getter": None}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        if self._group_columns:
+            self._key_getter = itemgetter(*self._group_columns)
+
+    def _group(self, key: GroupKey) -> list[Any]:
+        """キーのグループの集計先を返す（上限に達した後の新しいグループは「その他」）"""
+        group: list[Any] | None = self.groups.get(key)
+        if group is not None:
+            return group
+        if len(self.groups) < self.capacity:
+            group = self.groups[key] = [0, Counter()]
+            return group
+        return self.overflow
+
+    def add_row(self, row: list[str]) -> None:
+        """データ行を追加する
+
+        Args:
+            row (list[str]): csv.reader が返すデータ行（空行以外）
+
+        Returns:
+            None
+
+        Note:
+            - 列位置ごとの値が存在する行数はグループ毎にだけ数える（ファイル全体の行数には加えない）
+        """
+        if not self.active:
+            return
+        if len(row) < self._key_width:
+            row = row + [""] * (self._key_width - len(row))  # フィールド数が不足する行の足りない列は空の値
+        group: list[Any] = self._group(key=self._key_getter(row))
+        group[0] += 1
+        group[1].update(compress(self._column_indexes, row))
+
+    @property
+    def overflowed(self) -> bool:
+        """異なるグループの数が上限に達し、「その他」にまとめた行があるか"""
+        return self.overflow[0] > 0
+
+    def merge(self, other: "GroupCounter") -> None:
+        """別の集計結果をマージする
+
+        Args:
+            other (GroupCounter): マージする集計結果（ファイル上で後ろの範囲の結果）
+
+        Returns:
+            None
+
+        Note:
+            - other.overflowed の場合、other の「その他」の行は上限までに現れたグループに振り分け直せない
+              （1プロセスで集計した場合と同じ結果にならない可能性がある）
+        """
+        key: GroupKey
+        other_group: list[Any]
+        for key, other_group in other.groups.items():
+            group: list[Any] = self._group(key=key)
+            group[0] += other_group[0]
+            group[1].update(other_group[1])
+        self.overflow[0] += other.overflow[0]
+        self.overflow[1].update(other.overflow[1])
+
+    def total_positional_count(self) -> Counter[int]:
+        """集計した全ての行（「その他」を含む）の列位置ごとの値が存在する行数を返す
+
+        Returns:
+            Counter[int]: 列位置をキーとした値が存在する行数
+        """
+        total: Counter[int] = Counter(self.overflow[1])
+        group: list[Any]
+        for group in self.groups.values():
+            total.update(group[1])
+        return total
+
+    def summarize(self, header: list[str]) -> GroupSummary:
+        """グループ毎の値の個数をフィールド名毎にまとめて返す
+
+        Args:
+            header (list[str]): ヘッダ行のフィールド名リスト
+
+        Returns:
+            GroupSummary: 集計結果
+
+        Note:
+            - 項目名が重複する場合は csv.DictReader と同様に最後の列の値を採用する
+        """
+        name_to_index: Dict[str, int] = {name: index for index, name in enumerate(header)}
+
+        def field_counts(positional_count: Counter[int]) -> Dict[str, int]:
+            return {name: positional_count[index] for name, index in name_to_index.items()}
+
+        groups: list[GroupCount] = [
+            GroupCount(
+                values=[key] if isinstance(key, str) else list(key),
+                data_row_count=group[0],
+                counts=field_counts(positional_count=group[1]),
+            )
+            for key, group in self.groups.items()
+        ]
+        if self.overflowed:
+            groups.append(
+                GroupCount(
+                    values=None,
+                    data_row_count=self.overflow[0],
+                    counts=field_counts(positional_count=self.overflow[1]),
+                )
+            )
+        return GroupSummary(
+            group_fields=self.group_fields,
+            groups=groups,
+            missing_fields=self.missing_fields,
+            capacity=self.capacity,
+        )
+
+
+def format_group_label(group_fields: list[str], group: GroupCount) -> str:
+    """グループを「項目名=値」の形式で表す
+
+    Args:
+        group_fields (list[str]): グループ項目のフィールド名
+        group (GroupCount): グループ
+
+    Returns:
+        str: 「項目名=値」を " / " でつないだ文字列（「その他」の場合は "(その他)"）
+    """
+    if group.values is None:
+        return "(その他)"
+    return " / ".join(f"{field}={value}" for field, value in zip(group_fields, group.values))
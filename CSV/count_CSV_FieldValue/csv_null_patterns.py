@@ -0,0 +1,159 @@
+"""
+CSVの行毎の空値パターン（値が空のフィールドの組み合わせ）の集計
+
+値の個数のカウントと同じ1回の読み込みで、データ行毎に「どのフィールドに値があるか」を
+パターンとして数え、「住所1 と 住所2 がどちらも空の行」のような組み合わせ毎の行数を求めます。
+
+集計方法:
+- 行毎に列位置ごとの空/非空を1バイトずつ並べたキー（bytes(map(bool, row))、C 実装で作成）を作り、
+  ハッシュテーブルで出現回数を数える（200列のファイルで1行あたりの追加の処理は10マイクロ秒程度）
+- 異なるパターンの数が上限（capacity）に達した後は、新しいパターンの行は数えずに行数だけを記録する
+  （上限に達する前に現れたパターンの行数は正確）
+- 結果は列位置 i をビット i とした値があるフィールドのビットマスク（int）に変換して返す
+
+並列処理:
+- ファイルを分割して別プロセスで集計した結果はパターン毎の行数を合算してマージする
+  （上限に達しない場合は1プロセスで集計した場合と同じ結果になる）
+"""
+
+import heapq
+from typing import Dict, Iterable, NamedTuple
+
+DEFAULT_NULL_PATTERN_CAPACITY: int = 10000  # 集計する異なるパターンの数の上限（既定値）
+_MASK_DIGITS: bytes = bytes.maketrans(b"\x00\x01", b"01")  # 空/非空のキーを2進数の文字列に変換する表
+
+
+class NullPattern(NamedTuple):
+    """空値パターンの1件分"""
+
+    filled_mask: int  # 値があるフィールドのビットマスク（列位置 i がビット i、余剰フィールドは含めない）
+    row_count: int  # このパターンのデータ行数
+
+
+class NullPatternSummary(NamedTuple):
+    """1ファイル分の空値パターンの集計結果"""
+
+    patterns: list[NullPattern]  # 行数の多い順の空値パターン（上位 limit 件）
+    distinct_count: int  # 集計した異なるパターンの数
+    uncounted_rows: int  # パターンの数が上限に達したため集計しなかったデータ行数
+    capacity: int  # 集計する異なるパターンの数の上限
+
+
+def filled_mask(key: bytes, field_count: int) -> int:
+    """空/非空のキーをビットマスクに変換する
+
+    Args:
+        key (bytes): 列位置毎の空(0)/非空(1) を並べたキー
+        field_count (int): ヘッダ行のフィールド数（これ以降の余剰フィールドは含めない）
+
+    Returns:
+        int: 列位置 i をビット i とした値があるフィールドのビットマスク
+    """
+    return int(key[:field_count][::-1].translate(_MASK_DIGITS) or b"0", 2)
+
+
+class NullPatternCounter:
+    """データ行毎の空値パターンを数える（マージ可能）
+
+    Attributes:
+        field_count (int): ヘッダ行のフィールド数
+        limit (int): 結果に含めるパターンの件数
+        capacity (int): 集計する異なるパターンの数の上限
+        counts (Dict[bytes, int]): パターン（列位置毎の空(0)/非空(1) のキー）毎の行数
+        uncounted_rows (int): 上限に達したため集計しなかった行数
+    """
+
+    def __init__(self, field_count: int, limit: int, capacity: int = DEFAULT_NULL_PATTERN_CAPACITY) -> None:
+        self.field_count: int = field_count
+        self.limit: int = limit
+        self.capacity: int = capacity
+        self.counts: Dict[bytes, int] = {}
+        self.uncounted_rows: int = 0
+
+    def _add(self, key: bytes, row_count: int) -> None:
+        count: int | None = self.counts.get(key)
+        if count is not None:
+            self.counts[key] = count + row_count
+        elif len(self.counts) < self.capacity:
+            self.counts[key] = row_count
+        else:
+            self.uncounted_rows += row_count
+
+    def add_row(self, row: list[str]) -> None:
+        """データ行を追加する
+
+        Args:
+            row (list[str]): csv.reader が返すデータ行（空行以外）
+
+        Returns:
+            None
+        """
+        self._add(key=bytes(map(bool, row)), row_count=1)
+
+    def add_filled_columns(self, field_count: int, filled_columns: Iterable[int]) -> None:
+        """値を読み込まずに走査したデータ行を追加する（--max-field-size）
+
+        Args:
+            field_count (int): 行のフィールド数
+            filled_columns (Iterable[int]): 値が空でない列位置
+
+        Returns:
+            None
+        """
+        key: bytearray = bytearray(field_count)
+        column: int
+        for column in filled_columns:
+            key[column] = 1
+        self._add(key=bytes(key), row_count=1)
+
+    def merge(self, other: "NullPatternCounter") -> None:
+        """別の集計結果をマージする
+
+        Args:
+            other (NullPatternCounter): マージする集計結果（ファイル上で後ろの範囲の結果）
+
+        Returns:
+            None
+        """
+        key: bytes
+        row_count: int
+        for key, row_count in other.counts.items():
+            self._add(key=key, row_count=row_count)
+        self.uncounted_rows += other.uncounted_rows
+
+    def summarize(self) -> NullPatternSummary:
+        """行数の多い順に limit 件の空値パターンを返す
+
+        Returns:
+            NullPatternSummary: 集計結果
+
+        Note:
+            - フィールド数が異なる行は、不足する列を空とし、余剰フィールドを除いたパターンにまとめる
+            - 行数が同じ場合は値があるフィールドの少ない（ビットマスクの小さい）順に並べる
+        """
+        masks: Dict[int, int] = {}
+        key: bytes
+        row_count: int
+        for key, row_count in self.counts.items():
+            mask: int = filled_mask(key=key, field_count=self.field_count)
+            masks[mask] = masks.get(mask, 0) + row_count
+        top: list[int] = heapq.nsmallest(self.limit, masks, key=lambda mask: (-masks[mask], mask))
+        return NullPatternSummary(
+            patterns=[NullPattern(filled_mask=mask, row_count=masks[mask]) for mask in top],
+            distinct_count=len(masks),
+            uncounted_rows=self.uncounted_rows,
+            capacity=self.capacity,
+        )
+
+
+def empty_field_names(pattern: NullPattern, fieldnames: list[str]) -> list[str]:
+    """空値パターンで値が空のフィールド名を返す
+
+    Args:
+        pattern (NullPattern): 空値パターン
+        fieldnames (list[str]): フィールド名リスト（ヘッダ順）
+
+    Returns:
+        list[str]: 値が空のフィールド名（ヘッダ順）
+    """
+    return [name for index, name in enumerate(fieldnames) if not pattern.filled_mask >> index & 1]
@@ -0,0 +1,283 @@
+"""
+CSVファイルのカウント処理の進捗と処理速度の計測
+
+ファイル毎の読み込みバイト数・データ行数・処理時間を記録し、
+標準エラー出力に進捗（処理済みのファイル数・バイト数、処理速度、残り時間の目安）を表示します。
+実行の終了時には、処理時間の長いファイルと全体の処理速度をJSONファイルに書き込みます。
+（--watch の場合は、変更をカウントする毎の計測結果を "watch_batches" に追加して書き直します）
+
+残り時間の目安:
+- 検索済みのCSVファイルの合計バイト数から処理済みのバイト数を引き、
+  カウントしたファイルの処理速度（バイト/秒）で割って求める
+- 検索が終わっていない間は、ファイル数の後ろに "+" を付けて表示する（残り時間は増える可能性がある）
+"""
+
+import heapq
+import json
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, NamedTuple, TextIO, Tuple
+
+from csv_discovery import DiscoveredFile, DiscoveryError
+
+METRICS_VERSION: int = 1  # 計測結果のJSONファイルの形式のバージョン
+DEFAULT_SLOWEST_FILE_LIMIT: int = 10  # 計測結果に記録する処理時間の長いファイルの件数
+DEFAULT_PROGRESS_INTERVAL: float = 0.5  # 進捗表示を更新する最短の間隔（秒）
+NON_TTY_PROGRESS_INTERVAL: float = 10.0  # 出力先が端末でない場合に進捗を1行ずつ出力する間隔（秒）
+
+
+class FileMetrics(NamedTuple):
+    """1つのCSVファイルの処理の計測結果"""
+
+    path: str  # CSVファイルのパス
+    size: int  # 読み込んだバイト数（ファイルサイズ）
+    rows: int  # データ行数（ヘッダを除く）
+    seconds: float  # カウントにかかった時間（秒、前回の結果を再利用した場合は 0）
+    reused: bool  # 前回の結果を再利用したか
+
+    @property
+    def rows_per_sec(self) -> float:
+        """1秒あたりのデータ行数（処理時間が 0 の場合は 0）"""
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+    @property
+    def mb_per_sec(self) -> float:
+        """1秒あたりの読み込みバイト数（MB、処理時間が 0 の場合は 0）"""
+        return self.size / (1024 * 1024) / self.seconds if self.seconds > 0 else 0.0
+
+
+def format_duration(seconds: float) -> str:
+    """秒数を H:MM:SS 形式の文字列に変換する
+
+    Args:
+        seconds (float): 秒数
+
+    Returns:
+        str: H:MM:SS 形式の文字列
+    """
+    total: int = int(seconds + 0.5)
+    return f"{total // 3600}:{total // 60 % 60:02d}:{total % 60:02d}"
+
+
+class RunMetrics:
+    """実行全体の進捗と処理速度を集計する
+
+    Attributes:
+        discovered_files (int): 検索で見つかったCSVファイル数
+        discovered_bytes (int): 検索で見つかったCSVファイルの合計バイト数
+        discovery_finished (bool): 検索が終わったか
+        processed_files (int): 処理済みのファイル数（前回の結果の再利用を含む）
+        processed_bytes (int): 処理済みのバイト数（前回の結果の再利用を含む）
+        counted_files (int): カウントしたファイル数
+        counted_bytes (int): カウントしたバイト数
+        counted_rows (int): カウントしたデータ行数
+        first_result_seconds (float | None): 最初のファイルの処理が終わるまでの時間（秒）
+    """
+
+    def __init__(
+        self,
+        progress_stream: TextIO | None = None,
+        progress_interval: float = DEFAULT_PROGRESS_INTERVAL,
+        slowest_file_limit: int = DEFAULT_SLOWEST_FILE_LIMIT,
+    ) -> None:
+        self.started_at: datetime = datetime.now()
+        self.start_time: float = time.perf_counter()
+        self.discovered_files: int = 0
+        self.discovered_bytes: int = 0
+        self.discovery_finished: bool = False
+        self.processed_files: int = 0
+        self.processed_bytes: int = 0
+        self.counted_files: int = 0
+        self.counted_bytes: int = 0
+        self.counted_rows: int = 0
+        self.first_result_seconds: float | None = None
+        self._progress_stream: TextIO | None = progress_stream
+        self._is_tty: bool = progress_stream is not None and progress_stream.isatty()
+        self._progress_interval: float = progress_interval if self._is_tty else NON_TTY_PROGRESS_INTERVAL
+        self._last_progress_time: float = 0.0
+        self._progress_width: int = 0
+        self._slowest_file_limit: int = slowest_file_limit
+        self._slowest_files: list[Tuple[float, int, FileMetrics]] = []  # 処理時間の短い順のヒープ
+
+    def elapsed(self) -> float:
+        """計測開始からの経過時間（秒）を返す"""
+        return time.perf_counter() - self.start_time
+
+    def iter_discovered(
+        self, items: Iterable[DiscoveredFile | DiscoveryError]
+    ) -> Iterator[DiscoveredFile | DiscoveryError]:
+        """検索結果をそのまま返しながら、見つかったファイル数と合計バイト数を数える
+
+        Args:
+            items (Iterable[DiscoveredFile | DiscoveryError]): iter_csv_files の戻り値
+
+        Returns:
+            Iterator[DiscoveredFile | DiscoveryError]: items と同じ要素
+
+        Note:
+            - 検索用のスレッドで読み込まれるため、数える処理だけを行う
+        """
+        item: DiscoveredFile | DiscoveryError
+        for item in items:
+            if isinstance(item, DiscoveredFile):
+                self.discovered_files += 1
+                self.discovered_bytes += item.size
+            yield item
+        self.discovery_finished = True
+
+    def add_file(self, metrics: FileMetrics) -> None:
+        """1つのCSVファイルの計測結果を追加する
+
+        Args:
+            metrics (FileMetrics): ファイルの計測結果
+
+        Returns:
+            None
+        """
+        if self.first_result_seconds is None:
+            self.first_result_seconds = self.elapsed()
+        self.processed_files += 1
+        self.processed_bytes += metrics.size
+        if metrics.reused:
+            return
+        self.counted_files += 1
+        self.counted_bytes += metrics.size
+        self.counted_rows += metrics.rows
+        entry: Tuple[float, int, FileMetrics] = (metrics.seconds, self.counted_files, metrics)
+        if len(self._slowest_files) < self._slowest_file_limit:
+            heapq.heappush(self._slowest_files, entry)
+        elif self._slowest_file_limit > 0:
+            heapq.heappushpop(self._slowest_files, entry)
+
+    def progress_line(self) -> str:
+        """進捗を表す1行の文字列を返す
+
+        Returns:
+            str: 処理済みのファイル数・バイト数、処理速度、残り時間の目安
+        """
+        elapsed: float = self.elapsed()
+        total_files: str = f"{max(self.discovered_files, self.processed_files)}{'' if self.discovery_finished else '+'}"
+        total_bytes: int = max(self.discovered_bytes, self.processed_bytes)
+        percent: float = self.processed_bytes / total_bytes * 100 if total_bytes else 0.0
+        bytes_per_sec: float = self.counted_bytes / elapsed if elapsed > 0 else 0.0
+        remaining_bytes: int = total_bytes - self.processed_bytes
+        eta: str = format_duration(remaining_bytes / bytes_per_sec) if bytes_per_sec > 0 else "-"
+        return (
+            f"処理中: {self.processed_files}/{total_files} ファイル, "
+            f"{self.processed_bytes / (1024 * 1024):,.1f}/{total_bytes / (1024 * 1024):,.1f} MB ({percent:.1f}%), "
+            f"{bytes_per_sec / (1024 * 1024):,.1f} MB/秒, 経過 {format_duration(elapsed)}, 残り {eta}"
+        )
+
+    def report_progress(self, force: bool = False) -> None:
+        """標準エラー出力の進捗表示を更新する（前回の更新から progress_interval 秒以内は更新しない）
+
+        Args:
+            force (bool): 間隔に関わらず更新するか
+
+        Returns:
+            None
+        """
+        if self._progress_stream is None:
+            return
+        now: float = time.perf_counter()
+        if not force and now - self._last_progress_time < self._progress_interval:
+            return
+        self._last_progress_time = now
+        line: str = self.progress_line()
+        if self._is_tty:
+            # 前回の表示より短い場合は空白で上書きする
+            self._progress_stream.write(f"\r{line}{' ' * max(0, self._progress_width - len(line))}")
+            self._progress_width = len(line)
+        else:
+            self._progress_stream.write(f"{line}\n")
+        self._progress_stream.flush()
+
+    def finish_progress(self) -> None:
+        """最終的な進捗を表示して、進捗表示の行を終える
+
+        Returns:
+            None
+        """
+        if self._progress_stream is None:
+            return
+        self.report_progress(force=True)
+        if self._is_tty:
+            self._progress_stream.write("\n")
+            self._progress_stream.flush()
+
+    def slowest_files(self) -> list[FileMetrics]:
+        """カウントしたファイルのうち処理時間の長いものを返す
+
+        Returns:
+            list[FileMetrics]: 処理時間の長い順（最大 slowest_file_limit 件）
+        """
+        return [metrics for _, _, metrics in sorted(self._slowest_files, key=lambda entry: (-entry[0], entry[1]))]
+
+    def to_dict(self, settings: Dict[str, Any] | None = None) -> Dict[str, Any]:
+        """計測結果をJSONに変換できる辞書として返す
+
+        Args:
+            settings (Dict[str, Any] | None): 計測結果に記録する実行時の設定
+
+        Returns:
+            Dict[str, Any]: 計測結果
+        """
+        wall_seconds: float = self.elapsed()
+        return {
+            "version": METRICS_VERSION,
+            "started": self.started_at.isoformat(timespec="seconds"),
+            "finished": datetime.now().isoformat(timespec="seconds"),
+            "wall_seconds": round(wall_seconds, 3),
+            "time_to_first_result_seconds": (
+                round(self.first_result_seconds, 3) if self.first_result_seconds is not None else None
+            ),
+            "settings": settings or {},
+            "files": {
+                "total": self.processed_files,
+                "counted": self.counted_files,
+                "reused": self.processed_files - self.counted_files,
+            },
+            "bytes": {"total": self.processed_bytes, "counted": self.counted_bytes},
+            "rows": {"counted": self.counted_rows},
+            "throughput": {
+                "rows_per_sec": round(self.counted_rows / wall_seconds, 1) if wall_seconds > 0 else None,
+                "mb_per_sec": (
+                    round(self.counted_bytes / (1024 * 1024) / wall_seconds, 3) if wall_seconds > 0 else None
+                ),
+            },
+            "slowest_files": [
+                {
+                    "path": metrics.path,
+                    "bytes": metrics.size,
+                    "rows": metrics.rows,
+                    "seconds": round(metrics.seconds, 3),
+                    "rows_per_sec": round(metrics.rows_per_sec, 1),
+                    "mb_per_sec": round(metrics.mb_per_sec, 3),
+                }
+                for metrics in self.slowest_files()
+            ],
+        }
+
+    def write(
+        self, metrics_file: str, settings: Dict[str, Any] | None = None, history: list[Dict[str, Any]] | None = None
+    ) -> None:
+        """計測結果をJSONファイルに書き込む
+
+        Args:
+            metrics_file (str): 書き込むJSONファイルのパス
+            settings (Dict[str, Any] | None): 計測結果に記録する実行時の設定
+            history (list[Dict[str, Any]] | None): 同じファイルに記録するこれまでの計測結果（--watch の場合、古い順）
+                今回の計測結果を追加し、最初の計測結果に2件目以降を "watch_batches" として加えて書き込む
+
+        Returns:
+            None
+
+        Raises:
+            OSError: ファイルの書き込みに失敗した場合
+        """
+        data: Dict[str, Any] = self.to_dict(settings=settings)
+        if history is not None:
+            history.append(data)
+            data = dict(history[0], watch_batches=history[1:])
+        with open(file=metrics_file, mode="w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,444 @@
+"""
+巨大なCSVファイルの抽出による値の充填率の推定（--sample N）
+
+ファイル全体を読み込まずに、無作為なバイト位置へシークしてレコード境界に同期し、
+その直後のレコードを N 件抽出します。抽出したデータ行から項目毎の値の充填率
+（値が存在する行の割合）と信頼区間を、ファイルサイズと平均レコード長からデータ行数を推定します。
+
+レコード境界への同期:
+- シーク位置がクォートで囲まれたフィールドの内側か外側かは、ファイルの先頭から
+  " の個数を数えないと分からない
+- そこで「外側」「内側」の2つの仮定それぞれで最初のレコード境界（" の個数の偶奇が合う改行）を求め、
+  その後ろの数レコードを解析してフィールド数がヘッダ行と一致するレコードが長く続く方を採用する
+  （同じ場合は「外側」を採用する。クォートを含まないファイルでは2つの境界は一致する）
+- cp932 の2バイト文字の2バイト目は " (0x22), CR (0x0D), LF (0x0A) と一致しないため、
+  バイト単位で境界を判定できる（csv_byte_range を参照）
+
+推定値:
+- 充填率の信頼区間は Wilson のスコア区間（既定は 95%）
+- データ行数は (ファイルサイズ - ヘッダ行) / 抽出したレコードの平均バイト数 × 空行以外の割合
+
+Note:
+    - 抽出されるのはシーク位置を含むレコードの「次の」レコードのため、抽出される確率は
+      直前のレコードの長さに比例する。レコード長が前後のレコードと相関しない限り偏りは生じない
+    - シーク位置は重複を許して選ぶ（復元抽出）
+    - 圧縮されたCSVファイルはシークできないため、先頭から N 件のデータ行を読み込む（無作為抽出ではない）
+"""
+
+import csv
+import io
+import math
+import random
+import re
+from typing import IO, Dict, Iterable, NamedTuple, Tuple
+
+from csv_byte_range import find_record_end
+
+DEFAULT_SAMPLE_SEED: int = 1  # 既定の乱数シード（同じシードとファイルからは同じレコードを抽出する）
+DEFAULT_CONFIDENCE_Z: float = 1.96  # 信頼区間の z 値
+CONFIDENCE_LEVEL: str = "95%"  # DEFAULT_CONFIDENCE_Z に対応する信頼水準（出力ファイルの表示用）
+SAMPLE_WINDOW_SIZE: int = 16 * 1024  # 1回のシークで最初に読み込むバイト数（16 KB）
+MAX_SAMPLE_WINDOW_SIZE: int = 16 * 1024 * 1024  # 1回のシークで読み込む最大のバイト数（16 MB）
+RESYNC_CONFIRM_RECORDS: int = 4  # レコード境界の仮定を確かめるために解析するレコード数
+SAMPLE_METHODS: Dict[str, str] = {
+    "random": "無作為なバイト位置からの抽出",
+    "head": "先頭からの抽出（圧縮ファイルのため無作為抽出ではない）",
+    "full": "全件",
+}
+
+_NEWLINE_PATTERN: re.Pattern[bytes] = re.compile(rb"\r\n?|\n")  # open() のテキストモードと同じ改行
+
+
+class FieldEstimate(NamedTuple):
+    """1つの項目の値の充填率の推定値"""
+
+    fill_rate: float  # 値が存在する行の割合（0.0～1.0）
+    lower: float  # 信頼区間の下限
+    upper: float  # 信頼区間の上限
+
+
+class SampleResult(NamedTuple):
+    """抽出による推定結果"""
+
+    fieldnames: list[str]  # フィールド名リスト（ヘッダ順）
+    method: str  # 抽出方法（SAMPLE_METHODS のキー）
+    sample_rows: int  # 抽出したデータ行数（空行を除く）
+    estimated_row_count: int | None  # 推定データ行数（推定できない場合は None）
+    estimates: Dict[str, FieldEstimate]  # 各フィールド名と充填率の推定値
+
+    @property
+    def has_data(self) -> bool:
+        """値が存在するデータ行を抽出したか"""
+        return any(estimate.fill_rate > 0 for estimate in self.estimates.values())
+
+    def estimated_counts(self) -> Dict[str, int]:
+        """各フィールド名と値が存在する行数の推定値を返す（データ行数を推定できない場合は抽出した行での行数）"""
+        total: int = self.sample_rows if self.estimated_row_count is None else self.estimated_row_count
+        return {name: round(estimate.fill_rate * total) for name, estimate in self.estimates.items()}
+
+
+def wilson_interval(successes: int, trials: int, z: float = DEFAULT_CONFIDENCE_Z) -> Tuple[float, float]:
+    """二項比率の Wilson のスコア区間を返す
+
+    Args:
+        successes (int): 成功数
+        trials (int): 試行数
+        z (float): 信頼区間の z 値
+
+    Returns:
+        Tuple[float, float]: (下限, 上限)（試行数が 0 の場合は (0.0, 1.0)）
+    """
+    if trials <= 0:
+        return 0.0, 1.0
+    p: float = successes / trials
+    z2: float = z * z
+    denominator: float = 1 + z2 / trials
+    center: float = (p + z2 / (2 * trials)) / denominator
+    half_width: float = z * math.sqrt(p * (1 - p) / trials + z2 / (4 * trials * trials)) / denominator
+    return max(0.0, center - half_width), min(1.0, center + half_width)
+
+
+def parse_record(record: bytes, encoding: str = "cp932") -> list[str]:
+    """1レコードのバイト列をデコードしてフィールドのリストを返す
+
+    Args:
+        record (bytes): 1レコード（末尾の改行を含んでもよい）のバイト列
+        encoding (str): 文字エンコーディング
+
+    Returns:
+        list[str]: フィールドのリスト（空行の場合は空リスト）
+
+    Raises:
+        csv.Error: CSVとして解析できない場合
+    """
+    text: str = record.decode(encoding, errors="replace")
+    return next(csv.reader(io.StringIO(text)), [])
+
+
+def _split_records(data: bytes, at_eof: bool, limit: int) -> list[bytes]:
+    """レコードの先頭から始まるバイト列を、完結したレコードに分けて先頭から最大 limit 件返す
+
+    Args:
+        data (bytes): レコードの先頭から始まるバイト列
+        at_eof (bool): data がファイルの末尾まで含むか（最後の改行の無いレコードも完結とみなす）
+        limit (int): 返すレコードの最大数
+
+    Returns:
+        list[bytes]: 改行を含むレコードのバイト列
+    """
+    records: list[bytes] = []
+    position: int = 0
+    while position < len(data) and len(records) < limit:
+        end: int = find_record_end(data=data, start=position)
+        if end == len(data) and not at_eof and not data.endswith(b"\n"):
+            break  # 改行の手前で途切れたレコード（CR の後に LF が続く可能性もある）
+        records.append(data[position:end])
+        position = end
+    return records
+
+
+def _find_resync_boundary(data: bytes, quote_is_open: bool, at_eof: bool) -> int | None:
+    """シーク位置のクォートの状態を仮定して、最初のレコード境界を返す
+
+    Args:
+        data (bytes): シーク位置から読み込んだバイト列
+        quote_is_open (bool): シーク位置がクォートで囲まれたフィールドの内側と仮定するか
+        at_eof (bool): data がファイルの末尾まで含むか
+
+    Returns:
+        int | None: 最初のレコード境界（改行の直後）の位置（見つからない場合は None）
+    """
+    position: int = 0
+    newline: re.Match[bytes]
+    for newline in _NEWLINE_PATTERN.finditer(data):
+        quote_is_open ^= bool(data.count(b'"', position, newline.start()) & 1)
+        position = newline.end()
+        if quote_is_open:
+            if data.find(b'"', position) < 0:
+                return None  # クォートを閉じる " が無いので、これより後ろに境界は無い
+            continue
+        if position == len(data) and not at_eof and data.endswith(b"\r"):
+            return None  # CR の後に LF が続く可能性がある
+        return position
+    return None
+
+
+def _consistent_record_count(records: Iterable[bytes], expected_field_count: int, encoding: str) -> int:
+    """先頭から連続してフィールド数がヘッダ行と一致する（または空行の）レコードの数を返す"""
+    consistent: int = 0
+    record: bytes
+    for record in records:
+        try:
+            row: list[str] = parse_record(record=record, encoding=encoding)
+        except csv.Error:
+            break
+        if row and len(row) != expected_field_count:
+            break
+        consistent += 1
+    return consistent
+
+
+def read_sample_record(
+    file: IO[bytes], offset: int, header_end: int, file_size: int, expected_field_count: int, encoding: str = "cp932"
+) -> bytes | None:
+    """offset の後ろにある最初のレコードを読み込む
+
+    Args:
+        file (IO[bytes]): バイナリモードで開いたCSVファイル
+        offset (int): シーク位置（header_end 以上 file_size 未満）
+        header_end (int): ヘッダ行の終了位置
+        file_size (int): ファイルサイズ
+        expected_field_count (int): ヘッダ行のフィールド数
+        encoding (str): 文字エンコーディング（境界を確かめる際のレコードの解析に使う）
+
+    Returns:
+        bytes | None: 抽出したレコードのバイト列（改行を含む）
+            MAX_SAMPLE_WINDOW_SIZE を超えてもレコード境界が見つからない場合は None
+
+    Raises:
+        OSError: ファイルの読み込みに失敗した場合
+
+    Note:
+        - offset の後ろにレコード境界が無い場合は、ファイルの末尾から先頭のデータ行に戻って抽出する
+        - 2つの仮定の一方でしか境界が見つからない場合（読み込んだ範囲で " の個数の偶奇が合う改行が一方にしか無い場合）は、
+          その境界を確かめずに採用する
+        - レコード境界を確かめられない場合は、読み込むバイト数を MAX_SAMPLE_WINDOW_SIZE まで増やして読み直す
+    """
+    at_record_start: bool = False
+    window_size: int = SAMPLE_WINDOW_SIZE
+    while True:
+        file.seek(offset)
+        data: bytes = file.read(window_size)
+        at_eof: bool = offset + len(data) >= file_size
+        boundaries: list[int] = (
+            [0]
+            if at_record_start
+            else [
+                boundary
+                for boundary in dict.fromkeys(
+                    _find_resync_boundary(data=data, quote_is_open=quote_is_open, at_eof=at_eof)
+                    for quote_is_open in (False, True)
+                )
+                if boundary is not None
+            ]
+        )
+        # 2つの仮定で境界が異なる場合だけ、後ろのレコードを解析してどちらが正しいかを確かめる
+        limit: int = RESYNC_CONFIRM_RECORDS if len(boundaries) > 1 else 1
+        best: list[bytes] = []
+        best_score: int = -1
+        boundary: int
+        for boundary in boundaries:
+            records: list[bytes] = _split_records(data=data[boundary:], at_eof=at_eof, limit=limit)
+            if not records:
+                continue
+            score: int = _consistent_record_count(
+                records=records, expected_field_count=expected_field_count, encoding=encoding
+            )
+            if score > best_score:
+                best, best_score = records, score
+
+        if not at_eof and window_size < MAX_SAMPLE_WINDOW_SIZE and len(best) < limit:
+            window_size *= 4
+            continue
+        if best:
+            return best[0]
+        if at_record_start or not at_eof:
+            return None
+        # ファイルの末尾までレコード境界が無いので、先頭のデータ行から抽出する
+        offset, at_record_start, window_size = header_end, True, SAMPLE_WINDOW_SIZE
+
+
+def read_header(file: IO[bytes], encoding: str = "cp932") -> Tuple[int, list[str]]:
+    """CSVファイルのヘッダ行を読み込む
+
+    Args:
+        file (IO[bytes]): バイナリモードで開いたCSVファイル
+        encoding (str): 文字エンコーディング
+
+    Returns:
+        Tuple[int, list[str]]: (ヘッダ行の終了位置, フィールド名リスト)
+
+    Raises:
+        OSError: ファイルの読み込みに失敗した場合
+        csv.Error: ヘッダ行をCSVとして解析できない場合
+    """
+    data: bytes = b""
+    window_size: int = SAMPLE_WINDOW_SIZE
+    while True:
+        file.seek(0)
+        data = file.read(window_size)
+        header_end: int = find_record_end(data=data)
+        if header_end < len(data) or len(data) < window_size:
+            return header_end, parse_record(record=data[:header_end], encoding=encoding)
+        window_size *= 4
+
+
+def estimate_fill_rates(
+    header: list[str], rows: Iterable[list[str]], z: float = DEFAULT_CONFIDENCE_Z
+) -> Tuple[int, Dict[str, FieldEstimate]]:
+    """抽出したデータ行から項目毎の充填率と信頼区間を求める
+
+    Args:
+        header (list[str]): ヘッダ行のフィールド名リスト
+        rows (Iterable[list[str]]): 抽出したレコード（空行は除いて数える）
+        z (float): 信頼区間の z 値
+
+    Returns:
+        Tuple[int, Dict[str, FieldEstimate]]: (空行を除いたデータ行数, 各フィールド名と充填率の推定値)
+
+    Note:
+        - 項目名が重複する場合は csv.DictReader と同様に最後の列の値を採用する
+    """
+    name_to_index: Dict[str, int] = {name: index for index, name in enumerate(header)}
+    filled: list[int] = [0] * len(header)
+    sample_rows: int = 0
+    row: list[str]
+    for row in rows:
+        if not row:
+            continue
+        sample_rows += 1
+        index: int
+        for index in range(min(len(row), len(header))):
+            if row[index]:
+                filled[index] += 1
+    estimates: Dict[str, FieldEstimate] = {}
+    name: str
+    for name, index in name_to_index.items():
+        lower, upper = wilson_interval(successes=filled[index], trials=sample_rows, z=z)
+        fill_rate: float = filled[index] / sample_rows if sample_rows else 0.0
+        estimates[name] = FieldEstimate(fill_rate=fill_rate, lower=lower, upper=upper)
+    return sample_rows, estimates
+
+
+def sample_csv_file(
+    file_path: str,
+    sample_size: int,
+    seed: int = DEFAULT_SAMPLE_SEED,
+    z: float = DEFAULT_CONFIDENCE_Z,
+    encoding: str = "cp932",
+) -> SampleResult:
+    """無作為なバイト位置から sample_size 件のレコードを抽出して充填率を推定する
+
+    Args:
+        file_path (str): CSVファイルのパス（圧縮されていないファイル）
+        sample_size (int): 抽出するレコード数（シークする回数）
+        seed (int): 乱数シード
+        z (float): 信頼区間の z 値
+        encoding (str): 文字エンコーディング
+
+    Returns:
+        SampleResult: 推定結果（ヘッダ行のみのファイルは抽出行数 0）
+
+    Raises:
+        OSError: ファイルの読み込みに失敗した場合
+        csv.Error: ヘッダ行または抽出したレコードをCSVとして解析できない場合
+
+    Note:
+        - シーク位置は昇順に並べて読み込む（ディスクのシーク量を抑える）
+        - 空行も抽出の対象とし、データ行数の推定で空行以外の割合を掛ける
+    """
+    with open(file=file_path, mode="rb") as file:
+        file.seek(0, io.SEEK_END)
+        file_size: int = file.tell()
+        header_end, header = read_header(file=file, encoding=encoding)
+        if header_end >= file_size:
+            _, estimates = estimate_fill_rates(header=header, rows=[], z=z)
+            return SampleResult(
+                fieldnames=header, method="random", sample_rows=0, estimated_row_count=0, estimates=estimates
+            )
+
+        rng: random.Random = random.Random(seed)
+        offsets: list[int] = sorted(rng.randrange(header_end, file_size) for _ in range(sample_size))
+        records: list[bytes] = []
+        offset: int
+        for offset in offsets:
+            record: bytes | None = read_sample_record(
+                file=file,
+                offset=offset,
+                header_end=header_end,
+                file_size=file_size,
+                expected_field_count=len(header),
+                encoding=encoding,
+            )
+            if record is not None:
+                records.append(record)
+
+    rows: list[list[str]] = [parse_record(record=record, encoding=encoding) for record in records]
+    sample_rows, estimates = estimate_fill_rates(header=header, rows=rows, z=z)
+    if not records:
+        return SampleResult(
+            fieldnames=header, method="random", sample_rows=0, estimated_row_count=None, estimates=estimates
+        )
+    average_record_length: float = sum(len(record) for record in records) / len(records)
+    estimated_record_count: float = (file_size - header_end) / average_record_length
+    return SampleResult(
+        fieldnames=header,
+        method="random",
+        sample_rows=sample_rows,
+        estimated_row_count=round(estimated_record_count * sample_rows / len(records)),
+        estimates=estimates,
+    )
+
+
+def sample_csv_head(text: IO[str], sample_size: int, z: float = DEFAULT_CONFIDENCE_Z) -> SampleResult:
+    """先頭から sample_size 件のデータ行を読み込んで充填率を推定する（シークできないファイル用）
+
+    Args:
+        text (IO[str]): テキストとして開いたCSVファイル（圧縮されたCSVファイルは展開しながら読み込むストリーム）
+        sample_size (int): 読み込むデータ行数（空行を除く）
+        z (float): 信頼区間の z 値
+
+    Returns:
+        SampleResult: 推定結果（sample_size 件に達する前にファイルの末尾に達した場合は method が "full"）
+
+    Raises:
+        OSError: ファイルの読み込みに失敗した場合
+        csv.Error: CSVとして解析できない場合
+    """
+    reader = csv.reader(text)
+    header: list[str] = list(next(reader, None) or [])
+    rows: list[list[str]] = []
+    row: list[str]
+    for row in reader:
+        if row:
+            rows.append(row)
+            if len(rows) >= sample_size:
+                break
+    else:
+        sample_rows, estimates = estimate_fill_rates(header=header, rows=rows, z=z)
+        return SampleResult(
+            fieldnames=header,
+            method="full",
+            sample_rows=sample_rows,
+            estimated_row_count=sample_rows,
+            estimates=estimates,
+        )
+    sample_rows, estimates = estimate_fill_rates(header=header, rows=rows, z=z)
+    return SampleResult(
+        fieldnames=header, method="head", sample_rows=sample_rows, estimated_row_count=None, estimates=estimates
+    )
+
+
+def exact_sample_result(fieldnames: list[str], counts: Dict[str, int], data_row_count: int) -> SampleResult:
+    """全件をカウントした結果を推定結果の形式に変換する（信頼区間の幅は 0）
+
+    Args:
+        fieldnames (list[str]): フィールド名リスト（ヘッダ順）
+        counts (Dict[str, int]): 各フィールド名と値が存在する行数
+        data_row_count (int): データ行数（ヘッダを除く）
+
+    Returns:
+        SampleResult: method が "full" の推定結果
+    """
+    estimates: Dict[str, FieldEstimate] = {}
+    name: str
+    for name in dict.fromkeys(fieldnames):
+        fill_rate: float = counts.get(name, 0) / data_row_count if data_row_count else 0.0
+        estimates[name] = FieldEstimate(fill_rate=fill_rate, lower=fill_rate, upper=fill_rate)
+    return SampleResult(
+        fieldnames=fieldnames,
+        method="full",
+        sample_rows=data_row_count,
+        estimated_row_count=data_row_count,
+        estimates=estimates,
+    )
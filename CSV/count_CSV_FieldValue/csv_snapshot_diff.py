@@ -0,0 +1,614 @@
+"""
+2つのCSVスナップショットのキー項目による差分（メモリに収まらない大きさのファイルも一定のメモリ使用量で比較する）
+
+同じテーブルの2つの時点の抽出（前日と当日など）を、キー項目の値で行を対応付けて比較し、
+追加・削除・変更された行と、項目毎の変更行数を求めます。
+
+比較方法:
+- 両方のファイルを count_CSV_FieldValue と同じ読み込み（csv_compressed.open_csv_text、cp932、圧縮ファイル可）で
+  先頭から1回ずつ読み込む（改行は変換せず、フィールド内の改行は CRLF / LF の違いも含めて比較・出力する）
+- 読み込んだ行の推定メモリ使用量が上限（memory_limit）以下の間はメモリ上に保持し、超えたら
+  キーのハッシュ値（crc32）で DIFF_PARTITIONS 個の一時ファイルに振り分ける（ハッシュ分割）
+  （同じキーの行は比較元・比較先とも同じ番号の一時ファイルに入る）
+- 一時ファイルを1組ずつ、比較元の行をキー毎の辞書にしてから比較先の行と突き合わせる
+  （1組の比較元の推定メモリ使用量が上限を超える場合は、ハッシュ値の別のビットでさらに分割してから比較する）
+- 一時ファイル毎の結果は行番号の順に並んでいるため、最後にマージして変更ファイルに書き込む
+  （変更ファイルの行はファイル内の順序になる。一時ファイルを使わない場合は直接書き込む）
+
+対応付け:
+- キー項目の値が同じ行を対応付ける（キーが重複する場合は、それぞれのファイル内の順に1行ずつ対応付ける）
+- 比較する項目は比較先のヘッダ行の項目（比較元は項目名で対応付け、比較元に無い項目は空の値とする）
+- フィールド数が不足する行の足りない列は空の値、余剰フィールドは比較しない
+- 空行は比較しない（csv.DictReader と同じ）
+"""
+
+import csv
+import heapq
+import os
+import shutil
+import tempfile
+import zlib
+from collections import Counter
+from operator import itemgetter
+from typing import Any, Callable, Dict, Iterable, Iterator, NamedTuple, TextIO, Tuple
+
+from csv_compressed import open_csv_text
+
+DEFAULT_DIFF_MEMORY: int = 256 * 1024 * 1024  # 比較に使うメモリ使用量の上限（既定値、バイト）
+DIFF_PARTITIONS: int = 64  # 一時ファイルに振り分ける数（ハッシュ値の 6 ビット分）
+_PARTITION_BITS: int = 6  # 1回の振り分けに使うハッシュ値のビット数（DIFF_PARTITIONS = 2 ** 6）
+_MAX_PARTITION_DEPTH: int = 4  # 一時ファイルを分割し直す回数の上限（crc32 の 32 ビットの範囲）
+_ROW_SIZE: int = 120  # 1行あたりの推定メモリ使用量（値を除く、バイト）
+_VALUE_SIZE: int = 56  # 値1つあたりの推定メモリ使用量（文字数分を除く、バイト）
+_SIDES: Tuple[str, str] = ("old", "new")  # 比較元・比較先
+_KINDS: Tuple[str, str, str] = ("added", "removed", "changed")  # 変更ファイルの種類
+CHANGE_COLUMNS: list[str] = ["差分", "変更された項目"]  # 変更された行のファイルに追加する列
+
+DiffKey = Tuple[str, ...] | str  # キー項目が複数の場合は値のタプル、1つの場合は値
+NumberedRow = Tuple[int, list[str]]  # (ファイルの行番号, 比較先のヘッダ順に揃えた値)
+
+
+class DiffSummary(NamedTuple):
+    """2つのCSVファイルの差分の集計結果"""
+
+    key_fields: list[str]  # キー項目のフィールド名
+    old_rows: int  # 比較元のデータ行数
+    new_rows: int  # 比較先のデータ行数
+    added: int  # 比較先にだけある行数
+    removed: int  # 比較元にだけある行数
+    changed: int  # キーが同じで値が異なる行数
+    unchanged: int  # キーも値も同じ行数
+    old_duplicate_keys: int  # 比較元で先に同じキーの行がある行数
+    new_duplicate_keys: int  # 比較先で先に同じキーの行がある行数
+    changed_fields: Dict[str, int]  # 比較先のヘッダ順の、値が変更された行数（変更された行がある項目のみ）
+    old_only_fields: list[str]  # 比較元にだけある項目（比較しない）
+    new_only_fields: list[str]  # 比較先にだけある項目（比較元の値は空として比較する）
+    spilled: bool  # メモリ使用量の上限を超えたため一時ファイルを使ったか
+
+
+class DiffOutputs(NamedTuple):
+    """差分の出力ファイルのパス"""
+
+    added: str  # 比較先にだけある行（比較先のヘッダ）
+    removed: str  # 比較元にだけある行（比較先のヘッダ順に揃えた比較元の値）
+    changed: str  # 変更前と変更後の行の組（比較先のヘッダ + CHANGE_COLUMNS）
+    summary: str  # 集計結果
+
+    @classmethod
+    def from_prefix(cls, prefix: str) -> "DiffOutputs":
+        """出力ファイル名の先頭部分から各ファイルのパスを作る"""
+        return cls(
+            added=f"{prefix}.added.csv",
+            removed=f"{prefix}.removed.csv",
+            changed=f"{prefix}.changed.csv",
+            summary=f"{prefix}.txt",
+        )
+
+
+def _partition_hash(key: DiffKey) -> int:
+    """一時ファイルの振り分けに使う、プロセスによらないキーのハッシュ値を返す"""
+    text: str = key if isinstance(key, str) else "\x1f".join(key)
+    return zlib.crc32(text.encode("utf-8", "surrogatepass"))
+
+
+def _row_size(row: list[str]) -> int:
+    """1行分の推定メモリ使用量を返す（全角文字を含む値は1文字2バイトとみなす）"""
+    return _ROW_SIZE + _VALUE_SIZE * len(row) + 2 * sum(map(len, row))
+
+
+class _DiffCounts:
+    """比較結果の行数（一時ファイルの組毎の比較で加算する）"""
+
+    def __init__(self, field_count: int) -> None:
+        self.added: int = 0
+        self.removed: int = 0
+        self.changed: int = 0
+        self.unchanged: int = 0
+        self.old_duplicate_keys: int = 0
+        self.new_duplicate_keys: int = 0
+        self.changed_columns: Counter[int] = Counter()  # 列位置ごとの値が変更された行数
+        self._column_indexes: range = range(field_count)
+
+    def compare(
+        self,
+        old_rows: Iterable[NumberedRow],
+        new_rows: Iterable[NumberedRow],
+        key_getter: Callable[[list[str]], DiffKey],
+        emit: Callable[[str, int, list[str]], None],
+    ) -> None:
+        """比較元と比較先の行（同じキーの行は全て含むこと）をキーで対応付けて比較する
+
+        Args:
+            old_rows (Iterable[NumberedRow]): 比較元の行（行番号の順）
+            new_rows (Iterable[NumberedRow]): 比較先の行（行番号の順）
+            key_getter (Callable[[list[str]], DiffKey]): 行からキーを取り出す関数
+            emit (Callable[[str, int, list[str]], None]): 変更ファイルの行を書き出す関数
+                引数: (種類（_KINDS のいずれか）, 並べ替えに使う行番号, 変更ファイルに書き込む値)
+
+        Returns:
+            None
+
+        Note:
+            - 追加と変更は比較先の行番号の順に、削除は比較元の行番号の順に emit を呼び出す
+        """
+        # キー毎の [比較先で現れた行数, 比較元の行...]
+        entries: Dict[DiffKey, list[Any]] = {}
+        row_index: int
+        row: list[str]
+        for row_index, row in old_rows:
+            key: DiffKey = key_getter(row)
+            entry: list[Any] | None = entries.get(key)
+            if entry is None:
+                entries[key] = [0, (row_index, row)]
+            else:
+                entry.append((row_index, row))
+                self.old_duplicate_keys += 1
+
+        for row_index, row in new_rows:
+            key = key_getter(row)
+            entry = entries.get(key)
+            if entry is None:
+                entry = entries[key] = [0]
+            elif entry[0] > 0:
+                self.new_duplicate_keys += 1
+            entry[0] += 1
+            if len(entry) == 1:
+                self.added += 1
+                emit("added", row_index, row)
+                continue
+            old_row: list[str] = entry.pop(1)[1]
+            if old_row == row:
+                self.unchanged += 1
+                continue
+            self.changed += 1
+            changed_columns: list[int] = [index for index in self._column_indexes if old_row[index] != row[index]]
+            self.changed_columns.update(changed_columns)
+            emit("changed", row_index, [*old_row, *row, " ".join(map(str, changed_columns))])
+
+        removed: list[NumberedRow] = sorted(
+            (old for entry in entries.values() for old in entry[1:]), key=itemgetter(0)
+        )
+        self.removed += len(removed)
+        for row_index, row in removed:
+            emit("removed", row_index, row)
+
+
+class _SnapshotSpool:
+    """比較元・比較先の行を保持し、メモリ使用量が上限を超えたらキーのハッシュ値で一時ファイルに振り分ける"""
+
+    def __init__(
+        self, key_getter: Callable[[list[str]], DiffKey], memory_limit: int, temp_directory: str | None
+    ) -> None:
+        self._key_getter: Callable[[list[str]], DiffKey] = key_getter
+        self.memory_limit: int = memory_limit
+        self._temp_directory: str | None = temp_directory
+        self.rows: Dict[str, list[NumberedRow]] = {side: [] for side in _SIDES}  # 一時ファイルを使うまでの行
+        self._memory: int = 0
+        self.directory: str | None = None  # 一時ディレクトリ（一時ファイルを使わない場合は None）
+        self._files: list[TextIO] = []
+        self._writers: Dict[str, list[Any]] = {}
+        self.old_partition_memory: list[int] = [0] * DIFF_PARTITIONS  # 一時ファイル毎の比較元の推定メモリ使用量
+
+    def partition_path(self, side: str, partition: int) -> str:
+        """一時ファイルのパスを返す"""
+        return os.path.join(self.directory or "", f"{side}_{partition:02d}.csv")
+
+    def _spill(self, side: str, row_index: int, row: list[str]) -> None:
+        partition: int = _partition_hash(key=self._key_getter(row)) % DIFF_PARTITIONS
+        self._writers[side][partition].writerow((row_index, *row))
+        if side == "old":
+            self.old_partition_memory[partition] += _row_size(row=row)
+
+    def _spill_rows(self) -> None:
+        """保持している行を一時ファイルに書き出す（以降の行は一時ファイルに書き出す）"""
+        self.directory = tempfile.mkdtemp(prefix="count_CSV_FieldValue_", dir=self._temp_directory)
+        side: str
+        for side in _SIDES:
+            files: list[TextIO] = [
+                open(self.partition_path(side=side, partition=partition), mode="w", encoding="utf-8", newline="")
+                for partition in range(DIFF_PARTITIONS)
+            ]
+            self._files.extend(files)
+            self._writers[side] = [csv.writer(file) for file in files]
+            row_index: int
+            row: list[str]
+            for row_index, row in self.rows[side]:
+                self._spill(side=side, row_index=row_index, row=row)
+            self.rows[side] = []
+        self._memory = 0
+
+    def add(self, side: str, row_index: int, row: list[str]) -> None:
+        """行を追加する
+
+        Args:
+            side (str): "old"（比較元）または "new"（比較先）
+            row_index (int): ファイルの行番号
+            row (list[str]): 比較先のヘッダ順に揃えた値
+
+        Returns:
+            None
+        """
+        if self.directory is not None:
+            self._spill(side=side, row_index=row_index, row=row)
+            return
+        self.rows[side].append((row_index, row))
+        self._memory += _row_size(row=row)
+        if self._memory > self.memory_limit:
+            self._spill_rows()
+
+    def close(self) -> None:
+        """一時ファイルへの書き込みを終える"""
+        file: TextIO
+        for file in self._files:
+            file.close()
+        self._files = []
+        self._writers = {}
+
+    def cleanup(self) -> None:
+        """一時ファイルを削除する"""
+        self.close()
+        if self.directory is not None:
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def _read_partition(path: str, remove: bool = False) -> Iterator[NumberedRow]:
+    """一時ファイルから行番号と値を読み込む（remove の場合は読み終えた一時ファイルを削除する）"""
+    with open(path, encoding="utf-8", newline="") as file:
+        record: list[str]
+        for record in csv.reader(file):
+            yield int(record[0]), record[1:]
+    if remove:
+        os.remove(path)
+
+
+def _split_partition(
+    paths: Dict[str, str], key_getter: Callable[[list[str]], DiffKey], depth: int
+) -> Tuple[list[Dict[str, str]], list[int]]:
+    """比較元・比較先の一時ファイルの組を、ハッシュ値の別のビットで DIFF_PARTITIONS 組に分割し直す
+
+    Returns:
+        Tuple[list[Dict[str, str]], list[int]]: 分割した一時ファイルのパスの組と、それぞれの比較元の推定メモリ使用量
+    """
+    sub_directory: str = tempfile.mkdtemp(dir=os.path.dirname(paths["old"]))
+    sub_paths: list[Dict[str, str]] = [
+        {side: os.path.join(sub_directory, f"{side}_{partition:02d}.csv") for side in _SIDES}
+        for partition in range(DIFF_PARTITIONS)
+    ]
+    memory: list[int] = [0] * DIFF_PARTITIONS
+    shift: int = _PARTITION_BITS * depth
+    side: str
+    for side in _SIDES:
+        files: list[TextIO] = [open(sub_path[side], mode="w", encoding="utf-8", newline="") for sub_path in sub_paths]
+        try:
+            writers: list[Any] = [csv.writer(file) for file in files]
+            row_index: int
+            row: list[str]
+            for row_index, row in _read_partition(path=paths[side], remove=True):
+                partition: int = (_partition_hash(key=key_getter(row)) >> shift) % DIFF_PARTITIONS
+                writers[partition].writerow((row_index, *row))
+                if side == "old":
+                    memory[partition] += _row_size(row=row)
+        finally:
+            for file in files:
+                file.close()
+    return sub_paths, memory
+
+
+def _write_run(rows: Iterable[NumberedRow], path: str) -> None:
+    """行番号と値を一時ファイルに書き込む"""
+    with open(path, mode="w", encoding="utf-8", newline="") as file:
+        writer: Any = csv.writer(file)
+        row_index: int
+        values: list[str]
+        for row_index, values in rows:
+            writer.writerow((row_index, *values))
+
+
+def _compare_partition(
+    paths: Dict[str, str],
+    memory: int,
+    depth: int,
+    memory_limit: int,
+    key_getter: Callable[[list[str]], DiffKey],
+    counts: _DiffCounts,
+) -> Dict[str, str]:
+    """比較元・比較先の一時ファイルの組を比較し、種類毎の結果（行番号の順）の一時ファイルのパスを返す
+
+    Note:
+        - 比較元の推定メモリ使用量が上限を超える組は分割し直してから比較し、分割した組毎の結果をマージする
+          （同時に開く一時ファイルの数を DIFF_PARTITIONS 程度に抑える）
+        - 比較した一時ファイルは削除する
+    """
+    run_prefix: str = os.path.splitext(paths["old"])[0]
+    run_paths: Dict[str, str] = {kind: f"{run_prefix}.{kind}.csv" for kind in _KINDS}
+    kind: str
+    if memory > memory_limit and depth < _MAX_PARTITION_DEPTH:
+        sub_paths: list[Dict[str, str]]
+        sub_memory: list[int]
+        sub_paths, sub_memory = _split_partition(paths=paths, key_getter=key_getter, depth=depth + 1)
+        sub_runs: list[Dict[str, str]] = [
+            _compare_partition(
+                paths=sub_paths[partition],
+                memory=sub_memory[partition],
+                depth=depth + 1,
+                memory_limit=memory_limit,
+                key_getter=key_getter,
+                counts=counts,
+            )
+            for partition in range(DIFF_PARTITIONS)
+        ]
+        for kind in _KINDS:
+            _write_run(
+                rows=heapq.merge(
+                    *(_read_partition(path=sub_run[kind], remove=True) for sub_run in sub_runs), key=itemgetter(0)
+                ),
+                path=run_paths[kind],
+            )
+        return run_paths
+
+    files: Dict[str, TextIO] = {}
+    try:
+        for kind in _KINDS:
+            files[kind] = open(run_paths[kind], mode="w", encoding="utf-8", newline="")
+        run_writers: Dict[str, Any] = {kind: csv.writer(file) for kind, file in files.items()}
+
+        def emit(kind: str, row_index: int, values: list[str]) -> None:
+            run_writers[kind].writerow((row_index, *values))
+
+        counts.compare(
+            old_rows=_read_partition(path=paths["old"], remove=True),
+            new_rows=_read_partition(path=paths["new"], remove=True),
+            key_getter=key_getter,
+            emit=emit,
+        )
+    finally:
+        for file in files.values():
+            file.close()
+    return run_paths
+
+
+class _DiffWriters:
+    """変更ファイル（追加・削除・変更）への書き込み"""
+
+    def __init__(self, outputs: DiffOutputs, line_terminator: str) -> None:
+        self._outputs: DiffOutputs = outputs
+        self._line_terminator: str = line_terminator
+        self._files: list[TextIO] = []
+        self._writers: Dict[str, Any] = {}
+        self._header: list[str] = []
+
+    def __enter__(self) -> "_DiffWriters":
+        try:
+            kind: str
+            for kind in _KINDS:
+                file: TextIO = open(getattr(self._outputs, kind), mode="w", encoding="cp932", newline="")
+                self._files.append(file)
+                self._writers[kind] = csv.writer(file, lineterminator=self._line_terminator)
+        except BaseException:
+            self.__exit__()
+            raise
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        file: TextIO
+        for file in self._files:
+            file.close()
+        self._files = []
+
+    def write_headers(self, header: list[str]) -> None:
+        """各ファイルにヘッダ行を書き込む"""
+        self._header = header
+        self._writers["added"].writerow(header)
+        self._writers["removed"].writerow(header)
+        self._writers["changed"].writerow([*header, *CHANGE_COLUMNS])
+
+    def emit(self, kind: str, row_index: int, values: list[str]) -> None:
+        """_DiffCounts.compare の結果の1行を書き込む（row_index は並べ替えにだけ使う）"""
+        if kind != "changed":
+            self._writers[kind].writerow(values)
+            return
+        field_count: int = len(self._header)
+        changed_fields: str = " / ".join(self._header[int(index)] for index in values[-1].split())
+        writer: Any = self._writers["changed"]
+        writer.writerow([*values[:field_count], "変更前", ""])
+        writer.writerow([*values[field_count:-1], "変更後", changed_fields])
+
+
+def _compare_partitions(
+    spool: _SnapshotSpool,
+    key_getter: Callable[[list[str]], DiffKey],
+    counts: _DiffCounts,
+    writers: _DiffWriters,
+) -> None:
+    """一時ファイルの組毎に比較し、組毎の結果（行番号の順）をマージして変更ファイルに書き込む"""
+    runs: list[Dict[str, str]] = [
+        _compare_partition(
+            paths={side: spool.partition_path(side=side, partition=partition) for side in _SIDES},
+            memory=spool.old_partition_memory[partition],
+            depth=0,
+            memory_limit=spool.memory_limit,
+            key_getter=key_getter,
+            counts=counts,
+        )
+        for partition in range(DIFF_PARTITIONS)
+    ]
+    kind: str
+    for kind in _KINDS:
+        row_index: int
+        values: list[str]
+        for row_index, values in heapq.merge(
+            *(_read_partition(path=run[kind], remove=True) for run in runs), key=itemgetter(0)
+        ):
+            writers.emit(kind=kind, row_index=row_index, values=values)
+
+
+def _read_header(csvfile: TextIO, path: str) -> list[str]:
+    """ヘッダ行を読み込む（空ファイルの場合は ValueError）"""
+    header_row: list[str] | None = next(csv.reader(csvfile), None)
+    if not header_row:
+        raise ValueError(f"{path}: ヘッダ行がありません。")
+    return list(header_row)
+
+
+def _iter_data_rows(csvfile: TextIO, align: Callable[[list[str]], list[str]]) -> Iterator[NumberedRow]:
+    """ヘッダ行より後ろのデータ行を、ファイルの行番号（2始まり、空行を含むレコード番号）と一緒に返す"""
+    row_index: int
+    row: list[str]
+    for row_index, row in enumerate(csv.reader(csvfile), start=2):
+        if row:
+            yield row_index, align(row)
+
+
+def diff_csv_files(
+    old_path: str,
+    new_path: str,
+    key_fields: list[str],
+    output_prefix: str,
+    memory_limit: int = DEFAULT_DIFF_MEMORY,
+    temp_directory: str | None = None,
+) -> DiffSummary:
+    """2つのCSVファイルをキー項目で対応付けて比較し、変更ファイルと集計結果ファイルを書き込む
+
+    Args:
+        old_path (str): 比較元のCSVファイルのパス（圧縮ファイル・zip アーカイブ内のファイルの論理パスも可）
+        new_path (str): 比較先のCSVファイルのパス
+        key_fields (list[str]): キー項目のフィールド名（両方のヘッダ行にあること）
+        output_prefix (str): 出力ファイル名の先頭部分（DiffOutputs.from_prefix を参照）
+        memory_limit (int): 比較に使う推定メモリ使用量の上限（バイト）
+        temp_directory (str | None): 一時ファイルを作成するディレクトリ（None の場合はシステムの既定）
+
+    Returns:
+        DiffSummary: 集計結果
+
+    Raises:
+        ValueError: ヘッダ行が無い場合、キー項目がヘッダ行に無い場合
+        OSError: ファイルの読み込み・書き込みに失敗した場合
+        csv.Error: CSV形式エラーが発生した場合
+
+    Note:
+        - 変更ファイルは比較先と同じ形式（cp932、カンマ区切り、比較先のヘッダ行の改行）で書き込む
+        - 変更された行のファイルには、変更前と変更後の行を続けて書き込み、最後の2列に
+          "変更前" / "変更後" と変更された項目名（変更後の行のみ、" / " 区切り）を書き込む
+        - 一時ファイルは比較を終えた後（エラーの場合を含む）に削除する
+    """
+    outputs: DiffOutputs = DiffOutputs.from_prefix(prefix=output_prefix)
+    # フィールド内の改行（CRLF / LF）を変換せずに比較・出力する
+    with open_csv_text(path=old_path, newline="") as old_file, open_csv_text(path=new_path, newline="") as new_file:
+        old_header: list[str] = _read_header(csvfile=old_file, path=old_path)
+        header: list[str] = _read_header(csvfile=new_file, path=new_path)
+        # 比較先の改行（CRLF / LF）で変更ファイルを書き込む
+        line_terminator: str = "\n" if new_file.newlines == "\n" else "\r\n"
+        missing_fields: list[str] = [field for field in key_fields if field not in old_header or field not in header]
+        if missing_fields:
+            raise ValueError(f"キー項目 {', '.join(missing_fields)} がヘッダ行にありません。")
+
+        # 比較先の列位置（項目名が重複する場合は csv.DictReader と同様に最後の列）
+        name_to_index: Dict[str, int] = {name: index for index, name in enumerate(header)}
+        key_getter: Callable[[list[str]], DiffKey] = itemgetter(*(name_to_index[field] for field in key_fields))
+        field_count: int = len(header)
+        old_index: Dict[str, int] = {name: index for index, name in enumerate(old_header)}
+        old_columns: list[int | None] = [old_index.get(name) for name in header]
+
+        def align_new(row: list[str]) -> list[str]:
+            if len(row) == field_count:
+                return row
+            return row[:field_count] + [""] * (field_count - len(row))
+
+        def align_old(row: list[str]) -> list[str]:
+            return [row[index] if index is not None and index < len(row) else "" for index in old_columns]
+
+        align_old_row: Callable[[list[str]], list[str]] = align_new if old_header == header else align_old
+
+        spool: _SnapshotSpool = _SnapshotSpool(
+            key_getter=key_getter, memory_limit=memory_limit, temp_directory=temp_directory
+        )
+        try:
+            old_rows: int = 0
+            new_rows: int = 0
+            row_index: int
+            row: list[str]
+            for row_index, row in _iter_data_rows(csvfile=old_file, align=align_old_row):
+                spool.add(side="old", row_index=row_index, row=row)
+                old_rows += 1
+            for row_index, row in _iter_data_rows(csvfile=new_file, align=align_new):
+                spool.add(side="new", row_index=row_index, row=row)
+                new_rows += 1
+            spool.close()
+
+            counts: _DiffCounts = _DiffCounts(field_count=field_count)
+            with _DiffWriters(outputs=outputs, line_terminator=line_terminator) as writers:
+                writers.write_headers(header=header)
+                if spool.directory is None:
+                    counts.compare(
+                        old_rows=spool.rows["old"], new_rows=spool.rows["new"], key_getter=key_getter, emit=writers.emit
+                    )
+                else:
+                    _compare_partitions(spool=spool, key_getter=key_getter, counts=counts, writers=writers)
+        finally:
+            spool.cleanup()
+
+    summary: DiffSummary = DiffSummary(
+        key_fields=key_fields,
+        old_rows=old_rows,
+        new_rows=new_rows,
+        added=counts.added,
+        removed=counts.removed,
+        changed=counts.changed,
+        unchanged=counts.unchanged,
+        old_duplicate_keys=counts.old_duplicate_keys,
+        new_duplicate_keys=counts.new_duplicate_keys,
+        changed_fields={
+            name: counts.changed_columns[index] for index, name in enumerate(header) if counts.changed_columns[index]
+        },
+        old_only_fields=[field for field in old_header if field not in name_to_index],
+        new_only_fields=[field for field in header if field not in old_index],
+        spilled=spool.directory is not None,
+    )
+    return summary
+
+
+def write_diff_summary(summary: DiffSummary, old_name: str, new_name: str, outputs: DiffOutputs) -> None:
+    """差分の集計結果をテキストファイルに書き込む
+
+    Args:
+        summary (DiffSummary): diff_csv_files の集計結果
+        old_name (str): 比較元のCSVファイル名（表示用）
+        new_name (str): 比較先のCSVファイル名（表示用）
+        outputs (DiffOutputs): 出力ファイルのパス
+
+    Returns:
+        None
+
+    Raises:
+        OSError: ファイル作成や書き込み時にファイル操作エラーが発生した場合
+
+    Note:
+        - ファイルエンコーディングはcp932を使用
+        - 項目毎の変更行数は比較先のヘッダ順に、変更された行がある項目だけを出力する
+    """
+    with open(file=outputs.summary, mode="w", encoding="cp932") as f:
+        f.write(f"比較元のCSVファイル: {old_name}\n")
+        f.write(f"比較先のCSVファイル: {new_name}\n")
+        f.write(f"キー項目: {', '.join(summary.key_fields)}\n")
+        f.write(f"データ行数: 比較元 {summary.old_rows} 行 / 比較先 {summary.new_rows} 行\n\n")
+        f.write(f"追加された行: {summary.added} 行 ({os.path.basename(outputs.added)})\n")
+        f.write(f"削除された行: {summary.removed} 行 ({os.path.basename(outputs.removed)})\n")
+        f.write(f"変更された行: {summary.changed} 行 ({os.path.basename(outputs.changed)})\n")
+        f.write(f"変更のない行: {summary.unchanged} 行\n")
+        if summary.old_duplicate_keys or summary.new_duplicate_keys:
+            f.write(
+                f"\nキーが重複する行: 比較元 {summary.old_duplicate_keys} 行 / 比較先 {summary.new_duplicate_keys} 行"
+                "（それぞれのファイル内の順に対応付けました）\n"
+            )
+        if summary.changed_fields:
+            f.write("\n項目毎の変更された行数:\n")
+            field: str
+            count: int
+            for field, count in summary.changed_fields.items():
+                f.write(f"{field}: {count}\n")
+        if summary.old_only_fields:
+            f.write(f"\n比較元にだけある項目（比較していません）: {', '.join(summary.old_only_fields)}\n")
+        if summary.new_only_fields:
+            f.write(f"\n比較先にだけある項目（比較元の値は空として比較しました）: {', '.join(summary.new_only_fields)}\n")
+        if summary.spilled:
+            f.write("\n※ メモリ使用量の上限を超えたため、一時ファイルに書き出して比較しました\n")
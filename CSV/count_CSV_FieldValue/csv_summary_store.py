@@ -0,0 +1,452 @@
+"""
+CSVファイルのカウント結果の検索可能な形式（SQLite / Parquet）での保存
+
+統合結果ファイル（1ファイル・1項目あたり1行のテキスト）の代わりに、カウント結果を表として保存します。
+ファイル数・項目数の多い場合でも、保存した結果を読み込み直さずに SQL などで絞り込めます。
+
+SQLite（[PREFIX].db）の表:
+- runs: 実行毎の記録（開始・終了日時、設定（JSON）、ファイル数、更新・削除したファイル数）
+- files: CSVファイル毎の記録（パス、ファイルサイズ・更新日時・ハッシュ、文字エンコーディング、データ行数など）
+- fields: 項目毎の記録（値の個数、充填率、--stats の統計情報、--infer-types の型。キー: file_id, 列位置）
+  （項目名と充填率の索引があり、例えば充填率 10% 未満の項目は次の SQL で求められる）
+
+    SELECT files.path, fields.name, fields.fill_rate
+    FROM fields JOIN files USING (file_id)
+    WHERE fields.fill_rate < 0.1
+
+SQLite の更新方法:
+- ファイルサイズ・更新日時・ハッシュ・文字エンコーディングと、統計情報・型の有無が前回と同じファイルは書き直さない
+  （変更されたファイルの項目だけを削除して書き直し、今回見つからなかったファイルは削除する）
+- 1つのトランザクションで executemany によりまとめて書き込む（書き込み途中の状態は他のプログラムから見えない）
+- 半数を超えるファイルを書き込む場合（初回など）は、fields の索引を削除してから書き込み、最後に作り直す
+
+Parquet（[PREFIX].files.parquet, [PREFIX].fields.parquet）:
+- SQLite の files 表と fields 表と同じ列（fields にはパスの列も加える）。実行の記録はスキーマのメタデータに入れる
+- Parquet は部分的に書き換えられないため、毎回全てのファイルを一時ファイルに書き込んでから置き換える
+- 列毎の最小値・最大値の統計で、pyarrow・DuckDB などが条件に合わない行グループを読み飛ばせる
+
+Note:
+    - Parquet には pyarrow が必要（インストールされていない場合は PARQUET_AVAILABLE が False）
+    - 形式のバージョン（PRAGMA user_version）が異なる SQLite データベースは、表を作り直す
+"""
+
+import json
+import os
+import sqlite3
+from datetime import datetime
+from typing import Any, Dict, Iterator, NamedTuple, Tuple
+
+from csv_compressed import display_name
+from csv_count_manifest import ManifestEntry
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    PARQUET_AVAILABLE: bool = True
+except ImportError:
+    PARQUET_AVAILABLE = False  # pyarrow がインストールされていない場合、Parquet では保存できない
+
+STORE_VERSION: int = 1  # SQLite データベースの形式のバージョン（PRAGMA user_version）
+PARQUET_BATCH_ROWS: int = 1024 * 1024  # Parquet に一度に書き込む行数（行グループの大きさ）
+
+_SCHEMA: Tuple[str, ...] = (
+    """CREATE TABLE IF NOT EXISTS runs (
+        run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        started_at TEXT NOT NULL,
+        finished_at TEXT NOT NULL,
+        settings TEXT NOT NULL,
+        file_count INTEGER NOT NULL,
+        updated_file_count INTEGER NOT NULL,
+        removed_file_count INTEGER NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS files (
+        file_id INTEGER PRIMARY KEY,
+        path TEXT NOT NULL UNIQUE,
+        name TEXT NOT NULL,
+        size INTEGER NOT NULL,
+        mtime_ns INTEGER NOT NULL,
+        content_hash TEXT,
+        encoding TEXT NOT NULL,
+        has_data INTEGER NOT NULL,
+        data_row_count INTEGER NOT NULL,
+        field_count INTEGER NOT NULL,
+        has_stats INTEGER NOT NULL,
+        has_types INTEGER NOT NULL,
+        run_id INTEGER NOT NULL REFERENCES runs (run_id)
+    )""",
+    """CREATE TABLE IF NOT EXISTS fields (
+        file_id INTEGER NOT NULL REFERENCES files (file_id),
+        position INTEGER NOT NULL,
+        name TEXT NOT NULL,
+        value_count INTEGER NOT NULL,
+        fill_rate REAL,
+        distinct_count INTEGER,
+        min_length INTEGER,
+        max_length INTEGER,
+        average_length REAL,
+        whitespace_ratio REAL,
+        type_name TEXT,
+        mismatch_count INTEGER,
+        PRIMARY KEY (file_id, position)
+    ) WITHOUT ROWID""",
+    "CREATE INDEX IF NOT EXISTS files_name ON files (name)",
+)
+# fields の索引（名前, 作成する SQL）。多くのファイルを書き込む場合は削除してから書き込み、最後に作り直す
+_FIELD_INDEXES: Tuple[Tuple[str, str], ...] = (
+    ("fields_name", "CREATE INDEX IF NOT EXISTS fields_name ON fields (name)"),
+    ("fields_fill_rate", "CREATE INDEX IF NOT EXISTS fields_fill_rate ON fields (fill_rate)"),
+)
+_FILE_COLUMNS: Tuple[str, ...] = (
+    "file_id",
+    "path",
+    "name",
+    "size",
+    "mtime_ns",
+    "content_hash",
+    "encoding",
+    "has_data",
+    "data_row_count",
+    "field_count",
+    "has_stats",
+    "has_types",
+    "run_id",
+)
+_FIELD_COLUMNS: Tuple[str, ...] = (
+    "file_id",
+    "position",
+    "name",
+    "value_count",
+    "fill_rate",
+    "distinct_count",
+    "min_length",
+    "max_length",
+    "average_length",
+    "whitespace_ratio",
+    "type_name",
+    "mismatch_count",
+)
+
+# 前回から変更されていないかを判定する files の列（ファイルの情報と、書き込んだ項目の列の内容）
+FileState = Tuple[int, int, str | None, str, bool, bool]
+
+
+class StoreUpdate(NamedTuple):
+    """カウント結果の保存の結果"""
+
+    file_count: int  # 保存されているCSVファイルの数
+    updated_files: int  # 書き込んだ（追加・変更された）CSVファイルの数
+    removed_files: int  # 削除したCSVファイルの数（今回見つからなかったファイル）
+
+
+def file_state(entry: ManifestEntry) -> FileState:
+    """CSVファイルの結果を書き直す必要があるかを判定するための値を返す
+
+    Args:
+        entry (ManifestEntry): CSVファイルのカウント結果
+
+    Returns:
+        FileState: ファイルサイズ・更新日時・ハッシュ・文字エンコーディング・統計情報と型の有無
+    """
+    return (
+        entry.signature.size,
+        entry.signature.mtime_ns,
+        entry.signature.content_hash,
+        entry.encoding,
+        entry.field_stats is not None,
+        entry.field_types is not None,
+    )
+
+
+def file_row(file_id: int, path: str, entry: ManifestEntry) -> Tuple[Any, ...]:
+    """CSVファイルの files の行（run_id を除く）を返す
+
+    Args:
+        file_id (int): CSVファイルの file_id
+        path (str): CSVファイルのパス
+        entry (ManifestEntry): CSVファイルのカウント結果
+
+    Returns:
+        Tuple[Any, ...]: _FILE_COLUMNS の順の値（run_id を除く）
+    """
+    size, mtime_ns, content_hash, encoding, has_stats, has_types = file_state(entry=entry)
+    return (
+        file_id,
+        path,
+        display_name(path=path),
+        size,
+        mtime_ns,
+        content_hash,
+        encoding,
+        entry.has_data,
+        entry.data_row_count,
+        len(entry.fieldnames),
+        has_stats,
+        has_types,
+    )
+
+
+def iter_field_rows(file_id: int, entry: ManifestEntry) -> Iterator[Tuple[Any, ...]]:
+    """CSVファイルの項目毎の fields の行を列位置の順に返す
+
+    Args:
+        file_id (int): CSVファイルの file_id
+        entry (ManifestEntry): CSVファイルのカウント結果
+
+    Returns:
+        Iterator[Tuple[Any, ...]]: _FIELD_COLUMNS の順の値（充填率はデータ行が無い場合は None、
+            統計情報と型は無い場合は None）
+
+    Note:
+        - 項目名が重複する場合は、いずれの列位置も同じ項目名の結果（csv.DictReader と同様に最後の列）とする
+    """
+    position: int
+    name: str
+    for position, name in enumerate(entry.fieldnames):
+        value_count: int = entry.counts.get(name, 0)
+        stats = entry.field_stats.get(name) if entry.field_stats is not None else None
+        field_type = entry.field_types.get(name) if entry.field_types is not None else None
+        yield (
+            file_id,
+            position,
+            name,
+            value_count,
+            value_count / entry.data_row_count if entry.data_row_count > 0 else None,
+            *(stats if stats is not None else (None, None, None, None, None)),
+            *(field_type if field_type is not None else (None, None)),
+        )
+
+
+def open_summary_database(database_file: str) -> sqlite3.Connection:
+    """カウント結果を保存する SQLite データベースを開き、表が無ければ作成する
+
+    Args:
+        database_file (str): データベースファイルのパス
+
+    Returns:
+        sqlite3.Connection: データベースの接続
+
+    Raises:
+        sqlite3.Error: データベースを開けなかった場合
+
+    Note:
+        - 形式のバージョンが異なるデータベースは、表を削除して作り直す
+    """
+    connection: sqlite3.Connection = sqlite3.connect(database_file)
+    try:
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.execute("PRAGMA synchronous = NORMAL")
+        version: int = connection.execute("PRAGMA user_version").fetchone()[0]
+        with connection:
+            if version != STORE_VERSION:
+                connection.execute("DROP TABLE IF EXISTS fields")
+                connection.execute("DROP TABLE IF EXISTS files")
+                connection.execute("DROP TABLE IF EXISTS runs")
+            statement: str
+            for statement in _SCHEMA:
+                connection.execute(statement)
+            for _, statement in _FIELD_INDEXES:
+                connection.execute(statement)
+            connection.execute(f"PRAGMA user_version = {STORE_VERSION}")
+    except sqlite3.Error:
+        connection.close()
+        raise
+    return connection
+
+
+def write_sqlite_summary(
+    database_file: str, entries: Dict[str, ManifestEntry], settings: Dict[str, Any], started_at: datetime
+) -> StoreUpdate:
+    """全CSVファイルのカウント結果を SQLite データベースに保存する（変更されたファイルだけを書き直す）
+
+    Args:
+        database_file (str): データベースファイルのパス
+        entries (Dict[str, ManifestEntry]): 全CSVファイルのカウント結果（キー: CSVファイルのパス）
+        settings (Dict[str, Any]): runs に記録する実行時の設定
+        started_at (datetime): 実行を開始した日時
+
+    Returns:
+        StoreUpdate: 保存の結果
+
+    Raises:
+        sqlite3.Error: データベースの読み書きに失敗した場合（書き込みは全て取り消される）
+    """
+    connection: sqlite3.Connection = open_summary_database(database_file=database_file)
+    try:
+        with connection:
+            run_id: int = connection.execute(
+                "INSERT INTO runs (started_at, finished_at, settings, file_count, updated_file_count,"
+                " removed_file_count) VALUES (?, ?, ?, 0, 0, 0)",
+                (
+                    started_at.isoformat(timespec="seconds"),
+                    started_at.isoformat(timespec="seconds"),
+                    json.dumps(settings, ensure_ascii=False),
+                ),
+            ).lastrowid
+
+            # 前回保存したファイルの file_id と状態
+            stored: Dict[str, Tuple[int, FileState]] = {
+                path: (file_id, tuple(state))
+                for file_id, path, *state in connection.execute(
+                    "SELECT file_id, path, size, mtime_ns, content_hash, encoding, has_stats, has_types FROM files"
+                )
+            }
+            removed_ids: list[Tuple[int]] = [(file_id,) for path, (file_id, _) in stored.items() if path not in entries]
+            next_file_id: int = max((file_id for file_id, _ in stored.values()), default=0) + 1
+            updated: list[Tuple[int, str, ManifestEntry]] = []
+            path: str
+            entry: ManifestEntry
+            for path, entry in entries.items():
+                previous: Tuple[int, FileState] | None = stored.get(path)
+                if previous is None:
+                    updated.append((next_file_id, path, entry))
+                    next_file_id += 1
+                elif previous[1] != file_state(entry=entry):
+                    updated.append((previous[0], path, entry))
+
+            # 変更・削除されたファイルの項目を削除してから、変更されたファイルを書き込む
+            # （半数を超えるファイルを書き込む場合は、行毎に索引を更新するより最後に作り直す方が速い）
+            rebuild_indexes: bool = len(updated) * 2 > len(entries)
+            if rebuild_indexes:
+                index_name: str
+                for index_name, _ in _FIELD_INDEXES:
+                    connection.execute(f"DROP INDEX IF EXISTS {index_name}")
+            connection.executemany(
+                "DELETE FROM fields WHERE file_id = ?",
+                removed_ids + [(file_id,) for file_id, _, _ in updated],
+            )
+            connection.executemany("DELETE FROM files WHERE file_id = ?", removed_ids)
+            connection.executemany(
+                f"INSERT OR REPLACE INTO files ({', '.join(_FILE_COLUMNS)})"
+                f" VALUES ({', '.join('?' for _ in _FILE_COLUMNS)})",
+                ((*file_row(file_id=file_id, path=path, entry=entry), run_id) for file_id, path, entry in updated),
+            )
+            connection.executemany(
+                f"INSERT INTO fields ({', '.join(_FIELD_COLUMNS)}) VALUES ({', '.join('?' for _ in _FIELD_COLUMNS)})",
+                (row for file_id, _, entry in updated for row in iter_field_rows(file_id=file_id, entry=entry)),
+            )
+            if rebuild_indexes:
+                statement: str
+                for _, statement in _FIELD_INDEXES:
+                    connection.execute(statement)
+            update: StoreUpdate = StoreUpdate(
+                file_count=len(entries), updated_files=len(updated), removed_files=len(removed_ids)
+            )
+            connection.execute(
+                "UPDATE runs SET finished_at = ?, file_count = ?, updated_file_count = ?, removed_file_count = ?"
+                " WHERE run_id = ?",
+                (datetime.now().isoformat(timespec="seconds"), *update, run_id),
+            )
+    finally:
+        connection.close()
+    return update
+
+
+def write_parquet_summary(
+    prefix: str, entries: Dict[str, ManifestEntry], settings: Dict[str, Any], started_at: datetime
+) -> StoreUpdate:
+    """全CSVファイルのカウント結果を Parquet ファイル（[prefix].files.parquet, [prefix].fields.parquet）に書き込む
+
+    Args:
+        prefix (str): 出力ファイル名の先頭部分
+        entries (Dict[str, ManifestEntry]): 全CSVファイルのカウント結果（キー: CSVファイルのパス）
+        settings (Dict[str, Any]): スキーマのメタデータに記録する実行時の設定
+        started_at (datetime): 実行を開始した日時
+
+    Returns:
+        StoreUpdate: 保存の結果（全てのファイルを書き直すため、updated_files は file_count と同じ）
+
+    Raises:
+        RuntimeError: pyarrow がインストールされていない場合
+        OSError: ファイルの書き込みに失敗した場合
+
+    Note:
+        - fields は PARQUET_BATCH_ROWS 行毎に書き込む（全ての行をメモリ上の表にしない）
+        - 一時ファイル（[出力ファイル名].tmp）に書き込んでから置き換える
+    """
+    if not PARQUET_AVAILABLE:
+        raise RuntimeError("Parquet で保存するには pyarrow が必要です。")
+    run: Dict[str, Any] = {
+        "started_at": started_at.isoformat(timespec="seconds"),
+        "finished_at": datetime.now().isoformat(timespec="seconds"),
+        "settings": settings,
+        "file_count": len(entries),
+    }
+    metadata: Dict[bytes, bytes] = {b"run": json.dumps(run, ensure_ascii=False).encode("utf-8")}
+    files_schema: pa.Schema = pa.schema(
+        [
+            ("file_id", pa.int64()),
+            ("path", pa.string()),
+            ("name", pa.string()),
+            ("size", pa.int64()),
+            ("mtime_ns", pa.int64()),
+            ("content_hash", pa.string()),
+            ("encoding", pa.string()),
+            ("has_data", pa.bool_()),
+            ("data_row_count", pa.int64()),
+            ("field_count", pa.int64()),
+            ("has_stats", pa.bool_()),
+            ("has_types", pa.bool_()),
+        ],
+        metadata=metadata,
+    )
+    fields_schema: pa.Schema = pa.schema(
+        [
+            ("file_id", pa.int64()),
+            ("position", pa.int64()),
+            ("name", pa.string()),
+            ("value_count", pa.int64()),
+            ("fill_rate", pa.float64()),
+            ("distinct_count", pa.int64()),
+            ("min_length", pa.int64()),
+            ("max_length", pa.int64()),
+            ("average_length", pa.float64()),
+            ("whitespace_ratio", pa.float64()),
+            ("type_name", pa.string()),
+            ("mismatch_count", pa.int64()),
+            ("path", pa.string()),
+        ],
+        metadata=metadata,
+    )
+    files_file: str = f"{prefix}.files.parquet"
+    fields_file: str = f"{prefix}.fields.parquet"
+    try:
+        pq.write_table(
+            _rows_to_table(
+                rows=[
+                    file_row(file_id=file_id, path=path, entry=entry)
+                    for file_id, (path, entry) in enumerate(entries.items(), start=1)
+                ],
+                schema=files_schema,
+            ),
+            f"{files_file}.tmp",
+        )
+        with pq.ParquetWriter(f"{fields_file}.tmp", schema=fields_schema) as writer:
+            batch: list[Tuple[Any, ...]] = []
+            file_id: int
+            path: str
+            entry: ManifestEntry
+            for file_id, (path, entry) in enumerate(entries.items(), start=1):
+                batch.extend((*row, path) for row in iter_field_rows(file_id=file_id, entry=entry))
+                if len(batch) >= PARQUET_BATCH_ROWS:
+                    writer.write_table(_rows_to_table(rows=batch, schema=fields_schema))
+                    batch = []
+            writer.write_table(_rows_to_table(rows=batch, schema=fields_schema))
+        os.replace(f"{files_file}.tmp", files_file)
+        os.replace(f"{fields_file}.tmp", fields_file)
+    except BaseException:
+        for temporary_file in (f"{files_file}.tmp", f"{fields_file}.tmp"):
+            try:
+                os.remove(temporary_file)
+            except OSError:
+                pass
+        raise
+    return StoreUpdate(file_count=len(entries), updated_files=len(entries), removed_files=0)
+
+
+def _rows_to_table(rows: list[Tuple[Any, ...]], schema: "pa.Schema") -> "pa.Table":
+    """行のリストを列毎の配列に並べ替えて表にする"""
+    columns: list[Tuple[Any, ...]] = list(zip(*rows)) if rows else [() for _ in schema.names]
+    return pa.Table.from_arrays(
+        [pa.array(column, type=field.type) for column, field in zip(columns, schema)], schema=schema
+    )
@@ -0,0 +1,483 @@
+"""
+CSVのフィールド毎の値の型（整数・小数・日付・日時・真偽値・文字列）の推定
+
+値の個数のカウントと同じ1回の読み込みで、フィールド毎に空でない値を型別に数え、
+最も多くの値が当てはまる型と、その型に合わない値の個数を求めます。
+
+判定する型:
+- integer: 整数（符号・3桁毎のカンマを含むものも可。例: 123, -7, 1,234,567）
+- decimal: 小数（指数表記を含む。例: 1.5, -.25, 3e10。整数も小数に当てはまるとみなす）
+- date: 日付（年4桁、区切りは - または /。例: 2025-06-27, 2025/6/27）
+- datetime: 日時（日付 + T または空白 + 時刻。秒・小数秒・タイムゾーンは任意。日付も日時に当てはまるとみなす）
+- boolean: 真偽値（true, false, yes, no。大文字・小文字は区別しない）
+- text: 上記のいずれにも当てはまらない値（前後に空白を含む値や全角数字も文字列とする）
+
+処理速度:
+- 値の型を推定するだけの場合は、行の値を行順のまま連結したリストから列毎の値を取り出す（TypeCounter.update_rows）
+- 空でない値が全て同じ型の列は、次のまとめからはその型のよく現れる形の値（ISO 形式の日付など）だけかを
+  正規表現1回で確認し、当てはまれば他の型の判定を省く（それ以外の値・2月29日・改行を含む値があれば通常の判定に戻す）
+  - 型が確定した時点の値の種類が FIXED_VALUES_SIZE 以下の列は、それらの値だけが続く間は値を連結せずに数える
+- 値の種類が少ない列は、列毎に値とその型を記録し（VALUE_MEMO_SIZE 種類まで）、まとめた値を Counter で
+  数えてから値の種類毎に記録した型を加算する（型の混在する列も、値を連結して形を調べる処理と値毎の判定を省く）
+  - 値の種類が VALUE_MEMO_SIZE を超えた列は記録を破棄し、以降は下記のまとめた判定を行う
+- それ以外の列は、列毎にまとめた値（csv_field_stats の STATS_BATCH_ROWS 行分）を改行で連結し、C 実装の処理（bytes.translate、
+  bytes.count など）で文字の種類と値の形（数字を 9 に置き換えた形。例: 郵便番号は 999-9999）を調べる
+  - 数字だけの列は値を読み込まずに整数とする
+  - 型は値の形毎に1回だけ判定し（形の判定結果はキャッシュする）、形毎の値の個数をまとめて加算する
+  - 先頭の文字が数字・符号・小数点・真偽値の頭文字のいずれでもない値は、形を判定せずに文字列として数える
+- 日付・日時の形の値だけは存在しない日付（2月30日など）があり得るため値毎に確認する
+  - 全ての値が ISO 形式（区切りが / のものを含む）の列は datetime.fromisoformat() でまとめて確認する
+  - それ以外は値毎に正規表現で判定し、判定結果をキャッシュする（TYPE_CACHE_SIZE 件まで）
+- 全角文字を含む列は、先頭の文字で文字列以外になり得る値だけを選んでから値毎に判定する
+
+並列処理:
+- 型別の値の個数は合算してマージでき、1プロセスで集計した場合と同じ結果になる
+"""
+
+import calendar
+import re
+from collections import Counter, deque
+from datetime import datetime
+from typing import Any, Dict, NamedTuple, Sequence, Tuple
+
+TYPE_CACHE_SIZE: int = 65536  # 値毎の判定結果をキャッシュする件数の上限（超えた場合は空にする）
+FIXED_VALUES_SIZE: int = 1024  # 型が確定した列で、その型と判定済みとして保持する値の種類数の上限
+VALUE_MEMO_SIZE: int = 256  # 列毎に値とその型を記録する値の種類数の上限（超えた列は記録しない）
+TYPE_BATCH_VALUES: int = 1024 * 1024  # 一度に数える値の個数の目安（横長のファイルで列毎の値を取り出す際のキャッシュミスを抑える）
+
+# 型の番号（TYPE_NAMES の位置）
+INTEGER: int = 0
+DECIMAL: int = 1
+DATE: int = 2
+DATETIME: int = 3
+BOOLEAN: int = 4
+TEXT: int = 5
+TYPE_NAMES: Tuple[str, ...] = ("integer", "decimal", "date", "datetime", "boolean", "text")
+EMPTY_TYPE_NAME: str = "empty"  # 空でない値が無いフィールドの型
+TYPE_LABELS: Dict[str, str] = {
+    "integer": "整数",
+    "decimal": "小数",
+    "date": "日付",
+    "datetime": "日時",
+    "boolean": "真偽値",
+    "text": "文字列",
+    EMPTY_TYPE_NAME: "値なし",
+}
+
+# 値毎の判定に使う正規表現（re.ASCII により \d は半角数字だけに一致する）
+_TIME: str = r"[T ](?:[01]?\d|2[0-3]):[0-5]\d(?::[0-5]\d(?:\.\d+)?)?(?:Z|[+-](?:[01]\d|2[0-3]):?[0-5]\d)?"
+_INTEGER_PATTERN: re.Pattern[str] = re.compile(r"[+-]?(?:\d{1,3}(?:,\d{3})+|\d+)", re.ASCII)
+_DECIMAL_PATTERN: re.Pattern[str] = re.compile(
+    r"[+-]?(?:(?:\d{1,3}(?:,\d{3})+|\d+)(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?", re.ASCII  # 整数も一致する
+)
+_DATE_TIME_PATTERN: re.Pattern[str] = re.compile(
+    rf"(?P<year>\d{{4}})[-/](?P<month>0?[1-9]|1[0-2])[-/](?P<day>0?[1-9]|[12]\d|3[01])(?P<time>{_TIME})?", re.ASCII
+)
+_BOOLEAN_PATTERN: re.Pattern[str] = re.compile(r"true|false|yes|no", re.ASCII | re.IGNORECASE)
+_CANDIDATE_FIRST_CHARACTERS: frozenset[str] = frozenset("0123456789+-.tTfFyYnN")  # 文字列以外になり得る先頭の文字
+
+# 型が確定した列でよく現れる形の値だけに一致する正規表現（その型と判定される値の一部。2月29日の日付は含めない）
+_ISO_DATE: str = r"\d{4}-(?:(?:0[1-9]|1[0-2])-(?:0[1-9]|1\d|2[0-8])|(?:0[13-9]|1[0-2])-(?:29|30)|(?:0[13578]|1[02])-31)"
+_FIXED_TYPE_VALUES: Dict[int, str] = {
+    DECIMAL: r"-?\d+\.\d+",
+    DATE: _ISO_DATE,
+    DATETIME: _ISO_DATE + r"[T ](?:[01]\d|2[0-3]):[0-5]\d(?::[0-5]\d)?",
+    BOOLEAN: r"(?i:true|false|yes|no)",
+}
+# 改行で連結した列の値が、空の値と上記の値だけからなる場合に一致する（整数は数字だけか、文字列は先頭の文字で確認する）
+_FIXED_TYPE_PATTERNS: Dict[int, re.Pattern[str]] = {
+    type_index: re.compile(rf"(?:{value}\n|\n)*(?:{value})?", re.ASCII)
+    for type_index, value in _FIXED_TYPE_VALUES.items()
+}
+
+# まとめて判定する際の文字の種類（改行で連結した値を bytes にして調べる）
+_DIGITS: bytes = b"0123456789"
+_DIGIT_SHAPE: bytes = bytes.maketrans(_DIGITS, b"9" * len(_DIGITS))  # 数字を 9 に置き換えて値の形を求める表
+_CANDIDATE_LINES: re.Pattern[str] = re.compile(r"\n([0-9+\-.tTfFyYnN][^\n]*)")  # 先頭が候補の文字の値（改行の後）
+_CANDIDATE_BYTE_LINES: re.Pattern[bytes] = re.compile(rb"\n([0-9+\-.tTfFyYnN][^\n]*)")
+_CANDIDATE_FIRST_BYTES: frozenset[int] = frozenset(b"0123456789+-.tTfFyYnN")
+_COUNTED_SHAPES: int = 8  # 出現回数をバイト列の検索で数える値の形の種類の上限（超えた分は値毎に数える）
+_DATE_LIKE_SHAPE: re.Pattern[bytes] = re.compile(rb"9999[-/]99?[-/]99?")  # 値毎に判定する日付・日時の形
+_DATE_SEPARATORS: bytes = bytes.maketrans(b"/", b"-")  # 区切りが / の日付を ISO 形式にする表
+_PER_VALUE: int = -1  # 形だけでは型が決まらない（値毎に判定する）ことを表す番号
+# datetime.fromisoformat() で確認できる日付・日時の形（キー: 形, 値: 型の番号、タイムゾーン付きは値毎に判定する）
+_ISO_SHAPES: Dict[bytes, int] = {
+    b"9999-99-99": DATE,
+    **{
+        b"9999-99-99" + separator + time: DATETIME
+        for separator in (b" ", b"T")
+        for time in (b"99:99", b"99:99:99", b"99:99:99.999", b"99:99:99.999999")
+    },
+}
+
+
+class FieldType(NamedTuple):
+    """1フィールド分の型の推定結果"""
+
+    type_name: str  # 推定した型（TYPE_NAMES のいずれか、空でない値が無い場合は EMPTY_TYPE_NAME）
+    mismatch_count: int  # 推定した型に合わない値の個数（空の値は除く）
+
+
+def is_existing_date(year: int, month: int, day: int) -> bool:
+    """存在する日付かどうかを返す（month は 1～12、day は 1～31 であること）"""
+    if day <= 28:
+        return True
+    if month == 2:
+        return day == 29 and calendar.isleap(year)
+    return day <= 30 or month in (1, 3, 5, 7, 8, 10, 12)
+
+
+def classify_value(value: str) -> int:
+    """1つの値の型を判定する
+
+    Args:
+        value (str): 空でない値
+
+    Returns:
+        int: 型の番号（INTEGER, DECIMAL, DATE, DATETIME, BOOLEAN, TEXT のいずれか）
+    """
+    if value[0] not in _CANDIDATE_FIRST_CHARACTERS:
+        return TEXT
+    if _INTEGER_PATTERN.fullmatch(value):
+        return INTEGER
+    if _DECIMAL_PATTERN.fullmatch(value):
+        return DECIMAL
+    match: re.Match[str] | None = _DATE_TIME_PATTERN.fullmatch(value)
+    if match is not None:
+        if not is_existing_date(year=int(match["year"]), month=int(match["month"]), day=int(match["day"])):
+            return TEXT
+        return DATE if match["time"] is None else DATETIME
+    if _BOOLEAN_PATTERN.fullmatch(value):
+        return BOOLEAN
+    return TEXT
+
+
+def _matches_fixed_type(fixed_type: int, joined: str) -> bool:
+    """改行で連結した列の値が、空の値と確定した型のよく現れる形の値だけからなるかを返す
+
+    Args:
+        fixed_type (int): 列の空でない値が全て当てはまった型の番号
+        joined (str): 列の値を改行で連結した文字列（改行を含む値が無いこと）
+
+    Returns:
+        bool: True の場合は空でない値が全て fixed_type（False の場合は通常の判定で型を求める）
+    """
+    if fixed_type == TEXT:
+        return _CANDIDATE_LINES.search("\n" + joined) is None
+    if fixed_type == INTEGER:
+        return False  # 数字だけの値かは通常の判定でも最初に確認する
+    return _FIXED_TYPE_PATTERNS[fixed_type].fullmatch(joined) is not None
+
+
+def dominant_type(type_counts: list[int]) -> FieldType:
+    """型別の値の個数から、最も多くの値が当てはまる型を求める
+
+    Args:
+        type_counts (list[int]): 型別（TYPE_NAMES の順）の空でない値の個数
+
+    Returns:
+        FieldType: 推定した型とその型に合わない値の個数
+
+    Note:
+        - 整数は小数に、日付は日時に当てはまるとみなす（整数だけの列は integer、小数を含む列は decimal）
+        - 当てはまる値の個数が同じ型は TYPE_NAMES の順で先の型を選ぶ
+        - 文字列は全ての値が当てはまるため、文字列と推定した場合の合わない値の個数は 0
+    """
+    total: int = sum(type_counts)
+    if not total:
+        return FieldType(type_name=EMPTY_TYPE_NAME, mismatch_count=0)
+    fit_counts: list[int] = [
+        type_counts[INTEGER],
+        type_counts[INTEGER] + type_counts[DECIMAL],
+        type_counts[DATE],
+        type_counts[DATE] + type_counts[DATETIME],
+        type_counts[BOOLEAN],
+        type_counts[TEXT],
+    ]
+    best: int = fit_counts.index(max(fit_counts))
+    return FieldType(type_name=TYPE_NAMES[best], mismatch_count=0 if best == TEXT else total - fit_counts[best])
+
+
+class TypeCounter:
+    """列位置毎に空でない値を型別に数える（マージ可能）
+
+    Attributes:
+        counts (list[list[int]]): 列位置毎の型別（TYPE_NAMES の順）の空でない値の個数
+    """
+
+    def __init__(self, field_count: int, cache_size: int = TYPE_CACHE_SIZE) -> None:
+        self.counts: list[list[int]] = [[0] * len(TYPE_NAMES) for _ in range(field_count)]
+        self._cache: Dict[str, int] = {}
+        self._shape_cache: Dict[bytes, int] = {}
+        self._cache_size: int = cache_size
+        self._fixed_types: list[int | None] = [None] * field_count  # 空でない値が全て同じ型の列のその型
+        self._fixed_values: list[set[str]] = [{""} for _ in range(field_count)]  # 確定した型と判定済みの値（と空の値）
+        # 列毎の値とその型（値の種類が VALUE_MEMO_SIZE を超えた列は None）
+        self._value_types: list[Dict[str, int] | None] = [{} for _ in range(field_count)]
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # ワーカープロセスから結果を返す際にキャッシュと確定した型は送らない
+        field_count: int = len(self.counts)
+        return {
+            **self.__dict__,
+            "_cache": {},
+            "_shape_cache": {},
+            "_fixed_types": [None] * field_count,
+            "_fixed_values": [{""} for _ in range(field_count)],
+            "_value_types": [{} for _ in range(field_count)],
+        }
+
+    def _classify(self, value: str) -> int:
+        type_index: int | None = self._cache.get(value)
+        if type_index is None:
+            type_index = classify_value(value=value)
+            if len(self._cache) >= self._cache_size:
+                self._cache.clear()
+            self._cache[value] = type_index
+        return type_index
+
+    def _classify_shape(self, shape: bytes) -> int:
+        type_index: int | None = self._shape_cache.get(shape)
+        if type_index is None:
+            # 日付・日時は数字の値によって存在しない日時になり得るため値毎に判定する
+            type_index = _PER_VALUE if _DATE_LIKE_SHAPE.match(shape) else classify_value(value=shape.decode("ascii"))
+            if len(self._shape_cache) >= self._cache_size:
+                self._shape_cache.clear()
+            self._shape_cache[shape] = type_index
+        return type_index
+
+    def _count_shapes(self, shapes: bytes) -> Dict[bytes, int]:
+        """値の形毎の個数を求める（先頭が数字・符号・小数点・真偽値の頭文字以外の形は文字列として数えない）
+
+        Args:
+            shapes (bytes): 列の値を改行で連結し、数字を 9 に置き換えたバイト列
+
+        Returns:
+            Dict[bytes, int]: 値の形と個数の辞書（文字列以外になり得る形だけ）
+        """
+        # 値を改行2つで区切り、先頭の候補の値の形を探して出現回数を数えてから取り除くことを繰り返す
+        framed: bytes = b"\n" + shapes.replace(b"\n", b"\n\n") + b"\n"
+        shape_counts: Counter[bytes] = Counter()
+        for _ in range(_COUNTED_SHAPES):
+            match: re.Match[bytes] | None = _CANDIDATE_BYTE_LINES.search(framed)
+            if match is None:
+                return shape_counts
+            framed_shape: bytes = b"\n" + match[1] + b"\n"
+            shape_counts[match[1]] = framed.count(framed_shape)
+            framed = framed.replace(framed_shape, b"")
+        shape_counts.update(_CANDIDATE_BYTE_LINES.findall(framed))  # 形の種類が多い場合は残りを値毎に数える
+        return shape_counts
+
+    def _count_ascii(self, counts: list[int], values: Sequence[str], data: bytes, value_count: int) -> None:
+        """半角文字だけの列の値を、値の形（数字を 9 に置き換えた形）毎にまとめて数える
+
+        Args:
+            counts (list[int]): 列の型別の値の個数（加算する）
+            values (Sequence[str]): 列の値（空の値を含む）
+            data (bytes): 列の値を改行で連結したバイト列（改行を含む値が無いこと）
+            value_count (int): 空でない値の個数
+
+        Returns:
+            None
+        """
+        symbols: bytes = data.translate(None, _DIGITS)
+        if symbols.count(b"\n") == len(symbols):
+            counts[INTEGER] += value_count  # 数字だけの値
+            return
+        shapes: bytes = data.translate(_DIGIT_SHAPE)
+        shape_counts: Dict[bytes, int] = self._count_shapes(shapes=shapes)
+        per_value_shapes: list[bytes] = []
+        candidate_count: int = 0
+        shape: bytes
+        count: int
+        for shape, count in shape_counts.items():
+            candidate_count += count
+            type_index: int = self._classify_shape(shape=shape)
+            if type_index == _PER_VALUE:
+                per_value_shapes.append(shape)
+            else:
+                counts[type_index] += count
+        counts[TEXT] += value_count - candidate_count
+        if not per_value_shapes:
+            return
+        per_value_count: int = sum(shape_counts[shape] for shape in per_value_shapes)
+        if per_value_count == value_count:
+            # 全ての値が ISO 形式の日付・日時の場合は datetime.fromisoformat() でまとめて確認する
+            iso_types: Dict[bytes, int] = {
+                shape: _ISO_SHAPES.get(shape.translate(_DATE_SEPARATORS), _PER_VALUE) for shape in per_value_shapes
+            }
+            if _PER_VALUE not in iso_types.values():
+                try:
+                    iso_values: list[str] = data.translate(_DATE_SEPARATORS).decode("ascii").split("\n")
+                    deque(map(datetime.fromisoformat, filter(None, iso_values)), maxlen=0)  # 存在しない日時は ValueError
+                    iso_type: int
+                    for shape, iso_type in iso_types.items():
+                        counts[iso_type] += shape_counts[shape]
+                    return
+                except ValueError:
+                    pass
+            value_counts: Dict[str, int] = Counter(values)
+            value_counts.pop("", None)
+        else:
+            per_value_set: set[bytes] = set(per_value_shapes)
+            value_counts = Counter(
+                value.decode("ascii")
+                for value, shape in zip(
+                    _CANDIDATE_BYTE_LINES.findall(b"\n" + data), _CANDIDATE_BYTE_LINES.findall(b"\n" + shapes)
+                )
+                if shape in per_value_set
+            )
+        value: str
+        for value, count in value_counts.items():
+            counts[self._classify(value=value)] += count
+
+    def _memoized_types(self, column: int, value_counts: Dict[str, int]) -> Dict[str, int] | None:
+        """列毎に記録した値の型に、まだ記録していない値の型を追加して返す
+
+        Args:
+            column (int): 列位置
+            value_counts (Dict[str, int]): 列の空でない値と個数の辞書
+
+        Returns:
+            Dict[str, int] | None: 値と型の番号の辞書（値の種類が VALUE_MEMO_SIZE を超える列は記録を破棄して None）
+        """
+        value_types: Dict[str, int] | None = self._value_types[column]
+        if value_types is None:
+            return None
+        new_values: list[str] = [value for value in value_counts if value not in value_types]
+        if len(value_types) + len(new_values) > VALUE_MEMO_SIZE:
+            self._value_types[column] = None  # 以降は値を連結してまとめて判定する
+            return None
+        value: str
+        for value in new_values:
+            value_types[value] = classify_value(value=value)
+        return value_types
+
+    def _count_joined(self, counts: list[int], fixed_type: int | None, values: Sequence[str], value_count: int) -> None:
+        """列の値を改行で連結してまとめて数える
+
+        Args:
+            counts (list[int]): 列の型別の値の個数（加算する）
+            fixed_type (int | None): 列の空でない値が全て当てはまった型の番号（None の場合は確定していない）
+            values (Sequence[str]): 列の値（空の値を含む）
+            value_count (int): 空でない値の個数
+
+        Returns:
+            None
+        """
+        joined: str = "\n".join(values)
+        has_line_break: bool = joined.count("\n") != len(values) - 1
+        if fixed_type is not None and not has_line_break and _matches_fixed_type(fixed_type=fixed_type, joined=joined):
+            counts[fixed_type] += value_count  # 型が確定した列は他の型を判定しない
+            return
+
+        if not has_line_break and joined.isascii():
+            self._count_ascii(counts=counts, values=values, data=joined.encode("ascii"), value_count=value_count)
+        else:
+            # 改行を含む値がある場合は値毎に先頭の文字を調べる
+            candidates: list[str] = (
+                [value for value in values if value[:1] in _CANDIDATE_FIRST_CHARACTERS]
+                if has_line_break
+                else _CANDIDATE_LINES.findall("\n" + joined)
+            )
+            counts[TEXT] += value_count - len(candidates)
+            value: str
+            count: int
+            for value, count in Counter(candidates).items():
+                counts[self._classify(value=value)] += count
+
+    def _update_fixed_type(self, column: int, values: Sequence[str]) -> None:
+        """空でない値が全て同じ型になった列は、次からその型に当てはまるかだけを確認する
+
+        Args:
+            column (int): 列位置
+            values (Sequence[str]): 追加した列の値（空の値を含む）
+
+        Returns:
+            None
+        """
+        counts: list[int] = self.counts[column]
+        fixed_type: int | None = self._fixed_types[column]
+        found_types: list[int] = [type_index for type_index, type_count in enumerate(counts) if type_count]
+        if len(found_types) != 1:
+            self._fixed_types[column] = None
+            self._fixed_values[column] = {""}
+        elif fixed_type is None:
+            # 型が確定した時点の値の種類が少ない列は、同じ値だけが続く間は値を調べずに数える
+            self._fixed_types[column] = found_types[0]
+            distinct_values: set[str] = set(values)
+            if len(distinct_values) <= FIXED_VALUES_SIZE:
+                self._fixed_values[column] = distinct_values | {""}
+
+    def update(self, column: int, values: Sequence[str]) -> None:
+        """列の値を追加する
+
+        Args:
+            column (int): 列位置
+            values (Sequence[str]): 列の値（空の値を含む）
+
+        Returns:
+            None
+        """
+        counts: list[int] = self.counts[column]
+        fixed_type: int | None = self._fixed_types[column]
+        if fixed_type is not None and self._fixed_values[column].issuperset(values):
+            counts[fixed_type] += len(values) - values.count("")  # 型が確定した列で、判定済みの値だけの場合
+            return
+        if self._value_types[column] is not None:
+            # 値の種類が少ない列は、値の種類毎の個数に記録した型を加算する（値を連結して形を調べない）
+            value_counts: Counter[str] = Counter(filter(None, values))  # 空でない値の種類毎の個数
+            if not value_counts:
+                return
+            value_types: Dict[str, int] | None = self._memoized_types(column=column, value_counts=value_counts)
+            if value_types is not None:
+                value: str
+                count: int
+                for value, count in value_counts.items():
+                    counts[value_types[value]] += count
+                self._update_fixed_type(column=column, values=values)
+                return
+        value_count: int = len(values) - values.count("")
+        if not value_count:
+            return
+        self._count_joined(counts=counts, fixed_type=fixed_type, values=values, value_count=value_count)
+        self._update_fixed_type(column=column, values=values)
+
+    def update_rows(self, values: list[str]) -> None:
+        """行毎の値を行順のまま連結したリストを追加する（行を列毎に並べ替えたタプルを作らずに集計する）
+
+        Args:
+            values (list[str]): 各行の値を行順に連結したリスト（行のフィールド数は列数にそろえること）
+
+        Returns:
+            None
+        """
+        field_count: int = len(self.counts)
+        column: int
+        for column in range(field_count):
+            self.update(column=column, values=values[column::field_count])
+
+    def merge(self, other: "TypeCounter") -> None:
+        """別の集計結果をマージする
+
+        Args:
+            other (TypeCounter): マージする集計結果（列数が同じであること）
+
+        Returns:
+            None
+        """
+        counts: list[int]
+        other_counts: list[int]
+        for counts, other_counts in zip(self.counts, other.counts):
+            counts[:] = map(int.__add__, counts, other_counts)
+
+    def summarize(self, column: int) -> FieldType:
+        """列の型の推定結果を返す
+
+        Args:
+            column (int): 列位置
+
+        Returns:
+            FieldType: 推定した型とその型に合わない値の個数
+        """
+        return dominant_type(type_counts=self.counts[column])
@@ -0,0 +1,476 @@
+"""
+CSVファイルの作成・変更の監視（--watch）
+
+ディレクトリ以下のCSVファイルの作成・変更・削除を監視し、最後の変更から一定時間（待機時間）
+変更されなかったファイルのパスを返します。書き込み途中のファイルを何度もカウントしないよう、
+待機時間はファイル毎に計ります（書き込みが続くファイルがあっても、他のファイルの通知は遅れない）。
+
+監視方法:
+- inotify（Linux）: ディレクトリ毎に監視を登録し、カーネルからの通知を待つ
+  （変更が無い間は select で待機するだけなので CPU をほとんど使わない）
+- ポーリング（inotify が使えない環境、ネットワークドライブなど）: 一定間隔で os.scandir により
+  ファイルサイズと更新日時を取得し、前回との差分を求める（zip アーカイブは開かずにアーカイブ自体を比較する）
+
+Note:
+    - 検索対象・除外パターンと深さは csv_discovery と同じ規則で判定する
+    - 変更を通知するパスはファイルまたはディレクトリ（ディレクトリの場合はその下を検索し直す）
+    - 削除されたファイル・ディレクトリのパスも通知する（呼び出し側で前回の結果を取り除く）
+    - inotify の通知があふれた場合は top を通知する（全体を検索し直す）
+"""
+
+import ctypes
+import errno
+import os
+import select
+import struct
+import sys
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, Iterator, Tuple
+
+from csv_compressed import ZIP_MEMBER_SEPARATOR
+from csv_discovery import DiscoveredFile, DiscoveryError, iter_archive_files, iter_csv_files, matches_any
+
+DEFAULT_QUIET_SECONDS: float = 5.0  # 最後の変更からカウントを始めるまでの待機時間（秒）
+DEFAULT_POLL_INTERVAL: float = 2.0  # ポーリングで変更を確認する間隔（秒）
+INOTIFY_READ_SIZE: int = 64 * 1024  # inotify の通知を一度に読み込むバイト数
+
+# inotify の定数（<sys/inotify.h>）
+_IN_MODIFY: int = 0x00000002
+_IN_ATTRIB: int = 0x00000004
+_IN_CLOSE_WRITE: int = 0x00000008
+_IN_MOVED_FROM: int = 0x00000040
+_IN_MOVED_TO: int = 0x00000080
+_IN_CREATE: int = 0x00000100
+_IN_DELETE: int = 0x00000200
+_IN_Q_OVERFLOW: int = 0x00004000
+_IN_IGNORED: int = 0x00008000
+_IN_ONLYDIR: int = 0x01000000
+_IN_DONT_FOLLOW: int = 0x02000000
+_IN_EXCL_UNLINK: int = 0x04000000
+_IN_ISDIR: int = 0x40000000
+_IN_NONBLOCK: int = 0o4000
+_IN_CLOEXEC: int = 0o2000000
+_WATCH_MASK: int = (
+    _IN_MODIFY
+    | _IN_ATTRIB
+    | _IN_CLOSE_WRITE
+    | _IN_MOVED_FROM
+    | _IN_MOVED_TO
+    | _IN_CREATE
+    | _IN_DELETE
+    | _IN_ONLYDIR
+    | _IN_DONT_FOLLOW
+    | _IN_EXCL_UNLINK
+)
+_EVENT_HEADER: struct.Struct = struct.Struct("iIII")  # wd, mask, cookie, len（続いて len バイトのファイル名）
+
+
+def _load_libc() -> ctypes.CDLL | None:
+    """inotify を使える場合は libc を返す"""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc: ctypes.CDLL = ctypes.CDLL(None, use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+_libc: ctypes.CDLL | None = _load_libc()
+
+
+def is_under(path: str, directory: str) -> bool:
+    """パスがディレクトリ（またはアーカイブ）自身かその下にあるかを判定する
+
+    Args:
+        path (str): CSVファイルのパスまたは論理パス
+        directory (str): ディレクトリ、zip アーカイブまたはファイルのパス
+
+    Returns:
+        bool: path が directory と同じか、directory の下（アーカイブ内）にある場合は True
+    """
+    return (
+        path == directory
+        or path.startswith(directory.rstrip(os.sep) + os.sep)
+        or path.startswith(directory + ZIP_MEMBER_SEPARATOR)
+    )
+
+
+def is_excluded(relative_path: str, exclude: Iterable[str]) -> bool:
+    """相対パスまたはその上位のディレクトリが除外パターンに一致するかを判定する
+
+    Args:
+        relative_path (str): 検索の起点からの相対パス（区切り文字は "/"）
+        exclude (Iterable[str]): 除外するファイル・ディレクトリのパターン
+
+    Returns:
+        bool: 検索で除外される（上位のディレクトリが除外されて走査されない場合を含む）場合は True
+    """
+    exclude = tuple(exclude)
+    if not exclude:
+        return False
+    parts: list[str] = relative_path.split("/")
+    index: int
+    for index in range(1, len(parts) + 1):
+        if matches_any(relative_path="/".join(parts[:index]), patterns=exclude):
+            return True
+    return False
+
+
+def _relative_path(path: str, top: str) -> str | None:
+    """検索の起点からの相対パス（区切り文字は "/"）を返す（起点の外にある場合は None）"""
+    relative_path: str = os.path.relpath(path, top).replace(os.sep, "/")
+    if relative_path == ".." or relative_path.startswith("../"):
+        return None
+    return relative_path
+
+
+def accepts_directory(path: str, top: str, exclude: Iterable[str], max_depth: int | None) -> bool:
+    """検索で走査されるディレクトリかを判定する
+
+    Args:
+        path (str): ディレクトリのパス
+        top (str): 検索の起点となるディレクトリ
+        exclude (Iterable[str]): 除外するファイル・ディレクトリのパターン
+        max_depth (int | None): 走査するサブディレクトリの深さ（None: 制限なし）
+
+    Returns:
+        bool: iter_csv_files で走査されるディレクトリの場合は True
+    """
+    relative_path: str | None = _relative_path(path=path, top=top)
+    if relative_path is None:
+        return False
+    if relative_path == ".":
+        return True
+    return (max_depth is None or relative_path.count("/") + 1 <= max_depth) and not is_excluded(
+        relative_path=relative_path, exclude=exclude
+    )
+
+
+def accepts_file(path: str, top: str, include: Iterable[str], exclude: Iterable[str], max_depth: int | None) -> bool:
+    """検索対象のファイルかを判定する
+
+    Args:
+        path (str): ファイルのパス
+        top (str): 検索の起点となるディレクトリ
+        include (Iterable[str]): 検索対象とするファイルのパターン
+        exclude (Iterable[str]): 除外するファイル・ディレクトリのパターン
+        max_depth (int | None): 走査するサブディレクトリの深さ（None: 制限なし）
+
+    Returns:
+        bool: iter_csv_files で返されるファイル（または zip アーカイブ）の場合は True
+    """
+    relative_path: str | None = _relative_path(path=path, top=top)
+    if relative_path is None or relative_path == ".":
+        return False
+    return (
+        (max_depth is None or relative_path.count("/") <= max_depth)
+        and matches_any(relative_path=relative_path, patterns=include)
+        and not is_excluded(relative_path=relative_path, exclude=exclude)
+    )
+
+
+class ChangeWatcher(ABC):
+    """CSVファイルの変更を監視し、待機時間の間変更されなかったパスを返す（監視方法毎の基底クラス）
+
+    Attributes:
+        method (str): 監視方法の名前（ログに記録する）
+        errors (list[DiscoveryError]): 監視中に発生したエラー（呼び出し側でログに記録して空にする）
+    """
+
+    method: str = ""
+
+    def __init__(self, top: str, include: Iterable[str], exclude: Iterable[str], max_depth: int | None) -> None:
+        self._top: str = top
+        self._include: Tuple[str, ...] = tuple(include)
+        self._exclude: Tuple[str, ...] = tuple(exclude)
+        self._max_depth: int | None = max_depth
+        self._pending: Dict[str, float] = {}  # 変更されたパスと最後に変更を検知した時刻（time.monotonic）
+        self.errors: list[DiscoveryError] = []
+
+    @abstractmethod
+    def _collect(self, timeout: float | None) -> list[str]:
+        """変更されたパスを待つ
+
+        Args:
+            timeout (float | None): 待つ時間の上限（秒、None の場合は変更があるまで待つ）
+
+        Returns:
+            list[str]: 変更されたファイル・ディレクトリのパス（時間内に変更が無い場合は空）
+        """
+
+    def wait_for_changes(self, quiet_seconds: float = DEFAULT_QUIET_SECONDS) -> list[str]:
+        """最後の変更から quiet_seconds 秒以上変更されていないパスがそろうまで待つ
+
+        Args:
+            quiet_seconds (float): 最後の変更からの待機時間（秒）
+
+        Returns:
+            list[str]: 変更されたファイル・ディレクトリのパス（変更を検知した順、1件以上）
+
+        Note:
+            - 待機時間に達していないパスは次回の呼び出しまで保持する
+        """
+        while True:
+            now: float = time.monotonic()
+            ready: list[str] = [path for path, changed_at in self._pending.items() if now - changed_at >= quiet_seconds]
+            if ready:
+                path: str
+                for path in ready:
+                    del self._pending[path]
+                return ready
+            timeout: float | None = min(self._pending.values()) + quiet_seconds - now if self._pending else None
+            for path in self._collect(timeout=timeout):
+                self._pending.pop(path, None)  # 変更を検知した順に並べ直す
+                self._pending[path] = time.monotonic()
+
+    def close(self) -> None:
+        """監視を終了する"""
+
+
+class PollingWatcher(ChangeWatcher):
+    """一定間隔でファイルサイズと更新日時を比較して変更を検知する"""
+
+    method = "ポーリング"
+
+    def __init__(
+        self,
+        top: str,
+        include: Iterable[str],
+        exclude: Iterable[str],
+        max_depth: int | None,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+    ) -> None:
+        super().__init__(top=top, include=include, exclude=exclude, max_depth=max_depth)
+        self._poll_interval: float = poll_interval
+        self._next_poll: float = time.monotonic() + poll_interval
+        self._snapshot: Dict[str, Tuple[int, int]] = self._scan()
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        snapshot: Dict[str, Tuple[int, int]] = {}
+        item: DiscoveredFile | DiscoveryError
+        for item in iter_csv_files(
+            top=self._top,
+            include=self._include,
+            exclude=self._exclude,
+            max_depth=self._max_depth,
+            expand_archives=False,
+        ):
+            if isinstance(item, DiscoveredFile):
+                snapshot[item.path] = (item.size, item.mtime_ns)
+        return snapshot
+
+    def _collect(self, timeout: float | None) -> list[str]:
+        end: float | None = None if timeout is None else time.monotonic() + timeout
+        while True:
+            now: float = time.monotonic()
+            if now >= self._next_poll:
+                self._next_poll = now + self._poll_interval
+                snapshot: Dict[str, Tuple[int, int]] = self._scan()
+                changed: list[str] = [
+                    path for path in snapshot.keys() | self._snapshot.keys() if snapshot.get(path) != self._snapshot.get(path)
+                ]
+                self._snapshot = snapshot
+                if changed:
+                    return sorted(changed)
+                continue
+            if end is not None and now >= end:
+                return []
+            time.sleep((self._next_poll if end is None else min(self._next_poll, end)) - now)
+
+
+class InotifyWatcher(ChangeWatcher):
+    """inotify の通知で変更を検知する（Linux のみ）"""
+
+    method = "inotify"
+
+    def __init__(self, top: str, include: Iterable[str], exclude: Iterable[str], max_depth: int | None) -> None:
+        """
+        Raises:
+            OSError: inotify を使えない場合、監視の登録数の上限に達した場合
+        """
+        super().__init__(top=top, include=include, exclude=exclude, max_depth=max_depth)
+        if _libc is None:
+            raise OSError(errno.ENOSYS, "inotify を使えません")
+        fd: int = _libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if fd < 0:
+            error: int = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+        self._fd: int = fd
+        self._directories: Dict[int, str] = {}  # 監視記述子とディレクトリのパス
+        try:
+            self._add_tree(directory=top)
+        except OSError:
+            os.close(fd)
+            raise
+
+    def _add_tree(self, directory: str) -> None:
+        """ディレクトリとその下の走査対象のディレクトリを監視に登録する"""
+        stack: list[str] = [directory]
+        while stack:
+            current: str = stack.pop()
+            if not accepts_directory(path=current, top=self._top, exclude=self._exclude, max_depth=self._max_depth):
+                continue
+            wd: int = _libc.inotify_add_watch(self._fd, os.fsencode(current), _WATCH_MASK)  # type: ignore[union-attr]
+            if wd < 0:
+                error: int = ctypes.get_errno()
+                if error in (errno.ENOENT, errno.ENOTDIR):
+                    continue  # 登録する前に削除された
+                raise OSError(error, os.strerror(error), current)
+            self._directories[wd] = current
+            try:
+                with os.scandir(current) as entries:
+                    stack.extend(
+                        entry.path for entry in entries if entry.is_dir(follow_symlinks=False)
+                    )
+            except OSError:
+                continue  # 読み込めないディレクトリは検索時にエラーを記録する
+
+    def _remove_tree(self, directory: str) -> None:
+        """移動したディレクトリとその下の監視を取り消す"""
+        wd: int
+        path: str
+        for wd, path in list(self._directories.items()):
+            if is_under(path=path, directory=directory):
+                del self._directories[wd]
+                _libc.inotify_rm_watch(self._fd, wd)  # type: ignore[union-attr]
+
+    def _collect(self, timeout: float | None) -> list[str]:
+        readable: list[int]
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return []
+        try:
+            data: bytes = os.read(self._fd, INOTIFY_READ_SIZE)
+        except BlockingIOError:
+            return []
+        changed: list[str] = []
+        offset: int = 0
+        while offset < len(data):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name: bytes = data[offset : offset + length].rstrip(b"\0")
+            offset += length
+            if mask & _IN_Q_OVERFLOW:
+                changed.append(self._top)  # 通知があふれたため全体を検索し直す
+                continue
+            if mask & _IN_IGNORED:
+                self._directories.pop(wd, None)  # 削除されたディレクトリの監視は自動的に取り消される
+                continue
+            directory: str | None = self._directories.get(wd)
+            if directory is None or not name:
+                continue
+            path: str = os.path.join(directory, os.fsdecode(name))
+            if mask & _IN_ISDIR:
+                if not accepts_directory(path=path, top=self._top, exclude=self._exclude, max_depth=self._max_depth):
+                    continue
+                try:
+                    if mask & (_IN_CREATE | _IN_MOVED_TO):
+                        self._add_tree(directory=path)
+                    elif mask & _IN_MOVED_FROM:
+                        self._remove_tree(directory=path)
+                except OSError as e:
+                    self.errors.append(DiscoveryError(path=path, message=f"監視を登録できません: {e}"))
+                changed.append(path)
+            elif accepts_file(
+                path=path, top=self._top, include=self._include, exclude=self._exclude, max_depth=self._max_depth
+            ):
+                changed.append(path)
+        return changed
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+def create_watcher(
+    top: str,
+    include: Iterable[str],
+    exclude: Iterable[str],
+    max_depth: int | None,
+    poll_interval: float | None = None,
+) -> ChangeWatcher:
+    """使える監視方法で変更の監視を開始する
+
+    Args:
+        top (str): 監視の起点となるディレクトリ
+        include (Iterable[str]): 検索対象とするファイルのパターン
+        exclude (Iterable[str]): 除外するファイル・ディレクトリのパターン
+        max_depth (int | None): 監視するサブディレクトリの深さ（None: 制限なし）
+        poll_interval (float | None): ポーリングの間隔（秒、None の場合は inotify を使えなければ既定の間隔で
+            ポーリングする。指定した場合は常にポーリングする）
+
+    Returns:
+        ChangeWatcher: 開始した監視
+
+    Note:
+        - inotify の監視の登録数の上限に達した場合などはポーリングで監視する
+    """
+    if poll_interval is None:
+        if _libc is not None:
+            try:
+                return InotifyWatcher(top=top, include=include, exclude=exclude, max_depth=max_depth)
+            except OSError:
+                pass
+        poll_interval = DEFAULT_POLL_INTERVAL
+    return PollingWatcher(top=top, include=include, exclude=exclude, max_depth=max_depth, poll_interval=poll_interval)
+
+
+def iter_changed_files(
+    top: str,
+    paths: Iterable[str],
+    include: Iterable[str],
+    exclude: Iterable[str],
+    max_depth: int | None,
+) -> Iterator[DiscoveredFile | DiscoveryError]:
+    """変更されたパスの下にあるCSVファイルを iter_csv_files と同じ形式で返す
+
+    Args:
+        top (str): 検索の起点となるディレクトリ
+        paths (Iterable[str]): ChangeWatcher.wait_for_changes の戻り値
+        include (Iterable[str]): 検索対象とするファイルのパターン
+        exclude (Iterable[str]): 除外するファイル・ディレクトリのパターン
+        max_depth (int | None): 走査するサブディレクトリの深さ（None: 制限なし）
+
+    Returns:
+        Iterator[DiscoveredFile | DiscoveryError]: 見つかったファイル、または読み込めなかったディレクトリ・ファイル
+
+    Note:
+        - ディレクトリはその下を検索し直す（他のパスの下にあるパスは重複して返さない）
+        - 存在しないパス（削除されたファイル・ディレクトリ）は何も返さない
+    """
+    include = tuple(include)
+    exclude = tuple(exclude)
+    selected: list[str] = []
+    path: str
+    for path in sorted(set(paths), key=len):
+        if not any(is_under(path=path, directory=parent) for parent in selected):
+            selected.append(path)
+    for path in selected:
+        if os.path.isdir(path) and not os.path.islink(path):
+            if accepts_directory(path=path, top=top, exclude=exclude, max_depth=max_depth):
+                yield from iter_csv_files(top=top, include=include, exclude=exclude, max_depth=max_depth, start=path)
+            continue
+        if not accepts_file(path=path, top=top, include=include, exclude=exclude, max_depth=max_depth):
+            continue
+        try:
+            stat: os.stat_result = os.stat(path)
+        except FileNotFoundError:
+            continue
+        except OSError as e:
+            yield DiscoveryError(path=path, message=str(e))
+            continue
+        if os.path.splitext(path)[1] == ".zip":
+            yield from iter_archive_files(
+                archive_path=path,
+                relative_path=os.path.relpath(path, top).replace(os.sep, "/"),
+                mtime_ns=stat.st_mtime_ns,
+                exclude=exclude,
+            )
+            continue
+        yield DiscoveredFile(path=path, size=stat.st_size, mtime_ns=stat.st_mtime_ns)
@@ -0,0 +1,85 @@
+"""
+2つのCSVスナップショットのキー項目による差分の作成
+
+同じテーブルの2つの時点の抽出（前日と当日など）を、キー項目の値で行を対応付けて比較し、
+追加・削除・変更された行の変更ファイル（比較先と同じ形式のCSV）と集計結果を作成します。
+メモリ使用量の上限を超える大きさのファイルは、キーのハッシュ値で一時ファイルに振り分けて比較します
+（csv_snapshot_diff を参照）。
+
+出力ファイル（PREFIX の既定値は比較先の個別結果ファイルと同じ名前（csv_compressed.output_base_name） + "_diff"）:
+- PREFIX.added.csv: 比較先にだけある行
+- PREFIX.removed.csv: 比較元にだけある行
+- PREFIX.changed.csv: 変更前と変更後の行の組（最後の2列は "変更前" / "変更後" と変更された項目名）
+- PREFIX.txt: 行数・項目毎の変更行数などの集計結果
+
+使い方:
+    python diff_CSV_snapshots.py 20250626.csv 20250627.csv --keys 顧客ID
+    python diff_CSV_snapshots.py old.csv.gz new.csv.gz --keys 店舗コード,商品コード --memory 1024 --output diff/items
+"""
+
+import argparse
+import csv
+import os
+import sys
+
+from csv_compressed import display_name, output_base_name
+from csv_snapshot_diff import DEFAULT_DIFF_MEMORY, DiffOutputs, DiffSummary, diff_csv_files, write_diff_summary
+
+
+def main() -> None:
+    """コマンドライン引数に従って2つのCSVファイルの差分を作成する
+
+    Returns:
+        None
+
+    Note:
+        - ファイルの読み込み・書き込みに失敗した場合やキー項目がヘッダ行に無い場合は、
+          エラーメッセージを標準エラー出力に表示して終了コード 1 で終了する
+    """
+    parser = argparse.ArgumentParser(description="2つのCSVスナップショットのキー項目による差分の作成")
+    parser.add_argument("old", help="比較元のCSVファイル（.gz / .bz2 / .xz / .zip も可）")
+    parser.add_argument("new", help="比較先のCSVファイル（.gz / .bz2 / .xz / .zip も可）")
+    parser.add_argument("--keys", required=True, metavar="FIELDS", help="キー項目（カンマ区切りで複数指定可）")
+    parser.add_argument(
+        "--memory",
+        type=int,
+        default=DEFAULT_DIFF_MEMORY // (1024 * 1024),
+        metavar="MB",
+        help="比較に使うメモリ使用量の上限（MB。超える分はハッシュで振り分けた一時ファイルに書き出す、既定値: %(default)s）",
+    )
+    parser.add_argument("--output", metavar="PREFIX", help="出力ファイル名の先頭部分（既定値: 比較先のファイル名（.csv を除く）_diff）")
+    parser.add_argument("--temp-dir", help="一時ファイルを作成するディレクトリ（既定値: システムの既定）")
+    args = parser.parse_args()
+    key_fields: list[str] = [field.strip() for field in args.keys.split(",") if field.strip()]
+    if not key_fields:
+        parser.error("--keys には項目名を指定してください。")
+    if args.memory <= 0:
+        parser.error("--memory には1以上の値を指定してください。")
+
+    # フィールドサイズ制限を拡張（count_CSV_FieldValue と同じ）
+    csv.field_size_limit(1024 * 1024 * 1024)
+    output_prefix: str = args.output or f"{output_base_name(args.new)}_diff"
+    outputs: DiffOutputs = DiffOutputs.from_prefix(prefix=output_prefix)
+    try:
+        summary: DiffSummary = diff_csv_files(
+            old_path=args.old,
+            new_path=args.new,
+            key_fields=key_fields,
+            output_prefix=output_prefix,
+            memory_limit=args.memory * 1024 * 1024,
+            temp_directory=args.temp_dir,
+        )
+        write_diff_summary(
+            summary=summary, old_name=display_name(args.old), new_name=display_name(args.new), outputs=outputs
+        )
+    except (OSError, csv.Error, ValueError) as e:
+        print(f"差分の作成中にエラーが発生しました: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print(f"データ行数: 比較元 {summary.old_rows:,} 行 / 比較先 {summary.new_rows:,} 行")
+    print(f"追加: {summary.added:,} 行, 削除: {summary.removed:,} 行, 変更: {summary.changed:,} 行")
+    print(f"出力ファイル: {', '.join(os.path.basename(path) for path in outputs)}")
+
+
+if __name__ == "__main__":
+    main()
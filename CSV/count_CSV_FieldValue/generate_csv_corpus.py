@@ -0,0 +1,208 @@
+"""
+ベンチマーク用の合成CSVコーパスの作成
+
+count_CSV_FieldValue の性能を比較するための合成CSVファイル（cp932）を、
+乱数シードを固定して再現可能な形で作成します。
+
+プロファイル:
+- wide: 横長（1,000列）
+- tall: 縦長（10列、多数の行）
+- quoted: 全ての値をダブルクォートで囲み、カンマや "" を含む値が多い
+- multiline: クォートで囲まれた値の中に改行を含む
+- sparse: 値が入っているセルが少ない（5%）
+- fullwidth: 全角文字（漢字・カタカナ・全角英数字、2バイト目が 0x5C の文字を含む）の値
+
+使い方:
+    python generate_csv_corpus.py corpus
+    python generate_csv_corpus.py corpus --profile wide --profile quoted --scale 0.1 --seed 2
+"""
+
+import argparse
+import os
+import random
+from typing import Dict, NamedTuple, Tuple
+
+DEFAULT_SEED: int = 1  # 既定の乱数シード
+ROW_POOL_SIZE: int = 4093  # 事前に作成しておく行の種類数（巨大ファイルの作成時間を抑える、素数）
+
+
+class CorpusProfile(NamedTuple):
+    """合成CSVファイルの種類"""
+
+    name: str  # プロファイル名（ファイル名にも使う）
+    rows: int  # 既定のデータ行数（ヘッダを除く）
+    columns: int  # 列数
+    fill_rate: float  # 値が入っているセルの割合（0.0～1.0）
+    quote_rate: float  # 値をダブルクォートで囲む割合（0.0～1.0）
+    newline_rate: float  # 値に改行を含める割合（クォートで囲む値のうち、0.0～1.0）
+    fullwidth: bool  # 全角文字の値を使うか
+    description: str  # 説明
+
+
+class CorpusFile(NamedTuple):
+    """作成した合成CSVファイル"""
+
+    profile: str  # プロファイル名
+    path: str  # ファイルのパス
+    rows: int  # データ行数（ヘッダを除く）
+    columns: int  # 列数
+    size: int  # ファイルサイズ（バイト）
+
+
+PROFILES: Dict[str, CorpusProfile] = {
+    profile.name: profile
+    for profile in (
+        CorpusProfile("wide", 20_000, 1_000, 0.7, 0.0, 0.0, False, "横長（1,000列）"),
+        CorpusProfile("tall", 5_000_000, 10, 0.7, 0.0, 0.0, False, "縦長（10列）"),
+        CorpusProfile("quoted", 500_000, 20, 0.8, 1.0, 0.0, False, "全ての値をクォートで囲み、カンマや \"\" を含む"),
+        CorpusProfile("multiline", 500_000, 20, 0.7, 0.3, 0.3, False, "クォートで囲まれた値の中に改行を含む"),
+        CorpusProfile("sparse", 1_000_000, 50, 0.05, 0.0, 0.0, False, "値が入っているセルが 5%"),
+        CorpusProfile("fullwidth", 1_000_000, 20, 0.7, 0.1, 0.0, True, "全角文字（cp932 の2バイト文字）の値"),
+    )
+}
+
+_HALFWIDTH_VALUES: Tuple[str, ...] = ("ABC", "12345", "2025-06-27", "x", "value with spaces", "-0.5", "TRUE")
+_FULLWIDTH_VALUES: Tuple[str, ...] = (
+    "値",
+    "テスト データ",
+    "東京都千代田区",
+    "ソフトウェア開発",  # ソ: 2バイト目が 0x5C
+    "表計算",  # 表: 2バイト目が 0x5C
+    "能力評価",  # 能: 2バイト目が 0x5C
+    "ＡＢＣ１２３",
+    "ｶﾀｶﾅ",
+    "　",
+)
+_QUOTED_VALUES: Tuple[str, ...] = ("a,b", 'say ""hi""', ",", '""', "1,234,567")
+_NEWLINE_VALUES: Tuple[str, ...] = ("line1\r\nline2", "a\nb", "\r\n", "x\r\ny\r\nz")
+
+
+def generate_value(rng: random.Random, profile: CorpusProfile) -> str:
+    """プロファイルに従って1つのフィールドの値（CSVとして書き込む形式）を作成する
+
+    Args:
+        rng (random.Random): 乱数生成器
+        profile (CorpusProfile): 合成CSVファイルの種類
+
+    Returns:
+        str: フィールドの値（クォートする場合は "" でエスケープして " で囲んだ文字列、空の場合は ""）
+    """
+    if rng.random() >= profile.fill_rate:
+        return ""
+    value: str = rng.choice(_FULLWIDTH_VALUES if profile.fullwidth else _HALFWIDTH_VALUES)
+    if rng.random() >= profile.quote_rate:
+        return value
+    if rng.random() < profile.newline_rate:
+        value = rng.choice(_NEWLINE_VALUES)
+    elif rng.random() < 0.5:
+        value = rng.choice(_QUOTED_VALUES).replace('""', '"')
+    return '"' + value.replace('"', '""') + '"'
+
+
+def generate_csv_file(
+    file_path: str, profile: CorpusProfile, rows: int | None = None, seed: int = DEFAULT_SEED
+) -> CorpusFile:
+    """プロファイルに従って合成CSVファイルを作成する
+
+    Args:
+        file_path (str): 作成するCSVファイルのパス
+        profile (CorpusProfile): 合成CSVファイルの種類
+        rows (int | None): データ行数（None の場合はプロファイルの既定値）
+        seed (int): 乱数シード（同じシードとプロファイルからは同じ内容のファイルを作成する）
+
+    Returns:
+        CorpusFile: 作成したファイルの情報
+
+    Raises:
+        OSError: ファイルの書き込みに失敗した場合
+
+    Note:
+        - ファイルエンコーディングは cp932、改行は CRLF
+        - ROW_POOL_SIZE 種類の行を事前に作成し、それを順に繰り返して書き込む
+    """
+    row_count: int = profile.rows if rows is None else rows
+    rng: random.Random = random.Random(f"{profile.name}:{seed}")
+    pool: list[str] = [
+        ",".join(generate_value(rng=rng, profile=profile) for _ in range(profile.columns)) + "\r\n"
+        for _ in range(min(ROW_POOL_SIZE, row_count))
+    ]
+    with open(file=file_path, mode="w", encoding="cp932", newline="") as f:
+        f.write(",".join(f"項目{column + 1}" for column in range(profile.columns)) + "\r\n")
+        index: int
+        for index in range(row_count):
+            f.write(pool[index % len(pool)])
+    return CorpusFile(
+        profile=profile.name,
+        path=file_path,
+        rows=row_count,
+        columns=profile.columns,
+        size=os.path.getsize(file_path),
+    )
+
+
+def generate_corpus(
+    directory: str, profiles: list[str] | None = None, scale: float = 1.0, seed: int = DEFAULT_SEED
+) -> list[CorpusFile]:
+    """合成CSVコーパスを作成する
+
+    Args:
+        directory (str): CSVファイルの作成先ディレクトリ（存在しない場合は作成する）
+        profiles (list[str] | None): 作成するプロファイル名のリスト（None の場合は全て）
+        scale (float): 各プロファイルの既定の行数に掛ける倍率
+        seed (int): 乱数シード
+
+    Returns:
+        list[CorpusFile]: 作成したファイルの情報（profiles の順）
+
+    Raises:
+        KeyError: 存在しないプロファイル名を指定した場合
+        OSError: ファイルの書き込みに失敗した場合
+    """
+    os.makedirs(directory, exist_ok=True)
+    files: list[CorpusFile] = []
+    name: str
+    for name in profiles if profiles is not None else list(PROFILES):
+        profile: CorpusProfile = PROFILES[name]
+        files.append(
+            generate_csv_file(
+                file_path=os.path.join(directory, f"{name}.csv"),
+                profile=profile,
+                rows=max(1, int(profile.rows * scale)),
+                seed=seed,
+            )
+        )
+    return files
+
+
+def main() -> None:
+    """コマンドライン引数に従って合成CSVコーパスを作成する
+
+    Returns:
+        None
+    """
+    parser = argparse.ArgumentParser(description="ベンチマーク用の合成CSVコーパスの作成")
+    parser.add_argument("directory", help="CSVファイルの作成先ディレクトリ")
+    parser.add_argument(
+        "--profile",
+        action="append",
+        choices=list(PROFILES),
+        help="作成するプロファイル（複数指定可、既定値: 全て）",
+    )
+    parser.add_argument("--scale", type=float, default=1.0, help="各プロファイルの既定の行数に掛ける倍率")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="乱数シード（既定値: %(default)s）")
+    args = parser.parse_args()
+    if args.scale <= 0:
+        parser.error("--scale には0より大きい値を指定してください。")
+
+    corpus_file: CorpusFile
+    for corpus_file in generate_corpus(
+        directory=args.directory, profiles=args.profile, scale=args.scale, seed=args.seed
+    ):
+        print(
+            f"{corpus_file.path}: {corpus_file.rows:,} 行, {corpus_file.columns} 列, "
+            f"{corpus_file.size / (1024 * 1024):.1f} MB - {PROFILES[corpus_file.profile].description}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,470 @@
+"""
+count_CSV_FieldValue の回帰テスト
+
+test-csv のコミット済みの個別結果ファイル・統合結果ファイルと、generate_csv_corpus で作成した
+合成CSVコーパスのカウント結果を、カウント方式（python / bytes / arrow）・ワーカー数・分割・追記・
+マニフェストの再利用・圧縮・抽出の各経路で比較し、結果が一致しない場合は失敗します。
+
+使い方:
+    python -m unittest test_count_CSV_FieldValue
+    python -m pytest test_count_CSV_FieldValue.py
+
+Note:
+    - test-csv は一時ディレクトリにコピーしてからカウントする（個別結果ファイルはCSVファイルと同じ場所に書き込まれるため）
+    - 合成CSVコーパスは CORPUS_SCALE の倍率で一時ディレクトリに作成し、1パス化する前の処理
+      （benchmark_count_CSV_FieldValue.count_values_in_csv_two_pass）の結果を期待値とする
+    - pyarrow がインストールされていない場合、arrow は python で処理される（結果は同じになる）
+    - 2バイト文字のバイトが " や , と一致する iso-2022-jp のCSVファイルも、全ての経路で同じ結果になることを確認する
+"""
+
+import bz2
+import gzip
+import lzma
+import os
+import shutil
+import tempfile
+import unittest
+import zipfile
+from typing import Callable, Dict, Tuple
+
+from benchmark_count_CSV_FieldValue import count_values_in_csv_two_pass
+from count_CSV_FieldValue import (
+    DEFAULT_FIELD_SIZE_LIMIT,
+    ENGINES,
+    CountOptions,
+    CountResult,
+    FileProfile,
+    count_values_in_csv,
+    main,
+    profile_csv_files,
+    sample_values_in_csv,
+)
+from csv_sampling import SampleResult
+from generate_csv_corpus import PROFILES, CorpusFile, generate_corpus, generate_csv_file
+
+TEST_CSV_DIRECTORY: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test-csv")
+SUMMARY_FILE_NAME: str = "count_CSV_FieldValue.txt"  # 統合結果ファイル名（--output-dir の直下）
+CORPUS_SCALE: float = 0.002  # 合成CSVコーパスの行数の倍率（tall: 10,000 行、wide: 40 行）
+CORPUS_CHUNK_SIZE: int = 64 * 1024  # 合成CSVコーパスを分割してカウントする際の1範囲あたりのバイト数
+WORKER_COUNTS: Tuple[int, ...] = (1, 3)  # 比較するワーカー数
+
+
+def copy_test_csv(destination: str) -> str:
+    """test-csv のCSVファイルだけを一時ディレクトリにコピーする
+
+    Args:
+        destination (str): コピー先のディレクトリ（存在しないもの）
+
+    Returns:
+        str: コピー先のディレクトリ
+    """
+    shutil.copytree(src=TEST_CSV_DIRECTORY, dst=destination, ignore=shutil.ignore_patterns("*.txt", "*.log"))
+    return destination
+
+
+def read_bytes(file_path: str) -> bytes:
+    """ファイルの内容をバイト列で読み込む"""
+    with open(file=file_path, mode="rb") as f:
+        return f.read()
+
+
+def run_main(roots: list[str], output_dir: str, *arguments: str) -> None:
+    """コマンドラインの実行（main()）を進捗表示なしで呼び出す
+
+    Args:
+        roots (list[str]): 検索の起点となるディレクトリまたはファイル
+        output_dir (str): 統合結果ファイル・ログ・マニフェストの出力先ディレクトリ（存在しない場合は作成する）
+        *arguments (str): 追加のコマンドライン引数
+
+    Returns:
+        None
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    main(argv=[*roots, "--no-progress", "--output-dir", output_dir, *arguments])
+
+
+def expected_counts(file_path: str, log_file: str) -> Tuple[Dict[str, int], list[str], bool, int]:
+    """1パス化する前の処理で期待値（各フィールドの値の個数・フィールド名・データの有無・データ行数）を求める"""
+    return count_values_in_csv_two_pass(
+        file_path=file_path, log_file=log_file, field_size_limit=DEFAULT_FIELD_SIZE_LIMIT
+    )
+
+
+def counted_values(result: CountResult) -> Tuple[Dict[str, int], list[str], bool, int]:
+    """カウント結果から期待値と比較する4要素を取り出す"""
+    return result.counts, result.fieldnames, result.has_data, result.data_row_count
+
+
+class CommittedOutputTest(unittest.TestCase):
+    """test-csv のコミット済みの出力ファイルとの比較"""
+
+    def setUp(self) -> None:
+        self.directory: str = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def assert_committed_outputs(self, csv_directory: str, output_dir: str) -> None:
+        """個別結果ファイルと統合結果ファイルがコミット済みのものとバイト単位で一致することを確認する"""
+        self.assertEqual(
+            read_bytes(file_path=os.path.join(output_dir, SUMMARY_FILE_NAME)),
+            read_bytes(file_path=os.path.join(TEST_CSV_DIRECTORY, SUMMARY_FILE_NAME)),
+        )
+        root: str
+        file_names: list[str]
+        for root, _, file_names in os.walk(TEST_CSV_DIRECTORY):
+            file_name: str
+            for file_name in file_names:
+                if not file_name.endswith(".csv"):
+                    continue
+                relative_path: str = os.path.relpath(
+                    os.path.join(root, file_name[: -len(".csv")] + ".txt"), TEST_CSV_DIRECTORY
+                )
+                with self.subTest(file=relative_path):
+                    self.assertEqual(
+                        read_bytes(file_path=os.path.join(csv_directory, relative_path)),
+                        read_bytes(file_path=os.path.join(TEST_CSV_DIRECTORY, relative_path)),
+                    )
+
+    def test_engines_and_workers(self) -> None:
+        """全てのカウント方式とワーカー数で、コミット済みの出力ファイルと同じ内容になる"""
+        engine: str
+        for engine in ENGINES:
+            workers: int
+            for workers in WORKER_COUNTS:
+                with self.subTest(engine=engine, workers=workers):
+                    run_directory: str = os.path.join(self.directory, f"{engine}-{workers}")
+                    csv_directory: str = copy_test_csv(destination=os.path.join(run_directory, "in"))
+                    output_dir: str = os.path.join(run_directory, "out")
+                    run_main([csv_directory], output_dir, "--force", "--engine", engine, "--workers", str(workers))
+                    self.assert_committed_outputs(csv_directory=csv_directory, output_dir=output_dir)
+
+    def test_manifest_reuse(self) -> None:
+        """2回目の実行は前回の結果を再利用し、出力ファイルは1回目と同じ内容になる"""
+        csv_directory: str = copy_test_csv(destination=os.path.join(self.directory, "in"))
+        output_dir: str = os.path.join(self.directory, "out")
+        run_main([csv_directory], output_dir)
+        self.assert_committed_outputs(csv_directory=csv_directory, output_dir=output_dir)
+        run_main([csv_directory], output_dir)
+        self.assert_committed_outputs(csv_directory=csv_directory, output_dir=output_dir)
+        with open(file=os.path.join(output_dir, "count_CSV_FieldValue.log"), mode="r", encoding="cp932") as f:
+            log: str = f.read()
+        self.assertEqual(log.count("前回の結果を再利用しました。"), 5)
+
+
+class CorpusTest(unittest.TestCase):
+    """合成CSVコーパスのカウント結果の比較"""
+
+    directory: str
+    corpus: list[CorpusFile]
+    expected: Dict[str, Tuple[Dict[str, int], list[str], bool, int]]
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.directory = tempfile.mkdtemp()
+        cls.corpus = generate_corpus(directory=os.path.join(cls.directory, "corpus"), scale=CORPUS_SCALE)
+        log_file: str = os.path.join(cls.directory, "two_pass.log")
+        cls.expected = {
+            corpus_file.path: expected_counts(file_path=corpus_file.path, log_file=log_file)
+            for corpus_file in cls.corpus
+        }
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        shutil.rmtree(cls.directory)
+
+    def profile_corpus(
+        self, workers: int, engine: str = "python", options: CountOptions | None = None
+    ) -> list[FileProfile]:
+        """合成CSVコーパスを CORPUS_CHUNK_SIZE で分割してカウントする"""
+        return list(
+            profile_csv_files(
+                roots=[os.path.join(self.directory, "corpus")],
+                workers=workers,
+                engine=engine,
+                options=options,
+                chunk_size=CORPUS_CHUNK_SIZE,
+            )
+        )
+
+    def test_engines_and_workers(self) -> None:
+        """全てのカウント方式・ワーカー数（分割を含む）で、1パス化する前の処理と同じ結果になる"""
+        engine: str
+        for engine in ENGINES:
+            workers: int
+            for workers in WORKER_COUNTS:
+                profiles: list[FileProfile] = self.profile_corpus(workers=workers, engine=engine)
+                self.assertEqual(sorted(profile.path for profile in profiles), sorted(self.expected))
+                profile: FileProfile
+                for profile in profiles:
+                    with self.subTest(engine=engine, workers=workers, file=os.path.basename(profile.path)):
+                        self.assertEqual(profile.messages, [])
+                        self.assertIsNotNone(profile.result)
+                        self.assertEqual(counted_values(result=profile.result), self.expected[profile.path])
+
+    def test_data_row_count(self) -> None:
+        """データ行数が作成した行数と一致する（値の中の改行を含むレコードも1行として数える）"""
+        corpus_file: CorpusFile
+        for corpus_file in self.corpus:
+            with self.subTest(profile=corpus_file.profile):
+                self.assertEqual(self.expected[corpus_file.path][3], corpus_file.rows)
+
+    def test_value_statistics_with_workers(self) -> None:
+        """統計情報・頻出値・型の推定は、分割して並列にカウントしても順次処理と同じ結果になる"""
+        options: CountOptions = CountOptions(collect_stats=True, top_k=3, infer_types=True)
+        results: Dict[int, Dict[str, CountResult]] = {
+            workers: {profile.path: profile.result for profile in self.profile_corpus(workers=workers, options=options)}
+            for workers in WORKER_COUNTS
+        }
+        path: str
+        for path in self.expected:
+            sequential: CountResult = results[1][path]
+            with self.subTest(file=os.path.basename(path)):
+                self.assertEqual(counted_values(result=sequential), self.expected[path])
+                workers: int
+                for workers in WORKER_COUNTS[1:]:
+                    parallel: CountResult = results[workers][path]
+                    self.assertEqual(counted_values(result=parallel), self.expected[path])
+                    self.assertEqual(parallel.field_stats, sequential.field_stats)
+                    self.assertEqual(parallel.top_values, sequential.top_values)
+                    self.assertEqual(parallel.field_types, sequential.field_types)
+
+    def test_compressed(self) -> None:
+        """gzip / bzip2 / xz / zip で圧縮したCSVファイルも、圧縮前と同じ結果になる"""
+        compressed_directory: str = os.path.join(self.directory, "compressed")
+        os.makedirs(compressed_directory, exist_ok=True)
+        sources: Dict[str, str] = {}
+        archive_path: str = os.path.join(compressed_directory, "corpus.zip")
+        with zipfile.ZipFile(file=archive_path, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+            corpus_file: CorpusFile
+            for corpus_file in self.corpus:
+                data: bytes = read_bytes(file_path=corpus_file.path)
+                name: str = os.path.basename(corpus_file.path)
+                extension: str
+                compress: Callable[[bytes], bytes]
+                for extension, compress in ((".gz", gzip.compress), (".bz2", bz2.compress), (".xz", lzma.compress)):
+                    compressed_path: str = os.path.join(compressed_directory, name + extension)
+                    with open(file=compressed_path, mode="wb") as f:
+                        f.write(compress(data))
+                    sources[compressed_path] = corpus_file.path
+                archive.writestr(zinfo_or_arcname=name, data=data)
+                sources[f"{archive_path}::{name}"] = corpus_file.path
+
+        workers: int
+        for workers in WORKER_COUNTS:
+            profiles: list[FileProfile] = list(
+                profile_csv_files(roots=[compressed_directory], workers=workers, chunk_size=CORPUS_CHUNK_SIZE)
+            )
+            self.assertEqual(sorted(profile.path for profile in profiles), sorted(sources))
+            profile: FileProfile
+            for profile in profiles:
+                with self.subTest(workers=workers, file=profile.path):
+                    self.assertEqual(profile.messages, [])
+                    self.assertEqual(counted_values(result=profile.result), self.expected[sources[profile.path]])
+
+    def test_append(self) -> None:
+        """追記されたCSVファイルの続きからのカウントは、ファイル全体のカウントと同じ結果になる"""
+        corpus_file: CorpusFile
+        for corpus_file in self.corpus:
+            with self.subTest(profile=corpus_file.profile):
+                data: bytes = read_bytes(file_path=corpus_file.path)
+                append_directory: str = os.path.join(self.directory, "append", corpus_file.profile)
+                os.makedirs(append_directory)
+                file_path: str = os.path.join(append_directory, os.path.basename(corpus_file.path))
+                log_file: str = os.path.join(append_directory, "count.log")
+                options: CountOptions = CountOptions(append=True)
+                # 書き込み途中のレコードで終わる前半をカウントしてから、残りを追記して続きをカウントする
+                with open(file=file_path, mode="wb") as f:
+                    f.write(data[: len(data) // 2])
+                first: CountResult = count_values_in_csv(
+                    file_path=file_path, log_file=log_file, field_size_limit=DEFAULT_FIELD_SIZE_LIMIT, options=options
+                )
+                self.assertIsNotNone(first.append_state)
+                with open(file=file_path, mode="ab") as f:
+                    f.write(data[len(data) // 2 :])
+                appended: CountResult = count_values_in_csv(
+                    file_path=file_path,
+                    log_file=log_file,
+                    field_size_limit=DEFAULT_FIELD_SIZE_LIMIT,
+                    options=options,
+                    append_state=first.append_state,
+                )
+                self.assertEqual(counted_values(result=appended), self.expected[corpus_file.path])
+                self.assertEqual(appended.append_state.record_end, len(data))
+
+    def test_append_command_line(self) -> None:
+        """--append で続きからカウントした出力ファイルは、--force でファイル全体をカウントしたものと同じ内容になる"""
+        corpus_file: CorpusFile = next(item for item in self.corpus if item.profile == "multiline")
+        data: bytes = read_bytes(file_path=corpus_file.path)
+        outputs: Dict[str, Tuple[bytes, bytes]] = {}
+        mode: str
+        for mode in ("--append", "--force"):
+            run_directory: str = os.path.join(self.directory, "append-command-line" + mode)
+            os.makedirs(os.path.join(run_directory, "in"))
+            file_path: str = os.path.join(run_directory, "in", os.path.basename(corpus_file.path))
+            output_dir: str = os.path.join(run_directory, "out")
+            if mode == "--append":
+                with open(file=file_path, mode="wb") as f:
+                    f.write(data[: len(data) // 3])
+                run_main([os.path.dirname(file_path)], output_dir, mode)
+                with open(file=file_path, mode="ab") as f:
+                    f.write(data[len(data) // 3 :])
+            else:
+                shutil.copyfile(src=corpus_file.path, dst=file_path)
+            run_main([os.path.dirname(file_path)], output_dir, mode)
+            outputs[mode] = (
+                read_bytes(file_path=file_path[: -len(".csv")] + ".txt"),
+                read_bytes(file_path=os.path.join(output_dir, SUMMARY_FILE_NAME)),
+            )
+        self.assertEqual(outputs["--append"], outputs["--force"])
+
+
+class SamplingTest(unittest.TestCase):
+    """抽出による充填率の推定（--sample）と全件カウントの比較"""
+
+    def setUp(self) -> None:
+        self.directory: str = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.log_file: str = os.path.join(self.directory, "sample.log")
+
+    def assert_exact(self, sampled: SampleResult, file_path: str) -> None:
+        """全件をカウントした推定結果（抽出方法 "full"）の充填率が、期待値から求めた割合と一致することを確認する"""
+        counts: Dict[str, int]
+        fieldnames: list[str]
+        data_row_count: int
+        counts, fieldnames, _, data_row_count = expected_counts(file_path=file_path, log_file=self.log_file)
+        self.assertEqual(sampled.method, "full")
+        self.assertEqual(sampled.fieldnames, fieldnames)
+        self.assertEqual(sampled.sample_rows, data_row_count)
+        self.assertEqual(
+            {name: estimate.fill_rate for name, estimate in sampled.estimates.items()},
+            {name: counts.get(name, 0) / data_row_count for name in fieldnames},
+        )
+
+    def test_small_file_is_counted(self) -> None:
+        """抽出で読み込む量以下の小さなファイルは全件をカウントする"""
+        file_path: str = os.path.join(TEST_CSV_DIRECTORY, "B", "項目数50個.csv")
+        sampled: SampleResult = sample_values_in_csv(
+            file_path=file_path, log_file=self.log_file, field_size_limit=DEFAULT_FIELD_SIZE_LIMIT, sample_size=100
+        )
+        self.assert_exact(sampled=sampled, file_path=file_path)
+
+    def test_compressed_head(self) -> None:
+        """抽出する件数より行数の少ない圧縮ファイルは、先頭から全件を読み込む"""
+        file_path: str = generate_csv_file(
+            file_path=os.path.join(self.directory, "multiline.csv"), profile=PROFILES["multiline"], rows=500
+        ).path
+        compressed_path: str = file_path + ".gz"
+        with open(file=compressed_path, mode="wb") as f:
+            f.write(gzip.compress(read_bytes(file_path=file_path)))
+        sampled: SampleResult = sample_values_in_csv(
+            file_path=compressed_path,
+            log_file=self.log_file,
+            field_size_limit=DEFAULT_FIELD_SIZE_LIMIT,
+            sample_size=1000,
+        )
+        self.assert_exact(sampled=sampled, file_path=file_path)
+
+    def test_random_sample(self) -> None:
+        """無作為抽出の充填率の推定値は全件をカウントした割合に近く、その割合は信頼区間に含まれる"""
+        file_path: str = generate_csv_file(
+            file_path=os.path.join(self.directory, "tall.csv"), profile=PROFILES["tall"], rows=100_000
+        ).path
+        counts: Dict[str, int]
+        fieldnames: list[str]
+        data_row_count: int
+        counts, fieldnames, _, data_row_count = expected_counts(file_path=file_path, log_file=self.log_file)
+        sampled: SampleResult = sample_values_in_csv(
+            file_path=file_path, log_file=self.log_file, field_size_limit=DEFAULT_FIELD_SIZE_LIMIT, sample_size=200
+        )
+        self.assertEqual(sampled.method, "random")
+        self.assertEqual(sampled.sample_rows, 200)
+        self.assertEqual(sampled.fieldnames, fieldnames)
+        name: str
+        for name in fieldnames:
+            with self.subTest(field=name):
+                fill_rate: float = counts.get(name, 0) / data_row_count
+                self.assertAlmostEqual(sampled.estimates[name].fill_rate, fill_rate, delta=0.05)
+                self.assertLessEqual(sampled.estimates[name].lower, fill_rate)
+                self.assertGreaterEqual(sampled.estimates[name].upper, fill_rate)
+
+
+class StatefulEncodingTest(unittest.TestCase):
+    """2バイト文字のバイトが区切り文字と一致する文字エンコーディング（iso-2022-jp）の比較"""
+
+    ENCODING: str = "iso-2022-jp"
+    ROWS: int = 2000  # 各種類のデータ行数
+    EXPECTED: Dict[str, int] = {"h1": 2000, "h2": 2000, "h3": 4000}
+
+    def setUp(self) -> None:
+        self.directory: str = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.log_file: str = os.path.join(self.directory, "count.log")
+        # 「が」は ESC $ B $ , ESC ( B となり、2バイト文字の2バイト目がカンマ (0x2C) と一致する
+        self.file_path: str = os.path.join(self.directory, "in", "jis.csv")
+        os.makedirs(os.path.dirname(self.file_path))
+        with open(file=self.file_path, mode="w", encoding=self.ENCODING, newline="") as f:
+            f.write("h1,h2,h3\r\n" + "が,,x\r\n" * self.ROWS + ",z,w\r\n" * self.ROWS)
+        self.assertIn(b"$,", read_bytes(file_path=self.file_path))
+
+    def test_engines_and_workers(self) -> None:
+        """全てのカウント方式・ワーカー数（分割を含む）で、テキストとして読み込んだ結果と同じになる"""
+        engine: str
+        for engine in ENGINES:
+            workers: int
+            for workers in WORKER_COUNTS:
+                with self.subTest(engine=engine, workers=workers):
+                    profiles: list[FileProfile] = list(
+                        profile_csv_files(
+                            roots=[self.file_path],
+                            encoding=self.ENCODING,
+                            workers=workers,
+                            engine=engine,
+                            chunk_size=4096,
+                        )
+                    )
+                    self.assertEqual(len(profiles), 1)
+                    self.assertEqual(profiles[0].messages, [])
+                    self.assertEqual(profiles[0].result.counts, self.EXPECTED)
+                    self.assertEqual(profiles[0].result.data_row_count, 2 * self.ROWS)
+
+    def test_append_and_sample(self) -> None:
+        """--append と抽出はファイルをテキストとして先頭から読み込む"""
+        options: CountOptions = CountOptions(append=True, encoding=self.ENCODING)
+        counted: CountResult = count_values_in_csv(
+            file_path=self.file_path, log_file=self.log_file, field_size_limit=DEFAULT_FIELD_SIZE_LIMIT, options=options
+        )
+        self.assertEqual(counted.counts, self.EXPECTED)
+        self.assertIsNone(counted.append_state)
+        sampled: SampleResult = sample_values_in_csv(
+            file_path=self.file_path,
+            log_file=self.log_file,
+            field_size_limit=DEFAULT_FIELD_SIZE_LIMIT,
+            sample_size=1,
+            options=CountOptions(encoding=self.ENCODING),
+        )
+        self.assertEqual(sampled.method, "head")
+        self.assertEqual(sampled.estimated_counts(), {"h1": 1, "h2": 0, "h3": 1})
+
+    def test_command_line(self) -> None:
+        """コマンドラインの --engine bytes と --append でも、テキストとして読み込んだ結果と同じになる"""
+        output_dir: str = os.path.join(self.directory, "out")
+        run_main(
+            [os.path.dirname(self.file_path)], output_dir, "--encoding", self.ENCODING, "--engine", "bytes", "--append"
+        )
+        with open(file=os.path.join(output_dir, SUMMARY_FILE_NAME), mode="r", encoding="cp932") as f:
+            self.assertEqual(
+                f.read().splitlines()[1:],
+                [f"jis.csv,{2 * self.ROWS},{name},{count}" for name, count in self.EXPECTED.items()],
+            )
+
+    def test_max_field_size_is_rejected(self) -> None:
+        """巨大なフィールドはバイト列のまま走査するため、--max-field-size とは同時に使えない"""
+        with self.assertRaises(ValueError):
+            list(
+                profile_csv_files(
+                    roots=[self.file_path], encoding=self.ENCODING, options=CountOptions(max_field_size=1024)
+                )
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
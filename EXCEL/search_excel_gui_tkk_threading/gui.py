@@ -5,13 +5,18 @@ EXCELファイルに grep する GUI ツール
 
 -----------------------------------------------------------------------
 
+検索はワーカースレッドで実行し、検索中も画面の操作（スクロール・ウィンドウの移動など）ができる。
+検索結果はファイル毎にキューへ入れ、メインスレッドの update_treeview で treeview へ順次反映する。
+
 TODO 修正途中。頑張る
 
 """
 
 import csv
 import subprocess
+import threading
 from logging import Logger
+from queue import Queue
 from tkinter import (
     BooleanVar,
     Menu,
@@ -19,10 +24,11 @@ from tkinter import (
     filedialog,
     ttk,
 )
-from typing import Any, List, Tuple
+from typing import Any, List, Optional, Tuple
 
 import utility
 from search_files import search_files
+from update_treeview import MESSAGE_DONE, MESSAGE_PROGRESS, MESSAGE_RESULT, UPDATE_INTERVAL_MS, update_treeview
 
 
 # 検索を実行する関数
@@ -33,11 +39,15 @@ def run_search(
     case_sensitive: bool,
     width_sensitive: bool,
     shape_search: bool,
-    progress_callback: Any,
+    message_queue: "Queue[Tuple[str, Any]]",
     logger: Logger,
-) -> List[Tuple[str, str, str, str, str, str]]:
+) -> None:
     """
-    EXCELファイル内を検索して、結果をリストで返す関数
+    EXCELファイル内を検索して、進捗と結果をキューへ入れる関数（ワーカースレッドで実行する）
+
+    検索が終了したら、エラーの有無に関わらず最後に検索終了のメッセージをキューへ入れる。
+    GUI の操作はメインスレッドで行うため、この関数ではメッセージボックスなどを表示しない。
+
     Args:
         folder_path (str): EXCELファイルを検索する起点となるフォルダのパス
         search_term (str): 検索したい語句
@@ -45,29 +55,30 @@ def run_search(
         case_sensitive (bool): 大文字/小文字を同一視するか否か
         width_sensitive (bool): 全角/半角を同一視するか否か
         shape_search (bool): 図形内のテキストも検索するか否か（但し 新形式 .xlsx, .xlsm ファイルのみ）
-        progress_callback (Any): 進捗を更新するためのコールバック関数
+        message_queue (Queue[Tuple[str, Any]]): メインスレッドへ進捗と検索結果を渡すキュー
         logger (Logger): logging.Logger
     Returns:
-        List[Tuple[str, str, str, str, str]]: 検索結果をメインウィンドウのテービル構造に合わせたリストで返す
+        None
     """
     logger.debug(msg="run_search()")
+    error_message: Optional[str] = None
     try:
-        results: List[Tuple[str, str, str, str, str, str]] = search_files(
+        search_files(
             folder_path=folder_path,
             search_term=search_term,
             recursive=recursive,
             case_sensitive=case_sensitive,
             width_sensitive=width_sensitive,
             shape_search=shape_search,
-            progress_callback=progress_callback,
+            progress_callback=lambda message: message_queue.put((MESSAGE_PROGRESS, message)),
             logger=logger,
+            result_callback=lambda result: message_queue.put((MESSAGE_RESULT, result)),
         )
-        return results
     except Exception as e:
-        msg: str = f"検索中にエラーが発生しました: {e}"
-        logger.error(msg=msg)
-        utility.mbox_err(message=msg)
-        return []
+        error_message = f"検索中にエラーが発生しました: {e}"
+        logger.error(msg=error_message)
+    finally:
+        message_queue.put((MESSAGE_DONE, error_message))
 
 
 def gui_main(logger: Logger) -> None:
@@ -107,7 +118,6 @@ def gui_main(logger: Logger) -> None:
             None
         """
         status_bar.config(text=f"  {message}")
-        root.update_idletasks()
 
     # -----------------------------------------------------------------
     def start_search() -> None:
@@ -135,8 +145,9 @@ def gui_main(logger: Logger) -> None:
         width_sensitive: bool = not ignore_width_var.get()
         shape_search: bool = shape_search_var.get()
 
-        # 検索開始
+        # 検索開始（検索が終了するまで検索開始ボタンを無効にする）
         result_table.delete(*result_table.get_children())
+        search_button.state(["disabled"])
         update_status(message="検索中...")
         logger.info(
             msg="検索を開始しました。"
@@ -147,30 +158,61 @@ def gui_main(logger: Logger) -> None:
             f" width_sensitive={width_sensitive}"
             f" shape_search={shape_search}"
         )
-        results: List[Tuple[str, str, str, str, str, str]] = run_search(
-            folder_path=folder_path,
-            search_term=search_term,
-            recursive=recursive,
-            case_sensitive=case_sensitive,
-            width_sensitive=width_sensitive,
-            shape_search=shape_search,
-            progress_callback=update_status,
-            logger=logger,
-        )
-        logger.debug(
-            msg=f"len(results) = {results}",
+        message_queue: "Queue[Tuple[str, Any]]" = Queue()
+        threading.Thread(
+            target=run_search,
+            kwargs={
+                "folder_path": folder_path,
+                "search_term": search_term,
+                "recursive": recursive,
+                "case_sensitive": case_sensitive,
+                "width_sensitive": width_sensitive,
+                "shape_search": shape_search,
+                "message_queue": message_queue,
+                "logger": logger,
+            },
+            daemon=True,
+        ).start()
+
+        # 検索結果はメインスレッドで定期的にキューから読み込んで treeview へ反映する
+        root.after(
+            UPDATE_INTERVAL_MS,
+            update_treeview,
+            root,
+            result_table,
+            message_queue,
+            update_status,
+            finish_search,
+            logger,
         )
-        for result in results:
-            result_table.insert(parent="", index="end", values=result)
+
+    # -----------------------------------------------------------------
+    def finish_search(error_message: Optional[str]) -> None:
+        """
+        検索終了時に検索開始ボタンを有効に戻し、結果のメッセージを表示する関数
+        Args:
+            error_message (Optional[str]): 検索中に発生したエラーのメッセージ（正常に終了した場合は None）
+        Returns:
+            None
+        """
+        logger.debug(msg="finish_search()")
+        search_button.state(["!disabled"])
+
+        if error_message is not None:
+            update_status(message=error_message)
+            utility.mbox_err(message=error_message)
+            return
 
         # 検索結果の件数にあわせたメッセージを表示
-        if len(results) == 0:
+        result_count: int = len(result_table.get_children())
+        logger.debug(msg=f"result_count = {result_count}")
+        if result_count == 0:
             msg: str = "該当するEXCELファイルは見つかりませんでした。"
             logger.info(msg=msg)
             update_status(message=msg)
             utility.mbox_info(message=msg)
         else:
-            msg = f"{len(results)} 件の結果が見つかりました。"
+            msg = f"{result_count} 件の結果が見つかりました。"
             logger.info(msg=msg)
             update_status(message=msg + " 行を選択してダブルクリックするとEXCELファイルを開く事が出来ます。")
             utility.mbox_info(message=msg)
@@ -299,7 +341,8 @@ def gui_main(logger: Logger) -> None:
         )
 
         # 検索開始ボタンの作成
-        ttk.Button(master=frame, text="検索開始", command=start_search).grid(row=2, column=5, pady=10, sticky="E")
+        search_button: ttk.Button = ttk.Button(master=frame, text="検索開始", command=start_search)
+        search_button.grid(row=2, column=5, pady=10, sticky="E")
 
         # 検索結果をCSVで保存するボタンの作成
         ttk.Button(master=frame, text="CSVで保存", command=save_csv_file).grid(row=2, column=6, pady=10, sticky="E")
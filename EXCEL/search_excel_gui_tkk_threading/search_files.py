@@ -23,6 +23,7 @@ def search_files(
     shape_search: bool,
     progress_callback: Any,
     logger: Logger,
+    result_callback: Any = None,
 ) -> List[Tuple[str, str, str, str, str, str]]:
     """
     指定されたパスから EXCEL ファイルを探して、指定された検索語を含むセルを検索し、結果をリストで返す関数
@@ -36,9 +37,14 @@ def search_files(
         shape_search (bool): 図形内のテキストも検索するか否か（但し 新形式 .xlsx, .xlsm ファイルのみ）
         progress_callback (Any): 進捗を更新するためのコールバック関数
         logger (Logger): logging.Logger
+        result_callback (Any): 検索結果を1件ずつ受け取るコールバック関数（ファイル毎に、見つかった順に呼び出す）
 
     Returns:
         List[Tuple[str, str, str, str, str]]: 検索結果をメインウィンドウのテーブル構造に合わせたリストで返す
+
+    Note:
+        - ワーカースレッドから呼び出す場合、コールバック関数の中で GUI を直接操作しないこと
+          （キューへ入れてメインスレッドで反映する。update_treeview を参照）
     """
 
     logger.debug(msg="search_in_excel_files()")
@@ -48,11 +54,11 @@ def search_files(
         s=search_term,
         ignore_case=not case_sensitive,
         ignore_width=not width_sensitive,
-        logger=logger,
     )
 
     # 検索結果を格納するリストを初期化
     results: List[Tuple[str, str, str, str, str, str]] = []
+    found_count: int = 0  # result_callback に渡した検索結果の件数
 
     # 指定したフォルダ内のすべてのファイルを取得
     for root, dirs, files in os.walk(folder_path):
@@ -93,6 +99,12 @@ def search_files(
                 else:
                     pass  # 処理対象のファイルではない
 
+                # このファイルで見つかった検索結果を渡す（検索の終了を待たずに表示できるように）
+                if result_callback is not None:
+                    for result in results[found_count:]:
+                        result_callback(result)
+                found_count = len(results)
+
         # 再帰的に検索しない場合は、フォルダ内のファイルをすべて検索したら終了
         if not recursive:
             logger.debug(msg="再帰的に検索しない。")
@@ -4,14 +4,85 @@
 読み込み、GUI の treeview へ反映する。
 -----------------------------------------------------------------------
 
-TODO 修正途中。頑張る
+検索はワーカースレッドで実行し、検索結果と進捗はキューでメインスレッドへ渡す。
+Tkinter のウィジェットはメインスレッド以外から操作できないため、
+メインスレッドが root.after() のタイマーで定期的にキューを読み込み、まとめて treeview へ反映する。
 
 """
 
+from logging import Logger
+from queue import Empty, Queue
+from tkinter import Tk, ttk
+from typing import Any, Callable, Optional, Tuple
 
-def update_treeview() -> None:
+# キューへ入れるメッセージの種類（メッセージは (種類, 内容) のタプル）
+MESSAGE_PROGRESS: str = "progress"  # 進捗（内容: ステータスバーに表示するメッセージ）
+MESSAGE_RESULT: str = "result"  # 検索結果1件（内容: treeview の1行分のタプル）
+MESSAGE_DONE: str = "done"  # 検索終了（内容: エラーメッセージ、正常に終了した場合は None）
+
+UPDATE_INTERVAL_MS: int = 100  # キューを読み込む間隔（ミリ秒）
+MAX_MESSAGES_PER_UPDATE: int = 500  # 1回に読み込むメッセージの最大件数（残りは次の読み込みで反映する）
+
+
+def update_treeview(
+    root: Tk,
+    result_table: ttk.Treeview,
+    message_queue: "Queue[Tuple[str, Any]]",
+    update_status: Callable[[str], None],
+    on_finished: Callable[[Optional[str]], None],
+    logger: Logger,
+) -> None:
     """
     キューへ入ってきた EXCEL 新形式/旧型式ファイル内の検索結果を
     読み込み、GUI の treeview へ反映する。
+
+    検索終了のメッセージを受け取るまで、UPDATE_INTERVAL_MS ミリ秒毎に root.after() で繰り返し呼び出される。
+
+    Args:
+        root (Tk): メインウィンドウ
+        result_table (ttk.Treeview): 検索結果を表示する treeview
+        message_queue (Queue[Tuple[str, Any]]): ワーカースレッドからのメッセージを受け取るキュー
+        update_status (Callable[[str], None]): ステータスバーのメッセージを更新する関数
+        on_finished (Callable[[Optional[str]], None]): 検索終了時に呼び出す関数（引数はエラーメッセージ）
+        logger (Logger): logging.Logger
+    Returns:
+        None
     """
-    pass
+    progress_message: Optional[str] = None
+    finished: bool = False
+    error_message: Optional[str] = None
+    try:
+        # 1回に読み込む件数を制限し、検索結果が多い場合も画面の再描画と操作を妨げない
+        for _ in range(MAX_MESSAGES_PER_UPDATE):
+            kind: str
+            content: Any
+            kind, content = message_queue.get_nowait()
+            if kind == MESSAGE_RESULT:
+                result_table.insert(parent="", index="end", values=content)
+            elif kind == MESSAGE_PROGRESS:
+                # 進捗は最後のメッセージだけを表示する
+                progress_message = content
+            elif kind == MESSAGE_DONE:
+                finished = True
+                error_message = content
+                break
+    except Empty:
+        pass
+
+    if finished:
+        logger.debug(msg="検索終了のメッセージを受け取りました。")
+        on_finished(error_message)
+        return
+
+    if progress_message is not None:
+        update_status(progress_message)
+    root.after(
+        UPDATE_INTERVAL_MS,
+        update_treeview,
+        root,
+        result_table,
+        message_queue,
+        update_status,
+        on_finished,
+        logger,
+    )